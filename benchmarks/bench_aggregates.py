@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Aggregates benchmark - full-scan /api/metrics totals vs incrementally maintained ones
+
+For each table size, times the per-request cost of the previous get_metrics()
+computation (two passes over every interface) against reading
+InterfaceAggregates, plus the write-side cost the telemetry path now pays
+per updated interface. Results are checked to agree after a round of updates.
+
+    python benchmarks/bench_aggregates.py [--sizes 10000 100000 1000000] [--reads 200]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from monitoring.aggregates import InterfaceAggregates
+
+
+def synthetic_interfaces(count):
+    return [
+        {
+            'name': f'gigabitethernet{index // 4800}/{index // 48 % 100}/{index % 48}',
+            'building': f'building{index % 40}',
+            'vlan': 100 + index % 200,
+            'status': 'up' if random.random() < 0.9 else 'down',
+            'traffic_rx': random.randrange(10 ** 9),
+            'traffic_tx': random.randrange(10 ** 9)
+        }
+        for index in range(count)
+    ]
+
+
+def full_scan(interfaces):
+    """What get_metrics() computed on every request before"""
+    total_interfaces = len(interfaces)
+    up_interfaces = sum(1 for i in interfaces if i['status'] == 'up')
+    total_traffic = sum(i['traffic_rx'] + i['traffic_tx'] for i in interfaces)
+    return {
+        'total_interfaces': total_interfaces,
+        'up_interfaces': up_interfaces,
+        'total_traffic': total_traffic,
+        'health_score': round((up_interfaces / total_interfaces) * 100, 1)
+    }
+
+
+def per_call_us(runs, call):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--reads', type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(7)
+    print(f"{'interfaces':>10}  {'full scan':>12}  {'aggregates':>12}  {'speedup':>8}  {'update':>10}  {'load':>8}")
+    for size in args.sizes:
+        interfaces = synthetic_interfaces(size)
+        aggregates = InterfaceAggregates()
+        started = time.perf_counter()
+        aggregates.load(interfaces)
+        load_ms = (time.perf_counter() - started) * 1000
+
+        # One telemetry round: every interface gets counters, 1% flap
+        updates = [(interface, 'down' if random.random() < 0.01 else interface['status'],
+                    random.randrange(10 ** 6), random.randrange(10 ** 6)) for interface in interfaces]
+        started = time.perf_counter()
+        for interface, status, rx_delta, tx_delta in updates:
+            interface['status'] = status
+            interface['traffic_rx'] += rx_delta
+            interface['traffic_tx'] += tx_delta
+            aggregates.observe(interface['name'], status, rx_delta, tx_delta)
+        update_us = (time.perf_counter() - started) * 1e6 / size
+
+        expected = full_scan(interfaces)
+        summary = aggregates.summary()
+        mismatched = [key for key in expected if expected[key] != summary[key]]
+        if mismatched:
+            raise SystemExit(f"aggregates disagree with full scan on {mismatched}")
+
+        scan_us = per_call_us(max(3, args.reads * 10000 // size), lambda: full_scan(interfaces))
+        read_us = per_call_us(args.reads, aggregates.summary)
+        print(f"{size:>10}  {scan_us / 1000:>9.2f} ms  {read_us:>9.2f} us  {scan_us / read_us:>7.0f}x  "
+              f"{update_us:>7.2f} us  {load_ms:>5.0f} ms")
+        by_building = per_call_us(args.reads, lambda: aggregates.groups('building'))
+        print(f"{'':>10}  group_by=building read ({len(aggregates.groups('building'))} groups): {by_building:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
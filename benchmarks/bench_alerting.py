@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Alerting benchmark - per-cycle rule evaluation cost
+
+Evaluates a telemetry cycle of N interface series against R compiled
+monitored-metrics rules spread over utilization and rate metrics.
+
+    python benchmarks/bench_alerting.py [--series 100000] [--rules 300] [--cycles 20]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from monitoring.alerting import AlertEngine
+
+METRICS = ('rx_utilization', 'tx_utilization', 'rx_bps', 'tx_bps')
+SEVERITIES = ('low', 'medium', 'high', 'critical')
+
+
+def make_rules(count):
+    """Rules spread across metrics with thresholds in the upper operating range"""
+    rules = []
+    for index in range(count):
+        metric = METRICS[index % len(METRICS)]
+        level = 50 + 49 * (index // len(METRICS)) / max(1, count // len(METRICS))
+        threshold = level if metric.endswith('utilization') else level * 10_000_000
+        rules.append({'name': f'rule{index}', 'metric': metric, 'threshold': round(threshold, 2),
+                      'severity': SEVERITIES[index % len(SEVERITIES)]})
+    return rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--series', type=int, default=100000)
+    parser.add_argument('--rules', type=int, default=300)
+    parser.add_argument('--cycles', type=int, default=20)
+    args = parser.parse_args()
+
+    # Rate-limit warnings are expected under this synthetic churn
+    logging.getLogger('monitoring.alerting').setLevel(logging.ERROR)
+
+    rng = np.random.default_rng(1)
+    engine = AlertEngine()
+    engine.load_rules(make_rules(args.rules))
+
+    keys = [(f'sw{index // 48:05d}', f'ge1/0/{index % 48}') for index in range(args.series)]
+    speed = np.full(args.series, 1000.0)
+    # Typical campus load: ~30% utilization with a hot tail
+    utilization = np.clip(rng.normal(30, 15, args.series), 0, 100)
+
+    timings = []
+    for cycle in range(args.cycles + 1):
+        utilization = np.clip(utilization + rng.normal(0, 2, args.series), 0, 100)
+        columns = {
+            'speed_mbps': speed,
+            'rx_bps': utilization * 10_000_000,
+            'tx_bps': utilization * 6_000_000
+        }
+        started = time.perf_counter()
+        engine.evaluate_columns(keys, columns)
+        elapsed = time.perf_counter() - started
+        if cycle:
+            timings.append(elapsed)
+        else:
+            print(f"first cycle (allocating series state): {elapsed * 1000:.1f} ms")
+
+    timings.sort()
+    print(f"{args.series} series x {args.rules} rules: "
+          f"median {timings[len(timings) // 2] * 1000:.2f} ms, max {timings[-1] * 1000:.2f} ms per cycle, "
+          f"{engine.transitions_total} transitions, {engine.active_alert_count()} active alerts")
+
+
+if __name__ == '__main__':
+    main()
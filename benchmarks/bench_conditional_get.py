@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Conditional GET benchmark - polling cost of /api/status and /api/metrics
+
+Serves requests through the Flask test client (no sockets) and reports
+CPU time per poll for: re-encoding the payload on every request (the
+previous behaviour), the cached versioned response, and a 304
+revalidation. Then parks idle long-polls (?wait=<version>) for a few
+seconds and reports the process CPU they used.
+
+    python benchmarks/bench_conditional_get.py [--polls 2000] [--waiters 20] [--idle 5]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+
+def cpu_us_per_call(polls, call):
+    started = time.process_time()
+    for _ in range(polls):
+        call()
+    return (time.process_time() - started) * 1e6 / polls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--polls', type=int, default=2000)
+    parser.add_argument('--waiters', type=int, default=20)
+    parser.add_argument('--idle', type=float, default=5.0, help='seconds to hold the long-polls open')
+    args = parser.parse_args()
+
+    os.environ.setdefault('IBN_DATA_DIR', tempfile.mkdtemp(prefix='ibn-bench-'))
+    import logging
+    logging.disable(logging.INFO)
+    from flask import jsonify
+    from web_ui import app as web
+
+    client = web.app.test_client()
+    with web.app.test_request_context():
+        uncached = {
+            'status': lambda: jsonify(web.status_payload()).get_data(),
+            'metrics': lambda: jsonify(web.metrics_payload()).get_data(),
+        }
+    for name in ('status', 'metrics'):
+        path = f'/api/{name}'
+        etag = client.get(path).headers['ETag']
+        with web.app.test_request_context():
+            encode_us = cpu_us_per_call(args.polls, uncached[name])
+        full_us = cpu_us_per_call(args.polls, lambda: client.get(path))
+        revalidate_us = cpu_us_per_call(args.polls, lambda: client.get(path, headers={'If-None-Match': etag}))
+        print(f"{path:<13} payload encode {encode_us:6.0f} us (skipped when unchanged)  "
+              f"cached 200 {full_us:6.0f} us  304 {revalidate_us:6.0f} us per poll")
+
+    version = client.get('/api/status').headers['X-Resource-Version']
+    poll_us = cpu_us_per_call(args.polls, lambda: client.get('/api/status'))
+    results = []
+
+    def long_poll():
+        response = web.app.test_client().get(f'/api/status?wait={version}&timeout={args.idle}')
+        results.append(response.status_code)
+
+    waiters = [threading.Thread(target=long_poll) for _ in range(args.waiters)]
+    started_cpu, started = time.process_time(), time.perf_counter()
+    for waiter in waiters:
+        waiter.start()
+    for waiter in waiters:
+        waiter.join()
+    cpu_ms = (time.process_time() - started_cpu) * 1000
+    wall = time.perf_counter() - started
+    print(f"{args.waiters} idle long-polls for {wall:.1f} s: {cpu_ms:.0f} ms CPU total, "
+          f"responses {sorted(set(results))}; polling every second would be "
+          f"{args.waiters * args.idle:.0f} requests, ~{args.waiters * args.idle * poll_us / 1000:.0f} ms CPU")
+
+
+if __name__ == '__main__':
+    main()
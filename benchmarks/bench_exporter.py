@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Exporter benchmark - scrape time and RSS for interface metrics
+
+Compares the columnar InterfaceMetricsCollector, scraped through
+MetricsHub.render as Prometheus text, OpenMetrics and gzipped text, against
+per-interface Gauge label children. Each size/mode runs in its own process so RSS
+numbers are not polluted by earlier runs.
+
+    python benchmarks/bench_exporter.py [--sizes 50000,500000] [--modes collector,openmetrics,gzip,gauges]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+
+def rss_mb():
+    """Current resident set size in MiB (Linux)"""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def make_batch(series, cycle=0):
+    """Synthetic telemetry batch; 'series' counts interfaces"""
+    ports = 48
+    return [
+        {
+            'device': f'sw{index // ports:05d}',
+            'interface': f'ge1/0/{index % ports}',
+            'status': 1,
+            'speed_mbps': 1000.0,
+            'rx_bytes': index * 1000 + cycle,
+            'tx_bytes': index * 500 + cycle,
+            'rx_bps': float(index % 1000),
+            'tx_bps': float(index % 700)
+        }
+        for index in range(series)
+    ]
+
+
+# Accept / Accept-Encoding headers of the scrape for each collector mode
+SCRAPE_HEADERS = {
+    'collector': ('', ''),
+    'openmetrics': ('application/openmetrics-text; version=1.0.0', ''),
+    'gzip': ('', 'gzip'),
+}
+
+
+def run_collector(mode, registry):
+    from monitoring.metrics import MetricsHub
+    hub = MetricsHub(registry)
+    accept, accept_encoding = SCRAPE_HEADERS[mode]
+    return hub.interface_metrics.update, lambda: hub.render(accept, accept_encoding)[0]
+
+
+def run_gauges(mode, registry):
+    from prometheus_client import Gauge, generate_latest
+    speed = Gauge('network_interface_speed_mbps', 'Interface speed in Mbps', ['device', 'interface'], registry=registry)
+    status = Gauge('network_interface_status', 'Interface status', ['device', 'interface'], registry=registry)
+    traffic = Gauge('network_interface_traffic_bytes', 'Interface traffic', ['device', 'interface', 'direction'], registry=registry)
+    rate = Gauge('network_interface_rate_bps', 'Interface rate', ['device', 'interface', 'direction'], registry=registry)
+
+    def update(batch):
+        for sample in batch:
+            device, interface = sample['device'], sample['interface']
+            speed.labels(device, interface).set(sample['speed_mbps'])
+            status.labels(device, interface).set(sample['status'])
+            traffic.labels(device, interface, 'rx').set(sample['rx_bytes'])
+            traffic.labels(device, interface, 'tx').set(sample['tx_bytes'])
+            rate.labels(device, interface, 'rx').set(sample['rx_bps'])
+            rate.labels(device, interface, 'tx').set(sample['tx_bps'])
+    return update, lambda: generate_latest(registry)
+
+
+def measure(mode, series, repeats=3):
+    """Run one size/mode in-process and return the measurements"""
+    from prometheus_client import CollectorRegistry
+
+    registry = CollectorRegistry()
+    batch = make_batch(series)
+    baseline_rss = rss_mb()
+    runner = run_gauges if mode == 'gauges' else run_collector
+    update, scrape = runner(mode, registry)
+
+    update_times = []
+    for cycle in range(repeats):
+        batch = make_batch(series, cycle)
+        started = time.perf_counter()
+        update(batch)
+        update_times.append(time.perf_counter() - started)
+    del batch
+
+    scrape_times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        payload = scrape()
+        scrape_times.append(time.perf_counter() - started)
+
+    return {
+        'mode': mode,
+        'series': series,
+        'update_ms': round(min(update_times) * 1000, 1),
+        'scrape_ms': round(min(scrape_times) * 1000, 1),
+        'payload_mb': round(len(payload) / 1_048_576, 1),
+        'rss_mb': round(rss_mb() - baseline_rss, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='50000,500000')
+    parser.add_argument('--modes', default='collector,openmetrics,gzip,gauges')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.modes, int(args.sizes))))
+        return
+
+    for series in (int(size) for size in args.sizes.split(',')):
+        for mode in args.modes.split(','):
+            output = subprocess.run(
+                [sys.executable, __file__, '--child', '--sizes', str(series), '--modes', mode],
+                capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output)
+            print(f"{result['mode']:>9} {result['series']:>7} interfaces: "
+                  f"update {result['update_ms']:>8} ms  scrape {result['scrape_ms']:>8} ms  "
+                  f"payload {result['payload_mb']:>6} MiB  rss +{result['rss_mb']} MiB")
+
+
+if __name__ == '__main__':
+    main()
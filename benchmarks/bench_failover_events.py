@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Failover event benchmark - per-event cost of MetricsHub fan-out
+
+Publishes events through a private hub with 0, 1 and 3 subscribers,
+then measures scrape time with many failover managers registered.
+
+    python benchmarks/bench_failover_events.py [--events 200000] [--managers 100]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from prometheus_client import CollectorRegistry, generate_latest
+
+from failover.failover_manager import FailoverManager
+from monitoring.metrics import MetricsHub
+
+
+def publish_cost(events, subscribers):
+    """Mean microseconds per published event"""
+    hub = MetricsHub(CollectorRegistry())
+    for _ in range(subscribers):
+        hub.subscribe(lambda event: None)
+
+    started = time.perf_counter()
+    for index in range(events):
+        hub.publish_failover_event('shard0', f'group{index % 64}', 'failover', 'eth0', 'eth1')
+    return (time.perf_counter() - started) / events * 1_000_000
+
+
+def scrape_cost(managers, groups_per_manager=16):
+    """Milliseconds to render failover metrics for many managers"""
+    hub = MetricsHub(CollectorRegistry())
+    instances = []
+    for index in range(managers):
+        manager = FailoverManager(None, hub, name=f'shard{index}')
+        manager.set_failover_groups([
+            {'name': f'group{group}', 'primary-interfaces': ['eth0'], 'backup-interfaces': ['eth1']}
+            for group in range(groups_per_manager)
+        ])
+        instances.append(manager)
+
+    started = time.perf_counter()
+    generate_latest(hub.registry)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--managers', type=int, default=100)
+    args = parser.parse_args()
+
+    for subscribers in (0, 1, 3):
+        cost = publish_cost(args.events, subscribers)
+        print(f"publish with {subscribers} subscribers: {cost:.2f} us/event")
+    print(f"scrape with {args.managers} managers x 16 groups: {scrape_cost(args.managers):.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
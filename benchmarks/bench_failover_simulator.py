@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Failover simulator benchmark - a simulated year of failover groups, vectorized vs tick-by-tick
+
+Builds failover groups of one primary and two backups (backups shared
+between neighbouring groups, as on a pair of distribution uplinks), samples
+a year of interface failures (steady, then with 2% of interfaces flapping
+daily or hourly) and times the vectorized replay of each. A FailoverManager driven check by check over the same
+timelines on a few groups gives the per-check cost of the real state
+machine for comparison, and must agree with the simulator on them. Each
+scenario, and a few hours of flapping incident (10% of interfaces down
+every ~5 minutes), is also replayed without flap dampening to show the
+switchovers (and NETCONF pushes) that dampening saves.
+
+    python benchmarks/bench_failover_simulator.py [--groups 5000] [--days 365]
+"""
+
+import argparse
+import logging
+import math
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+import numpy as np
+
+from failover.dampening import FlapDampener
+from failover.failover_manager import FailoverManager
+from failover.simulator import DAY, FailoverSimulator
+from monitoring.metrics import MetricsHub
+
+FLAKY_REPAIR = {'distribution': 'exponential', 'mean': 45.0}
+# name -> flaky population (None: every interface on the default monthly failure rate)
+SCENARIOS = {
+    'steady': None,
+    '2% flap daily': {'fraction': 0.02, 'failure': {'distribution': 'exponential', 'mean': DAY}, 'repair': FLAKY_REPAIR},
+    '2% flap hourly': {'fraction': 0.02, 'failure': {'distribution': 'exponential', 'mean': 3600.0},
+                       'repair': FLAKY_REPAIR},
+}
+INCIDENT = {'fraction': 0.1, 'failure': {'distribution': 'exponential', 'mean': 300.0}, 'repair': FLAKY_REPAIR}
+
+def failover_groups(count):
+    return [{'name': f'group{index}', 'primary-interfaces': [f'gi{index}/0/1'],
+             'backup-interfaces': [f'te{index // 2}/1/1', f'te{index // 2}/1/2']}
+            for index in range(count)]
+
+
+def manager_replay(groups, transitions, ticks):
+    """Reference: the real FailoverManager, one run_health_checks() per simulated check"""
+    hub = MetricsHub()
+    clock = [0]
+    dampener = FlapDampener(clock=lambda: clock[0] * FailoverManager.CHECK_INTERVAL)
+    manager = FailoverManager(None, hub, name='bench', dampener=dampener)
+    manager.set_failover_groups(groups)
+    events = []
+    hub.subscribe(events.append)
+    seen_ticks = {name: np.ceil(times / manager.CHECK_INTERVAL) for name, times in transitions.items()}
+    manager._check_interface_health = lambda name: np.searchsorted(seen_ticks[name], clock[0], side='right') % 2 == 0
+    for tick in range(ticks):
+        clock[0] = tick
+        manager.run_health_checks()
+    return sum(event['kind'] == 'failover' for event in events), sum(event['kind'] == 'failback' for event in events)
+
+
+def report_dampening(summary, plain):
+    switches, plain_switches = summary['failovers'] + summary['failbacks'], plain['failovers'] + plain['failbacks']
+    print(f"    dampening: {summary['suppressed_failbacks']} failbacks suppressed, {switches} switchovers vs "
+          f"{plain_switches} undampened ({1 - switches / max(plain_switches, 1):.0%} fewer); unavailability p99 "
+          f"{summary['unavailability']['p99']:.2e} vs {plain['unavailability']['p99']:.2e} undampened")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--groups', type=int, default=5000)
+    parser.add_argument('--days', type=float, default=365)
+    parser.add_argument('--incident-hours', type=float, default=6)
+    parser.add_argument('--reference-groups', type=int, default=4)
+    parser.add_argument('--reference-days', type=float, default=7)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    groups = failover_groups(args.groups)
+    simulator = FailoverSimulator(groups)
+    undampened = FailoverSimulator(groups, dampening=None)
+    duration = args.days * DAY
+    checks = args.groups * math.ceil(duration / simulator.check_interval)
+    print(f"{args.groups} groups, {len(simulator.interfaces)} interfaces, {args.days:g} simulated days "
+          f"({checks:,} group checks)")
+    for name, flaky in SCENARIOS.items():
+        started = time.perf_counter()
+        transitions = simulator.sample_transitions(duration, seed=7, flaky=flaky)
+        sample_seconds = time.perf_counter() - started
+        result = simulator.replay(transitions, duration)
+        summary = result.to_dict()
+        print(f"  {name}: sample {sample_seconds:.2f} s + replay {result.wall_seconds:.2f} s "
+              f"({summary['interface_transitions']:,} transitions)")
+        print(f"    {summary['failovers']} failovers, {summary['failbacks']} failbacks; "
+              f"MTTR p50 {summary['mttr_seconds'].get('p50', 0):.0f} s p99 {summary['mttr_seconds'].get('p99', 0):.0f} s; "
+              f"unavailability p50 {summary['unavailability']['p50']:.2e} p99.9 {summary['unavailability']['p99.9']:.2e}")
+        report_dampening(summary, undampened.replay(transitions, duration).to_dict())
+
+    incident = args.incident_hours * 3600
+    transitions = simulator.sample_transitions(incident, seed=7, flaky=INCIDENT)
+    result = simulator.replay(transitions, incident)
+    print(f"  flapping incident, {args.incident_hours:g} h: replay {result.wall_seconds:.2f} s "
+          f"({result.interface_transitions:,} transitions)")
+    report_dampening(result.to_dict(), undampened.replay(transitions, incident).to_dict())
+
+    reference = failover_groups(args.reference_groups)
+    reference_duration = args.reference_days * DAY
+    reference_simulator = FailoverSimulator(reference)
+    reference_transitions = reference_simulator.sample_transitions(
+        reference_duration, seed=7, flaky=dict(SCENARIOS['2% flap hourly'], fraction=0.5))
+    expected = reference_simulator.replay(reference_transitions, reference_duration)
+    ticks = math.ceil(reference_duration / reference_simulator.check_interval)
+    started = time.perf_counter()
+    counts = manager_replay(reference, reference_transitions, ticks)
+    elapsed = time.perf_counter() - started
+    per_check = elapsed / (ticks * len(reference))
+    print(f"  FailoverManager tick loop: {per_check * 1e6:.1f} us per group check "
+          f"-> {per_check * checks / 3600:.1f} h per scenario above")
+    if counts != (int(expected.failovers.sum()), int(expected.failbacks.sum())):
+        raise SystemExit(f"simulator {expected.failovers.sum()}/{expected.failbacks.sum()} "
+                         f"disagrees with FailoverManager {counts[0]}/{counts[1]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Interface query benchmark - indexed filters, sparse fields and cursor paging at campus scale
+
+Builds a synthetic interface table, times the index build, then measures
+end-to-end query latency (engine + JSON encoding of the response) for the
+query shapes the dashboard and API clients use, against the previous
+behaviour of serializing the whole list.
+
+    python benchmarks/bench_interface_query.py [--interfaces 100000] [--runs 200]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from web_ui.interface_query import InterfaceQueryEngine
+
+
+def synthetic_interfaces(count):
+    speeds = ['100M', '1G', '1G', '1G', '10G', '25G']
+    return [
+        {
+            'name': f'gigabitethernet{index // 4800}/{index // 48 % 100}/{index % 48}',
+            'status': 'up' if random.random() < 0.8 else 'down',
+            'speed': random.choice(speeds),
+            'vlan': 100 + random.randrange(200),
+            'description': f"{random.choice(('Access', 'Uplink', 'AP', 'Camera', 'Printer'))} port {index}",
+            'traffic_rx': random.randrange(10 ** 12),
+            'traffic_tx': random.randrange(10 ** 12),
+            'rx_bps': random.random() * 1e9,
+            'tx_bps': random.random() * 1e9
+        }
+        for index in range(count)
+    ]
+
+
+def timed(runs, query):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        query()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--interfaces', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(7)
+    records = synthetic_interfaces(args.interfaces)
+    engine = InterfaceQueryEngine(records)
+    started = time.perf_counter()
+    engine.index()
+    print(f"{args.interfaces} interfaces: index build {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    page = engine.query({'status': 'up'}, sort='name', limit=100)
+    cursor = page['next_cursor']
+    cases = [
+        ('full list (previous behaviour)', lambda: json.dumps({'interfaces': records}), 5),
+        ('status=up&speed=10G&fields=name,vlan&limit=100',
+         lambda: engine.query({'status': 'up', 'speed': '10G'}, fields=['name', 'vlan'], limit=100), args.runs),
+        ('vlan=150&sort=-speed&limit=100',
+         lambda: engine.query({'vlan': '150'}, sort='-speed', limit=100), args.runs),
+        ('description_prefix=uplink&limit=100',
+         lambda: engine.query({'description_prefix': 'uplink'}, limit=100), args.runs),
+        ('status=up&limit=100&cursor=<page 2>',
+         lambda: engine.query({'status': 'up'}, limit=100, cursor=cursor), args.runs),
+        ('sort=-rx_bps&fields=name,rx_bps&limit=100',
+         lambda: engine.query({}, fields=['name', 'rx_bps'], sort='-rx_bps', limit=100), args.runs),
+    ]
+    for label, query, runs in cases:
+        p50, p99 = timed(runs, lambda: json.dumps(query()))
+        print(f"  {label:<50} p50 {p50:8.2f} ms  p99 {p99:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Interface table benchmark - memory and bulk-update cost of dict-per-interface vs InterfaceTable
+
+Builds the same synthetic campus interfaces as a list of dicts and as an
+InterfaceTable, measures the memory each holds (tracemalloc), then times a
+telemetry-style bulk counter update, a full JSON export and a Prometheus
+text render (both streamed in chunks).
+
+    python benchmarks/bench_interface_table.py [--interfaces 1000000]
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Imported up front so the table's memory does not include numpy itself
+import numpy
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from netconf_client.interface_table import InterfaceTable
+
+DESCRIPTIONS = ('Faculty access', 'Student access', 'Uplink', 'Wireless AP', 'Camera', 'Printer')
+
+
+def synthetic_interfaces(count):
+    return [
+        {
+            'name': f'gigabitethernet{index // 4800}/{index // 48 % 100}/{index % 48}',
+            'ip_address': f'10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}/24',
+            'speed': random.choice(('1G', '1G', '10G')),
+            'status': 'up' if random.random() < 0.9 else 'down',
+            'vlan': 100 + index % 200,
+            'traffic_rx': random.getrandbits(48),
+            'traffic_tx': random.getrandbits(48),
+            'description': random.choice(DESCRIPTIONS),
+            'rx_bps': random.randrange(10 ** 9),
+            'tx_bps': random.randrange(10 ** 9)
+        }
+        for index in range(count)
+    ]
+
+
+def measured(build):
+    """Run ``build`` and return (result, bytes it still holds)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, held
+
+
+def timed(label, call):
+    started = time.perf_counter()
+    result = call()
+    print(f"  {label:<44} {(time.perf_counter() - started) * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--interfaces', type=int, default=1000000)
+    args = parser.parse_args()
+    count = args.interfaces
+
+    random.seed(7)
+    records, dict_bytes = measured(lambda: synthetic_interfaces(count))
+    table, table_bytes = measured(lambda: InterfaceTable.from_records(records))
+    print(f"{count} interfaces")
+    print(f"  list of dicts   {dict_bytes / 2 ** 20:8.1f} MiB  ({dict_bytes / count:6.1f} bytes/interface)")
+    print(f"  InterfaceTable  {table_bytes / 2 ** 20:8.1f} MiB  ({table_bytes / count:6.1f} bytes/interface)")
+    print(f"  reduction       {dict_bytes / table_bytes:8.1f}x")
+
+    # One telemetry round: every interface gets new counters and rates
+    names = [record['name'] for record in records]
+    rx_deltas = [random.randrange(10 ** 6) for _ in range(count)]
+    rates = [random.random() * 1e9 for _ in range(count)]
+
+    def update_dicts():
+        by_name = {record['name']: record for record in records}
+        for name, delta, rate in zip(names, rx_deltas, rates):
+            record = by_name[name]
+            record['traffic_rx'] += delta
+            record['rx_bps'] = round(rate)
+
+    print("bulk counter update")
+    timed('dicts (lookup by name, per-field writes)', update_dicts)
+    rows = timed('table (name -> row lookup)', lambda: table.rows_of(names))
+    timed('table (vectorized add/assign by row)', lambda: (table.add('traffic_rx', rows, rx_deltas),
+                                                           table.assign('rx_bps', rows, rates)))
+    if table[count // 2]['traffic_rx'] != records[count // 2]['traffic_rx']:
+        raise SystemExit("table and dicts disagree after the update")
+
+    print("export")
+    timed('json.dumps(list of dicts)', lambda: json.dumps(records))
+    timed('InterfaceTable.iter_json() (streamed)', lambda: sum(map(len, table.iter_json())))
+    timed('InterfaceTable.iter_prometheus() (streamed)', lambda: sum(map(len, table.iter_prometheus('campus'))))
+
+
+if __name__ == '__main__':
+    main()
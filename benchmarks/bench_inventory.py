@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Inventory benchmark - label selector resolution and incremental reload on a large campus
+
+Loads a labelled inventory (building, floor, role, vendor), then times
+selector resolution against a full scan of the device labels, an
+incremental reload that changes a small fraction of the devices, and the
+slowest selector resolution a reader sees while that reload runs.
+
+    python benchmarks/bench_inventory.py [--devices 50000] [--churn 0.01]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from inventory.device_inventory import DeviceInventory
+
+SELECTORS = ['building=b07,role=access', 'building in (b01,b02),floor=3,vendor!=juniper', 'role=core']
+
+
+def campus(count, rng):
+    return [{
+        'name': f'sw{index:06d}', 'host': f'10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}',
+        'labels': {'building': f'b{index % 40:02d}', 'floor': str(index % 6),
+                   'role': rng.choice(('access', 'access', 'access', 'distribution', 'core')),
+                   'vendor': rng.choice(('cisco', 'juniper', 'arista'))}
+    } for index in range(count)]
+
+
+def scan(devices, selector):
+    """Reference resolution without the index"""
+    terms = [term.split('=') for term in selector.split(',') if ' in ' not in term and '!=' not in term]
+    return [device['name'] for device in devices if all(device['labels'].get(key) == value for key, value in terms)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--devices', type=int, default=50000)
+    parser.add_argument('--churn', type=float, default=0.01, help='fraction of devices changed per reload')
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    devices = campus(args.devices, rng)
+    inventory = DeviceInventory()
+    started = time.perf_counter()
+    inventory.load(devices)
+    print(f"initial load of {args.devices} devices: {time.perf_counter() - started:.2f} s")
+
+    snapshot = inventory.snapshot()
+    for selector in SELECTORS:
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            snapshot.select(selector)
+        select_us = (time.perf_counter() - started) / args.rounds * 1e6
+        started = time.perf_counter()
+        names = snapshot.names(selector)
+        names_ms = (time.perf_counter() - started) * 1000
+        line = f"  {selector:<48} {len(names):>6} devices  select {select_us:6.1f} us  names {names_ms:6.2f} ms"
+        if ' in ' not in selector and '!=' not in selector:
+            started = time.perf_counter()
+            assert sorted(scan(devices, selector)) == sorted(names)
+            line += f"  full scan {(time.perf_counter() - started) * 1000:6.1f} ms"
+        print(line)
+
+    for device in rng.sample(devices, int(args.devices * args.churn)):
+        device['labels']['role'] = rng.choice(('access', 'distribution', 'core'))
+        device['labels']['floor'] = str(rng.randrange(6))
+
+    slowest = [0.0]
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            started = time.perf_counter()
+            inventory.select(SELECTORS[0])
+            slowest[0] = max(slowest[0], time.perf_counter() - started)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    started = time.perf_counter()
+    summary = inventory.load(devices)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    thread.join()
+    print(f"reload with {summary['updated']} changed devices: {elapsed * 1000:.0f} ms "
+          f"(index update {summary['seconds'] * 1000:.1f} ms); "
+          f"slowest concurrent select {slowest[0] * 1e6:.0f} us")
+
+
+if __name__ == '__main__':
+    main()
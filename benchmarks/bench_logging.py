@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Logging benchmark - request latency with logging off, synchronous and queued
+
+Serves a small Flask app on a real threaded Werkzeug server, so access
+logging is exercised, and drives it with concurrent clients. The app
+mirrors the two hot logging paths in the web UI: the dashboard's
+/api/metrics poll (access log only) and intent submission (full payload
+logged at INFO). Each mode's server runs in its own process, driven
+by client threads in this one.
+
+    off       root logger at WARNING, no access log
+    sync      previous setup: StreamHandler + FileHandler on the root logger,
+              payloads formatted eagerly with f-strings / json.dumps
+    pipeline  monitoring.log_pipeline: queue handoff, JSON file records,
+              INFO summary + LazyJson payload at DEBUG, sampled access log
+
+    python benchmarks/bench_logging.py [--requests 2000] [--clients 8] [--modes off,sync,pipeline]
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+INTENT = {
+    'intent_name': 'campus-core',
+    'interface_speed': '10G',
+    'failover_config': {'groups': [
+        {'name': f'group{index}', 'primary-interfaces': [f'ge1/0/{index}'],
+         'backup-interfaces': [f'ge2/0/{index}'], 'threshold': 3}
+        for index in range(64)
+    ]},
+    'security_rules': [
+        {'name': f'rule{index}', 'action': 'permit', 'source': f'10.{index}.0.0/16', 'port': 443}
+        for index in range(128)
+    ]
+}
+
+
+def configure(mode, log_dir):
+    """Install the logging setup under test; returns an object with stop() or None"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    if mode == 'off':
+        root.setLevel(logging.WARNING)
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        return None
+    if mode == 'sync':
+        # Console output goes to /dev/null so terminal speed does not skew results
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            handlers=[
+                logging.StreamHandler(open(os.devnull, 'w')),
+                logging.FileHandler(log_dir / 'app.log', encoding='utf-8')
+            ]
+        )
+        return None
+
+    from monitoring.log_pipeline import LogPipeline
+    pipeline = LogPipeline(log_dir / 'app.log', console=True)
+    pipeline.listener.handlers[1].setStream(open(os.devnull, 'w'))
+    return pipeline.start()
+
+
+def make_app(mode):
+    from flask import Flask, jsonify, request
+    from monitoring.log_pipeline import LazyJson
+
+    app = Flask('bench_logging')
+    logger = logging.getLogger('web_ui.app')
+
+    @app.route('/api/metrics')
+    def metrics():
+        return jsonify({'total_interfaces': 4, 'up_interfaces': 3, 'health_score': 75.0})
+
+    @app.route('/api/intent', methods=['POST'])
+    def intent():
+        intent_data = request.get_json()
+        if mode == 'pipeline':
+            logger.info("Applying enhanced network intent (%d settings)", len(intent_data))
+            logger.debug("Intent payload: %s", LazyJson(intent_data))
+            logger.debug("Demo Config: %s", LazyJson(intent_data, indent=2))
+        else:
+            logger.info(f"Applying enhanced network intent: {intent_data}")
+            logger.info(f"Demo Config: {json.dumps(intent_data, indent=2)}")
+        return jsonify({'success': True})
+
+    return app
+
+
+def drive(port, requests, clients):
+    """Per-request latencies in milliseconds; every 10th request submits an intent"""
+    body = json.dumps(INTENT)
+    latencies = []
+    lock = threading.Lock()
+
+    def client(count):
+        local = []
+        for index in range(count):
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            started = time.perf_counter()
+            if index % 10 == 0:
+                connection.request('POST', '/api/intent', body, {'Content-Type': 'application/json'})
+            else:
+                connection.request('GET', '/api/metrics')
+            connection.getresponse().read()
+            local.append((time.perf_counter() - started) * 1000)
+            connection.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(requests // clients,)) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def serve(mode):
+    """Child process: serve until stdin closes, then report the log line count"""
+    from werkzeug.serving import make_server
+
+    with tempfile.TemporaryDirectory() as scratch:
+        pipeline = configure(mode, Path(scratch))
+        server = make_server('127.0.0.1', 0, make_app(mode), threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(server.server_port, flush=True)
+
+        sys.stdin.read()
+        server.shutdown()
+        if pipeline is not None:
+            pipeline.stop()
+        log_file = Path(scratch) / 'app.log'
+        print(sum(1 for _ in open(log_file)) if log_file.exists() else 0, flush=True)
+
+
+def measure(mode, requests, clients, trials):
+    """Drive a server child from this process so client work does not share its GIL"""
+    child = subprocess.Popen(
+        [sys.executable, __file__, '--serve', '--modes', mode],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    port = int(child.stdout.readline())
+    drive(port, 200, clients)  # warm up
+
+    runs = []
+    for _ in range(trials):
+        started = time.perf_counter()
+        latencies = sorted(drive(port, requests, clients))
+        runs.append((time.perf_counter() - started, latencies))
+    log_lines = int(child.communicate('')[0].strip() or 0)
+
+    # Report the trial with the median throughput
+    elapsed, latencies = sorted(runs, key=lambda run: run[0])[len(runs) // 2]
+    return {
+        'mode': mode,
+        'requests': len(latencies),
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1], 2),
+        'throughput_rps': round(len(latencies) / elapsed),
+        'log_lines': log_lines
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--modes', default='off,sync,pipeline')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.modes)
+        return
+
+    for mode in args.modes.split(','):
+        result = measure(mode, args.requests, args.clients, args.trials)
+        print(f"{result['mode']:>9}: p50 {result['p50_ms']:>6} ms  p99 {result['p99_ms']:>6} ms  "
+              f"{result['throughput_rps']:>5} req/s  {result['log_lines']:>6} log lines")
+
+
+if __name__ == '__main__':
+    main()
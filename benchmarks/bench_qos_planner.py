@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+QoS planner benchmark - admission checks for a large campus, full and incremental
+
+Builds a campus of access switches (48 x 1G access ports and a 10G uplink
+each), then times: the first full evaluation of a QoS config with
+VLAN-wide and per-port classes, an incremental change to one VLAN class,
+a change to a handful of ports, a rejected oversubscribing change, and a
+per-interface Python loop over the same config for comparison.
+
+    python benchmarks/bench_qos_planner.py [--ports 100000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from intent_engine.qos_planner import QosPlanner, parse_qos_config
+from netconf_client.demo_client import SPEED_BPS
+from netconf_client.interface_table import InterfaceTable
+
+ACCESS_PORTS = 48
+VLANS = (100, 200, 300, 400)
+
+
+def synthetic_campus(ports):
+    records, uplinks = [], {}
+    for switch in range(ports // (ACCESS_PORTS + 1)):
+        uplink = f'tengigabitethernet{switch}/1/1'
+        records.append({'name': uplink, 'speed': '10G', 'status': 'up', 'vlan': 1})
+        records.extend({'name': f'gigabitethernet{switch}/0/{port}', 'speed': '1G', 'status': 'up',
+                        'vlan': random.choice(VLANS)} for port in range(1, ACCESS_PORTS + 1))
+        uplinks[uplink] = f'gigabitethernet{switch}/0/'
+    return records, uplinks
+
+
+def loop_check(records, qos_config):
+    """Reference: evaluate every class on every interface in Python"""
+    classes, uplinks, max_reserved = parse_qos_config(qos_config)
+    by_name = {record['name']: record for record in records}
+    reserved = dict.fromkeys(by_name, 0.0)
+    for spec in classes.values():
+        kind, amount = spec['guaranteed']
+        names = set(spec['interfaces'] or by_name)
+        for name in names:
+            record = by_name[name]
+            if spec['vlan'] is not None and record['vlan'] not in spec['vlan']:
+                continue
+            line_rate = SPEED_BPS[record['speed']]
+            reserved[name] += line_rate * amount / 100 if kind == 'percent' else amount
+    over = sum(reserved[name] > SPEED_BPS[by_name[name]['speed']] * max_reserved for name in reserved)
+    uplink_of = {prefix: uplink for uplink, prefix in uplinks.items()}
+    uplink_reserved = dict.fromkeys(uplinks, 0.0)
+    for name, value in reserved.items():
+        uplink = uplink_of.get(name[:name.rfind('/') + 1])
+        if uplink is not None:
+            uplink_reserved[uplink] += value
+    over += sum(total > SPEED_BPS[by_name[uplink]['speed']] * max_reserved
+                for uplink, total in uplink_reserved.items())
+    return f"{over} violations"
+
+
+def timed(label, call):
+    started = time.perf_counter()
+    result = call()
+    elapsed = (time.perf_counter() - started) * 1000
+    if hasattr(result, 'admitted'):
+        detail = f"{result.violation_count} violations, {result.evaluated_ports} ports evaluated"
+    else:
+        detail = result
+    print(f"  {label:<48} {elapsed:9.1f} ms  ({detail})")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ports', type=int, default=100000)
+    args = parser.parse_args()
+
+    random.seed(7)
+    records, uplinks = synthetic_campus(args.ports)
+    table = InterfaceTable.from_records(records)
+    planner = QosPlanner(table)
+    config = {
+        'classes': {
+            'voice': {'guaranteed': '10%', 'vlan': [100, 200]},
+            'video': {'guaranteed': '100M', 'vlan': 300},
+            'critical': {'guaranteed': '200M', 'interfaces': [records[i]['name'] for i in range(1, 2000, 7)]}
+        },
+        'uplinks': uplinks,
+        'max_reserved': 0.8
+    }
+    print(f"{len(table)} ports, {len(uplinks)} uplinks")
+
+    timed('first apply (full evaluation)', lambda: planner.apply(config))
+    config['classes']['video'] = {'guaranteed': '150M', 'vlan': 300}
+    timed('change one VLAN class (incremental)', lambda: planner.apply(config))
+    config['classes']['critical'] = {'guaranteed': '250M', 'interfaces': [records[i]['name'] for i in range(1, 200, 7)]}
+    timed('change a per-port class (incremental)', lambda: planner.apply(config))
+    oversubscribed = dict(config, classes=dict(config['classes'], bulk={'guaranteed': '50%', 'vlan': 400}))
+    timed('oversubscribing change (rejected)', lambda: planner.plan(oversubscribed))
+    timed('per-interface loop over the same config', lambda: loop_check(records, oversubscribed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Reconciler benchmark - full-campus drift sweep with simulated device latency
+
+Builds a fleet of simulated devices running the intended config, drifts a
+fraction of them (changed leaves, new list entries, extra entries), then
+runs one DriftReconciler sweep. Reports sweep time, peak requests in
+flight per device and overall, and how much config was pushed back.
+
+    python benchmarks/bench_reconciler.py [--devices 2000] [--latency 0.2] [--workers 32] [--rate 50]
+"""
+
+import argparse
+import copy
+import json
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from netconf_client.demo_client import DemoNETCONFClient
+from netconf_client.reconciler import DriftReconciler
+
+
+def campus_config(ports=48, vlans=16):
+    """Intended config shaped like IntentProcessor output for one access switch"""
+    return {
+        'network': {
+            'interfaces': [
+                {'name': f'gigabitethernet1/0/{port}', 'enabled': True, 'speed': '1G',
+                 'vlan': 100 + port % vlans, 'description': f'access port {port}'}
+                for port in range(ports)
+            ],
+            'network-ranges': {'ip-range': [
+                {'name': f'vlan{vlan}', 'subnet': f'10.{vlan}.0.0/16', 'vlan-id': vlan}
+                for vlan in range(vlans)
+            ]},
+            'failover-system': {'enabled': True, 'failover-groups': []},
+            'monitoring': {'enabled': True, 'monitored-metrics': []}
+        }
+    }
+
+
+class SimulatedDevice(DemoNETCONFClient):
+    """Demo client with per-RPC latency and in-flight accounting"""
+
+    in_flight = 0
+    peak_in_flight = 0
+    lock = threading.Lock()
+
+    def __init__(self, name, config, latency):
+        super().__init__(name, 830, 'admin', 'admin', interfaces=[])
+        self.connected = True
+        self.current_config = copy.deepcopy(config)
+        self.latency = latency
+        self.active = 0
+        self.peak_active = 0
+        self.pushed_bytes = 0
+
+    def _rpc(self):
+        with SimulatedDevice.lock:
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            SimulatedDevice.in_flight += 1
+            SimulatedDevice.peak_in_flight = max(SimulatedDevice.peak_in_flight, SimulatedDevice.in_flight)
+        time.sleep(self.latency * random.uniform(0.5, 1.5))
+        with SimulatedDevice.lock:
+            self.active -= 1
+            SimulatedDevice.in_flight -= 1
+
+    def get_config(self):
+        self._rpc()
+        return copy.deepcopy(self.current_config)
+
+    def send_config(self, config):
+        self._rpc()
+        self.pushed_bytes += len(json.dumps(config))
+        return super().send_config(config)
+
+    def replace_config(self, config):
+        self._rpc()
+        self.pushed_bytes += len(json.dumps(config))
+        return super().replace_config(config)
+
+
+def drift(device, kind):
+    interfaces = device.current_config['network']['interfaces']
+    if kind == 'leaf':
+        interfaces[random.randrange(len(interfaces))]['speed'] = '100M'
+    elif kind == 'missing':
+        del interfaces[random.randrange(len(interfaces))]
+    else:
+        interfaces.append({'name': 'loopback99', 'enabled': True})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--devices', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.2, help='mean seconds per RPC')
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--rate', type=float, default=50, help='config fetches per second')
+    parser.add_argument('--drift', type=float, default=0.05, help='fraction of drifted devices')
+    args = parser.parse_args()
+
+    random.seed(7)
+    desired = campus_config()
+    full_size = len(json.dumps(desired))
+    devices = {f'sw{index:05d}': SimulatedDevice(f'sw{index:05d}', desired, args.latency)
+               for index in range(args.devices)}
+    for device in random.sample(list(devices.values()), int(args.devices * args.drift)):
+        drift(device, random.choice(('leaf', 'missing', 'extra')))
+
+    reconciler = DriftReconciler(devices, lambda device_id: desired, workers=args.workers,
+                                 fetch_rate=args.rate, burst=args.workers)
+    summary = reconciler.sweep()
+    confirm = reconciler.sweep(force=True)
+
+    pushed = sum(device.pushed_bytes for device in devices.values())
+    repaired = max(summary['repaired'], 1)
+    print(f"sweep of {args.devices} devices ({args.workers} workers, {args.rate:g} fetch/s, "
+          f"{args.latency * 1000:.0f} ms RPC): {summary['duration']:.1f} s")
+    print(f"  in sync {summary['in_sync']}  repaired {summary['repaired']}  failed {summary['failed']}")
+    print(f"  pushed {pushed / repaired:.0f} bytes per repaired device (full config {full_size} bytes)")
+    print(f"  peak requests in flight: {SimulatedDevice.peak_in_flight} overall, "
+          f"{max(device.peak_active for device in devices.values())} per device")
+    print(f"confirming sweep: {confirm['in_sync']} in sync, {confirm['repaired']} repaired "
+          f"in {confirm['duration']:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Security compiler benchmark - indexed rule analysis vs pairwise comparison
+
+Generates a synthetic campus policy (per-VLAN access to server ports, some
+duplicated, split and overlapping rules, a final deny), compiles it with
+compile_security_policy and compares the findings against a pairwise
+O(n^2) reference on a prefix of the policy. The pairwise time at the full
+size is extrapolated from that prefix.
+
+    python benchmarks/bench_security_compiler.py [--rules 20000] [--reference 3000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from intent_engine.security_compiler import compile_security_policy, parse_security_rules
+
+SERVICES = (('tcp', '22'), ('tcp', '80'), ('tcp', '443'), ('tcp', '3389'), ('udp', '53'),
+            ('udp', '123'), ('tcp', '8000-8099'), ('tcp', '5432'))
+
+
+def synthetic_policy(count):
+    rules = []
+    while len(rules) < count - 1:
+        building, vlan = random.randrange(64), random.randrange(100, 164)
+        subnet = f'10.{building}.{vlan}.0/24'
+        server = f'172.16.{random.randrange(32)}.{random.randrange(1, 255)}'
+        protocol, port = random.choice(SERVICES)
+        action = 'allow' if random.random() < 0.8 else 'deny'
+        rules.append({'action': action, 'source': subnet, 'destination': server, 'protocol': protocol, 'port': port})
+        roll = random.random()
+        if roll < 0.05:
+            # Copy-pasted duplicate
+            rules.append(dict(rules[-1]))
+        elif roll < 0.10:
+            # Same access split into two halves of the subnet
+            for half in ('0/25', '128/25'):
+                rules.append(dict(rules[-1], source=f'10.{building}.{vlan}.{half}'))
+        elif roll < 0.13:
+            # Whole building to a server range, overlapping the per-VLAN rules
+            rules.append({'action': 'deny' if action == 'allow' else 'allow', 'source': f'10.{building}.0.0/16',
+                          'destination': f'172.16.{random.randrange(32)}.0/24', 'protocol': protocol, 'port': port})
+    rules = rules[:count - 1]
+    rules.append({'action': 'deny', 'source': 'any', 'destination': 'any'})
+    return rules
+
+
+def pairwise_findings(rules):
+    """Reference analysis: every rule against every earlier live rule"""
+    parsed = parse_security_rules(rules)
+    findings, live = [], []
+    for rule in parsed:
+        cover = next((earlier for earlier in live if earlier.contains(rule)), None)
+        if cover is not None:
+            findings.append((rule.position, 'shadowed' if cover.action != rule.action else 'redundant', cover.position))
+            continue
+        for earlier in live:
+            if earlier.action != rule.action and _overlaps(earlier, rule):
+                findings.append((rule.position, 'conflict', earlier.position))
+        live.append(rule)
+    return findings
+
+
+def _overlaps(first, second):
+    def prefixes_overlap(a, b):
+        shift = 32 - min(a[1], b[1])
+        return a[0] >> shift == b[0] >> shift
+    return (prefixes_overlap(first.source, second.source) and prefixes_overlap(first.destination, second.destination)
+            and first.overlaps_ranges(second))
+
+
+def comparable(policy):
+    return sorted((finding['rule'], finding['type'], finding.get('by', finding.get('with')))
+                  for finding in policy.findings if finding.get('by') != 'default')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rules', type=int, default=20000)
+    parser.add_argument('--reference', type=int, default=3000, help='policy prefix checked against the pairwise analysis')
+    args = parser.parse_args()
+
+    random.seed(7)
+    rules = synthetic_policy(args.rules)
+
+    reference = rules[:args.reference]
+    started = time.perf_counter()
+    expected = sorted(pairwise_findings(reference))
+    pairwise_seconds = time.perf_counter() - started
+    if comparable(compile_security_policy(reference)) != expected:
+        raise SystemExit("compiler findings disagree with the pairwise reference")
+    print(f"{len(reference)} rules: findings match the pairwise reference ({len(expected)} findings, "
+          f"pairwise {pairwise_seconds:.2f} s)")
+
+    started = time.perf_counter()
+    policy = compile_security_policy(rules)
+    compile_seconds = time.perf_counter() - started
+    summary = policy.summary()
+    estimate = pairwise_seconds * (len(rules) / len(reference)) ** 2
+    print(f"{len(rules)} rules compiled in {compile_seconds:.2f} s "
+          f"(pairwise would take ~{estimate:.0f} s)")
+    print(f"  {summary['shadowed']} shadowed, {summary['redundant']} redundant, {summary['conflicts']} conflicts")
+    print(f"  {summary['rules']} rules -> {summary['acl_entries']} ACL entries")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Sharding benchmark - intent throughput versus number of worker processes
+
+Applies intents for many buildings through ShardedIntentRouter with
+requests pipelined to every worker, and compares against applying the
+same intents in-process. Throughput should scale with worker count up to
+the number of cores (os.cpu_count() is printed for reference).
+
+    python benchmarks/bench_sharding.py [--intents 4000] [--partitions 256] [--workers 1,2,4]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from intent_engine.sharding import Partition, ShardedIntentRouter, partition_of
+
+
+def make_intents(count, partitions):
+    speeds = ('1G', '10G', '25G', '40G')
+    return [
+        {
+            'network_name': f'campus{index}',
+            'building': f'building{index % partitions:04d}',
+            'network_range': f'10.{index % 250}.0.0',
+            'subnet_mask': '255.255.0.0',
+            'interface_speed': speeds[index % len(speeds)],
+            'vlans': [{'id': 100 + index % 50}],
+            'failover_enabled': True
+        }
+        for index in range(count)
+    ]
+
+
+def in_process(intents):
+    partitions = {}
+    started = time.perf_counter()
+    for intent in intents:
+        name = partition_of(intent)
+        partition = partitions.get(name)
+        if partition is None:
+            partition = partitions[name] = Partition(name)
+        partition.apply_intent(intent)
+    elapsed = time.perf_counter() - started
+    for partition in partitions.values():
+        partition.close()
+    return elapsed
+
+
+def sharded(intents, workers):
+    router = ShardedIntentRouter(workers, log_level=logging.ERROR).start()
+    try:
+        # Create every partition first so timing covers steady-state intent handling
+        warmup = {partition_of(intent): intent for intent in intents}
+        for future in [router.submit(name, 'apply_intent', intent) for name, intent in warmup.items()]:
+            future.result()
+
+        started = time.perf_counter()
+        futures = [router.submit(partition_of(intent), 'apply_intent', intent) for intent in intents]
+        for future in futures:
+            future.result()
+        return time.perf_counter() - started
+    finally:
+        router.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--intents', type=int, default=4000)
+    parser.add_argument('--partitions', type=int, default=256)
+    parser.add_argument('--workers', default='1,2,4')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    intents = make_intents(args.intents, args.partitions)
+    print(f"{args.intents} intents over {args.partitions} partitions, {os.cpu_count()} CPUs")
+
+    elapsed = in_process(intents)
+    print(f"  in-process      {args.intents / elapsed:>8.0f} intents/s")
+    for workers in (int(count) for count in args.workers.split(',')):
+        elapsed = sharded(intents, workers)
+        print(f"  {workers:>2} workers      {args.intents / elapsed:>8.0f} intents/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark - import cost of web_ui.app and time to a listening socket
+
+Parses ``python -X importtime -c "import web_ui.app"`` for the slowest
+top-level imports, then launches main.py in a scratch directory (so the
+tracked logs are left alone) and times how long it takes until the web
+port accepts connections. Target: under 300 ms to a listening socket.
+
+    python benchmarks/bench_startup.py [--runs 5] [--top 15]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+src_path = ROOT / 'src'
+
+TARGET_MS = 300
+
+
+def import_profile(top):
+    """(cumulative us, module) for the slowest top-level imports of web_ui.app"""
+    env = dict(os.environ, PYTHONPATH=str(src_path))
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import web_ui.app'],
+        env=env, capture_output=True, text=True, check=True
+    ).stderr
+
+    # Children are printed before their parent and nesting is shown by
+    # indentation, so collect depth-1 rows until web_ui.app itself appears
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):
+            if name.strip() == 'web_ui.app':
+                break
+            rows = []
+        elif not name.startswith('    '):
+            rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def time_to_listen(timeout=30.0):
+    """Milliseconds from launching main.py until its web port accepts a connection"""
+    port = free_port()
+    env = dict(os.environ, IBN_WEB_PORT=str(port))
+    with tempfile.TemporaryDirectory() as scratch:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, str(ROOT / 'main.py')], cwd=scratch, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                try:
+                    with socket.create_connection(('127.0.0.1', port), timeout=0.05):
+                        return (time.perf_counter() - started) * 1000
+                except OSError:
+                    if process.poll() is not None:
+                        raise RuntimeError(f"main.py exited with status {process.returncode}")
+                    time.sleep(0.002)
+            raise RuntimeError(f"main.py did not listen on port {port} within {timeout:.0f}s")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    print("slowest direct imports of web_ui.app (cumulative):")
+    for cumulative, name in import_profile(args.top):
+        print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+
+    times = [time_to_listen() for _ in range(args.runs)]
+    median = statistics.median(times)
+    print(f"time to listening socket over {args.runs} runs: "
+          f"median {median:.0f} ms  min {min(times):.0f} ms  max {max(times):.0f} ms "
+          f"({'within' if median <= TARGET_MS else 'over'} {TARGET_MS} ms target)")
+
+
+if __name__ == '__main__':
+    main()
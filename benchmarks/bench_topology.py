@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Topology benchmark - failure impact lookups and batch what-if on a synthetic campus
+
+Builds a two-core campus: per building two distribution switches uplinked
+to both cores, and access switches (48 host ports each) uplinked to the
+first distribution switch, every other one dual-homed to the second. Times
+the graph build, single-interface impact lookups, and a batch of random
+double link failures, and checks the precomputed answers against a BFS
+over the graph with the links removed.
+
+    python benchmarks/bench_topology.py [--buildings 40] [--access 50] [--scenarios 10000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from topology.topology_graph import TopologyGraph
+
+HOST_PORTS = 48
+
+
+def synthetic_campus(buildings, access):
+    devices = {'core0': [], 'core1': []}
+    links = [('core0:te1/0/1', 'core1:te1/0/1')]
+    ranges_by_vlan = {}
+    for building in range(buildings):
+        vlans = [building * 10 + offset for offset in range(1, 5)]
+        for vlan in vlans:
+            ranges_by_vlan[vlan] = [f'b{building}-v{vlan}']
+        dists = [f'b{building}-dist{side}' for side in 'ab']
+        for side, dist in enumerate(dists):
+            devices[dist] = []
+            for core in range(2):
+                links.append((f'core{core}:te{building + 2}/{side}/{core}', f'{dist}:te0/0/{core}'))
+        links.append((f'{dists[0]}:te0/1/0', f'{dists[1]}:te0/1/0'))
+        for switch in range(access):
+            name = f'b{building}-acc{switch}'
+            devices[name] = [{'name': f'gi0/0/{port}', 'vlan': random.choice(vlans)}
+                             for port in range(1, HOST_PORTS + 1)]
+            links.append((f'{name}:te0/1/1', f'{dists[0]}:gi1/{switch}/1'))
+            if switch % 2:
+                links.append((f'{name}:te0/1/2', f'{dists[1]}:gi1/{switch}/1'))
+    return devices, links, ranges_by_vlan
+
+
+def timed(label, call, count=1):
+    started = time.perf_counter()
+    result = call()
+    elapsed = time.perf_counter() - started
+    per = f"  {elapsed * 1e6 / count:8.1f} us each" if count > 1 else ''
+    print(f"  {label:<44} {elapsed * 1000:9.1f} ms{per}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--buildings', type=int, default=40)
+    parser.add_argument('--access', type=int, default=50)
+    parser.add_argument('--scenarios', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    random.seed(7)
+    devices, links, ranges_by_vlan = synthetic_campus(args.buildings, args.access)
+    graph = timed('build graph', lambda: TopologyGraph('core0', devices, links, ranges_by_vlan, seed=7))
+    summary = graph.summary()
+    print(f"  {summary['devices']} devices, {summary['links']} links, {summary['edge_ports']} host ports, "
+          f"{len(summary['bridges'])} bridges, {len(summary['articulation_points'])} articulation points")
+
+    link_ports = [end for link in links for end in link]
+    singles = random.sample(link_ports, min(2000, len(link_ports)))
+    timed('single interface impact', lambda: [graph.impact([port]) for port in singles], len(singles))
+    doubles = [random.sample(link_ports, 2) for _ in range(args.scenarios)]
+    results = timed('double link what-if batch', lambda: graph.what_if(doubles, workers=args.workers), len(doubles))
+    # Reference: a BFS per scenario (the path taken for scenarios without a precomputed answer)
+    sample = doubles[:1000]
+    reference = timed('BFS per scenario (reference)',
+                      lambda: [graph._describe(tuple(sorted(failures)),
+                                               graph._search_region([graph.resolve(port) for port in failures]),
+                                               [], False)
+                               for failures in sample], len(sample))
+    mismatches = sum(result['disconnected_device_count'] != expected['disconnected_device_count'] or
+                     result['vlans_affected'] != expected['vlans_affected']
+                     for result, expected in zip(results, reference))
+    cuts = sum(result['disconnected_device_count'] > 0 for result in results)
+    print(f"  {cuts}/{len(results)} scenarios disconnect devices, {mismatches} mismatches against BFS")
+    if mismatches:
+        raise SystemExit("precomputed impact disagrees with BFS")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite - hot paths at several data sizes, recorded to JSON and checked against a baseline
+
+Times each case below at every size (best of --repeat batches, each
+batch running the case until --min-time has passed), writes the results
+to --output and compares them with benchmarks/baseline.json. A case more
+than --tolerance slower than its baseline is a regression and makes the
+run exit with status 1, so the suite can gate a deploy. Cases whose
+optional dependency is missing are reported as skipped.
+
+    python benchmarks/suite.py [--quick] [--filter api_] [--tolerance 0.25]
+    python benchmarks/suite.py --update-baseline
+
+--update-baseline stores the median of --rounds runs. Baselines are only
+comparable on the machine and Python that recorded them; refresh
+baseline.json after a deliberate change or on new CI hardware.
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+RESULTS = Path(__file__).resolve().parent / 'results.json'
+
+INTENT = {
+    'network_name': 'campus', 'network_range': '10.20.0.0', 'subnet_mask': '255.255.0.0',
+    'interface_speed': '1G', 'failover_enabled': True
+}
+
+# name -> (sizes, size label, case generator, group); see case()
+CASES = {}
+
+
+def case(name, sizes, unit, group=None):
+    """Register a generator that sets up ``size`` items, yields the call to time, then tears down.
+
+    Cases of one ``group`` share state that only grows, and are run size
+    by size instead of case by case.
+    """
+    def register(function):
+        CASES[name] = (sizes, unit, contextlib.contextmanager(function), group or name)
+        return function
+    return register
+
+
+def vlans(count):
+    return [{'id': 100 + index, 'name': f'vlan{index}'} for index in range(count)]
+
+
+def network_config(interfaces):
+    return {'network': {
+        'interfaces': [{'name': f'eth{index}', 'enabled': True, 'speed': '1G', 'mtu': 1500,
+                        'ip-address': f'10.{index >> 8 & 255}.{index & 255}.1/24', 'vlan': 100 + index % 200}
+                       for index in range(interfaces)],
+        'monitoring': {'enabled': True, 'monitored-metrics': []}
+    }}
+
+
+def telemetry_batch(interfaces):
+    from monitoring.telemetry_collector import TelemetryCollector
+
+    return [TelemetryCollector._build_sample({}, 'localhost', 0.0, {
+        'name': f'gigabitethernet1/0/{index}', 'oper_status': 'up', 'speed': 1_000_000_000,
+        'in_octets': index * 1000, 'out_octets': index * 500
+    }) for index in range(interfaces)]
+
+
+@case('intent_config', sizes=(1, 64, 1024), unit='vlans')
+def intent_config(size):
+    from intent_engine.intent_processor import IntentProcessor
+
+    processor = IntentProcessor()
+    intent = dict(INTENT, vlans=vlans(size))
+    yield lambda: processor.generate_network_config(intent)
+
+
+@case('netconf_dict_to_xml', sizes=(4, 256, 4096), unit='interfaces')
+def netconf_dict_to_xml(size):
+    from netconf_client.netconf_manager import NETCONFClient
+
+    client = NETCONFClient('localhost', 830, 'admin', 'admin')
+    config = network_config(size)
+    yield lambda: client._dict_to_xml(config)
+
+
+@case('netconf_parse_interfaces', sizes=(4, 256, 4096), unit='interfaces')
+def netconf_parse_interfaces(size):
+    from netconf_client.netconf_manager import NETCONFClient
+
+    client = NETCONFClient('localhost', 830, 'admin', 'admin')
+    reply = client._dict_to_xml(network_config(size))
+    yield lambda: client._parse_interfaces(reply)
+
+
+@case('failover_health_checks', sizes=(10, 1000, 10000), unit='groups')
+def failover_health_checks(size):
+    from failover.failover_manager import FailoverManager
+    from monitoring.metrics import MetricsHub
+
+    manager = FailoverManager(None, MetricsHub())
+    manager.set_failover_groups([{'name': f'group{index}', 'primary-interfaces': [f'p{index}'],
+                                  'backup-interfaces': [f'b{index}', f'b{index + 1}']} for index in range(size)])
+    # A few published rounds leave groups in every state (failing, failed over, recovering)
+    random.seed(7)
+    for _ in range(8):
+        manager.run_health_checks()
+    groups = list(manager.snapshot().items())
+
+    def check_all():
+        # Interface health is sampled randomly; every call sees the same failures
+        random.seed(7)
+        for group_name, group_data in groups:
+            manager._check_group_health(group_name, dict(group_data), [])
+    yield check_all
+
+
+@case('monitor_interface_metrics', sizes=(48, 4800, 48000), unit='interfaces')
+def monitor_interface_metrics(size):
+    from monitoring.metrics import MetricsHub
+    from monitoring.prometheus_exporter import NetworkMonitor
+
+    monitor = NetworkMonitor(metrics=MetricsHub())
+    batch = telemetry_batch(size)
+    yield lambda: monitor.update_interface_metrics(batch)
+
+
+@contextlib.contextmanager
+def web_app(interfaces):
+    """web_ui.app over a temporary data directory, its demo device grown to ``interfaces`` interfaces.
+
+    Interface tables only grow: api_intent runs first, on the smallest
+    table, and the cases scaled by interface count form one group.
+    """
+    os.environ.setdefault('IBN_DATA_DIR', tempfile.mkdtemp(prefix='ibn-bench-'))
+    from web_ui import app as web
+
+    table = web.demo_interfaces
+    if len(table) < interfaces:
+        table.extend({'name': f'gigabitethernet{index // 48 + 1}/0/{index % 48 + 1}', 'speed': '1G',
+                      'status': 'up' if index % 10 else 'down', 'vlan': 100 + index % 200}
+                     for index in range(len(table), interfaces))
+        web.interface_aggregates.load(table)
+        web.invalidate_interface_query()
+        web.notify_state_changed()
+    # apply_intent's simulated device delay is not part of the request path being measured
+    sleep = web.time.sleep
+    web.time.sleep = lambda seconds: None
+    try:
+        yield web, web.app.test_client()
+    finally:
+        web.time.sleep = sleep
+
+
+@case('api_intent', sizes=(1, 64, 1024), unit='vlans')
+def api_intent(size):
+    with web_app(48) as (web, client):
+        intent = dict(INTENT, vlans=vlans(size))
+        response = client.post('/api/intent', json=intent)
+        assert response.status_code == 200, response.get_json()
+        yield lambda: client.post('/api/intent', json=intent)
+
+
+@case('api_metrics', sizes=(48, 4800, 48000), unit='interfaces', group='web_app')
+def api_metrics(size):
+    with web_app(size) as (web, client):
+        def poll():
+            # A state change per poll, so the payload is rebuilt rather than served from cache
+            web.interface_aggregates.observe(web.demo_interfaces.name_of(0), rx_delta=1)
+            web.notify_state_changed()
+            return client.get('/api/metrics')
+        assert poll().status_code == 200
+        yield poll
+
+
+@case('api_interfaces', sizes=(48, 4800, 48000), unit='interfaces', group='web_app')
+def api_interfaces(size):
+    with web_app(size) as (web, client):
+        assert client.get('/api/interfaces?status=up').status_code == 200
+        yield lambda: client.get('/api/interfaces?status=up')
+
+
+def measure(call, repeat, min_time):
+    """Best seconds per call over ``repeat`` batches of at least ``min_time`` seconds each (GC off, as in timeit)"""
+    call()
+    gc.collect()
+    gc.disable()
+    try:
+        return _batches(call, repeat, min_time)
+    finally:
+        gc.enable()
+
+
+def _batches(call, repeat, min_time):
+    best, runs = float('inf'), 0
+    for _ in range(repeat):
+        count, started = 0, time.perf_counter()
+        while True:
+            call()
+            count += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / count)
+        runs += count
+    return best, runs
+
+
+def schedule(names, quick=False):
+    """(case, size) pairs in run order: case by case, except size by size within a group"""
+    groups = list(dict.fromkeys(CASES[name][3] for name in names))
+    items = []
+    for order, name in enumerate(names):
+        sizes, _, _, group = CASES[name]
+        for position, size in enumerate(sizes[:1] if quick else sizes):
+            items.append((groups.index(group), position, order, name, size))
+    return [(name, size) for _, _, _, name, size in sorted(items)]
+
+
+def result_key(name, size):
+    return f'{name}[{size} {CASES[name][1]}]'
+
+
+def run_suite(names, quick=False, repeat=5, min_time=0.1, only=None):
+    """Results keyed ``case[size unit]`` and the skipped cases with the reason (``only``: keys to run)"""
+    results, skipped = {}, {}
+    for name, size in schedule(names, quick):
+        key = result_key(name, size)
+        if name in skipped or (only is not None and key not in only):
+            continue
+        setup = CASES[name][2]
+        try:
+            with setup(size) as call:
+                seconds, runs = measure(call, repeat, min_time)
+        except ImportError as e:
+            skipped[name] = f'missing dependency: {e.name or e}'
+            print(f"{name:<48} skipped ({skipped[name]})")
+            continue
+        results[key] = {'seconds': seconds, 'runs': runs}
+        print(f"{key:<48} {seconds * 1e6:12.1f} us")
+    return results, skipped
+
+
+def compare(results, baseline, tolerance):
+    """(key, current, baseline, ratio) of every result slower than its baseline by more than ``tolerance``"""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        ratio = result['seconds'] / reference['seconds']
+        if ratio > 1 + tolerance:
+            regressions.append((key, result['seconds'], reference['seconds'], ratio))
+    return regressions
+
+
+def median_results(rounds):
+    """Per-result median over several runs of the suite"""
+    merged = {}
+    for key in rounds[0]:
+        measured = [results[key] for results in rounds if key in results]
+        merged[key] = {'seconds': statistics.median(result['seconds'] for result in measured),
+                       'runs': sum(result['runs'] for result in measured)}
+    return merged
+
+
+def run_in_subprocess(args):
+    """Results of the suite run in a fresh interpreter (web_ui.app state only grows within a process)"""
+    with tempfile.TemporaryDirectory(prefix='ibn-bench-') as directory:
+        output = Path(directory) / 'results.json'
+        command = [sys.executable, str(Path(__file__).resolve()), '--filter', args.filter,
+                   '--repeat', str(args.repeat), '--min-time', str(args.min_time),
+                   '--output', str(output), '--baseline', str(Path(directory) / 'none.json')]
+        subprocess.run(command + (['--quick'] if args.quick else []), check=True, stdout=subprocess.DEVNULL)
+        return json.loads(output.read_text(encoding='utf-8'))['results']
+
+
+def environment():
+    return {'python': platform.python_version(), 'machine': platform.machine(),
+            'system': platform.system(), 'processor': platform.processor() or None,
+            'hash_seed': os.environ.get('PYTHONHASHSEED')}
+
+
+def main():
+    if 'PYTHONHASHSEED' not in os.environ:
+        # Randomized string hashing changes dict layouts, and with them timings, from run to run
+        os.environ['PYTHONHASHSEED'] = '0'
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this')
+    parser.add_argument('--quick', action='store_true', help='smallest size of each case only')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.1, help='seconds per timed batch')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown against the baseline')
+    parser.add_argument('--confirm', type=int, default=2,
+                        help='re-measure a slow result this many times before calling it a regression')
+    parser.add_argument('--output', type=Path, default=RESULTS)
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--rounds', type=int, default=3,
+                        help='with --update-baseline, store the median of this many runs')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    names = [name for name in CASES if args.filter in name]
+    results, skipped = run_suite(names, args.quick, args.repeat, args.min_time)
+    report = {'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+              'environment': environment(), 'results': results, 'skipped': skipped}
+    args.output.write_text(json.dumps(report, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+    print(f"results written to {args.output}")
+
+    if args.update_baseline:
+        if args.rounds > 1:
+            print(f"{args.rounds - 1} more rounds for the baseline median")
+            results = median_results([results] + [run_in_subprocess(args) for _ in range(args.rounds - 1)])
+        stored = json.loads(args.baseline.read_text(encoding='utf-8')) if args.baseline.exists() else {}
+        # A filtered or quick run only refreshes the entries it measured
+        report['results'] = dict(stored.get('results', {}), **results)
+        args.baseline.write_text(json.dumps(report, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+        print(f"baseline updated: {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+    if baseline.get('environment') != report['environment']:
+        print(f"warning: baseline was recorded on {baseline.get('environment')}, not {report['environment']}")
+    missing = [key for key in results if key not in baseline['results']]
+    if missing:
+        print(f"{len(missing)} results have no baseline yet: {', '.join(missing)}")
+    regressions = compare(results, baseline['results'], args.tolerance)
+    for _ in range(args.confirm):
+        if not regressions:
+            break
+        # A busy machine slows whole stretches of a run; keep the best of the measurements
+        print(f"re-measuring {len(regressions)} slow results")
+        retried, _ = run_suite(names, args.quick, args.repeat, args.min_time, {key for key, *_ in regressions})
+        for key, result in retried.items():
+            if result['seconds'] < results[key]['seconds']:
+                results[key] = result
+        regressions = compare(results, baseline['results'], args.tolerance)
+    report['results'] = results
+    args.output.write_text(json.dumps(report, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+    for key, seconds, reference, ratio in regressions:
+        print(f"REGRESSION {key}: {seconds * 1e6:.1f} us vs baseline {reference * 1e6:.1f} us ({ratio:.2f}x)")
+    if regressions:
+        return 1
+    print(f"{len(results) - len(missing)} results within {args.tolerance:.0%} of the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
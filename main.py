@@ -3,12 +3,19 @@
 Campus IBN NMS - Main Application Entry Point
 """
 
+import atexit
+import importlib.util
 import logging
 import sys
 import os
+import socket
+import threading
 import time
 from pathlib import Path
 
+# Startup phases are measured from interpreter start of this module
+STARTUP_BEGAN = time.perf_counter()
+
 # Add src to path - Windows compatible
 current_dir = Path(__file__).parent
 src_path = current_dir / 'src'
@@ -24,17 +31,12 @@ def setup_directories():
 
 def setup_logging():
     """Setup logging configuration"""
-    log_dir = Path('logs')
-    log_dir.mkdir(exist_ok=True)
+    # Records are handed to a queue; formatting, JSON encoding and file I/O
+    # happen on a listener thread instead of the request threads
+    from monitoring.log_pipeline import LogPipeline
     
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler(log_dir / 'app.log', encoding='utf-8')
-        ]
-    )
+    pipeline = LogPipeline(Path('logs') / 'app.log', level=logging.INFO).start()
+    atexit.register(pipeline.stop)
     
     return logging.getLogger(__name__)
 
@@ -48,12 +50,11 @@ def check_dependencies():
         'dotenv': 'python-dotenv'
     }
     
-    missing_packages = []
-    for package, display_name in required_packages.items():
-        try:
-            __import__(package)
-        except ImportError:
-            missing_packages.append(display_name)
+    # find_spec only locates packages; importing them here would double startup cost
+    missing_packages = [
+        display_name for package, display_name in required_packages.items()
+        if importlib.util.find_spec(package) is None
+    ]
     
     if missing_packages:
         print("❌ Missing required packages:")
@@ -70,10 +71,16 @@ def create_default_config():
         config_file.parent.mkdir(exist_ok=True)
         default_config = """# Campus IBN NMS Configuration
 netconf_devices:
-  - host: "localhost"
+  - name: "localhost"
+    host: "localhost"
     port: 830
     username: "admin"
     password: "admin"
+    labels:
+      building: "main"
+      floor: "1"
+      role: "access"
+      vendor: "demo"
 
 monitoring:
   prometheus_port: 8000
@@ -87,6 +94,41 @@ web_ui:
         config_file.write_text(default_config.strip())
         print(f"✓ Created default config: {config_file}")
 
+class StartupTimer:
+    """Records how long each startup phase takes"""
+    
+    def __init__(self):
+        self.last = STARTUP_BEGAN
+        self.phases = []
+    
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self.last) * 1000))
+        self.last = now
+    
+    def total_ms(self):
+        return (self.last - STARTUP_BEGAN) * 1000
+    
+    def report(self, logger):
+        breakdown = ', '.join(f"{phase} {elapsed:.0f} ms" for phase, elapsed in self.phases)
+        logger.info(f"Startup timing: {breakdown} (total {self.total_ms():.0f} ms)")
+
+def watch_listening_socket(timer, logger, port, timeout=30.0):
+    """Log the startup breakdown once the web server accepts connections"""
+    def wait_for_socket():
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=0.05):
+                    timer.mark('listen')
+                    timer.report(logger)
+                    return
+            except OSError:
+                time.sleep(0.005)
+        logger.warning(f"Web server not listening on port {port} after {timeout:.0f}s")
+    
+    threading.Thread(target=wait_for_socket, name='startup-watch', daemon=True).start()
+
 def display_banner():
     """Display application banner"""
     banner = """
@@ -109,6 +151,8 @@ def display_banner():
 
 def main():
     """Main application entry point"""
+    timer = StartupTimer()
+    port = int(os.environ.get('IBN_WEB_PORT', 5000))
     
     # Display banner
     display_banner()
@@ -117,9 +161,11 @@ def main():
     print("🔧 Setting up environment...")
     setup_directories()
     create_default_config()
+    timer.mark('environment')
     
     # Setup logging
     logger = setup_logging()
+    timer.mark('logging')
     
     # Check dependencies
     print("📦 Checking dependencies...")
@@ -127,33 +173,38 @@ def main():
         print("\nPlease install dependencies using:")
         print("pip install -r requirements.txt")
         return
+    timer.mark('dependency check')
     
     try:
         # Import and start the application
         print("🚀 Starting Enhanced Campus IBN NMS...")
         
-        from web_ui.app import app, socketio
+        from web_ui.app import METRICS_PORT, run_server, start_background_tasks, stop_background_tasks
+        timer.mark('import web_ui.app')
         
         logger.info("Enhanced application components imported successfully")
         
         print("\n🎯 ENHANCED CAMPUS IBN NMS STARTED SUCCESSFULLY!")
-        print("🌐 Web Interface:  http://localhost:5000")
-        print("📊 Metrics:        http://localhost:8000")
+        print(f"🌐 Web Interface:  http://localhost:{port}")
+        if METRICS_PORT > 0:
+            print(f"📊 Metrics:        http://localhost:{METRICS_PORT}/metrics")
         print("📝 Logs:          ./logs/app.log")
         print("="*60)
         print("💡 Features: Basic Config • Advanced Features • Monitoring")
         print("💡 Press Ctrl+C to stop the application")
         print("="*60 + "\n")
         
-        # Start the web server
+        # Background tasks are started explicitly, never as an import side effect
+        start_background_tasks()
+        timer.mark('background tasks')
+        watch_listening_socket(timer, logger, port)
+        
+        # Start the web server (debug mode only with IBN_DEBUG=1)
         logger.info("Starting Enhanced Flask-SocketIO server")
-        socketio.run(
-            app, 
-            host='0.0.0.0', 
-            port=5000, 
-            debug=True,
-            allow_unsafe_werkzeug=True
-        )
+        try:
+            run_server(port)
+        finally:
+            stop_background_tasks()
         
     except ImportError as e:
         logger.error(f"Import error: {e}")
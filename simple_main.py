@@ -19,12 +19,17 @@ Path('src/web_ui/templates').mkdir(parents=True, exist_ok=True)
 print("🚀 Starting Campus IBN NMS...")
 
 try:
-    from web_ui.app import app, socketio
+    from web_ui.app import run_server, start_background_tasks, stop_background_tasks
     print("✅ Application loaded successfully!")
     print("🌐 Web Interface: http://localhost:5000")
     print("💡 Press Ctrl+C to stop")
     
-    socketio.run(app, host='0.0.0.0', port=5000, debug=True, allow_unsafe_werkzeug=True)
+    start_background_tasks()
+    # Debug mode only with IBN_DEBUG=1
+    try:
+        run_server(5000)
+    finally:
+        stop_background_tasks()
     
 except ImportError as e:
     print(f"❌ Import error: {e}")
@@ -0,0 +1,147 @@
+"""
+Flap dampening - BGP-style exponential-decay penalties that hold down flapping interfaces
+"""
+import logging
+import math
+import threading
+import time
+from array import array
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-interface flag bits
+_SEEN_UP = 1
+_SUPPRESSED = 2
+
+# RFC 2439 style defaults: three flaps within minutes suppress for ~25 min, never over an hour
+DEFAULT_DAMPENING = {
+    'half_life': 900.0,
+    'penalty': 1000.0,
+    'suppress': 2000.0,
+    'reuse': 750.0,
+    'max_suppress': 3600.0
+}
+
+
+class FlapDampener:
+    """Flap penalty and suppression state for every interface the failover manager observes.
+
+    Each observed up -> down transition adds ``penalty``; the penalty halves
+    every ``half_life`` seconds. An interface is suppressed once its penalty
+    reaches ``suppress`` and reusable again when it decays below ``reuse``.
+    The penalty is capped so that no interface stays suppressed longer than
+    ``max_suppress`` seconds after its last flap.
+
+    State lives in parallel arrays indexed by a per-interface slot: penalty
+    and time at the last flap, and a flag byte. The current penalty is
+    always derived from the last flap, so it does not depend on how often
+    it is read.
+    """
+
+    def __init__(self, half_life: float = DEFAULT_DAMPENING['half_life'],
+                 penalty: float = DEFAULT_DAMPENING['penalty'],
+                 suppress: float = DEFAULT_DAMPENING['suppress'],
+                 reuse: float = DEFAULT_DAMPENING['reuse'],
+                 max_suppress: float = DEFAULT_DAMPENING['max_suppress'],
+                 clock: Callable[[], float] = time.monotonic):
+        if half_life <= 0 or penalty <= 0 or max_suppress <= 0:
+            raise ValueError("half_life, penalty and max_suppress must be positive")
+        if not 0 < reuse < suppress:
+            raise ValueError("Dampening needs 0 < reuse < suppress")
+        self.half_life = float(half_life)
+        self.penalty = float(penalty)
+        self.suppress = float(suppress)
+        self.reuse = float(reuse)
+        self.max_suppress = float(max_suppress)
+        # Highest penalty that still decays to reuse within max_suppress
+        self.ceiling = self.reuse * 2 ** (self.max_suppress / self.half_life)
+        self.clock = clock
+
+        self.names: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._penalty = array('d')
+        self._updated = array('d')
+        self._flags = bytearray()
+        self.flaps = 0
+        self._lock = threading.Lock()
+
+    def params(self) -> Dict:
+        return {'half_life': self.half_life, 'penalty': self.penalty, 'suppress': self.suppress,
+                'reuse': self.reuse, 'max_suppress': self.max_suppress}
+
+    def _slot(self, name: str) -> int:
+        slot = self._slots.get(name)
+        if slot is None:
+            slot = self._slots[name] = len(self.names)
+            self.names.append(name)
+            self._penalty.append(0.0)
+            self._updated.append(0.0)
+            self._flags.append(_SEEN_UP)
+        return slot
+
+    def _current(self, slot: int, now: float) -> float:
+        penalty = self._penalty[slot]
+        return penalty * 0.5 ** ((now - self._updated[slot]) / self.half_life) if penalty else 0.0
+
+    def _suppressed(self, slot: int, now: float) -> bool:
+        if self._flags[slot] & _SUPPRESSED and self._current(slot, now) < self.reuse:
+            self._flags[slot] &= ~_SUPPRESSED
+            logger.info(f"Interface {self.names[slot]} reusable after flap dampening")
+        return bool(self._flags[slot] & _SUPPRESSED)
+
+    def observe(self, name: str, healthy: bool, now: Optional[float] = None) -> bool:
+        """Record a health check result; returns whether the interface is suppressed"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            slot = self._slot(name)
+            flags = self._flags[slot]
+            if flags & _SEEN_UP and not healthy:
+                self._suppressed(slot, now)
+                penalty = min(self._current(slot, now) + self.penalty, self.ceiling)
+                self._penalty[slot], self._updated[slot] = penalty, now
+                self.flaps += 1
+                if penalty >= self.suppress and not self._flags[slot] & _SUPPRESSED:
+                    self._flags[slot] |= _SUPPRESSED
+                    logger.warning(f"Interface {name} suppressed by flap dampening (penalty {penalty:.0f})")
+            if healthy:
+                self._flags[slot] |= _SEEN_UP
+            else:
+                self._flags[slot] &= ~_SEEN_UP
+            return self._suppressed(slot, now)
+
+    def is_suppressed(self, name: str, now: Optional[float] = None) -> bool:
+        now = self.clock() if now is None else now
+        with self._lock:
+            slot = self._slots.get(name)
+            return slot is not None and self._suppressed(slot, now)
+
+    def reuse_in(self, name: str, now: Optional[float] = None) -> float:
+        """Seconds until a suppressed interface becomes reusable (0 if it is not suppressed)"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            slot = self._slots.get(name)
+            if slot is None or not self._suppressed(slot, now):
+                return 0.0
+            return self.half_life * math.log2(self._current(slot, now) / self.reuse)
+
+    def suppressed_count(self, now: Optional[float] = None) -> int:
+        now = self.clock() if now is None else now
+        with self._lock:
+            return sum(self._suppressed(slot, now) for slot, flags in enumerate(self._flags) if flags & _SUPPRESSED)
+
+    def to_dict(self, now: Optional[float] = None) -> Dict:
+        """Dampening parameters and every interface with a penalty left"""
+        now = self.clock() if now is None else now
+        interfaces = {}
+        with self._lock:
+            for slot, name in enumerate(self.names):
+                penalty = self._current(slot, now)
+                suppressed = self._suppressed(slot, now)
+                if suppressed or penalty >= 1:
+                    interfaces[name] = {
+                        'penalty': round(penalty, 1),
+                        'suppressed': suppressed,
+                        'reuse_in': round(self.half_life * math.log2(penalty / self.reuse), 1) if suppressed else 0.0
+                    }
+        return {'params': self.params(), 'flaps': self.flaps, 'interfaces': interfaces}
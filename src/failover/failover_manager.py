@@ -1,28 +1,46 @@
 import threading
 import time
 import logging
-from typing import Dict, List, Callable
-from prometheus_client import Gauge, Counter
+from typing import Dict, List, Callable, Optional
+
+from failover.dampening import FlapDampener
+from failover.state_store import StateStore, StateSnapshot
+from monitoring.metrics import MetricsHub, get_default_hub
 
 logger = logging.getLogger(__name__)
 
 class FailoverManager:
-    def __init__(self, netconf_client, monitoring_system):
+    # Health check period and the consecutive bad/good checks that switch over and back
+    CHECK_INTERVAL = 10
+    FAILOVER_THRESHOLD = 3
+    FAILBACK_THRESHOLD = 5
+    
+    def __init__(self, netconf_client, monitoring_system: Optional[MetricsHub] = None,
+                 name: Optional[str] = None, dampener: Optional[FlapDampener] = None):
         self.netconf_client = netconf_client
-        self.monitoring_system = monitoring_system
-        self.failover_groups = {}
+        self.monitoring_system = monitoring_system or get_default_hub()
+        self.state = StateStore()
+        # Flap penalties of every interface health-checked by this manager; gates failback
+        self.dampener = dampener or FlapDampener()
         self.is_running = False
         self.monitor_thread = None
+        self._stop_event = threading.Event()
         
-        # Prometheus metrics
-        self.failover_status = Gauge('failover_manager_status', 'Failover manager status')
-        self.failover_switch_count = Counter('failover_switch_events_total', 
-                                           'Total failover switch events', ['group'])
+        # Metrics are exported by the shared hub, so many managers can coexist
+        self.name = self.monitoring_system.register_failover_manager(self, name)
     
-    def add_failover_group(self, group_config: Dict):
-        """Add a failover group"""
-        group_name = group_config['name']
-        self.failover_groups[group_name] = {
+    @property
+    def failover_groups(self):
+        """Read-only view of the latest published failover group state"""
+        return self.state.snapshot().data
+    
+    def snapshot(self) -> StateSnapshot:
+        """Latest immutable failover state snapshot (never blocks the monitor loop)"""
+        return self.state.snapshot()
+    
+    def _new_group_state(self, group_config: Dict) -> Dict:
+        """Build initial runtime state for a failover group"""
+        return {
             'config': group_config,
             'primary_interfaces': group_config.get('primary-interfaces', []),
             'backup_interfaces': group_config.get('backup-interfaces', []),
@@ -30,55 +48,105 @@ class FailoverManager:
             'failure_count': 0,
             'recovery_count': 0
         }
+    
+    def add_failover_group(self, group_config: Dict):
+        """Add a failover group"""
+        group_name = group_config['name']
+        self.state.put(group_name, self._new_group_state(group_config))
         logger.info(f"Added failover group: {group_name}")
     
+    def remove_failover_group(self, group_name: str):
+        """Remove a failover group"""
+        self.state.remove(group_name)
+        logger.info(f"Removed failover group: {group_name}")
+    
+    def set_failover_groups(self, group_configs: List[Dict]):
+        """Replace all failover groups in a single atomic publish"""
+        self.state.replace({
+            group_config['name']: self._new_group_state(group_config)
+            for group_config in group_configs
+        })
+        logger.info(f"Loaded {len(group_configs)} failover groups")
+    
     def start_monitoring(self):
         """Start failover monitoring"""
         self.is_running = True
+        self._stop_event.clear()
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
-        self.failover_status.set(1)
         logger.info("Failover monitoring started")
     
     def stop_monitoring(self):
         """Stop failover monitoring"""
         self.is_running = False
+        self._stop_event.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
-        self.failover_status.set(0)
         logger.info("Failover monitoring stopped")
     
     def _monitor_loop(self):
         """Main monitoring loop"""
         while self.is_running:
             try:
-                for group_name, group_data in self.failover_groups.items():
-                    self._check_group_health(group_name, group_data)
+                self.run_health_checks()
                 
-                time.sleep(10)  # Check every 10 seconds
+                self._stop_event.wait(self.CHECK_INTERVAL)
                 
             except Exception as e:
                 logger.error(f"Failover monitoring error: {e}")
-                time.sleep(30)
+                self._stop_event.wait(30)
+    
+    def run_health_checks(self) -> StateSnapshot:
+        """Evaluate every group once and publish the results as one new version"""
+        snapshot = self.state.snapshot()
+        changes = {}
+        actions = {}
+        
+        for group_name, frozen_data in snapshot.items():
+            # Work on a private copy; readers keep seeing the old snapshot
+            group_data = dict(frozen_data)
+            pending = []
+            self._check_group_health(group_name, group_data, pending)
+            if group_data != frozen_data:
+                changes[group_name] = group_data
+                actions[group_name] = pending
+        
+        if not changes:
+            return snapshot
+        
+        # Groups replaced or removed meanwhile by add/remove are left untouched,
+        # and only switchovers that were actually published are carried out
+        applied = []
+        published = self.state.compare_and_update(snapshot.data, changes, applied)
+        for group_name in applied:
+            for action in actions[group_name]:
+                action()
+        return published
     
-    def _check_group_health(self, group_name: str, group_data: Dict):
-        """Check health of failover group interfaces"""
+    def _check_group_health(self, group_name: str, group_data: Dict, actions: List[Callable]):
+        """Check health of failover group interfaces; side effects are queued on ``actions``"""
         active_interface = group_data['current_active']
         
-        if active_interface and not self._check_interface_health(active_interface):
+        if active_interface and not self._interface_healthy(active_interface):
             logger.warning(f"Interface {active_interface} in group {group_name} is down")
             group_data['failure_count'] += 1
             
             # Trigger failover after 3 consecutive failures
-            if group_data['failure_count'] >= 3:
-                self._trigger_failover(group_name, group_data)
+            if group_data['failure_count'] >= self.FAILOVER_THRESHOLD:
+                self._trigger_failover(group_name, group_data, actions)
         else:
             # Reset failure count on successful check
             group_data['failure_count'] = 0
             
             # Check if we can failback to primary
             if active_interface in group_data['backup_interfaces']:
-                self._check_failback(group_name, group_data)
+                self._check_failback(group_name, group_data, actions)
+    
+    def _interface_healthy(self, interface_name: str) -> bool:
+        """Health check whose result also feeds the flap dampener"""
+        healthy = self._check_interface_health(interface_name)
+        self.dampener.observe(interface_name, healthy)
+        return healthy
     
     def _check_interface_health(self, interface_name: str) -> bool:
         """Check if interface is healthy"""
@@ -91,61 +159,64 @@ class FailoverManager:
         except:
             return False
     
-    def _trigger_failover(self, group_name: str, group_data: Dict):
+    def _trigger_failover(self, group_name: str, group_data: Dict, actions: List[Callable]):
         """Trigger failover to backup interface"""
         current_active = group_data['current_active']
         backup_interface = self._select_backup_interface(group_data)
         
         if backup_interface and backup_interface != current_active:
-            logger.info(f"Failover: Switching from {current_active} to {backup_interface} in group {group_name}")
-            
-            # Deactivate current interface
-            self._deactivate_interface(current_active)
-            
-            # Activate backup interface
-            self._activate_interface(backup_interface)
-            
             # Update group state
             group_data['current_active'] = backup_interface
             group_data['failure_count'] = 0
             
-            # Update metrics
-            self.failover_switch_count.labels(group=group_name).inc()
-            
-            logger.info(f"Failover completed for group {group_name}")
+            actions.append(lambda: self._switch_interfaces(group_name, 'failover', current_active, backup_interface))
     
-    def _check_failback(self, group_name: str, group_data: Dict):
+    def _check_failback(self, group_name: str, group_data: Dict, actions: List[Callable]):
         """Check if we can failback to primary interface"""
         primary_interface = group_data['primary_interfaces'][0] if group_data['primary_interfaces'] else None
         current_active = group_data['current_active']
         
         if primary_interface and current_active != primary_interface:
-            if self._check_interface_health(primary_interface):
-                group_data['recovery_count'] += 1
+            if self._interface_healthy(primary_interface):
+                # Capped while failback is suppressed, so a held-down primary publishes no new versions
+                group_data['recovery_count'] = min(group_data['recovery_count'] + 1, self.FAILBACK_THRESHOLD + 1)
                 
-                # Failback after 5 consecutive successful checks
-                if group_data['recovery_count'] >= 5:
-                    self._trigger_failback(group_name, group_data, primary_interface)
+                # Failback after 5 consecutive successful checks, unless the primary is held down for flapping
+                if group_data['recovery_count'] >= self.FAILBACK_THRESHOLD:
+                    if not self.dampener.is_suppressed(primary_interface):
+                        self._trigger_failback(group_name, group_data, primary_interface, actions)
+                    elif group_data['recovery_count'] == self.FAILBACK_THRESHOLD:
+                        logger.info(f"Failback to {primary_interface} in group {group_name} suppressed for "
+                                    f"{self.dampener.reuse_in(primary_interface):.0f}s (flapping)")
+                        actions.append(lambda: self.monitoring_system.publish_suppressed_transition(
+                            self.name, group_name, 'failback'))
             else:
                 group_data['recovery_count'] = 0
     
-    def _trigger_failback(self, group_name: str, group_data: Dict, primary_interface: str):
+    def _trigger_failback(self, group_name: str, group_data: Dict, primary_interface: str, actions: List[Callable]):
         """Trigger failback to primary interface"""
         current_active = group_data['current_active']
         
-        logger.info(f"Failback: Switching from {current_active} to {primary_interface} in group {group_name}")
-        
-        # Deactivate current backup interface
-        self._deactivate_interface(current_active)
-        
-        # Activate primary interface
-        self._activate_interface(primary_interface)
-        
         # Update group state
         group_data['current_active'] = primary_interface
         group_data['recovery_count'] = 0
         
-        logger.info(f"Failback completed for group {group_name}")
+        actions.append(lambda: self._switch_interfaces(group_name, 'failback', current_active, primary_interface))
+    
+    def _switch_interfaces(self, group_name: str, kind: str, from_interface: str, to_interface: str):
+        """Carry out a published failover/failback on the device"""
+        logger.info(f"{kind.capitalize()}: Switching from {from_interface} to {to_interface} in group {group_name}")
+        
+        # Deactivate current interface
+        self._deactivate_interface(from_interface)
+        
+        # Activate the new one
+        self._activate_interface(to_interface)
+        
+        # Update metrics and notify subscribers
+        self.monitoring_system.publish_failover_event(self.name, group_name, kind, from_interface, to_interface)
+        
+        logger.info(f"{kind.capitalize()} completed for group {group_name}")
     
     def _select_backup_interface(self, group_data: Dict) -> str:
         """Select appropriate backup interface"""
@@ -154,7 +225,7 @@ class FailoverManager:
         
         # Select first available backup interface that's not the current active
         for interface in backup_interfaces:
-            if interface != current_active and self._check_interface_health(interface):
+            if interface != current_active and self._interface_healthy(interface):
                 return interface
         
         return backup_interfaces[0] if backup_interfaces else None
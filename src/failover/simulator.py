@@ -0,0 +1,387 @@
+"""
+Failover simulator - Monte Carlo replay of the FailoverManager state machine on a virtual clock
+"""
+import logging
+import math
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from failover.dampening import DEFAULT_DAMPENING, FlapDampener
+from failover.failover_manager import FailoverManager
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400.0
+# Interfaces fail about monthly and come back after minutes unless told otherwise
+DEFAULT_FAILURE = {'distribution': 'exponential', 'mean': 30 * DAY}
+DEFAULT_REPAIR = {'distribution': 'lognormal', 'median': 300.0, 'sigma': 1.0}
+# Upper bound on sampled durations held in memory at once while building timelines
+SAMPLE_BATCH = 2_000_000
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def parse_distribution(spec: Dict):
+    """Distribution spec -> (sampler(rng, size) in seconds, mean seconds)"""
+    kind = spec.get('distribution')
+    try:
+        if kind == 'exponential':
+            mean = float(spec['mean'])
+            sampler, expected = (lambda rng, size: rng.exponential(mean, size)), mean
+        elif kind == 'weibull':
+            shape, scale = float(spec['shape']), float(spec['scale'])
+            sampler = lambda rng, size: scale * rng.weibull(shape, size)
+            expected = scale * math.gamma(1 + 1 / shape)
+        elif kind == 'lognormal':
+            median, sigma = float(spec['median']), float(spec['sigma'])
+            sampler = lambda rng, size: rng.lognormal(math.log(median), sigma, size)
+            expected = median * math.exp(sigma * sigma / 2)
+        elif kind == 'fixed':
+            value = float(spec['value'])
+            sampler, expected = (lambda rng, size: np.full(size, value)), value
+        else:
+            raise ValueError(f"Unknown distribution {kind!r} (exponential, weibull, lognormal, fixed)")
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Incomplete {kind} distribution spec {spec!r}: {e}")
+    if expected <= 0:
+        raise ValueError(f"Distribution {spec!r} must have a positive mean")
+    return sampler, expected
+
+
+def _decayed(penalty, flapped_at, at, half_life):
+    """FlapDampener's current penalty, for arrays of groups"""
+    return np.where(penalty > 0, penalty * 0.5 ** ((at - flapped_at) / half_life), 0.0)
+
+
+def _summary(values, scale: float = 1.0) -> Dict:
+    if len(values) == 0:
+        return {'count': 0}
+    values = np.asarray(values, dtype=np.float64) * scale
+    summary = {'count': int(len(values)), 'mean': float(values.mean()), 'max': float(values.max())}
+    for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f'p{percentile:g}'] = float(value)
+    return summary
+
+
+class SimulationResult:
+    """Per-group outcomes of one simulated run"""
+
+    def __init__(self, names: List[str], duration: float, interval: float, failovers, failbacks,
+                 downtime_ticks, outages, open_outages: int, interface_transitions: int, wall_seconds: float,
+                 suppressed=None):
+        self.names = names
+        self.duration = duration
+        self.interval = interval
+        self.failovers = failovers
+        self.failbacks = failbacks
+        self.downtime_ticks = downtime_ticks
+        self.outages = outages
+        self.open_outages = open_outages
+        self.interface_transitions = interface_transitions
+        self.wall_seconds = wall_seconds
+        # Failbacks held back by flap dampening (counted once per hold, like the manager's metric)
+        self.suppressed = suppressed if suppressed is not None else np.zeros(len(names), dtype=np.int64)
+        self.final_active: List[Optional[str]] = []
+
+    @property
+    def unavailability(self):
+        """Fraction of simulated time each group's active interface was down"""
+        return self.downtime_ticks * self.interval / self.duration
+
+    def to_dict(self) -> Dict:
+        return {
+            'groups': len(self.names),
+            'simulated_seconds': self.duration,
+            'check_interval': self.interval,
+            'wall_seconds': round(self.wall_seconds, 3),
+            'interface_transitions': self.interface_transitions,
+            'failovers': int(self.failovers.sum()),
+            'failbacks': int(self.failbacks.sum()),
+            'suppressed_failbacks': int(self.suppressed.sum()),
+            'flaps_per_group': _summary(self.failovers + self.failbacks),
+            'mttr_seconds': _summary(self.outages, self.interval),
+            'open_outages': self.open_outages,
+            'unavailability': _summary(self.unavailability)
+        }
+
+
+class FailoverSimulator:
+    """Replays FailoverManager's group state machine for many groups at once.
+
+    Interface health is an alternating up/down renewal process sampled at
+    every health check, exactly as ``_check_interface_health`` would see it.
+    Each group keeps its own virtual time. While no interface of a group
+    changes, its checks only count towards the failover or failback
+    threshold, so after each evaluated check the group jumps straight to
+    the check that reaches a threshold or to the next up/down transition of
+    one of its interfaces. All groups step together as numpy arrays, so the
+    work grows with the number of transitions and switchovers rather than
+    the number of checks.
+
+    With ``dampening`` (FlapDampener parameters; None disables it) every
+    observed up -> down flap of a group's primary adds to its penalty and a
+    suppressed primary is not failed back to, as in the manager. Penalties
+    are kept per group, which is exact as long as no primary interface is
+    shared with another group.
+    """
+
+    def __init__(self, groups: List[Dict], check_interval: float = FailoverManager.CHECK_INTERVAL,
+                 failover_threshold: int = FailoverManager.FAILOVER_THRESHOLD,
+                 failback_threshold: int = FailoverManager.FAILBACK_THRESHOLD,
+                 dampening: Optional[Dict] = DEFAULT_DAMPENING):
+        if check_interval <= 0:
+            raise ValueError("check_interval must be positive")
+        self.check_interval = float(check_interval)
+        self.failover_threshold = failover_threshold
+        self.failback_threshold = failback_threshold
+        self.dampener = FlapDampener(**dampening) if dampening else None
+
+        # Groups without a primary never change state; they are simulated as always idle
+        self.names = [group['name'] for group in groups]
+        self.interfaces: List[str] = []
+        interface_ids: Dict[str, int] = {}
+        rows = []
+        for group in groups:
+            primary = group.get('primary-interfaces', [])[:1]
+            row = [interface_ids.setdefault(name, len(interface_ids)) for name in primary + group.get('backup-interfaces', [])]
+            rows.append(row if primary else [])
+        self.interfaces = list(interface_ids)
+        width = max((len(row) for row in rows), default=0)
+        # Slot 0 is the primary, slots 1.. the backups in order; -1 pads
+        self.slots = np.full((len(groups), max(width, 2)), -1, dtype=np.int64)
+        for index, row in enumerate(rows):
+            self.slots[index, :len(row)] = row
+
+    @classmethod
+    def from_manager(cls, manager: FailoverManager, **kwargs) -> 'FailoverSimulator':
+        """Simulator over the failover groups currently published by ``manager``"""
+        from failover.state_store import thaw
+        groups = [thaw(group_data['config']) for group_data in manager.snapshot().data.values()]
+        kwargs.setdefault('dampening', manager.dampener.params())
+        return cls(groups, check_interval=manager.CHECK_INTERVAL, failover_threshold=manager.FAILOVER_THRESHOLD,
+                   failback_threshold=manager.FAILBACK_THRESHOLD, **kwargs)
+
+    def sample_transitions(self, duration: float, failure: Optional[Dict] = None, repair: Optional[Dict] = None,
+                           seed: Optional[int] = None, flaky: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+        """Interface -> sorted times (seconds) at which it goes down, up, down, ...
+
+        ``flaky`` ({'fraction', 'failure', 'repair'}) gives that fraction of
+        interfaces their own distributions.
+        """
+        rng = np.random.default_rng(seed)
+        count = len(self.interfaces)
+        profiles = [(np.arange(count), failure or DEFAULT_FAILURE, repair or DEFAULT_REPAIR)]
+        if flaky:
+            chosen = rng.random(count) < float(flaky.get('fraction', 0))
+            profiles = [(np.nonzero(~chosen)[0], profiles[0][1], profiles[0][2]),
+                        (np.nonzero(chosen)[0], flaky.get('failure', DEFAULT_FAILURE),
+                         flaky.get('repair', DEFAULT_REPAIR))]
+
+        owners, times = [], []
+        for members, failure_spec, repair_spec in profiles:
+            fail_sampler, fail_mean = parse_distribution(failure_spec)
+            repair_sampler, repair_mean = parse_distribution(repair_spec)
+            clock = np.zeros(len(members))
+            # Enough up/down cycles per batch that most interfaces pass the horizon in one go
+            cycles = int(min(max(4, math.ceil(1.2 * duration / (fail_mean + repair_mean)) + 1),
+                             max(1, SAMPLE_BATCH // max(1, 2 * len(members)))))
+            while len(members):
+                size = (len(members), cycles)
+                steps = np.empty((len(members), 2 * cycles))
+                steps[:, 0::2] = fail_sampler(rng, size)
+                steps[:, 1::2] = repair_sampler(rng, size)
+                at = clock[:, None] + np.cumsum(steps, axis=1)
+                inside = at < duration
+                owners.append(np.broadcast_to(members[:, None], at.shape)[inside])
+                times.append(at[inside])
+                unfinished = at[:, -1] < duration
+                members, clock = members[unfinished], at[unfinished, -1]
+
+        owners = np.concatenate(owners) if owners else np.empty(0, dtype=np.int64)
+        times = np.concatenate(times) if times else np.empty(0)
+        order = np.lexsort((times, owners))
+        owners, times = owners[order], times[order]
+        bounds = np.searchsorted(owners, np.arange(count + 1))
+        return {name: times[bounds[index]:bounds[index + 1]] for index, name in enumerate(self.interfaces)}
+
+    def run(self, duration: float, failure: Optional[Dict] = None, repair: Optional[Dict] = None,
+            seed: Optional[int] = None, flaky: Optional[Dict] = None) -> SimulationResult:
+        """Sample interface failures for ``duration`` seconds and replay every group through them"""
+        return self.replay(self.sample_transitions(duration, failure, repair, seed, flaky), duration)
+
+    def replay(self, transitions: Dict[str, np.ndarray], duration: float) -> SimulationResult:
+        """Run the state machine against given interface transition times (all interfaces start up)"""
+        started = time.perf_counter()
+        interval = self.check_interval
+        ticks = int(math.ceil(duration / interval))
+        stride = ticks + 1
+
+        # A transition is first seen by the check at or after it; keys sort by (interface, tick)
+        keys = [index * stride + np.minimum(np.ceil(np.asarray(transitions.get(name, ()), dtype=np.float64) / interval),
+                                            ticks).astype(np.int64)
+                for index, name in enumerate(self.interfaces)]
+        keys = np.sort(np.concatenate(keys)) if keys else np.empty(0, dtype=np.int64)
+        bounds = np.searchsorted(keys, np.arange(len(self.interfaces) + 1) * stride)
+        padded_keys = np.append(keys, np.iinfo(np.int64).max)
+
+        groups = len(self.names)
+        failovers = np.zeros(groups, dtype=np.int64)
+        failbacks = np.zeros(groups, dtype=np.int64)
+        downtime = np.zeros(groups, dtype=np.int64)
+        final_slot = np.zeros(groups, dtype=np.int64)
+        outages = []
+        open_outages = 0
+        threshold_down, threshold_up = self.failover_threshold, self.failback_threshold
+
+        # Working set: groups with a primary that have not reached the horizon yet
+        ids = np.nonzero(self.slots[:, 0] >= 0)[0]
+        group_slots = self.slots[ids]
+        group_valid = group_slots >= 0
+        safe_slots = np.where(group_valid, group_slots, 0)
+        base = safe_slots * stride
+        first = bounds[:-1][safe_slots]
+        last = np.where(group_valid, bounds[1:][safe_slots], first)
+        # cursor = transitions of each slot's interface seen so far (as an index into keys)
+        cursor = first.copy()
+        now = np.zeros(len(ids), dtype=np.int64)
+        active = np.zeros(len(ids), dtype=np.int64)
+        count_down = np.zeros(len(ids), dtype=np.int64)
+        count_up = np.zeros(len(ids), dtype=np.int64)
+        outage_start = np.full(len(ids), -1, dtype=np.int64)
+        group_failovers = np.zeros(len(ids), dtype=np.int64)
+        group_failbacks = np.zeros(len(ids), dtype=np.int64)
+        group_downtime = np.zeros(len(ids), dtype=np.int64)
+        group_suppressed = np.zeros(len(ids), dtype=np.int64)
+        suppressed = np.zeros(groups, dtype=np.int64)
+        # Flap dampening state of each group's primary
+        dampener = self.dampener
+        seen_up = np.ones(len(ids), dtype=bool)
+        penalty = np.zeros(len(ids))
+        flapped_at = np.zeros(len(ids))
+        held = np.zeros(len(ids), dtype=bool)
+
+        def flap(mask, at):
+            """FlapDampener.observe for the groups whose primary went down at time ``at``"""
+            if not mask.any():
+                return held, penalty, flapped_at
+            current = _decayed(penalty, flapped_at, at, dampener.half_life)
+            added = np.minimum(current + dampener.penalty, dampener.ceiling)
+            return (np.where(mask, (held & (current >= dampener.reuse)) | (added >= dampener.suppress), held),
+                    np.where(mask, added, penalty), np.where(mask, at, flapped_at))
+
+        while len(ids):
+            # Catch every slot's cursor up with the transitions seen by this check
+            while True:
+                seen = (cursor < last) & (padded_keys[cursor] - base <= now[:, None])
+                if not seen.any():
+                    break
+                cursor += seen
+            # Up when an even number of transitions has been seen
+            up = group_valid & (((cursor - first) & 1) == 0)
+            rows = np.arange(len(ids))
+            # Finished groups wait (unchanged) for the next compaction
+            alive = now < ticks
+            current_id = group_slots[rows, active]
+            current_up = up[rows, active]
+
+            # Active interface down: count it, fail over at the threshold
+            down = ~current_up
+            new_failures = np.where(down, np.minimum(count_down + 1, threshold_down), 0)
+            candidates = up[:, 1:] & (group_slots[:, 1:] != current_id[:, None])
+            chosen = np.where(candidates.any(axis=1), candidates.argmax(axis=1) + 1,
+                              np.where(group_valid[:, 1], 1, -1))
+            chosen_id = np.where(chosen >= 0, group_slots[rows, np.maximum(chosen, 0)], -1)
+            switch = alive & down & (new_failures >= threshold_down) & (chosen >= 0) & (chosen_id != current_id)
+            new_active = np.where(switch, chosen, active)
+            new_failures = np.where(switch, 0, new_failures)
+
+            # Active interface up on a backup: count healthy primary checks, fail back at the threshold
+            on_backup = (group_slots[:, 1:] == current_id[:, None]).any(axis=1)
+            checking = current_up & on_backup & (group_slots[:, 0] != current_id)
+            new_recoveries = np.where(checking, np.where(up[:, 0], count_up + 1, 0), count_up)
+            recovered = alive & checking & up[:, 0] & (new_recoveries >= threshold_up)
+            blocked = np.zeros(len(ids), dtype=bool)
+            if dampener:
+                # The primary is observed while active and while checked for failback
+                observed = alive & ((group_slots[:, 0] == current_id) | checking)
+                held, penalty, flapped_at = flap(observed & seen_up & ~up[:, 0], now * interval)
+                seen_up = np.where(observed, up[:, 0], seen_up)
+                if (recovered & held).any():
+                    blocked = recovered & held & (_decayed(penalty, flapped_at, now * interval, dampener.half_life)
+                                                  >= dampener.reuse)
+                    group_suppressed += blocked & (new_recoveries == threshold_up)
+                    # Only "reached" and "reached just now" matter beyond the threshold
+                    new_recoveries = np.where(blocked, np.minimum(new_recoveries, threshold_up + 1), new_recoveries)
+            back = recovered & ~blocked
+            new_active = np.where(back, 0, new_active)
+            new_recoveries = np.where(back, 0, new_recoveries)
+
+            # Until an interface changes, the counters just count: jump to the check that next
+            # switches (threshold reached) or to the next transition, whichever comes first
+            serving_id = group_slots[rows, new_active]
+            serving_up = up[rows, new_active]
+            counting_down = ~serving_up & (new_failures < threshold_down)
+            serving_primary = group_slots[:, 0] == serving_id
+            serving_checking = serving_up & (group_slots[:, 1:] == serving_id[:, None]).any(axis=1) & ~serving_primary
+            counting_up = serving_checking & up[:, 0]
+            upcoming = np.where(cursor < last, padded_keys[cursor] - base, ticks)
+            following = np.minimum(upcoming.min(axis=1), ticks)
+            following = np.where(counting_down, np.minimum(following, now + threshold_down - new_failures), following)
+            following = np.where(counting_up & (new_recoveries < threshold_up),
+                                 np.minimum(following, now + threshold_up - new_recoveries), following)
+            holding = counting_up & (new_recoveries >= threshold_up)
+            if dampener and holding.any():
+                # Failback held back: the next check that can change anything is the one after reuse
+                reuse_at = np.floor((flapped_at + dampener.half_life * np.log2(np.maximum(penalty, dampener.reuse)
+                                                                              / dampener.reuse)) / interval) - 1
+                reuse_at = np.where(held, np.maximum(now + 1, reuse_at.astype(np.int64)), now + 1)
+                following = np.where(holding, np.minimum(following, reuse_at), following)
+            skipped = following - now - 1
+            count_down = np.where(counting_down, new_failures + skipped, new_failures)
+            count_up = np.where(counting_up, np.minimum(new_recoveries + skipped, threshold_up + 1), new_recoveries)
+            # A primary seen down by the skipped failback checks resets the count
+            count_up = np.where(serving_checking & ~up[:, 0] & (skipped > 0), 0, count_up)
+            if dampener:
+                observed = alive & (skipped > 0) & (serving_primary | serving_checking)
+                held, penalty, flapped_at = flap(observed & seen_up & ~up[:, 0], (now + 1) * interval)
+                seen_up = np.where(observed, up[:, 0], seen_up)
+
+            group_downtime += np.where(serving_up, 0, following - now)
+            starts = alive & ~serving_up & (outage_start < 0)
+            outage_start[starts] = now[starts]
+            ends = alive & serving_up & (outage_start >= 0)
+            if ends.any():
+                outages.append(now[ends] - outage_start[ends])
+                outage_start[ends] = -1
+
+            active = new_active
+            group_failovers += switch
+            group_failbacks += back
+            now = following
+
+            done = now >= ticks
+            if done.all() or 2 * done.sum() >= len(ids):
+                # Hand finished groups back and shrink the working set
+                finished = ids[done]
+                failovers[finished], failbacks[finished] = group_failovers[done], group_failbacks[done]
+                downtime[finished], final_slot[finished] = group_downtime[done], active[done]
+                suppressed[finished] = group_suppressed[done]
+                open_outages += int((outage_start[done] >= 0).sum())
+                keep = ~done
+                ids, group_slots, group_valid, base, first, last, cursor = (
+                    ids[keep], group_slots[keep], group_valid[keep], base[keep], first[keep], last[keep], cursor[keep])
+                now, active, count_down, count_up, outage_start = (
+                    now[keep], active[keep], count_down[keep], count_up[keep], outage_start[keep])
+                group_failovers, group_failbacks, group_downtime, group_suppressed = (
+                    group_failovers[keep], group_failbacks[keep], group_downtime[keep], group_suppressed[keep])
+                seen_up, penalty, flapped_at, held = seen_up[keep], penalty[keep], flapped_at[keep], held[keep]
+
+        result = SimulationResult(
+            self.names, duration, interval, failovers, failbacks, downtime,
+            np.concatenate(outages) if outages else np.empty(0, dtype=np.int64),
+            open_outages, len(keys), time.perf_counter() - started, suppressed)
+        result.final_active = [self.interfaces[self.slots[index, slot]] if self.slots[index, 0] >= 0 else None
+                               for index, slot in enumerate(final_slot)]
+        logger.info(f"Simulated {groups} failover groups over {duration:.0f}s in {result.wall_seconds:.2f}s")
+        return result
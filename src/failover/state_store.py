@@ -0,0 +1,135 @@
+"""
+Versioned copy-on-write state store for failover state
+"""
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts/lists into read-only mappings/tuples"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Convert frozen values back into plain, JSON-serializable dicts/lists"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, frozenset)):
+        return [thaw(item) for item in value]
+    return value
+
+
+class StateSnapshot:
+    """Immutable, versioned view of the store contents"""
+
+    __slots__ = ('version', 'timestamp', 'data')
+
+    def __init__(self, version: int, data: Mapping[str, Any], timestamp: float):
+        self.version = version
+        self.timestamp = timestamp
+        self.data = data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def items(self):
+        return self.data.items()
+
+    def to_dict(self) -> Dict:
+        """Plain-dict copy suitable for jsonify/SocketIO payloads"""
+        return {
+            'version': self.version,
+            'timestamp': self.timestamp,
+            'data': thaw(self.data)
+        }
+
+
+class StateStore:
+    """Copy-on-write key/value store with atomically published snapshots.
+
+    Readers call ``snapshot()`` and never take a lock: publishing a new
+    snapshot is a single reference assignment, so a reader always sees a
+    complete version. Writers are serialized among themselves only.
+    """
+
+    def __init__(self, initial: Optional[Dict[str, Any]] = None):
+        self._write_lock = threading.Lock()
+        self._snapshot = StateSnapshot(0, freeze(initial or {}), time.time())
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def snapshot(self) -> StateSnapshot:
+        """Return the latest published snapshot (lock-free)"""
+        return self._snapshot
+
+    def update(self, mutator: Callable[[Dict[str, Any]], None]) -> StateSnapshot:
+        """Apply ``mutator`` to a shallow working copy and publish the result.
+
+        Values placed into the working copy are frozen before publishing;
+        values carried over from the previous snapshot are already frozen
+        and are shared, not copied.
+        """
+        with self._write_lock:
+            current = self._snapshot
+            working = dict(current.data)
+            mutator(working)
+            frozen = {
+                key: value if key in current.data and current.data[key] is value else freeze(value)
+                for key, value in working.items()
+            }
+            snapshot = StateSnapshot(current.version + 1, MappingProxyType(frozen), time.time())
+            self._snapshot = snapshot
+            return snapshot
+
+    def put(self, key: str, value: Any) -> StateSnapshot:
+        """Insert or replace a single key"""
+        def mutator(working):
+            working[key] = value
+        return self.update(mutator)
+
+    def remove(self, key: str) -> StateSnapshot:
+        """Remove a single key if present"""
+        def mutator(working):
+            working.pop(key, None)
+        return self.update(mutator)
+
+    def replace(self, data: Dict[str, Any]) -> StateSnapshot:
+        """Replace the whole store contents"""
+        def mutator(working):
+            working.clear()
+            working.update(data)
+        return self.update(mutator)
+
+    def compare_and_update(self, expected: Mapping[str, Any], changes: Dict[str, Any],
+                           applied: Optional[List[str]] = None) -> StateSnapshot:
+        """Publish ``changes`` for keys whose value is still ``expected[key]``.
+
+        Keys that were replaced or removed by another writer since
+        ``expected`` was read are skipped, so concurrent writers never
+        clobber each other's updates. The keys actually published are
+        appended to ``applied``; callers act on a change only once it is
+        in that list, never before the check.
+        """
+        def mutator(working):
+            for key, value in changes.items():
+                if key in working and working[key] is expected.get(key):
+                    working[key] = value
+                    if applied is not None:
+                        applied.append(key)
+        return self.update(mutator)
@@ -76,7 +76,8 @@ class IntentProcessor:
                     "failover-groups": []
                 },
                 "monitoring": {
-                    "enabled": intent.get("monitoring_enabled", True)
+                    "enabled": intent.get("monitoring_enabled", True),
+                    "monitored-metrics": intent.get("monitored_metrics", [])
                 }
             }
         }
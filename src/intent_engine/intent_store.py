@@ -0,0 +1,290 @@
+"""
+Persistent intent store - append-only intent log with compacted snapshots in SQLite (WAL)
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Record kinds in the intent log
+SECTION = 'section'    # key = section name, payload = its new value (None deletes it)
+DESIRED = 'desired'    # key = device, payload = config digest the device should run
+APPLIED = 'applied'    # key = device, payload = config digest last pushed successfully
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS intent_log (
+    seq INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    seq INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    state TEXT NOT NULL
+);
+"""
+
+
+class CommitTimeout(TimeoutError):
+    """A change was not committed within the store's commit timeout"""
+
+
+def config_digest(config: Any) -> str:
+    """Stable digest of a JSON-serializable config"""
+    canonical = json.dumps(config, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def empty_state() -> Dict:
+    return {'sections': {}, 'devices': {}}
+
+
+def apply_record(state: Dict, kind: str, key: str, payload: Any):
+    """Fold one log record into the state"""
+    if kind == SECTION:
+        if payload is None:
+            state['sections'].pop(key, None)
+        else:
+            state['sections'][key] = payload
+    elif kind in (DESIRED, APPLIED):
+        state['devices'].setdefault(key, {'desired': None, 'applied': None})[kind] = payload
+    else:
+        logger.warning(f"Skipping unknown intent log record kind: {kind}")
+
+
+class IntentStore:
+    """Durable intent and config state for restart recovery.
+
+    The store opens (recovers from disk) on first use. Every change is
+    appended to ``intent_log`` and folded into an in-memory state
+    immediately. A writer thread group-commits pending records, so one fsync
+    covers every change queued within ``flush_interval``; callers that need
+    durability pass ``wait=True`` (or call ``commit``) and block until their
+    record commits, at most ``commit_timeout`` seconds.
+    Every ``snapshot_every`` records the state is written as a compacted
+    snapshot and the log before it is truncated, so recovery is one snapshot
+    load plus a short replay.
+    """
+
+    def __init__(self, path='data/intent_store.db', flush_interval: float = 0.05,
+                 max_batch: int = 512, snapshot_every: int = 1000, commit_timeout: float = 5.0):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.commit_timeout = commit_timeout
+        self.max_batch = max_batch
+        self.snapshot_every = snapshot_every
+
+        self.recovery_ms = 0.0
+        self.replayed = 0
+        self.commits = 0
+
+        self._state = empty_state()
+        self._seq = 0
+        self._durable_seq = 0
+        self._snapshot_seq = 0
+        self._pending: List[tuple] = []
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._open_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._writer: Optional[threading.Thread] = None
+
+    def open(self) -> Dict:
+        """Recover state from disk and start the writer; returns the recovered state"""
+        with self._open_lock:
+            if self._connection is None:
+                self._open()
+        return self.state()
+
+    def _open(self):
+        started = time.perf_counter()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        # FULL syncs the WAL on every commit; batching commits is what bounds the fsync rate
+        connection.execute('PRAGMA synchronous=FULL')
+        connection.executescript(SCHEMA)
+
+        state = empty_state()
+        row = connection.execute('SELECT seq, state FROM snapshots ORDER BY seq DESC LIMIT 1').fetchone()
+        snapshot_seq = 0
+        if row is not None:
+            snapshot_seq, state = row[0], json.loads(row[1])
+
+        seq = snapshot_seq
+        replayed = 0
+        for seq, kind, key, payload in connection.execute(
+                'SELECT seq, kind, key, payload FROM intent_log WHERE seq > ? ORDER BY seq', (snapshot_seq,)):
+            apply_record(state, kind, key, json.loads(payload) if payload is not None else None)
+            replayed += 1
+
+        with self._lock:
+            self._state = state
+            self._seq = self._durable_seq = seq
+        self._snapshot_seq = snapshot_seq
+        self.replayed = replayed
+        self.recovery_ms = (time.perf_counter() - started) * 1000
+
+        # Published last: append() only skips open() once the recovered state is in place
+        self._connection = connection
+        self._stop.clear()
+        self._writer = threading.Thread(target=self._write_loop, name='intent-store-writer', daemon=True)
+        self._writer.start()
+        logger.info(f"Intent store recovered {len(state['sections'])} sections, "
+                    f"{len(state['devices'])} devices from snapshot {snapshot_seq} "
+                    f"+ {replayed} log records in {self.recovery_ms:.1f} ms")
+
+    def close(self):
+        """Flush pending records, write a final snapshot and close the database"""
+        with self._open_lock:
+            if self._connection is None:
+                return
+            self._stop.set()
+            self._wakeup.set()
+            self._writer.join()
+            self._write_snapshot()
+            self._connection.close()
+            self._connection = None
+
+    def state(self) -> Dict:
+        """Deep copy of the current state (including records not yet durable)"""
+        if self._connection is None:
+            self.open()
+        with self._lock:
+            return json.loads(json.dumps(self._state))
+
+    def append(self, kind: str, key: str, payload: Any = None, wait: bool = False) -> int:
+        """Log a change; with ``wait`` block until it is committed. Returns its sequence number"""
+        encoded = json.dumps(payload, default=str) if payload is not None else None
+        if self._connection is None:
+            self.open()
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            apply_record(self._state, kind, key, json.loads(encoded) if encoded is not None else None)
+            self._pending.append((seq, time.time(), kind, key, encoded))
+            if len(self._pending) >= self.max_batch:
+                self._wakeup.set()
+        if wait:
+            self.commit(seq)
+        return seq
+
+    def wait_for(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """Block until ``seq`` is durable"""
+        self._wakeup.set()
+        with self._flushed:
+            return self._flushed.wait_for(lambda: self._durable_seq >= seq, timeout)
+
+    def commit(self, seq: int):
+        """Block until ``seq`` is durable; raise CommitTimeout after ``commit_timeout`` seconds"""
+        if not self.wait_for(seq, self.commit_timeout):
+            raise CommitTimeout(f"Intent store did not commit change {seq} within {self.commit_timeout}s")
+
+    def set_section(self, section: str, value: Any, wait: bool = False) -> int:
+        return self.append(SECTION, section, value, wait)
+
+    def set_desired(self, device: str, config: Any, wait: bool = False) -> str:
+        """Record the config a device should run; returns its digest"""
+        digest = config_digest(config)
+        self.append(DESIRED, device, digest, wait)
+        return digest
+
+    def mark_applied(self, device: str, digest: str, wait: bool = False) -> int:
+        return self.append(APPLIED, device, digest, wait)
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest change; bumps on every append"""
+        return self._seq
+
+    def desired_digest(self, device: str) -> Optional[str]:
+        with self._lock:
+            digests = self._state['devices'].get(device)
+            return digests['desired'] if digests else None
+
+    def drifted_devices(self) -> List[str]:
+        """Devices whose last successful push differs from their desired config"""
+        with self._lock:
+            return sorted(
+                device for device, digests in self._state['devices'].items()
+                if digests['desired'] is not None and digests['desired'] != digests['applied']
+            )
+
+    def _write_loop(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._flush()
+            if self._seq - self._snapshot_seq >= self.snapshot_every:
+                self._write_snapshot()
+        self._flush()
+
+    def _flush(self):
+        """Commit all pending records in one transaction"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            connection = self._connection
+            connection.execute('BEGIN')
+            connection.executemany(
+                'INSERT INTO intent_log (seq, timestamp, kind, key, payload) VALUES (?, ?, ?, ?, ?)', batch
+            )
+            connection.execute('COMMIT')
+        except sqlite3.Error as e:
+            logger.error(f"Intent store commit failed, retrying {len(batch)} records: {e}")
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            with self._lock:
+                self._pending[:0] = batch
+            return
+        self.commits += 1
+        with self._flushed:
+            self._durable_seq = batch[-1][0]
+            self._flushed.notify_all()
+
+    def _write_snapshot(self):
+        """Persist the compacted state and drop the log records it covers"""
+        with self._lock:
+            seq = self._seq
+            encoded = json.dumps(self._state)
+        if seq <= self._snapshot_seq:
+            return
+        try:
+            connection = self._connection
+            connection.execute('BEGIN')
+            connection.execute('INSERT OR REPLACE INTO snapshots (seq, timestamp, state) VALUES (?, ?, ?)',
+                               (seq, time.time(), encoded))
+            connection.execute('DELETE FROM snapshots WHERE seq < ?', (seq,))
+            connection.execute('DELETE FROM intent_log WHERE seq <= ?', (seq,))
+            connection.execute('COMMIT')
+        except sqlite3.Error as e:
+            logger.error(f"Intent store snapshot failed: {e}")
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            return
+        self._snapshot_seq = seq
+        logger.debug(f"Intent store snapshot at seq {seq} ({len(encoded)} bytes)")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'seq': self._seq,
+                'durable_seq': self._durable_seq,
+                'snapshot_seq': self._snapshot_seq,
+                'pending': len(self._pending),
+                'commits': self.commits,
+                'replayed_on_recovery': self.replayed,
+                'recovery_ms': round(self.recovery_ms, 2)
+            }
@@ -0,0 +1,353 @@
+"""
+QoS admission control - guaranteed-bandwidth classes checked against port and uplink capacity
+"""
+import bisect
+import json
+import logging
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from netconf_client.demo_client import SPEED_BPS
+from netconf_client.interface_table import InterfaceTable
+
+logger = logging.getLogger(__name__)
+
+# Guarantees for classes given in the short form {class: interface}, which names no bandwidth
+DEFAULT_GUARANTEES = {'voice': '10%', 'video': '20%'}
+# qos_config keys that hold settings rather than a traffic class
+SETTINGS_KEYS = ('classes', 'uplinks', 'max_reserved')
+# Violations listed per plan (the count is always exact)
+MAX_REPORTED_VIOLATIONS = 100
+
+_RATE = re.compile(r'^(\d+(?:\.\d+)?)\s*([kmg]?)(?:bps)?$', re.IGNORECASE)
+_RATE_UNITS = {'': 1, 'k': 1e3, 'm': 1e6, 'g': 1e9}
+# Reservations within this many bps of capacity still fit (float rounding)
+_TOLERANCE_BPS = 1e-3
+
+
+def _parse_guarantee(value) -> Tuple[str, float]:
+    """'20%' -> ('percent', 20.0); '100M' / 100000000 -> ('bps', 1e8)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if value < 0:
+            raise ValueError(f"negative guarantee {value!r}")
+        return 'bps', float(value)
+    text = str(value).strip()
+    if text.endswith('%'):
+        try:
+            percent = float(text[:-1])
+        except ValueError:
+            raise ValueError(f"invalid guarantee {value!r}") from None
+        if not 0 <= percent <= 100:
+            raise ValueError(f"guarantee {value!r} must be between 0% and 100%")
+        return 'percent', percent
+    match = _RATE.match(text)
+    if match is None:
+        raise ValueError(f"invalid guarantee {value!r} (use a percentage, bps, or a K/M/G rate)")
+    return 'bps', float(match.group(1)) * _RATE_UNITS[match.group(2).lower()]
+
+
+def _parse_class(name: str, spec) -> Optional[Dict]:
+    """Canonical class spec, or None for a class that is switched off"""
+    if spec is None or spec == '':
+        return None
+    if isinstance(spec, str):
+        # Short form from the dashboard: the class's priority interface, no bandwidth given
+        spec = {'interfaces': [spec], 'guaranteed': DEFAULT_GUARANTEES.get(name, 0)}
+    if not isinstance(spec, dict):
+        raise ValueError(f"QoS class {name!r}: expected an interface name or an object")
+    try:
+        kind, amount = _parse_guarantee(spec.get('guaranteed', 0))
+    except ValueError as e:
+        raise ValueError(f"QoS class {name!r}: {e}") from None
+    interfaces = spec.get('interfaces')
+    if isinstance(interfaces, str):
+        interfaces = [interfaces]
+    vlans = spec.get('vlan')
+    if vlans is not None and not isinstance(vlans, list):
+        vlans = [vlans]
+    try:
+        vlans = sorted(int(vlan) for vlan in vlans) if vlans is not None else None
+    except (TypeError, ValueError):
+        raise ValueError(f"QoS class {name!r}: invalid vlan {spec.get('vlan')!r}") from None
+    return {'guaranteed': [kind, amount], 'interfaces': interfaces, 'vlan': vlans}
+
+
+def parse_qos_config(qos_config: Optional[Dict]) -> Tuple[Dict[str, Dict], Dict, float]:
+    """Split a qos_config into (classes, uplinks, max_reserved); raises ValueError.
+
+    Classes come from ``classes`` ({name: {guaranteed, interfaces?, vlan?}},
+    no selector meaning every port) and from the short form
+    ``{class: interface}``. ``uplinks`` maps an uplink interface to its
+    member ports (a list of names, or a name prefix such as
+    'gigabitethernet1/0/'). ``max_reserved`` is the share of a link's
+    line rate guarantees may add up to.
+    """
+    qos_config = qos_config or {}
+    if not isinstance(qos_config, dict):
+        raise ValueError("qos_config must be an object")
+    classes = {}
+    for name, spec in qos_config.items():
+        if name not in SETTINGS_KEYS:
+            classes[name] = _parse_class(name, spec)
+    for name, spec in (qos_config.get('classes') or {}).items():
+        classes[name] = _parse_class(name, spec)
+    classes = {name: spec for name, spec in classes.items() if spec is not None}
+
+    uplinks = qos_config.get('uplinks') or {}
+    if not isinstance(uplinks, dict) or not all(isinstance(members, (str, list)) for members in uplinks.values()):
+        raise ValueError("uplinks must map an uplink interface to a list of ports or a name prefix")
+    try:
+        max_reserved = float(qos_config.get('max_reserved', 1.0))
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid max_reserved {qos_config.get('max_reserved')!r}") from None
+    if not 0 < max_reserved <= 1:
+        raise ValueError("max_reserved must be greater than 0 and at most 1")
+    return classes, uplinks, max_reserved
+
+
+class QosPlan:
+    """Result of checking a qos_config against capacity; committed by the planner if admitted"""
+
+    def __init__(self, config: Dict, violations: List[Dict], violation_count: int,
+                 changed_classes: List[str], evaluated_ports: int, seconds: float, state: Dict):
+        self.config = config
+        self.violations = violations
+        self.violation_count = violation_count
+        self.changed_classes = changed_classes
+        self.evaluated_ports = evaluated_ports
+        self.seconds = seconds
+        self._state = state
+
+    @property
+    def admitted(self) -> bool:
+        return self.violation_count == 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'admitted': self.admitted,
+            'violation_count': self.violation_count,
+            'violations': self.violations,
+            'changed_classes': self.changed_classes,
+            'evaluated_ports': self.evaluated_ports,
+            'seconds': round(self.seconds, 4)
+        }
+
+
+class QosAdmissionError(ValueError):
+    """A qos_config whose guarantees do not fit port or uplink capacity"""
+
+    def __init__(self, plan: QosPlan):
+        first = plan.violations[0]
+        super().__init__(f"QoS oversubscribed on {plan.violation_count} links, e.g. {first['kind']} "
+                         f"{first['interface']}: {first['reserved_bps']:.0f} of {first['capacity_bps']:.0f} bps")
+        self.plan = plan
+
+
+class QosPlanner:
+    """Tracks the bandwidth every QoS class reserves on each port and uplink of an interface table.
+
+    Reservations are kept as per-port and per-uplink arrays. A new config is
+    diffed against the committed one by class, so only the ports of changed
+    classes (and their uplinks) are re-evaluated; a change in line rates or
+    uplink layout re-evaluates everything. Nothing is committed unless every
+    link still fits.
+    """
+
+    def __init__(self, interfaces: InterfaceTable):
+        self.interfaces = interfaces
+        self.config: Dict = {}
+        self.last_plan: Optional[QosPlan] = None
+        self._classes: Dict[str, Tuple[str, object, object]] = {}
+        self._capacity: Optional[Dict] = None
+        self._demand = None
+        self._uplink_demand = None
+        self._lock = threading.Lock()
+
+    def plan(self, qos_config: Optional[Dict], speed: Optional[str] = None) -> QosPlan:
+        """Check ``qos_config`` without committing it; ``speed`` previews every port set to that speed"""
+        with self._lock:
+            return self._plan(qos_config, speed)
+
+    def apply(self, qos_config: Optional[Dict], force: bool = False) -> QosPlan:
+        """Check and commit ``qos_config``; raises QosAdmissionError if it does not fit (unless ``force``)"""
+        with self._lock:
+            plan = self._plan(qos_config, None)
+            if not plan.admitted and not force:
+                raise QosAdmissionError(plan)
+            self._commit(plan)
+            return plan
+
+    def summary(self) -> Dict:
+        with self._lock:
+            if self._demand is None:
+                return {'classes': 0, 'reserved_bps': 0.0, 'ports_with_reservations': 0, 'uplinks': 0}
+            return {
+                'classes': len(self._classes),
+                'reserved_bps': float(self._demand.sum()),
+                'ports_with_reservations': int((self._demand > 0).sum()),
+                'uplinks': len(self._capacity['uplinks']),
+                'max_reserved': self._capacity['max_reserved']
+            }
+
+    # -- evaluation -------------------------------------------------------
+
+    def _plan(self, qos_config: Optional[Dict], speed: Optional[str]) -> QosPlan:
+        import numpy as np
+
+        started = time.perf_counter()
+        classes, uplinks, max_reserved = parse_qos_config(qos_config)
+        capacity = self._capacity_for(uplinks, max_reserved, speed)
+        full = capacity is not self._capacity
+        size = len(capacity['line_rate'])
+        if full:
+            committed, demand, uplink_demand = {}, np.zeros(size), np.zeros(size)
+        else:
+            committed, demand, uplink_demand = self._classes, self._demand, self._uplink_demand
+
+        # Contributions that change: old ones withdrawn, new ones added
+        new_classes = {}
+        changed, row_parts, delta_parts = [], [], []
+        for name in sorted(set(committed) | set(classes)):
+            key = json.dumps(classes[name], sort_keys=True) if name in classes else None
+            old = committed.get(name)
+            if old is not None and old[0] == key:
+                new_classes[name] = old
+                continue
+            changed.append(name)
+            if old is not None:
+                row_parts.append(old[1])
+                delta_parts.append(-old[2])
+            if key is not None:
+                rows, bps = self._reservations(name, classes[name], capacity)
+                new_classes[name] = (key, rows, bps)
+                row_parts.append(rows)
+                delta_parts.append(bps)
+
+        if row_parts:
+            touched, inverse = np.unique(np.concatenate(row_parts), return_inverse=True)
+            port_reserved = demand[touched] + np.bincount(inverse, weights=np.concatenate(delta_parts),
+                                                          minlength=len(touched))
+        else:
+            touched, port_reserved = np.zeros(0, dtype=np.int64), np.zeros(0)
+        port_delta = port_reserved - demand[touched]
+        uplink_of = capacity['uplink'][touched]
+        has_uplink = uplink_of >= 0
+        uplink_touched, inverse = np.unique(uplink_of[has_uplink], return_inverse=True)
+        uplink_reserved = uplink_demand[uplink_touched] + np.bincount(inverse, weights=port_delta[has_uplink],
+                                                                      minlength=len(uplink_touched))
+
+        line_rate = capacity['line_rate']
+        violations, count = [], 0
+        for kind, rows, reserved in (('port', touched, port_reserved), ('uplink', uplink_touched, uplink_reserved)):
+            limit = line_rate[rows] * max_reserved + _TOLERANCE_BPS
+            over = np.flatnonzero(reserved > limit)
+            count += len(over)
+            reported = over[:MAX_REPORTED_VIOLATIONS - len(violations)]
+            names = self.interfaces.names(rows[reported].tolist())
+            violations.extend({
+                'kind': kind,
+                'interface': name,
+                'reserved_bps': float(reserved[index]),
+                'capacity_bps': float(line_rate[rows[index]] * max_reserved)
+            } for name, index in zip(names, reported.tolist()))
+
+        state = {
+            'capacity': capacity, 'classes': new_classes, 'full': full,
+            'touched': touched, 'port_reserved': port_reserved,
+            'uplink_touched': uplink_touched, 'uplink_reserved': uplink_reserved
+        }
+        return QosPlan(qos_config or {}, violations, count, changed, len(touched),
+                       time.perf_counter() - started, state)
+
+    def _commit(self, plan: QosPlan):
+        import numpy as np
+
+        state = plan._state
+        if state['full']:
+            size = len(state['capacity']['line_rate'])
+            self._demand, self._uplink_demand = np.zeros(size), np.zeros(size)
+            self._capacity = state['capacity']
+        self._demand[state['touched']] = state['port_reserved']
+        self._uplink_demand[state['uplink_touched']] = state['uplink_reserved']
+        self._classes = state['classes']
+        self.config = plan.config
+        self.last_plan = plan
+        logger.info(f"QoS plan committed: {len(self._classes)} classes, {len(plan.changed_classes)} changed, "
+                    f"{plan.evaluated_ports} ports re-evaluated in {plan.seconds * 1000:.1f} ms")
+
+    def _reservations(self, name: str, spec: Dict, capacity: Dict):
+        """Rows a class applies to and the bps it guarantees on each"""
+        import numpy as np
+
+        size = len(capacity['line_rate'])
+        selected = np.ones(size, dtype=bool)
+        if spec['interfaces'] is not None:
+            rows = self.interfaces.rows_of(spec['interfaces'])
+            unknown = [interface for interface, row in zip(spec['interfaces'], rows) if row < 0]
+            if unknown:
+                raise ValueError(f"QoS class {name!r}: unknown interfaces {unknown[:5]}")
+            by_name = np.zeros(size, dtype=bool)
+            by_name[rows] = True
+            selected &= by_name
+        if spec['vlan'] is not None:
+            selected &= np.isin(self.interfaces.column('vlan'), spec['vlan'])
+        rows = np.flatnonzero(selected)
+        kind, amount = spec['guaranteed']
+        if kind == 'percent':
+            bps = capacity['line_rate'][rows] * (amount / 100)
+        else:
+            bps = np.full(len(rows), amount)
+        return rows, bps
+
+    def _capacity_for(self, uplinks: Dict, max_reserved: float, speed: Optional[str]) -> Dict:
+        """Line rate and uplink of every port; the committed capacity object when nothing changed"""
+        import numpy as np
+
+        if speed is not None and speed not in SPEED_BPS:
+            raise ValueError(f"Unknown interface speed {speed!r}. Supported: {list(SPEED_BPS)}")
+        table = self.interfaces
+        speed_codes = table.column('speed').tobytes()
+        uplinks_key = json.dumps(uplinks, sort_keys=True)
+        current = self._capacity
+        if current is not None and speed is None and current['speed_codes'] == speed_codes \
+                and current['uplinks_key'] == uplinks_key and current['max_reserved'] == max_reserved:
+            return current
+
+        size = len(table)
+        if speed is not None:
+            line_rate = np.full(size, float(SPEED_BPS.get(speed, 0)))
+        else:
+            rates = np.array([float(SPEED_BPS.get(value, 0)) for value in table.pool_values('speed')])
+            line_rate = rates[table.column('speed')]
+
+        uplink = np.full(size, -1, dtype=np.int64)
+        sorted_names = None
+        for uplink_name, members in uplinks.items():
+            uplink_row = table.row_of(uplink_name)
+            if uplink_row is None:
+                raise ValueError(f"Unknown uplink interface {uplink_name!r}")
+            if isinstance(members, str):
+                if sorted_names is None:
+                    names = table.names()
+                    order = sorted(range(size), key=names.__getitem__)
+                    sorted_names = ([names[row] for row in order], order)
+                rows = _prefix_rows(sorted_names, members)
+            else:
+                rows = table.rows_of(members)
+                if min(rows, default=0) < 0:
+                    raise ValueError(f"Uplink {uplink_name!r} lists unknown interfaces")
+            rows = np.asarray([row for row in rows if row != uplink_row], dtype=np.int64)
+            if (uplink[rows] >= 0).any():
+                raise ValueError(f"Ports of uplink {uplink_name!r} already belong to another uplink")
+            uplink[rows] = uplink_row
+        return {'speed_codes': speed_codes if speed is None else None, 'uplinks_key': uplinks_key,
+                'uplinks': list(uplinks), 'max_reserved': max_reserved, 'line_rate': line_rate, 'uplink': uplink}
+
+
+def _prefix_rows(sorted_names: Tuple[List[str], List[int]], prefix: str) -> List[int]:
+    names, order = sorted_names
+    start = bisect.bisect_left(names, prefix)
+    end = bisect.bisect_left(names, prefix + '\U0010ffff', start)
+    return order[start:end]
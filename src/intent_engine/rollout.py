@@ -0,0 +1,294 @@
+"""
+Intent rollout - dependency-ordered per-device config operations run as a DAG on a bounded worker pool
+"""
+import copy
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional
+
+from netconf_client.reconciler import merge_config, normalize_config
+
+logger = logging.getLogger(__name__)
+
+# Sections that reference another section are applied after it: interfaces
+# use the VLANs of the network ranges, failover groups leafref interfaces/name
+SECTION_DEPENDENCIES = {
+    'interfaces': ('network-ranges',),
+    'failover-system': ('interfaces',),
+    'monitoring': ('interfaces',),
+    # Sections of the intent store's device config
+    'failover_config': ('current_config',),
+    'network_services': ('current_config',),
+    'qos_config': ('current_config',),
+}
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+class RolloutStep:
+    """One operation on one device: merge a config section, or (section None) commit the device's config"""
+
+    __slots__ = ('device', 'section', 'value', 'depends', 'dependents', 'status', 'error', 'duration')
+
+    def __init__(self, device: str, section: Optional[str], value=None):
+        self.device = device
+        self.section = section
+        self.value = value
+        self.depends: List['RolloutStep'] = []
+        self.dependents: List['RolloutStep'] = []
+        self.status = PENDING
+        self.error: Optional[str] = None
+        self.duration = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.device}:{self.section or 'commit'}"
+
+    def after(self, step: 'RolloutStep'):
+        self.depends.append(step)
+        step.dependents.append(self)
+
+
+class RolloutPlan:
+    """Per-device operations for a set of device configs, in dependency order (steps record their run, so run it once)"""
+
+    def __init__(self, configs: Dict[str, Dict], steps: List[RolloutStep]):
+        self.configs = configs
+        self.steps = steps
+        self.commits = {step.device: step for step in steps if step.section is None}
+
+    @property
+    def devices(self) -> List[str]:
+        return list(self.configs)
+
+    def critical_path(self) -> int:
+        """Number of steps on the longest dependency chain (``steps`` is in topological order)"""
+        depth: Dict[int, int] = {}
+        for step in self.steps:
+            depth[id(step)] = 1 + max((depth[id(parent)] for parent in step.depends), default=0)
+        return max(depth.values(), default=0)
+
+
+def plan_rollout(configs: Dict[str, Dict], after: Optional[Dict[str, Iterable[str]]] = None) -> RolloutPlan:
+    """Turn device configs (device -> ``{'network': {...}}``) into a DAG of per-device operations.
+
+    Every section under ``network`` becomes a merge step that runs after the
+    sections it references (``SECTION_DEPENDENCIES``), and a final commit
+    step per device runs after all of them. ``after`` maps a device to the
+    devices whose rollout must finish first (e.g. distribution before
+    access switches). Raises ValueError for unknown devices or cycles.
+    """
+    after = after or {}
+    steps: List[RolloutStep] = []
+    roots: Dict[str, List[RolloutStep]] = {}
+    commits: Dict[str, RolloutStep] = {}
+
+    for device, config in configs.items():
+        sections = (config or {}).get('network') or {}
+        by_section = {section: RolloutStep(device, section, value) for section, value in sections.items()}
+        device_roots = []
+        for section, step in by_section.items():
+            parents = [by_section[parent] for parent in SECTION_DEPENDENCIES.get(section, ()) if parent in by_section]
+            for parent in parents:
+                step.after(parent)
+            if not parents:
+                device_roots.append(step)
+        commit = RolloutStep(device, None)
+        for step in by_section.values():
+            commit.after(step)
+        roots[device] = device_roots or [commit]
+        commits[device] = commit
+        steps.extend(by_section.values())
+        steps.append(commit)
+
+    for device, upstream in after.items():
+        if device not in commits:
+            raise ValueError(f"Rollout order names unknown device {device}")
+        for other in upstream:
+            if other not in commits:
+                raise ValueError(f"Rollout order names unknown device {other}")
+            for step in roots[device]:
+                step.after(commits[other])
+
+    # Kahn's algorithm: order the steps topologically and reject cycles
+    remaining = {id(step): len(step.depends) for step in steps}
+    ready = deque(step for step in steps if not step.depends)
+    ordered = []
+    while ready:
+        step = ready.popleft()
+        ordered.append(step)
+        for dependent in step.dependents:
+            remaining[id(dependent)] -= 1
+            if not remaining[id(dependent)]:
+                ready.append(dependent)
+    if len(ordered) != len(steps):
+        raise ValueError("Rollout order has a cycle")
+    return RolloutPlan(dict(configs), ordered)
+
+
+class RolloutResult:
+    """Outcome of one rollout: completed devices, the failing step and what was rolled back"""
+
+    def __init__(self, plan: RolloutPlan, duration: float, failed: Optional[RolloutStep],
+                 rolled_back: List[str], rollback_failed: List[str]):
+        self.plan = plan
+        self.duration = duration
+        self.failed = failed
+        self.rolled_back = rolled_back
+        self.rollback_failed = rollback_failed
+        self.completed = [device for device in plan.devices if plan.commits[device].status == DONE]
+
+    @property
+    def success(self) -> bool:
+        return self.failed is None
+
+    def to_dict(self) -> Dict:
+        counts = {PENDING: 0, DONE: 0, FAILED: 0, SKIPPED: 0}
+        for step in self.plan.steps:
+            counts[step.status] += 1
+        return {
+            'status': 'completed' if self.success else 'failed',
+            'devices': len(self.plan.devices),
+            'completed': self.completed,
+            'failed_step': None if self.failed is None else {
+                'device': self.failed.device, 'section': self.failed.section, 'error': self.failed.error
+            },
+            'rolled_back': self.rolled_back,
+            'rollback_failed': self.rollback_failed,
+            'steps': len(self.plan.steps),
+            'executed': counts[DONE],
+            'skipped': counts[SKIPPED],
+            'critical_path': self.plan.critical_path(),
+            'duration': round(self.duration, 3)
+        }
+
+
+class RolloutExecutor:
+    """Runs rollout plans on a bounded thread pool.
+
+    A step is dispatched once everything it depends on is done, with at
+    most one operation in flight per device (a NETCONF session serializes
+    its RPCs anyway), so independent branches on different devices proceed
+    in parallel and the rollout takes about as long as its critical path.
+    Before its first operation each device's running ``network`` config is
+    snapshotted, and started devices are finished before new ones begin.
+    The first failure stops dispatching; once in-flight steps finish,
+    devices that were touched but did not commit are restored from their
+    snapshot with ``replace_config``. Devices that committed keep the new
+    config.
+    """
+
+    def __init__(self, max_workers: int = 16):
+        self.max_workers = max_workers
+        self.last_result: Optional[RolloutResult] = None
+        # One rollout at a time, so two pushes never interleave on a device
+        self._lock = threading.Lock()
+
+    def run(self, plan: RolloutPlan, clients: Dict[str, object]) -> RolloutResult:
+        missing = [device for device in plan.devices if device not in clients]
+        if missing:
+            raise ValueError(f"No client for devices {missing}")
+        with self._lock:
+            result = self._run(plan, clients)
+            self.last_result = result
+        summary = result.to_dict()
+        if result.success:
+            logger.info(f"Rolled out {summary['executed']} operations to {summary['devices']} devices "
+                        f"in {result.duration:.2f}s (critical path {summary['critical_path']} steps)")
+        else:
+            logger.error(f"Rollout stopped at {result.failed.name}: {result.failed.error}; "
+                         f"rolled back {len(result.rolled_back)} devices, {len(result.rollback_failed)} failed")
+        return result
+
+    def _run(self, plan: RolloutPlan, clients: Dict[str, object]) -> RolloutResult:
+        started = time.perf_counter()
+        snapshots: Dict[str, Dict] = {}
+        remaining = {id(step): len(step.depends) for step in plan.steps}
+        ready = deque(step for step in plan.steps if not step.depends)
+        busy = set()
+        running = {}
+        failed: Optional[RolloutStep] = None
+
+        workers = max(1, min(self.max_workers, len(plan.devices)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rollout') as executor:
+            while ready or running:
+                if failed is None:
+                    deferred = []
+                    while ready and len(running) < workers:
+                        step = ready.popleft()
+                        if step.device in busy:
+                            deferred.append(step)
+                            continue
+                        busy.add(step.device)
+                        future = executor.submit(self._run_step, plan, step, clients[step.device], snapshots)
+                        running[future] = step
+                    ready.extendleft(reversed(deferred))
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    busy.discard(step.device)
+                    if step.status == DONE:
+                        # Devices already started go first, so few are half-configured at any time
+                        for dependent in reversed(step.dependents):
+                            remaining[id(dependent)] -= 1
+                            if not remaining[id(dependent)]:
+                                ready.appendleft(dependent)
+                    elif failed is None:
+                        failed = step
+
+            rolled_back, rollback_failed = [], []
+            if failed is not None:
+                unfinished = [device for device in snapshots if plan.commits[device].status != DONE]
+                restored = executor.map(lambda device: self._restore(device, clients[device], snapshots[device]),
+                                        unfinished)
+                for device, ok in zip(unfinished, restored):
+                    (rolled_back if ok else rollback_failed).append(device)
+
+        for step in plan.steps:
+            if step.status == PENDING:
+                step.status = SKIPPED
+        return RolloutResult(plan, time.perf_counter() - started, failed, rolled_back, rollback_failed)
+
+    @staticmethod
+    def _run_step(plan: RolloutPlan, step: RolloutStep, client, snapshots: Dict[str, Dict]):
+        started = time.perf_counter()
+        try:
+            if step.device not in snapshots:
+                running = client.get_config() or {}
+                snapshots[step.device] = copy.deepcopy(running.get('network') or {})
+            if step.section is None:
+                ok = RolloutExecutor._commit(plan.configs[step.device], snapshots[step.device], client)
+            else:
+                ok = client.send_config({'network': {step.section: step.value}})
+            if not ok:
+                raise RuntimeError("device rejected the change")
+            step.status = DONE
+        except Exception as e:
+            step.status = FAILED
+            step.error = str(e)
+        step.duration = time.perf_counter() - started
+
+    @staticmethod
+    def _commit(config: Dict, snapshot: Dict, client) -> bool:
+        """Finish a device: replace its config only if the merges left entries the intent no longer has"""
+        desired = (config or {}).get('network') or {}
+        merged = merge_config(copy.deepcopy(snapshot), desired)
+        if normalize_config(merged) == normalize_config(desired):
+            return True
+        return client.replace_config(config)
+
+    @staticmethod
+    def _restore(device: str, client, snapshot: Dict) -> bool:
+        try:
+            return bool(client.replace_config({'network': snapshot}))
+        except Exception as e:
+            logger.error(f"Rollback of {device} failed: {e}")
+            return False
@@ -0,0 +1,405 @@
+"""
+Security rule compiler - normalizes firewall rules, finds shadowed, redundant and conflicting rules, emits merged ACLs
+"""
+import bisect
+import ipaddress
+import logging
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = {'allow': 'allow', 'permit': 'allow', 'deny': 'deny', 'drop': 'deny'}
+PROTOCOLS = {'icmp': 1, 'tcp': 6, 'udp': 17, 'gre': 47, 'esp': 50, 'ospf': 89}
+PROTOCOL_NAMES = {number: name for name, number in PROTOCOLS.items()}
+# Protocols whose rules may match on ports
+PORT_PROTOCOLS = (6, 17)
+WILDCARDS = ('any', '*', 'ip', '')
+
+ANY_PREFIX = (0, 0)
+ANY_PROTOCOL = (0, 255)
+ANY_PORT = (0, 65535)
+
+Prefix = Tuple[int, int]
+Range = Tuple[int, int]
+
+
+def _contains_prefix(outer: Prefix, inner: Prefix) -> bool:
+    shift = 32 - outer[1]
+    return outer[1] <= inner[1] and outer[0] >> shift == inner[0] >> shift
+
+
+def _contains_range(outer: Range, inner: Range) -> bool:
+    return outer[0] <= inner[0] and inner[1] <= outer[1]
+
+
+def _overlaps_range(first: Range, second: Range) -> bool:
+    return first[0] <= second[1] and second[0] <= first[1]
+
+
+def _format_address(value: int) -> str:
+    return f'{value >> 24}.{value >> 16 & 255}.{value >> 8 & 255}.{value & 255}'
+
+
+def _format_prefix(prefix: Prefix) -> str:
+    return 'any' if prefix == ANY_PREFIX else f'{_format_address(prefix[0])}/{prefix[1]}'
+
+
+def _format_ports(ports: Range) -> str:
+    if ports == ANY_PORT:
+        return 'any'
+    return str(ports[0]) if ports[0] == ports[1] else f'{ports[0]}-{ports[1]}'
+
+
+def _format_protocol(protocol: Range) -> str:
+    return 'ip' if protocol == ANY_PROTOCOL else PROTOCOL_NAMES.get(protocol[0], str(protocol[0]))
+
+
+class SecurityRule:
+    """One firewall rule normalized to integer prefixes (source/destination) and ranges (protocol, ports)"""
+
+    __slots__ = ('position', 'action', 'source', 'destination', 'protocol', 'source_ports', 'destination_ports')
+
+    def __init__(self, position: int, action: str, source: Prefix, destination: Prefix,
+                 protocol: Range = ANY_PROTOCOL, source_ports: Range = ANY_PORT, destination_ports: Range = ANY_PORT):
+        self.position = position
+        self.action = action
+        self.source = source
+        self.destination = destination
+        self.protocol = protocol
+        self.source_ports = source_ports
+        self.destination_ports = destination_ports
+
+    @classmethod
+    def parse(cls, position: int, rule: Dict) -> 'SecurityRule':
+        """Normalize a rule dict as sent to /api/intent; raises ValueError naming the rule"""
+        if not isinstance(rule, dict):
+            raise ValueError(f"Security rule {position}: expected an object, got {type(rule).__name__}")
+        try:
+            action = ACTIONS.get(str(rule.get('action', '')).lower())
+            if action is None:
+                raise ValueError(f"unknown action {rule.get('action')!r} (use allow or deny)")
+            protocol = cls._parse_protocol(rule.get('protocol', 'ip'))
+            source_ports = cls._parse_ports(rule.get('source_port', 'any'))
+            destination_ports = cls._parse_ports(rule.get('destination_port', rule.get('port', 'any')))
+            if (source_ports != ANY_PORT or destination_ports != ANY_PORT) and \
+                    not (protocol[0] == protocol[1] and protocol[0] in PORT_PROTOCOLS):
+                raise ValueError("ports can only be matched for tcp or udp")
+            return cls(position, action, cls._parse_prefix(rule.get('source', 'any')),
+                       cls._parse_prefix(rule.get('destination', 'any')), protocol, source_ports, destination_ports)
+        except ValueError as e:
+            raise ValueError(f"Security rule {position}: {e}") from None
+
+    @staticmethod
+    def _parse_prefix(value) -> Prefix:
+        text = str(value).strip().lower()
+        if text in WILDCARDS:
+            return ANY_PREFIX
+        try:
+            network = ipaddress.IPv4Network(text, strict=False)
+        except ValueError:
+            raise ValueError(f"invalid address or prefix {value!r}") from None
+        return int(network.network_address), network.prefixlen
+
+    @staticmethod
+    def _parse_protocol(value) -> Range:
+        text = str(value).strip().lower()
+        if text in WILDCARDS:
+            return ANY_PROTOCOL
+        number = PROTOCOLS.get(text)
+        if number is None:
+            if not text.isdigit() or int(text) > 255:
+                raise ValueError(f"unknown protocol {value!r}")
+            number = int(text)
+        return number, number
+
+    @staticmethod
+    def _parse_ports(value) -> Range:
+        text = str(value).strip().lower()
+        if text in WILDCARDS:
+            return ANY_PORT
+        low, _, high = text.partition('-')
+        if not low.strip().isdigit() or (high and not high.strip().isdigit()):
+            raise ValueError(f"invalid port or port range {value!r}")
+        ports = (int(low), int(high) if high else int(low))
+        if ports[0] > ports[1] or ports[1] > 65535:
+            raise ValueError(f"invalid port or port range {value!r}")
+        return ports
+
+    def match(self) -> Tuple[Prefix, Prefix, Range, Range, Range]:
+        return self.source, self.destination, self.protocol, self.source_ports, self.destination_ports
+
+    def contains(self, other: 'SecurityRule') -> bool:
+        """Every packet ``other`` matches is also matched by this rule"""
+        return (_contains_prefix(self.source, other.source) and _contains_prefix(self.destination, other.destination)
+                and self.contains_ranges(other))
+
+    def contains_ranges(self, other: 'SecurityRule') -> bool:
+        return (_contains_range(self.protocol, other.protocol) and _contains_range(self.source_ports, other.source_ports)
+                and _contains_range(self.destination_ports, other.destination_ports))
+
+    def overlaps_ranges(self, other: 'SecurityRule') -> bool:
+        return (_overlaps_range(self.protocol, other.protocol) and _overlaps_range(self.source_ports, other.source_ports)
+                and _overlaps_range(self.destination_ports, other.destination_ports))
+
+
+class _PrefixIndex:
+    """Prefixes bucketed by length: ancestors are found by masking, descendants by bisecting longer buckets.
+
+    Two levels (source prefix, then destination prefix) form the decision
+    tree the compiler searches, so a rule is only compared with rules whose
+    addresses can overlap it rather than with every earlier rule.
+    """
+
+    def __init__(self):
+        self.values: Dict[Prefix, object] = {}
+        self._nets: Dict[int, List[int]] = {}
+        self._lengths: List[int] = []
+
+    def setdefault(self, prefix: Prefix, factory):
+        value = self.values.get(prefix)
+        if value is None:
+            value = self.values[prefix] = factory()
+            nets = self._nets.get(prefix[1])
+            if nets is None:
+                nets = self._nets[prefix[1]] = []
+                bisect.insort(self._lengths, prefix[1])
+            bisect.insort(nets, prefix[0])
+        return value
+
+    def covering(self, prefix: Prefix) -> Iterator:
+        """Values stored at ``prefix`` or any shorter prefix containing it"""
+        net, length = prefix
+        for other in self._lengths:
+            if other > length:
+                break
+            shift = 32 - other
+            value = self.values.get((net >> shift << shift, other))
+            if value is not None:
+                yield value
+
+    def overlapping(self, prefix: Prefix) -> Iterator:
+        """Values stored at any prefix that contains or is contained by ``prefix``"""
+        yield from self.covering(prefix)
+        net, length = prefix
+        last = net + (1 << (32 - length)) - 1
+        for other in self._lengths:
+            if other <= length:
+                continue
+            nets = self._nets[other]
+            for index in range(bisect.bisect_left(nets, net), bisect.bisect_right(nets, last)):
+                yield self.values[(nets[index], other)]
+
+
+def _collapse_prefixes(prefixes: Iterable[Prefix]) -> List[Prefix]:
+    """Fewest prefixes covering exactly the union of ``prefixes``"""
+    merged: List[Prefix] = []
+    for prefix in sorted(set(prefixes)):
+        if merged and _contains_prefix(merged[-1], prefix):
+            continue
+        merged.append(prefix)
+        while len(merged) > 1:
+            (net, length), (next_net, next_length) = merged[-2], merged[-1]
+            size = 1 << (32 - length)
+            if length != next_length or length == 0 or net % (size * 2) or next_net != net + size:
+                break
+            merged[-2:] = [(net, length - 1)]
+    return merged
+
+
+def _collapse_ranges(ranges: Iterable[Range]) -> List[Range]:
+    """Fewest ranges covering exactly the union of ``ranges``"""
+    merged: List[Range] = []
+    for low, high in sorted(set(ranges)):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+        else:
+            merged.append((low, high))
+    return merged
+
+
+# Merge passes over a run of same-action rules: (field index in match(), collapse function)
+_MERGE_PASSES = ((0, _collapse_prefixes), (1, _collapse_prefixes), (4, _collapse_ranges), (3, _collapse_ranges))
+
+
+def _merge_run(entries: List[Tuple[tuple, List[int]]]) -> List[Tuple[tuple, List[int]]]:
+    """Merge (match, rule positions) entries whose action is the same and that are adjacent in evaluation order.
+
+    Within such a run the order of entries does not change the outcome, so
+    entries that differ in one field can be merged on that field.
+    """
+    for field, collapse in _MERGE_PASSES:
+        groups: Dict[tuple, List[Tuple[object, List[int]]]] = {}
+        for match, positions in entries:
+            groups.setdefault(match[:field] + match[field + 1:], []).append((match[field], positions))
+        entries = []
+        for rest, members in groups.items():
+            values = collapse(value for value, _ in members)
+            for value in values:
+                if len(values) == 1:
+                    positions = sorted(position for _, member_positions in members for position in member_positions)
+                else:
+                    positions = sorted(position for member_value, member_positions in members
+                                       for position in member_positions
+                                       if (_contains_prefix if field < 2 else _contains_range)(value, member_value))
+                entries.append((rest[:field] + (value,) + rest[field:], positions))
+        entries.sort(key=lambda entry: entry[1][0])
+    return entries
+
+
+class SecurityPolicy:
+    """Result of compiling a rule list: normalized rules, analysis findings and the merged ACL"""
+
+    def __init__(self, source: List[Dict], rules: List[SecurityRule], findings: List[Dict],
+                 acl: List[Dict], default_action: str, compile_seconds: float, matches: List[tuple] = ()):
+        self.source = source
+        self.rules = rules
+        self.findings = findings
+        self.acl = acl
+        self.default_action = default_action
+        self.compile_seconds = compile_seconds
+        # Integer form of each ACL entry, for rendering
+        self._matches = list(matches)
+
+    def summary(self) -> Dict:
+        counts = {'shadowed': 0, 'redundant': 0, 'conflict': 0}
+        for finding in self.findings:
+            counts[finding['type']] += 1
+        return {
+            'rules': len(self.rules),
+            'acl_entries': len(self.acl),
+            'shadowed': counts['shadowed'],
+            'redundant': counts['redundant'],
+            'conflicts': counts['conflict'],
+            'default_action': self.default_action,
+            'compile_seconds': round(self.compile_seconds, 4)
+        }
+
+    def render(self, name: str = 'CAMPUS-SECURITY') -> List[str]:
+        """Extended ACL text for the merged entries, ending in the explicit default action"""
+        lines = [f'ip access-list extended {name}']
+        for entry, match in zip(self.acl, self._matches):
+            lines.append(f" {entry['sequence']} {_render_entry(entry['action'], match)}")
+        default = 'permit' if self.default_action == 'allow' else 'deny'
+        lines.append(f" {(len(self.acl) + 1) * 10} {default} ip any any")
+        return lines
+
+    def to_dict(self) -> Dict:
+        return {
+            'summary': self.summary(),
+            'findings': self.findings,
+            'acl': self.acl
+        }
+
+
+def _render_address(prefix: Prefix) -> str:
+    if prefix == ANY_PREFIX:
+        return 'any'
+    if prefix[1] == 32:
+        return f'host {_format_address(prefix[0])}'
+    return f'{_format_address(prefix[0])} {_format_address((1 << (32 - prefix[1])) - 1)}'
+
+
+def _render_ports(ports: Range) -> str:
+    if ports == ANY_PORT:
+        return ''
+    return f' eq {ports[0]}' if ports[0] == ports[1] else f' range {ports[0]} {ports[1]}'
+
+
+def _render_entry(action: str, match: tuple) -> str:
+    source, destination, protocol, source_ports, destination_ports = match
+    return (f"{'permit' if action == 'allow' else 'deny'} {_format_protocol(protocol)} "
+            f"{_render_address(source)}{_render_ports(source_ports)} "
+            f"{_render_address(destination)}{_render_ports(destination_ports)}")
+
+
+def parse_security_rules(rules: Optional[List[Dict]]) -> List[SecurityRule]:
+    """Normalize a rule list, raising ValueError on the first invalid rule"""
+    if rules is None:
+        return []
+    if not isinstance(rules, list):
+        raise ValueError("security_rules must be a list")
+    return [SecurityRule.parse(position, rule) for position, rule in enumerate(rules)]
+
+
+def compile_security_policy(rules: Optional[List[Dict]], default_action: str = 'deny') -> SecurityPolicy:
+    """Analyze an ordered (first match wins) rule list and build its merged ACL.
+
+    A rule is *shadowed* when an earlier rule with the other action matches
+    everything it does, and *redundant* when an earlier rule with the same
+    action does (or it only repeats the default action at the end of the
+    list); neither can ever take effect, so both are dropped from the ACL.
+    A *conflict* is an earlier rule with the other action that matches
+    part of the rule: a "generalization" when the later rule contains the
+    earlier one, otherwise a "correlation". Remaining rules are merged
+    within runs of the same action.
+    """
+    started = time.perf_counter()
+    default_action = ACTIONS.get(default_action, default_action)
+    parsed = parse_security_rules(rules)
+    findings: List[Dict] = []
+    live: List[SecurityRule] = []
+    index = _PrefixIndex()
+
+    for rule in parsed:
+        cover: Optional[SecurityRule] = None
+        for by_destination in index.covering(rule.source):
+            for leaf in by_destination.covering(rule.destination):
+                for earlier_rules in leaf.values():
+                    for earlier in earlier_rules:
+                        if cover is not None and earlier.position > cover.position:
+                            break
+                        if earlier.contains_ranges(rule):
+                            cover = earlier
+                            break
+        if cover is not None:
+            findings.append({'rule': rule.position, 'type': 'shadowed' if cover.action != rule.action else 'redundant',
+                             'by': cover.position})
+            continue
+
+        for by_destination in index.overlapping(rule.source):
+            for leaf in by_destination.overlapping(rule.destination):
+                for earlier in leaf.get('deny' if rule.action == 'allow' else 'allow', ()):
+                    if earlier.overlaps_ranges(rule):
+                        findings.append({'rule': rule.position, 'type': 'conflict', 'with': earlier.position,
+                                         'kind': 'generalization' if rule.contains(earlier) else 'correlation'})
+        leaf = index.setdefault(rule.source, _PrefixIndex).setdefault(rule.destination, dict)
+        leaf.setdefault(rule.action, []).append(rule)
+        live.append(rule)
+
+    # Trailing rules that repeat the default action never change the outcome
+    while live and live[-1].action == default_action:
+        findings.append({'rule': live[-1].position, 'type': 'redundant', 'by': 'default'})
+        live.pop()
+    findings.sort(key=lambda finding: finding['rule'])
+
+    acl: List[Dict] = []
+    matches: List[tuple] = []
+    run_start = 0
+    for end in range(1, len(live) + 1):
+        if end < len(live) and live[end].action == live[run_start].action:
+            continue
+        action = live[run_start].action
+        for match, positions in _merge_run([(rule.match(), [rule.position]) for rule in live[run_start:end]]):
+            source, destination, protocol, source_ports, destination_ports = match
+            acl.append({
+                'sequence': (len(acl) + 1) * 10,
+                'action': action,
+                'protocol': _format_protocol(protocol),
+                'source': _format_prefix(source),
+                'destination': _format_prefix(destination),
+                'source_port': _format_ports(source_ports),
+                'destination_port': _format_ports(destination_ports),
+                'rules': positions
+            })
+            matches.append(match)
+        run_start = end
+
+    policy = SecurityPolicy(rules or [], parsed, findings, acl, default_action,
+                            time.perf_counter() - started, matches)
+    if parsed:
+        summary = policy.summary()
+        logger.info(f"Compiled {summary['rules']} security rules into {summary['acl_entries']} ACL entries "
+                    f"({summary['shadowed']} shadowed, {summary['redundant']} redundant, "
+                    f"{summary['conflicts']} conflicts) in {policy.compile_seconds:.2f}s")
+    return policy
@@ -0,0 +1,340 @@
+"""
+Intent sharding - consistent-hash partitioning of intents and devices across worker processes
+"""
+import bisect
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Intent fields that name the partition (building or device group), in order of preference
+PARTITION_FIELDS = ('building', 'device_group', 'network_name')
+
+
+def partition_of(intent: Dict) -> str:
+    """Partition key for an intent"""
+    for field in PARTITION_FIELDS:
+        if intent.get(field):
+            return str(intent[field])
+    raise ValueError(f"Intent has none of the partition fields {PARTITION_FIELDS}")
+
+
+def _ring_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes.
+
+    Adding or removing a node only moves the keys that hash next to its
+    virtual nodes (about 1/N of them), so partitions stay with their owner
+    across pool resizes.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 64):
+        self.vnodes = vnodes
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node: str):
+        for replica in range(self.vnodes):
+            point = _ring_hash(f'{node}#{replica}')
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove_node(self, node: str):
+        keep = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != node]
+        self._points = [point for point, _ in keep]
+        self._owners = [owner for _, owner in keep]
+
+    def nodes(self) -> List[str]:
+        return sorted(set(self._owners))
+
+    def owner(self, key: str) -> str:
+        if not self._points:
+            raise LookupError("Hash ring has no nodes")
+        index = bisect.bisect(self._points, _ring_hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class Partition:
+    """Everything one building/device group owns, living in its worker process"""
+
+    def __init__(self, name: str):
+        from failover.failover_manager import FailoverManager
+        from intent_engine.intent_processor import IntentProcessor
+        from monitoring.metrics import MetricsHub
+        from monitoring.telemetry_collector import TelemetryCollector
+
+        self.name = name
+        self.intent: Optional[Dict] = None
+        self.config: Optional[Dict] = None
+        self.processor = IntentProcessor()
+        # Private registry: several partitions share one worker process
+        self.metrics = MetricsHub()
+        self.failover_manager = FailoverManager(None, self.metrics, name=name)
+        self.telemetry = TelemetryCollector({}, interval=10)
+        self.applied = 0
+
+    def apply_intent(self, intent: Dict) -> Dict:
+        intent = dict(intent)
+        intent.setdefault('vlans', [])
+        config = self.processor.generate_network_config(intent)
+        failover = config['network']['failover-system']
+        groups = failover['failover-groups'] if failover['enabled'] else []
+        self.failover_manager.set_failover_groups(groups)
+        if groups and not self.failover_manager.is_running:
+            self.failover_manager.start_monitoring()
+        elif not groups and self.failover_manager.is_running:
+            self.failover_manager.stop_monitoring()
+
+        self.intent = intent
+        self.config = config
+        self.applied += 1
+        return {'interfaces': len(config['network']['interfaces']), 'failover_groups': len(groups)}
+
+    def add_device(self, spec: Dict) -> Dict:
+        from netconf_client.demo_client import DemoNETCONFClient
+
+        client = DemoNETCONFClient(spec['host'], spec.get('port', 830), spec.get('username', 'admin'),
+                                   spec.get('password', 'admin'), interfaces=spec.get('interfaces'))
+        client.connect()
+        self.telemetry.add_device(spec.get('name', spec['host']), client)
+        return {'devices': len(self.telemetry.devices)}
+
+    def collect(self) -> Dict:
+        batch = self.telemetry.collect_once()
+        return {'samples': len(batch), 'duration': self.telemetry.last_duration}
+
+    def state(self) -> Dict:
+        return {
+            'partition': self.name,
+            'intent': self.intent,
+            'config': self.config,
+            'failover': self.failover_manager.snapshot().to_dict(),
+            'devices': sorted(self.telemetry.devices),
+            'applied': self.applied
+        }
+
+    def export(self) -> Dict:
+        """What a new owner needs to take this partition over"""
+        return {'intent': self.intent, 'devices': [
+            {'name': name, 'host': client.host, 'port': client.port, 'interfaces': client.seed_interfaces}
+            for name, client in self.telemetry.devices.items()
+        ]}
+
+    def close(self):
+        self.failover_manager.stop_monitoring()
+        self.telemetry.stop()
+
+
+def _worker_main(worker_id: str, connection, log_level: int):
+    """Worker process loop: serve partition requests until told to stop"""
+    logging.basicConfig(level=log_level, format=f'%(asctime)s - [{worker_id}] %(name)s - %(levelname)s - %(message)s')
+    partitions: Dict[str, Partition] = {}
+
+    def handle(op: str, partition_name: Optional[str], payload):
+        if op == 'stats':
+            return {'worker': worker_id, 'pid': os.getpid(), 'partitions': sorted(partitions)}
+        if op == 'drop':
+            partition = partitions.pop(partition_name, None)
+            if partition is None:
+                return None
+            exported = partition.export()
+            partition.close()
+            return exported
+
+        partition = partitions.get(partition_name)
+        if partition is None:
+            if op not in ('apply_intent', 'add_device'):
+                raise KeyError(f"Unknown partition {partition_name}")
+            partition = partitions[partition_name] = Partition(partition_name)
+        if op == 'apply_intent':
+            return partition.apply_intent(payload)
+        if op == 'add_device':
+            return partition.add_device(payload)
+        if op == 'collect':
+            return partition.collect()
+        if op == 'state':
+            return partition.state()
+        raise ValueError(f"Unknown operation {op}")
+
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if message is None:
+            break
+        request_id, op, partition_name, payload = message
+        try:
+            connection.send((request_id, True, handle(op, partition_name, payload)))
+        except Exception as e:
+            connection.send((request_id, False, f"{type(e).__name__}: {e}"))
+
+    for partition in partitions.values():
+        partition.close()
+
+
+class _WorkerHandle:
+    """Parent-side end of one worker process"""
+
+    def __init__(self, worker_id: str, context, log_level: int):
+        self.worker_id = worker_id
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(worker_id, child_connection, log_level),
+                                       name=f'intent-{worker_id}', daemon=True)
+        self.pending: Dict[int, Future] = {}
+        self.send_lock = threading.Lock()
+        self.process.start()
+        child_connection.close()
+        self.reader = threading.Thread(target=self._read_loop, name=f'intent-{worker_id}-reader', daemon=True)
+        self.reader.start()
+
+    def submit(self, request_id: int, op: str, partition: Optional[str], payload) -> Future:
+        future = Future()
+        with self.send_lock:
+            self.pending[request_id] = future
+            try:
+                self.connection.send((request_id, op, partition, payload))
+            except (BrokenPipeError, OSError):
+                self.pending.pop(request_id, None)
+                raise RuntimeError(f"Worker {self.worker_id} is not running")
+        return future
+
+    def _read_loop(self):
+        while True:
+            try:
+                request_id, ok, result = self.connection.recv()
+            except (EOFError, OSError):
+                break
+            future = self.pending.pop(request_id, None)
+            if future is None:
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(f"{self.worker_id}: {result}"))
+        for future in list(self.pending.values()):
+            future.set_exception(RuntimeError(f"Worker {self.worker_id} exited"))
+        self.pending.clear()
+
+    def stop(self, timeout: float):
+        try:
+            with self.send_lock:
+                self.connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.connection.close()
+
+
+class ShardedIntentRouter:
+    """Routes intents and device requests to the worker process that owns their partition.
+
+    Each partition (building or device group) lives in exactly one worker:
+    its intent, generated config, FailoverManager and telemetry collector.
+    Requests are pipelined over one pipe per worker, so different
+    partitions proceed in parallel on separate cores. Workers are started
+    with the ``spawn`` method so they never inherit the API process'
+    threads or locks.
+    """
+
+    def __init__(self, workers: Optional[int] = None, vnodes: int = 64, log_level: int = logging.WARNING):
+        self.worker_count = workers or os.cpu_count() or 1
+        self.vnodes = vnodes
+        self.log_level = log_level
+        self.ring = HashRing(vnodes=vnodes)
+        self.workers: Dict[str, _WorkerHandle] = {}
+        self.partitions: Dict[str, str] = {}  # partition -> owning worker
+        self._request_ids = itertools.count()
+        self._worker_ids = itertools.count()
+        self._context = multiprocessing.get_context('spawn')
+        self._lock = threading.Lock()
+
+    def start(self) -> 'ShardedIntentRouter':
+        started = time.perf_counter()
+        for _ in range(self.worker_count - len(self.workers)):
+            self._spawn_worker()
+        logger.info(f"Started {len(self.workers)} intent workers in {time.perf_counter() - started:.2f}s")
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        for handle in self.workers.values():
+            handle.stop(timeout)
+        self.workers.clear()
+        self.ring = HashRing(vnodes=self.vnodes)
+        self.partitions.clear()
+
+    def _spawn_worker(self) -> str:
+        worker_id = f'worker{next(self._worker_ids)}'
+        self.workers[worker_id] = _WorkerHandle(worker_id, self._context, self.log_level)
+        self.ring.add_node(worker_id)
+        return worker_id
+
+    def owner(self, partition: str) -> str:
+        return self.ring.owner(partition)
+
+    def submit(self, partition: str, op: str, payload=None) -> Future:
+        """Send one request to the partition's owner; returns a Future"""
+        with self._lock:
+            worker_id = self.ring.owner(partition)
+            if op in ('apply_intent', 'add_device'):
+                self.partitions[partition] = worker_id
+            handle = self.workers[worker_id]
+        return handle.submit(next(self._request_ids), op, partition, payload)
+
+    def call(self, partition: str, op: str, payload=None, timeout: Optional[float] = 30.0):
+        return self.submit(partition, op, payload).result(timeout)
+
+    def apply_intent(self, intent: Dict, timeout: Optional[float] = 30.0) -> Dict:
+        partition = partition_of(intent)
+        result = self.call(partition, 'apply_intent', intent, timeout)
+        result.update({'partition': partition, 'worker': self.partitions[partition]})
+        return result
+
+    def partition_state(self, partition: str, timeout: Optional[float] = 30.0) -> Dict:
+        return self.call(partition, 'state', timeout=timeout)
+
+    def stats(self, timeout: Optional[float] = 30.0) -> List[Dict]:
+        futures = [handle.submit(next(self._request_ids), 'stats', None, None) for handle in self.workers.values()]
+        return [future.result(timeout) for future in futures]
+
+    def add_worker(self, timeout: Optional[float] = 30.0) -> str:
+        """Grow the pool and move over the partitions the new worker now owns.
+
+        The routing lock is held from the ring change until every moved
+        partition is imported, so no request reaches the new owner before
+        its state does (requests queued at the old owner run before the drop).
+        """
+        with self._lock:
+            worker_id = self._spawn_worker()
+            handle = self.workers[worker_id]
+            moving = [(partition, old_owner) for partition, old_owner in self.partitions.items()
+                      if self.ring.owner(partition) != old_owner]
+            for partition, old_owner in moving:
+                exported = self.workers[old_owner].submit(
+                    next(self._request_ids), 'drop', partition, None).result(timeout)
+                self.partitions[partition] = worker_id
+                if exported is None:
+                    continue
+                imports = [('add_device', device) for device in exported['devices']]
+                if exported['intent'] is not None:
+                    imports.insert(0, ('apply_intent', exported['intent']))
+                futures = [handle.submit(next(self._request_ids), op, partition, payload) for op, payload in imports]
+                for future in futures:
+                    future.result(timeout)
+        logger.info(f"Added {worker_id}; moved {len(moving)} of {len(self.partitions)} partitions")
+        return worker_id
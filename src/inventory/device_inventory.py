@@ -0,0 +1,329 @@
+"""
+Device inventory - labelled devices, inverted label indexes and bitmap selector resolution
+"""
+import functools
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TERM = re.compile(r'^\s*(!?)\s*([A-Za-z0-9_./-]+)\s*(?:(==|=|!=)\s*([A-Za-z0-9_./:-]*)|\s+(in|notin)\s*\(([^)]*)\))?\s*$')
+# Bit positions set in each byte value, for turning a bitmap back into slots
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+# Below this many changes to one bitmap, shift/or beats a bytearray round trip
+_BULK_CHANGES = 8
+
+_popcount = getattr(int, 'bit_count', lambda value: bin(value).count('1'))
+
+
+def _split_terms(selector: str) -> List[str]:
+    """Split on commas outside ``in (...)`` value lists"""
+    terms, depth, start = [], 0, 0
+    for index, char in enumerate(selector):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            terms.append(selector[start:index])
+            start = index + 1
+    terms.append(selector[start:])
+    return [term for term in terms if term.strip()]
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_selector(selector: str) -> Tuple[tuple, ...]:
+    """Parse ``building=eng,role!=core,floor in (1,2),vendor,!decommissioned`` into (key, op, values) terms.
+
+    Operators: ``=``/``==`` and ``!=``, ``in``/``notin`` a value list, and
+    a bare key (``exists``) or ``!key`` (``absent``). As with Kubernetes
+    label selectors, ``!=`` and ``notin`` also match devices without the key.
+    """
+    requirements = []
+    for term in _split_terms(selector or ''):
+        match = _TERM.match(term)
+        if match is None:
+            raise ValueError(f"Invalid selector term {term.strip()!r}")
+        negated, key, operator, value, set_operator, values = match.groups()
+        if negated and (operator or set_operator):
+            raise ValueError(f"Invalid selector term {term.strip()!r}")
+        if operator:
+            requirements.append((key, '!=' if operator == '!=' else '=', (value,)))
+        elif set_operator:
+            members = tuple(member.strip() for member in values.split(',') if member.strip())
+            if not members:
+                raise ValueError(f"Empty value list in selector term {term.strip()!r}")
+            requirements.append((key, set_operator, members))
+        else:
+            requirements.append((key, 'absent' if negated else 'exists', ()))
+    return tuple(requirements)
+
+
+def _set_bits(bitmap: int, add: List[int], remove: List[int], size: int) -> int:
+    """``bitmap`` with the ``remove`` slots cleared, then the ``add`` slots set (a freed slot may be reused)"""
+    if len(add) + len(remove) < _BULK_CHANGES:
+        for slot in remove:
+            bitmap &= ~(1 << slot)
+        for slot in add:
+            bitmap |= 1 << slot
+        return bitmap
+    buffer = bytearray(bitmap.to_bytes((size + 7) // 8, 'little'))
+    for slot in remove:
+        buffer[slot >> 3] &= 0xFF ^ (1 << (slot & 7))
+    for slot in add:
+        buffer[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def bitmap_slots(bitmap: int) -> List[int]:
+    """Set bit positions of ``bitmap``, ascending"""
+    slots = []
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    for offset, byte in enumerate(data):
+        if byte:
+            base = offset << 3
+            slots.extend(base + bit for bit in _BYTE_BITS[byte])
+    return slots
+
+
+def normalize_device(device: Dict) -> Dict:
+    """Inventory record for a ``netconf_devices`` entry: connection fields plus string labels"""
+    if not isinstance(device, dict) or not (device.get('name') or device.get('host')):
+        raise ValueError(f"Inventory device needs a name or host: {device!r}")
+    labels = device.get('labels') or {}
+    if not isinstance(labels, dict):
+        raise ValueError(f"Labels of device {device.get('name') or device.get('host')} must be a mapping")
+    return {
+        'name': str(device.get('name') or device['host']),
+        'host': str(device.get('host') or device['name']),
+        'port': int(device.get('port', 830)),
+        'username': device.get('username', 'admin'),
+        'password': device.get('password', 'admin'),
+        'labels': {str(key): str(value) for key, value in labels.items()}
+    }
+
+
+class InventorySnapshot:
+    """Immutable, versioned view of the inventory and its label indexes.
+
+    Device ``i`` owns bit ``i`` of every bitmap: ``index[key][value]`` has
+    the bits of the devices labelled ``key=value`` and ``keys[key]`` those
+    with any value for ``key``. A selector is resolved by intersecting a
+    handful of integers, independent of how many devices match.
+    """
+
+    __slots__ = ('version', 'devices', 'slots', 'index', 'keys', 'live')
+
+    def __init__(self, version: int, devices: List[Optional[Dict]], slots: Dict[str, int],
+                 index: Dict[str, Dict[str, int]], keys: Dict[str, int], live: int):
+        self.version = version
+        self.devices = devices
+        self.slots = slots
+        self.index = index
+        self.keys = keys
+        self.live = live
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def get(self, name: str) -> Optional[Dict]:
+        slot = self.slots.get(name)
+        return None if slot is None else self.devices[slot]
+
+    def select(self, selector: str) -> int:
+        """Bitmap of the devices matching ``selector`` (every device for an empty one)"""
+        bitmap = self.live
+        for key, operator, values in parse_selector(selector):
+            if operator == 'exists':
+                bitmap &= self.keys.get(key, 0)
+            elif operator == 'absent':
+                bitmap &= ~self.keys.get(key, 0)
+            else:
+                by_value = self.index.get(key, {})
+                matched = 0
+                for value in values:
+                    matched |= by_value.get(value, 0)
+                bitmap = bitmap & ~matched if operator in ('!=', 'notin') else bitmap & matched
+            if not bitmap:
+                break
+        return bitmap
+
+    def count(self, selector: str) -> int:
+        return _popcount(self.select(selector))
+
+    def names(self, selector: str) -> List[str]:
+        devices = self.devices
+        return [devices[slot]['name'] for slot in bitmap_slots(self.select(selector))]
+
+    def resolve(self, selector: str) -> List[Dict]:
+        devices = self.devices
+        return [devices[slot] for slot in bitmap_slots(self.select(selector))]
+
+    def label_values(self) -> Dict[str, Dict[str, int]]:
+        """Device count per value of every label"""
+        return {key: {value: _popcount(bitmap) for value, bitmap in values.items()}
+                for key, values in self.index.items()}
+
+
+class DeviceInventory:
+    """Labelled device inventory with lock-free reads.
+
+    Readers take ``snapshot()`` (or call ``select``/``names``) and never
+    block: a change builds a new snapshot that shares every untouched
+    index entry with the previous one and is published with one reference
+    assignment. ``load`` diffs the new device list against the current one,
+    so a reload only rewrites the bitmaps of labels that actually changed.
+    Removed devices free their slot for the next added device.
+    """
+
+    def __init__(self, devices: Optional[Iterable[Dict]] = None):
+        self._write_lock = threading.Lock()
+        self._snapshot = InventorySnapshot(0, [], {}, {}, {}, 0)
+        self._free: List[int] = []
+        self._source = None
+        if devices is not None:
+            self.load(devices)
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def snapshot(self) -> InventorySnapshot:
+        """Latest published snapshot (lock-free)"""
+        return self._snapshot
+
+    def select(self, selector: str) -> int:
+        return self._snapshot.select(selector)
+
+    def names(self, selector: str) -> List[str]:
+        return self._snapshot.names(selector)
+
+    def resolve(self, selector: str) -> List[Dict]:
+        return self._snapshot.resolve(selector)
+
+    def upsert(self, device: Dict) -> Dict:
+        record = normalize_device(device)
+        with self._write_lock:
+            return self._apply({record['name']: record}, ())
+
+    def remove(self, name: str) -> Dict:
+        with self._write_lock:
+            return self._apply({}, (name,))
+
+    def load(self, devices: Iterable[Dict]) -> Dict:
+        """Make the inventory exactly ``devices``; returns the added/updated/removed counts"""
+        records = {}
+        for device in devices:
+            record = normalize_device(device)
+            records[record['name']] = record
+        with self._write_lock:
+            current = self._snapshot
+            changed = {name: record for name, record in records.items() if current.get(name) != record}
+            removed = [name for name in current.slots if name not in records]
+            return self._apply(changed, removed)
+
+    def load_file(self, path, force: bool = False) -> Optional[Dict]:
+        """Load ``netconf_devices`` from a YAML config; skipped (None) while the file is unchanged"""
+        import yaml
+
+        path = Path(path)
+        stat = path.stat()
+        source = (str(path), stat.st_mtime_ns, stat.st_size)
+        if source == self._source and not force:
+            return None
+        with path.open(encoding='utf-8') as handle:
+            config = yaml.safe_load(handle) or {}
+        summary = self.load(config.get('netconf_devices') or [])
+        self._source = source
+        logger.info(f"Inventory loaded from {path}: {summary['devices']} devices "
+                    f"(+{summary['added']} ~{summary['updated']} -{summary['removed']})")
+        return summary
+
+    def _apply(self, changed: Dict[str, Dict], removed: Iterable[str]) -> Dict:
+        """Publish a snapshot with ``changed`` devices upserted and ``removed`` ones dropped (write lock held)"""
+        started = time.perf_counter()
+        current = self._snapshot
+        devices = list(current.devices)
+        slots = dict(current.slots)
+        # (key, value) -> ([slots to set], [slots to clear]); key -> same for the key bitmaps
+        value_changes: Dict[Tuple[str, str], Tuple[List[int], List[int]]] = {}
+        key_changes: Dict[str, Tuple[List[int], List[int]]] = {}
+        live_changes: Tuple[List[int], List[int]] = ([], [])
+        added = updated = dropped = 0
+
+        def change(table, key, slot, index):
+            entry = table.get(key)
+            if entry is None:
+                entry = table[key] = ([], [])
+            entry[index].append(slot)
+
+        for name in removed:
+            slot = slots.pop(name, None)
+            if slot is None:
+                continue
+            for key, value in devices[slot]['labels'].items():
+                change(value_changes, (key, value), slot, 1)
+                change(key_changes, key, slot, 1)
+            live_changes[1].append(slot)
+            devices[slot] = None
+            self._free.append(slot)
+            dropped += 1
+
+        for name, record in changed.items():
+            slot = slots.get(name)
+            if slot is None:
+                if self._free:
+                    slot = self._free.pop()
+                else:
+                    slot = len(devices)
+                    devices.append(None)
+                slots[name] = slot
+                old_labels = {}
+                live_changes[0].append(slot)
+                added += 1
+            else:
+                old_labels = devices[slot]['labels']
+                updated += 1
+            labels = record['labels']
+            for key, value in old_labels.items():
+                if labels.get(key) != value:
+                    change(value_changes, (key, value), slot, 1)
+                    if key not in labels:
+                        change(key_changes, key, slot, 1)
+            for key, value in labels.items():
+                if old_labels.get(key) != value:
+                    change(value_changes, (key, value), slot, 0)
+                    if key not in old_labels:
+                        change(key_changes, key, slot, 0)
+            devices[slot] = record
+
+        size = len(devices)
+        index = dict(current.index)
+        copied = set()
+        for (key, value), (add, clear) in value_changes.items():
+            if key not in copied:
+                index[key] = dict(index.get(key, {}))
+                copied.add(key)
+            bitmap = _set_bits(index[key].get(value, 0), add, clear, size)
+            if bitmap:
+                index[key][value] = bitmap
+            else:
+                index[key].pop(value, None)
+        keys = dict(current.keys)
+        for key, (add, clear) in key_changes.items():
+            bitmap = _set_bits(keys.get(key, 0), add, clear, size)
+            if bitmap:
+                keys[key] = bitmap
+            else:
+                keys.pop(key, None)
+                index.pop(key, None)
+        live = _set_bits(current.live, live_changes[0], live_changes[1], size)
+
+        version = current.version + (1 if changed or dropped else 0)
+        self._snapshot = InventorySnapshot(version, devices, slots, index, keys, live)
+        return {'devices': len(slots), 'added': added, 'updated': updated, 'removed': dropped,
+                'version': version, 'seconds': time.perf_counter() - started}
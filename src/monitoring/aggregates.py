@@ -0,0 +1,149 @@
+"""
+Interface aggregates - running status counts, traffic totals and health, maintained on write
+"""
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Group-by dimensions maintained alongside the totals
+DEFAULT_GROUP_BY: Dict[str, Callable[[Dict], Any]] = {
+    'building': lambda record: record.get('building') or 'unassigned',
+    'vlan': lambda record: record.get('vlan'),
+}
+
+
+class _Bucket:
+    """Totals for one set of interfaces (the whole table or one group)"""
+
+    __slots__ = ('total', 'by_status', 'traffic_rx', 'traffic_tx')
+
+    def __init__(self):
+        self.total = 0
+        self.by_status: Dict[str, int] = {}
+        self.traffic_rx = 0
+        self.traffic_tx = 0
+
+    def add(self, status: str, rx: int, tx: int, sign: int):
+        self.total += sign
+        count = self.by_status.get(status, 0) + sign
+        if count:
+            self.by_status[status] = count
+        else:
+            self.by_status.pop(status, None)
+        self.traffic_rx += sign * rx
+        self.traffic_tx += sign * tx
+
+    def summary(self) -> Dict:
+        up = self.by_status.get('up', 0)
+        return {
+            'total_interfaces': self.total,
+            'up_interfaces': up,
+            'down_interfaces': self.total - up,
+            'by_status': dict(self.by_status),
+            'traffic_rx': self.traffic_rx,
+            'traffic_tx': self.traffic_tx,
+            'total_traffic': self.traffic_rx + self.traffic_tx,
+            'health_score': round(up / self.total * 100, 1) if self.total else 0.0
+        }
+
+
+class InterfaceAggregates:
+    """Counts by status, traffic totals and health score for an interface table.
+
+    Writers report changes (``observe`` from the telemetry ingest path,
+    ``upsert``/``remove`` when interfaces are added, edited or deleted) and
+    each change adjusts the running totals of the table and of the groups
+    the interface belongs to. Reading the totals never touches the
+    interfaces, so its cost does not grow with the table.
+    """
+
+    def __init__(self, group_by: Optional[Dict[str, Callable[[Dict], Any]]] = None):
+        self.group_by = DEFAULT_GROUP_BY if group_by is None else group_by
+        self.version = 0
+        # name -> [status, group keys, traffic_rx, traffic_tx]
+        self._members: Dict[str, list] = {}
+        self._totals = _Bucket()
+        self._groups: Dict[str, Dict[Any, _Bucket]] = {dimension: {} for dimension in self.group_by}
+        self._lock = threading.Lock()
+
+    def load(self, records: Iterable[Dict]):
+        """Replace all members with ``records``"""
+        with self._lock:
+            self._members.clear()
+            self._totals = _Bucket()
+            self._groups = {dimension: {} for dimension in self.group_by}
+            for record in records:
+                self._add(record)
+            self.version += 1
+
+    def upsert(self, record: Dict):
+        """Add an interface or re-read all of its fields"""
+        with self._lock:
+            self._discard(record['name'])
+            self._add(record)
+            self.version += 1
+
+    def remove(self, name: str):
+        with self._lock:
+            self._discard(name)
+            self.version += 1
+
+    def observe(self, name: str, status: Optional[str] = None, rx_delta: int = 0, tx_delta: int = 0) -> bool:
+        """Apply one telemetry update; returns False for unknown interfaces"""
+        with self._lock:
+            member = self._members.get(name)
+            if member is None:
+                return False
+            buckets = [self._totals] + [self._groups[dimension][key]
+                                        for dimension, key in zip(self.group_by, member[1])]
+            old_status = member[0]
+            if status is not None and status != old_status:
+                for bucket in buckets:
+                    bucket.add(old_status, 0, 0, -1)
+                    bucket.add(status, 0, 0, 1)
+                member[0] = status
+            if rx_delta or tx_delta:
+                for bucket in buckets:
+                    bucket.traffic_rx += rx_delta
+                    bucket.traffic_tx += tx_delta
+                member[2] += rx_delta
+                member[3] += tx_delta
+            self.version += 1
+            return True
+
+    def summary(self) -> Dict:
+        """Totals over all interfaces"""
+        with self._lock:
+            return self._totals.summary()
+
+    def groups(self, dimension: str) -> Dict:
+        """Totals per group of ``dimension`` (one of ``group_by``)"""
+        if dimension not in self._groups:
+            raise ValueError(f"Unknown group-by dimension {dimension}. Supported: {sorted(self._groups)}")
+        with self._lock:
+            return {str(key): bucket.summary() for key, bucket in self._groups[dimension].items()}
+
+    def _add(self, record: Dict):
+        status = record.get('status') or 'unknown'
+        rx = record.get('traffic_rx') or 0
+        tx = record.get('traffic_tx') or 0
+        keys = tuple(key_of(record) for key_of in self.group_by.values())
+        self._members[record['name']] = [status, keys, rx, tx]
+        self._totals.add(status, rx, tx, 1)
+        for dimension, key in zip(self.group_by, keys):
+            groups = self._groups[dimension]
+            bucket = groups.get(key)
+            if bucket is None:
+                bucket = groups[key] = _Bucket()
+            bucket.add(status, rx, tx, 1)
+
+    def _discard(self, name: str):
+        member = self._members.pop(name, None)
+        if member is None:
+            return
+        status, keys, rx, tx = member
+        self._totals.add(status, rx, tx, -1)
+        for dimension, key in zip(self.group_by, keys):
+            groups = self._groups[dimension]
+            groups[key].add(status, rx, tx, -1)
+            if not groups[key].total:
+                del groups[key]
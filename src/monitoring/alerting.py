@@ -0,0 +1,363 @@
+"""
+Threshold alerting engine driven by YANG monitoring/monitored-metrics entries
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ('low', 'medium', 'high', 'critical')
+
+# Metrics derived from a telemetry sample rather than read from it directly
+DERIVED_METRICS = {
+    'rx_utilization': lambda columns: _utilization(columns['rx_bps'], columns['speed_mbps']),
+    'tx_utilization': lambda columns: _utilization(columns['tx_bps'], columns['speed_mbps']),
+}
+
+SAMPLE_METRICS = ('status', 'speed_mbps', 'rx_bps', 'tx_bps', 'rx_bytes', 'tx_bytes')
+
+COMPARISONS = ('>', '<')
+
+
+def _utilization(rate_bps: np.ndarray, speed_mbps: np.ndarray) -> np.ndarray:
+    """Percent of line rate; zero for interfaces with unknown speed"""
+    capacity = speed_mbps * 1_000_000
+    return np.divide(rate_bps * 100, capacity, out=np.zeros_like(rate_bps), where=capacity > 0)
+
+
+def _number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def compile_rule(entry: Dict) -> Dict:
+    """Alert rule for one monitored-metrics entry; raises ValueError if it is invalid"""
+    if not isinstance(entry, dict) or not isinstance(entry.get('name'), str) or not entry['name']:
+        raise ValueError(f"Monitored metric needs a name: {entry!r}")
+    name = entry['name']
+    metric = entry.get('metric', name)
+    if metric not in SAMPLE_METRICS and metric not in DERIVED_METRICS:
+        raise ValueError(f"Monitored metric {name}: unknown metric {metric!r}")
+    if 'threshold' not in entry:
+        raise ValueError(f"Monitored metric {name}: threshold is required")
+    if not _number(entry['threshold']):
+        raise ValueError(f"Monitored metric {name}: threshold must be a number")
+    if entry.get('hysteresis') is not None and not _number(entry['hysteresis']):
+        raise ValueError(f"Monitored metric {name}: hysteresis must be a number")
+    if entry.get('severity', 'medium') not in SEVERITIES:
+        raise ValueError(f"Monitored metric {name}: severity must be one of {list(SEVERITIES)}")
+    if entry.get('comparison', '>') not in COMPARISONS:
+        raise ValueError(f"Monitored metric {name}: comparison must be one of {list(COMPARISONS)}")
+    return {
+        'name': name,
+        'metric': metric,
+        'threshold': float(entry['threshold']),
+        'severity': entry.get('severity', 'medium'),
+        'comparison': entry.get('comparison', '>'),
+        'hysteresis': entry.get('hysteresis')
+    }
+
+
+def validate_monitored_metrics(monitored_metrics) -> List[Dict]:
+    """Compile every entry, raising ValueError on the first invalid one (admission check)"""
+    if not isinstance(monitored_metrics, list):
+        raise ValueError("monitored_metrics must be a list of rules")
+    return [compile_rule(entry) for entry in monitored_metrics]
+
+
+def monitored_metrics_from_config(config: Dict) -> List[Dict]:
+    """Extract monitored-metrics entries from a compiled campus-network config"""
+    return config.get('network', {}).get('monitoring', {}).get('monitored-metrics', [])
+
+
+class _RuleSet:
+    """All rules on one metric/comparison, compiled to sorted threshold arrays.
+
+    Per series we keep a single level: the number of rules currently
+    firing. Rules are ordered by threshold, so the level identifies the
+    most severe breached rule, and one ``searchsorted`` per batch evaluates
+    every rule at once.
+    """
+
+    def __init__(self, metric: str, comparison: str, rules: List[Dict], hysteresis: float):
+        self.metric = metric
+        self.comparison = comparison
+        # Rules "below" a threshold are evaluated as "above" on negated values
+        self.sign = -1.0 if comparison == '<' else 1.0
+
+        self.rules = sorted(rules, key=lambda rule: self.sign * rule['threshold'])
+        raise_at = np.array([self.sign * rule['threshold'] for rule in self.rules], dtype=np.float64)
+        margins = np.array([
+            rule['hysteresis'] if rule['hysteresis'] is not None else abs(rule['threshold']) * hysteresis
+            for rule in self.rules
+        ], dtype=np.float64)
+        self.raise_at = raise_at
+        # Keep clear points sorted so one searchsorted still works
+        self.clear_at = np.maximum.accumulate(raise_at - margins)
+        self.levels = np.zeros(0, dtype=np.int16)
+        # Value and time of each series' last level change
+        self.values = np.zeros(0, dtype=np.float32)
+        self.since = np.zeros(0, dtype=np.float64)
+
+    def evaluate(self, rows: np.ndarray, values: np.ndarray, capacity: int):
+        """Update levels for ``rows``; returns (batch positions, old levels, new levels) that changed"""
+        if self.levels.shape[0] < capacity:
+            for name in ('levels', 'values', 'since'):
+                current = getattr(self, name)
+                grown = np.zeros(capacity, dtype=current.dtype)
+                grown[:current.shape[0]] = current
+                setattr(self, name, grown)
+
+        raw_values = values
+        values = self.sign * values
+        current = self.levels[rows]
+        # Most series sit below every threshold with nothing firing: skip them
+        candidates = np.nonzero((values > self.raise_at[0]) | (current > 0))[0]
+        if candidates.size == 0:
+            return None
+        values = values[candidates]
+        current = current[candidates]
+
+        # Climb as soon as a threshold is crossed ...
+        updated = np.maximum(current, np.searchsorted(self.raise_at, values, side='left').astype(np.int16))
+        # ... but descend only once the value falls past the clear point
+        firing = np.nonzero(updated > 0)[0]
+        if firing.size:
+            cleared = np.searchsorted(self.clear_at, values[firing], side='left').astype(np.int16)
+            updated[firing] = np.minimum(updated[firing], cleared)
+
+        changed = np.nonzero(updated != current)[0]
+        if changed.size == 0:
+            return None
+        positions = candidates[changed]
+        changed_rows = rows[positions]
+        self.levels[changed_rows] = updated[changed]
+        self.values[changed_rows] = raw_values[positions]
+        self.since[changed_rows] = time.time()
+        return positions, current[changed], updated[changed]
+
+    def rule_for(self, level: int) -> Dict:
+        return self.rules[level - 1]
+
+
+class _TokenBucket:
+    """Simple token bucket for notification rate limiting"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class AlertEngine:
+    """Streaming threshold evaluation over telemetry batches.
+
+    Rules are YANG ``monitored-metrics`` entries (``name``, ``threshold``,
+    ``severity``) with optional ``metric`` (defaults to ``name``),
+    ``comparison`` (``>`` default, or ``<``) and ``hysteresis`` (absolute
+    clear margin, defaulting to a fraction of the threshold).
+
+    Alert state lives in per-rule-set arrays, so only state transitions
+    produce notifications (dedup), and notification dicts are built only
+    for transitions within the rate limit; the rest are counted and
+    reported with the next delivered notification.
+    """
+
+    def __init__(self, hysteresis: float = 0.05, notify_rate: float = 20, notify_burst: int = 100):
+        self.hysteresis = hysteresis
+        self.series: Dict[Hashable, int] = {}
+        self.series_keys: List[Hashable] = []
+        self.subscribers: List[Callable[[List[Dict]], None]] = []
+        self.transitions_total = 0
+        self.suppressed = 0
+
+        self._rule_sets: List[_RuleSet] = []
+        self._last_keys: List[Hashable] = []
+        self._last_rows = np.empty(0, dtype=np.int64)
+        self._limiter = _TokenBucket(notify_rate, notify_burst)
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[List[Dict]], None]):
+        """Receive lists of alert notifications"""
+        self.subscribers.append(callback)
+
+    def load_rules(self, monitored_metrics: Sequence[Dict]) -> List[Dict]:
+        """Compile monitored-metrics entries.
+
+        Rule sets that are unchanged keep their alert state. Alerts firing
+        on removed or changed rules are resolved (and notified) before the
+        new rules take over; returns those notifications.
+        """
+        grouped: Dict[tuple, List[Dict]] = {}
+        for entry in monitored_metrics:
+            try:
+                rule = compile_rule(entry)
+            except ValueError as e:
+                logger.warning(f"Ignoring invalid rule: {e}")
+                continue
+            grouped.setdefault((rule['metric'], rule['comparison']), []).append(rule)
+
+        rule_sets = [
+            _RuleSet(metric, comparison, rules, self.hysteresis)
+            for (metric, comparison), rules in grouped.items()
+        ]
+        changes = []
+        with self._lock:
+            by_metric = {(rule_set.metric, rule_set.comparison): rule_set for rule_set in rule_sets}
+            for previous in self._rule_sets:
+                current = by_metric.get((previous.metric, previous.comparison))
+                if current is not None and current.rules == previous.rules:
+                    current.levels, current.values, current.since = previous.levels, previous.values, previous.since
+                    continue
+                rows = np.nonzero(previous.levels)[0]
+                if rows.size:
+                    positions = np.arange(rows.size)
+                    levels = previous.levels[rows]
+                    changes.append((previous, rows, previous.values[rows],
+                                    (positions, levels, np.zeros_like(levels))))
+            self._rule_sets = rule_sets
+        logger.info(f"Loaded {sum(len(rules) for rules in grouped.values())} alert rules "
+                    f"on {len(rule_sets)} metrics")
+        if not changes:
+            return []
+        return self._notify(changes)
+
+    def _rows_for(self, keys: Sequence[Hashable]) -> np.ndarray:
+        """Map series keys to state rows; repeated key sets reuse the last mapping"""
+        keys = list(keys)
+        if keys == self._last_keys:
+            return self._last_rows
+
+        series = self.series
+        rows = np.empty(len(keys), dtype=np.int64)
+        for index, key in enumerate(keys):
+            row = series.get(key)
+            if row is None:
+                row = len(self.series_keys)
+                series[key] = row
+                self.series_keys.append(key)
+            rows[index] = row
+
+        self._last_keys = keys
+        self._last_rows = rows
+        return rows
+
+    def evaluate_batch(self, batch: List[Dict]) -> List[Dict]:
+        """Evaluate a telemetry batch (collector sink)"""
+        if not batch or not self._rule_sets:
+            return []
+        keys = [(sample['device'], sample['interface']) for sample in batch]
+        sources = {rule_set.metric for rule_set in self._rule_sets}
+        if sources & DERIVED_METRICS.keys():
+            sources |= {'rx_bps', 'tx_bps', 'speed_mbps'}
+        columns = {
+            column: np.fromiter((sample[column] for sample in batch), dtype=np.float64, count=len(batch))
+            for column in sources & set(SAMPLE_METRICS)
+        }
+        return self.evaluate_columns(keys, columns)
+
+    def evaluate_columns(self, keys: Sequence[Hashable], columns: Dict[str, np.ndarray]) -> List[Dict]:
+        """Evaluate all rules against column arrays aligned with ``keys``.
+
+        Returns the notifications delivered this cycle.
+        """
+        with self._lock:
+            rows = self._rows_for(keys)
+            capacity = len(self.series_keys)
+            derived = {}
+            changes = []
+
+            for rule_set in self._rule_sets:
+                values = columns.get(rule_set.metric)
+                if values is None:
+                    if rule_set.metric not in derived:
+                        derived[rule_set.metric] = DERIVED_METRICS[rule_set.metric](columns)
+                    values = derived[rule_set.metric]
+
+                changed = rule_set.evaluate(rows, values, capacity)
+                if changed is not None:
+                    changes.append((rule_set, rows, values, changed))
+
+        if not changes:
+            return []
+        return self._notify(changes)
+
+    def _notify(self, changes: List[tuple]) -> List[Dict]:
+        """Build and deliver notifications within the rate limit"""
+        delivered = []
+        now = time.time()
+        for rule_set, rows, values, (positions, old_levels, new_levels) in changes:
+            self.transitions_total += positions.size
+            for index, position in enumerate(positions.tolist()):
+                if not self._limiter.take():
+                    self.suppressed += positions.size - index
+                    break
+                old = int(old_levels[index])
+                new = int(new_levels[index])
+                if new == 0:
+                    state = 'resolved'
+                    rule = rule_set.rule_for(old)
+                else:
+                    state = 'firing' if new > old else 'downgraded'
+                    rule = rule_set.rule_for(new)
+                delivered.append(self._alert(rule, self.series_keys[rows[position]],
+                                             float(values[position]), state, now))
+
+        if not delivered:
+            return []
+        if self.suppressed:
+            logger.warning(f"Alert notifications rate limited: {self.suppressed} suppressed")
+            delivered.append({'state': 'suppressed', 'count': self.suppressed, 'timestamp': now})
+            self.suppressed = 0
+
+        for callback in self.subscribers:
+            try:
+                callback(delivered)
+            except Exception as e:
+                logger.error(f"Alert subscriber error: {e}")
+        return delivered
+
+    @staticmethod
+    def _alert(rule: Dict, key: Hashable, value: float, state: str, timestamp: float) -> Dict:
+        device, interface = key if isinstance(key, tuple) and len(key) == 2 else (None, key)
+        return {
+            'device': device,
+            'interface': interface,
+            'rule': rule['name'],
+            'metric': rule['metric'],
+            'threshold': rule['threshold'],
+            'severity': rule['severity'],
+            'value': value,
+            'state': state,
+            'timestamp': timestamp
+        }
+
+    def get_active_alerts(self, limit: Optional[int] = None) -> List[Dict]:
+        """Currently firing alerts, most severe rule per series and metric"""
+        alerts = []
+        with self._lock:
+            for rule_set in self._rule_sets:
+                for row in np.nonzero(rule_set.levels)[0].tolist():
+                    if limit is not None and len(alerts) >= limit:
+                        return alerts
+                    rule = rule_set.rule_for(int(rule_set.levels[row]))
+                    alerts.append(self._alert(rule, self.series_keys[row], float(rule_set.values[row]),
+                                              'firing', float(rule_set.since[row])))
+        return alerts
+
+    def active_alert_count(self) -> int:
+        with self._lock:
+            return sum(int(np.count_nonzero(rule_set.levels)) for rule_set in self._rule_sets)
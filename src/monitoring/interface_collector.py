@@ -0,0 +1,109 @@
+"""
+Custom Prometheus collector rendering interface metrics from a columnar snapshot
+"""
+from typing import Dict, List
+
+from prometheus_client.metrics_core import Metric
+from prometheus_client.samples import Sample
+
+# (metric name, documentation, snapshot column, per-direction)
+INTERFACE_METRICS = (
+    ('network_interface_speed_mbps', 'Interface speed in Mbps', 'speed_mbps', None),
+    ('network_interface_status', 'Interface status (1=up, 0=down)', 'status', None),
+    ('network_interface_traffic_bytes', 'Interface traffic in bytes', ('rx_bytes', 'tx_bytes'), True),
+    ('network_interface_rate_bps', 'Interface traffic rate in bits per second', ('rx_bps', 'tx_bps'), True),
+)
+
+SNAPSHOT_COLUMNS = ('speed_mbps', 'status', 'rx_bytes', 'tx_bytes', 'rx_bps', 'tx_bps')
+
+
+class InterfaceSnapshot:
+    """Immutable column-per-field view of one telemetry batch"""
+
+    __slots__ = ('labels', 'rx_labels', 'tx_labels', 'columns')
+
+    def __init__(self, labels: List[Dict], rx_labels: List[Dict], tx_labels: List[Dict],
+                 columns: Dict[str, List[float]]):
+        self.labels = labels
+        self.rx_labels = rx_labels
+        self.tx_labels = tx_labels
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+EMPTY_SNAPSHOT = InterfaceSnapshot([], [], [], {column: [] for column in SNAPSHOT_COLUMNS})
+
+
+class InterfaceMetricsCollector:
+    """Renders interface metric families straight from the latest snapshot on scrape.
+
+    Replaces per-interface ``Gauge.labels(...).set(...)`` children: an update
+    is one columnar snapshot swap, there are no per-child locks, and an
+    interface missing from the latest batch simply stops being exported.
+    """
+
+    def __init__(self):
+        self._snapshot = EMPTY_SNAPSHOT
+        # (device, interface) -> (labels, rx_labels, tx_labels), reused across updates
+        self._label_cache = {}
+
+    def describe(self):
+        # Describe without reading data so registration stays cheap
+        return [Metric(name, documentation, 'gauge') for name, documentation, _, _ in INTERFACE_METRICS]
+
+    def update(self, batch: List[Dict]):
+        """Publish a telemetry batch as the new snapshot"""
+        previous_cache = self._label_cache
+        label_cache = {}
+        labels = []
+        rx_labels = []
+        tx_labels = []
+        columns = {column: [] for column in SNAPSHOT_COLUMNS}
+        appenders = [(columns[column].append, column) for column in SNAPSHOT_COLUMNS]
+
+        for sample in batch:
+            key = (sample['device'], sample['interface'])
+            cached = previous_cache.get(key)
+            if cached is None:
+                cached = (
+                    {'device': key[0], 'interface': key[1]},
+                    {'device': key[0], 'direction': 'rx', 'interface': key[1]},
+                    {'device': key[0], 'direction': 'tx', 'interface': key[1]}
+                )
+            label_cache[key] = cached
+            labels.append(cached[0])
+            rx_labels.append(cached[1])
+            tx_labels.append(cached[2])
+            for append, column in appenders:
+                append(sample[column])
+
+        # Interfaces absent from this batch drop out of the cache and the export
+        self._label_cache = label_cache
+        self._snapshot = InterfaceSnapshot(labels, rx_labels, tx_labels, columns)
+
+    def series_count(self) -> int:
+        return len(self._snapshot)
+
+    def collect(self):
+        snapshot = self._snapshot
+        columns = snapshot.columns
+        for name, documentation, column, per_direction in INTERFACE_METRICS:
+            metric = Metric(name, documentation, 'gauge')
+            if per_direction:
+                rx_column, tx_column = column
+                metric.samples = [
+                    Sample(name, labels, value, None, None)
+                    for labels, value in zip(snapshot.rx_labels, columns[rx_column])
+                ]
+                metric.samples.extend(
+                    Sample(name, labels, value, None, None)
+                    for labels, value in zip(snapshot.tx_labels, columns[tx_column])
+                )
+            else:
+                metric.samples = [
+                    Sample(name, labels, value, None, None)
+                    for labels, value in zip(snapshot.labels, columns[column])
+                ]
+            yield metric
@@ -0,0 +1,189 @@
+"""
+Non-blocking structured logging - queue handoff, JSON records, access-log sampling
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+# Endpoints the dashboard polls every few seconds
+DEFAULT_SAMPLED_PATHS = ('/api/metrics', '/api/interfaces', '/api/status', '/api/alerts',
+                         '/api/failover', '/api/history', '/socket.io')
+
+
+class LazyJson:
+    """Defers ``json.dumps`` of a payload until a handler actually formats the record.
+
+    Pass it as a logging argument (``logger.info("Config: %s", LazyJson(config))``)
+    so filtered-out records cost nothing and emitted ones are serialized on the
+    listener thread. Output is truncated to ``max_chars``. The payload is held by
+    reference, so it should not be mutated in place after logging.
+    """
+
+    __slots__ = ('payload', 'indent', 'max_chars')
+
+    def __init__(self, payload, indent: Optional[int] = None, max_chars: int = 4096):
+        self.payload = payload
+        self.indent = indent
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        try:
+            text = json.dumps(self.payload, indent=self.indent, default=str)
+        except (TypeError, ValueError):
+            text = repr(self.payload)
+        if len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}... ({len(text)} chars)"
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra=`` fields are carried through"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class AccessLogSampler(logging.Filter):
+    """Keeps 1 in ``rate`` Werkzeug access-log lines for frequently polled paths.
+
+    Errors (4xx/5xx) and requests to other paths are always kept. Attach it to
+    the ``werkzeug`` logger so dropped lines are discarded before they reach
+    any handler.
+    """
+
+    def __init__(self, rate: int = 100, paths: Iterable[str] = DEFAULT_SAMPLED_PATHS):
+        super().__init__()
+        self.rate = max(1, rate)
+        self.paths = tuple(paths)
+        self.seen = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        args = record.args
+        # Werkzeug access lines log (request line, status code, size) as args
+        if not isinstance(args, tuple) or len(args) != 3:
+            return True
+        request_line, code = str(args[0]), str(args[1])
+        if code[:1] in ('4', '5'):
+            return True
+        parts = request_line.split(' ', 2)
+        path = parts[1] if len(parts) > 1 else ''
+        if not path.startswith(self.paths):
+            return True
+
+        with self._lock:
+            self.seen += 1
+            if (self.seen - 1) % self.rate == 0:
+                return True
+            self.dropped += 1
+        return False
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock ``prepare`` formats the record in the caller so it can be
+    pickled; our queue never leaves the process, so the record is passed
+    through untouched. A full queue drops the record and counts it
+    instead of blocking the request thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """Root logger -> bounded queue -> listener thread -> console + rotating JSON file"""
+
+    def __init__(self, log_file, level: int = logging.INFO, max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5, console: bool = True, queue_size: int = 10000,
+                 access_sample_rate: int = 100):
+        log_path = Path(log_file)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers = [file_handler]
+        if console:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+            handlers.append(console_handler)
+
+        self.level = level
+        self.queue = queue.Queue(queue_size)
+        self.handler = DeferredQueueHandler(self.queue)
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.access_sampler = AccessLogSampler(access_sample_rate)
+        self._installed = False
+
+    def start(self) -> 'LogPipeline':
+        """Route the root logger through the queue and start the listener"""
+        if self._installed:
+            return self
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+
+        werkzeug_logger = logging.getLogger('werkzeug')
+        werkzeug_logger.setLevel(logging.INFO)
+        werkzeug_logger.addFilter(self.access_sampler)
+
+        self.listener.start()
+        self._installed = True
+        return self
+
+    def stop(self):
+        """Flush queued records and detach from the root logger"""
+        if not self._installed:
+            return
+        self.listener.stop()
+        logging.getLogger().removeHandler(self.handler)
+        logging.getLogger('werkzeug').removeFilter(self.access_sampler)
+        for handler in self.listener.handlers:
+            handler.close()
+        self._installed = False
+
+    def stats(self) -> dict:
+        return {
+            'queued': self.queue.qsize(),
+            'dropped': self.handler.dropped,
+            'access_logs_sampled_out': self.access_sampler.dropped
+        }
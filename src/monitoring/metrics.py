@@ -0,0 +1,177 @@
+"""
+Metrics subsystem - one injectable registry, failover event fan-out
+"""
+import gzip
+import itertools
+import logging
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import REGISTRY, CollectorRegistry
+from prometheus_client.exposition import choose_encoder, gzip_accepted
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from monitoring.interface_collector import InterfaceMetricsCollector
+
+logger = logging.getLogger(__name__)
+
+# (family type, metric name, documentation, labels)
+FAILOVER_METRICS = (
+    (GaugeMetricFamily, 'failover_manager_status', 'Failover manager status', ['shard']),
+    (GaugeMetricFamily, 'network_failover_active', 'Failover status (1=running on backup, 0=on primary)',
+     ['shard', 'group']),
+    (CounterMetricFamily, 'failover_switch_events', 'Total failover switch events', ['shard', 'group', 'kind']),
+    (CounterMetricFamily, 'failover_suppressed_transitions', 'Switches held back by flap dampening',
+     ['shard', 'group', 'kind']),
+    (GaugeMetricFamily, 'failover_dampened_interfaces', 'Interfaces currently suppressed by flap dampening',
+     ['shard']),
+)
+
+
+def _failover_families():
+    return [family(name, documentation, labels=labels) for family, name, documentation, labels in FAILOVER_METRICS]
+
+
+class FailoverCollector:
+    """Renders failover metrics for every registered manager at scrape time"""
+
+    def __init__(self, hub: 'MetricsHub'):
+        self.hub = hub
+
+    def describe(self):
+        # Empty families: enough for restricted_registry to filter by name, without reading state
+        return _failover_families()
+
+    def collect(self):
+        status, active, events, suppressed, dampened = _failover_families()
+
+        for shard, manager in self.hub.failover_managers():
+            status.add_metric([shard], 1 if manager.is_running else 0)
+            dampened.add_metric([shard], manager.dampener.suppressed_count())
+            for group_name, group_data in manager.snapshot().items():
+                on_backup = group_data['current_active'] in group_data['backup_interfaces']
+                active.add_metric([shard, group_name], 1 if on_backup else 0)
+
+        for (shard, group_name, kind), count in self.hub.event_counts().items():
+            events.add_metric([shard, group_name, kind], count)
+        for (shard, group_name, kind), count in self.hub.suppressed_counts().items():
+            suppressed.add_metric([shard, group_name, kind], count)
+
+        yield status
+        yield active
+        yield events
+        yield suppressed
+        yield dampened
+
+
+class MetricsHub:
+    """Single owner of Prometheus registration for the whole process.
+
+    Failover managers register here instead of creating their own metrics,
+    so any number of managers (one per shard) can coexist. Failover events
+    are published once and fanned out to the Prometheus counters and to
+    every subscriber (SocketIO, time-series store, ...).
+    """
+
+    def __init__(self, registry: Optional[CollectorRegistry] = None):
+        self.registry = registry if registry is not None else CollectorRegistry()
+        self.interface_metrics = InterfaceMetricsCollector()
+        self.subscribers: List[Callable[[Dict], None]] = []
+
+        self._managers = weakref.WeakValueDictionary()
+        self._event_counts: Dict[tuple, int] = {}
+        self._suppressed_counts: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+        self._shard_ids = itertools.count()
+
+        self.registry.register(FailoverCollector(self))
+        self.registry.register(self.interface_metrics)
+
+    def register_failover_manager(self, manager, shard: Optional[str] = None) -> str:
+        """Track a failover manager under a shard name; returns the name used"""
+        if shard is None:
+            shard = f'manager{next(self._shard_ids)}'
+        if shard in self._managers and self._managers[shard] is not manager:
+            logger.warning(f"Replacing failover manager registered for shard {shard}")
+        self._managers[shard] = manager
+        return shard
+
+    def unregister_failover_manager(self, shard: str):
+        """Stop exporting a manager's state (its event counts are kept)"""
+        self._managers.pop(shard, None)
+
+    def failover_managers(self):
+        return list(self._managers.items())
+
+    def event_counts(self) -> Dict[tuple, int]:
+        with self._lock:
+            return dict(self._event_counts)
+
+    def suppressed_counts(self) -> Dict[tuple, int]:
+        with self._lock:
+            return dict(self._suppressed_counts)
+
+    def subscribe(self, callback: Callable[[Dict], None]):
+        """Receive every published failover event"""
+        self.subscribers.append(callback)
+
+    def publish_failover_event(self, shard: str, group: str, kind: str,
+                               from_interface: Optional[str], to_interface: Optional[str]):
+        """Record a failover/failback once and fan it out"""
+        key = (shard, group, kind)
+        with self._lock:
+            self._event_counts[key] = self._event_counts.get(key, 0) + 1
+
+        if not self.subscribers:
+            return
+        event = {
+            'shard': shard,
+            'group': group,
+            'kind': kind,
+            'from': from_interface,
+            'to': to_interface,
+            'timestamp': time.time()
+        }
+        for callback in self.subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Failover event subscriber error: {e}")
+
+    def publish_suppressed_transition(self, shard: str, group: str, kind: str):
+        """Count a failover/failback held back by flap dampening"""
+        key = (shard, group, kind)
+        with self._lock:
+            self._suppressed_counts[key] = self._suppressed_counts.get(key, 0) + 1
+
+    def render(self, accept: str = '', accept_encoding: str = '',
+               names: Optional[List[str]] = None) -> Tuple[bytes, List[Tuple[str, str]]]:
+        """/metrics payload and headers, negotiated like prometheus_client's own handler.
+
+        ``accept`` picks Prometheus text or OpenMetrics, ``accept_encoding``
+        enables gzip and ``names`` (``name[]`` query parameters) restricts
+        the output to those metric families.
+        """
+        encoder, content_type = choose_encoder(accept)
+        registry = self.registry.restricted_registry(names) if names else self.registry
+        payload = encoder(registry)
+        headers = [('Content-Type', content_type)]
+        if gzip_accepted(accept_encoding):
+            payload = gzip.compress(payload)
+            headers.append(('Content-Encoding', 'gzip'))
+        return payload, headers
+
+
+_default_hub = None
+_default_hub_lock = threading.Lock()
+
+
+def get_default_hub() -> MetricsHub:
+    """Process-wide hub on the global prometheus_client registry"""
+    global _default_hub
+    with _default_hub_lock:
+        if _default_hub is None:
+            _default_hub = MetricsHub(REGISTRY)
+        return _default_hub
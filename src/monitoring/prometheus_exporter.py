@@ -1,42 +1,73 @@
-from prometheus_client import start_http_server, Gauge, Counter, Info
+from prometheus_client import Gauge, Info
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
 import time
 import threading
 import requests
 import json
 
+from monitoring.metrics import get_default_hub
+
 class NetworkMonitor:
-    def __init__(self, port=8000):
+    def __init__(self, port=8000, telemetry_collector=None, metrics=None):
         self.port = port
+        self.telemetry_collector = telemetry_collector
+        self.metrics = metrics or get_default_hub()
+        self.http_server = None
         self.setup_metrics()
     
     def setup_metrics(self):
         """Setup Prometheus metrics"""
-        # Interface metrics
-        self.interface_speed = Gauge('network_interface_speed_mbps', 
-                                   'Interface speed in Mbps', ['interface'])
-        self.interface_status = Gauge('network_interface_status', 
-                                    'Interface status (1=up, 0=down)', ['interface'])
-        self.interface_traffic = Gauge('network_interface_traffic_bytes',
-                                     'Interface traffic in bytes', ['interface', 'direction'])
+        # Interface and failover metrics are owned by the metrics hub and
+        # rendered from snapshots at scrape time
+        registry = self.metrics.registry
         
         # Network range metrics
         self.ip_usage = Gauge('network_ip_usage_percent',
-                            'IP address usage percentage', ['subnet'])
-        
-        # Failover metrics
-        self.failover_status = Gauge('network_failover_active',
-                                   'Failover status (1=active, 0=inactive)', ['group'])
-        self.failover_events = Counter('network_failover_events_total',
-                                     'Total failover events', ['group'])
+                            'IP address usage percentage', ['subnet'], registry=registry)
         
         # System info
-        self.network_info = Info('network_system', 'Network system information')
+        self.network_info = Info('network_system', 'Network system information', registry=registry)
+    
+    def _start_http_server(self):
+        """Serve /metrics from the metrics hub"""
+        hub = self.metrics
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                payload, headers = hub.render(self.headers.get('Accept', ''),
+                                              self.headers.get('Accept-Encoding', ''),
+                                              parse_qs(url.query).get('name[]'))
+                self.send_response(200)
+                for header, value in headers:
+                    self.send_header(header, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, format, *args):
+                return
+        
+        server = ThreadingHTTPServer(('0.0.0.0', self.port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
     
     def start_monitoring(self):
         """Start monitoring server"""
-        start_http_server(self.port)
+        self.http_server = self._start_http_server()
         print(f"Monitoring server started on port {self.port}")
         
+        # Interface metrics are pushed by the telemetry collector each cycle
+        if self.telemetry_collector:
+            self.telemetry_collector.add_sink(self.update_interface_metrics)
+            if not self.telemetry_collector.is_running:
+                self.telemetry_collector.start()
+        
         # Start background monitoring
         monitor_thread = threading.Thread(target=self._collect_metrics, daemon=True)
         monitor_thread.start()
@@ -45,9 +76,6 @@ class NetworkMonitor:
         """Collect and update metrics continuously"""
         while True:
             try:
-                # Simulate metric collection
-                self._update_interface_metrics()
-                self._update_failover_metrics()
                 self._update_network_info()
                 
                 time.sleep(30)  # Collect every 30 seconds
@@ -56,25 +84,9 @@ class NetworkMonitor:
                 print(f"Metric collection error: {e}")
                 time.sleep(60)
     
-    def _update_interface_metrics(self):
-        """Update interface metrics"""
-        # Simulated interface data - replace with actual device queries
-        interfaces = [
-            {"name": "eth0", "speed": 1000, "status": 1, "traffic_tx": 1500000, "traffic_rx": 2000000},
-            {"name": "eth1", "speed": 1000, "status": 1, "traffic_tx": 800000, "traffic_rx": 1200000},
-            {"name": "eth2", "speed": 10000, "status": 1, "traffic_tx": 5000000, "traffic_rx": 4500000},
-        ]
-        
-        for interface in interfaces:
-            self.interface_speed.labels(interface=interface['name']).set(interface['speed'])
-            self.interface_status.labels(interface=interface['name']).set(interface['status'])
-            self.interface_traffic.labels(interface=interface['name'], direction='tx').set(interface['traffic_tx'])
-            self.interface_traffic.labels(interface=interface['name'], direction='rx').set(interface['traffic_rx'])
-    
-    def _update_failover_metrics(self):
-        """Update failover metrics"""
-        # Simulated failover data
-        self.failover_status.labels(group='primary_failover').set(1)
+    def update_interface_metrics(self, batch):
+        """Update interface metrics from a telemetry batch"""
+        self.metrics.interface_metrics.update(batch)
     
     def _update_network_info(self):
         """Update network information"""
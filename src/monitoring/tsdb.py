@@ -0,0 +1,204 @@
+"""
+Embedded ring-buffer time-series store for dashboard history
+"""
+import logging
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (step seconds, slots): 1 h of 1 s points, 24 h of 1 m rollups, 30 d of 1 h rollups
+DEFAULT_RESOLUTIONS = ((1, 3600), (60, 1440), (3600, 720))
+
+
+class _Tier:
+    """One resolution: a fixed number of wall-clock aligned slots per series"""
+
+    def __init__(self, step: int, slots: int, capacity: int):
+        self.step = step
+        self.slots = slots
+        self.raw = step == 1
+        # Bucket number currently held by each slot; shared by every series
+        self.buckets = np.full(slots, -1, dtype=np.int64)
+        if self.raw:
+            self.value = np.full((capacity, slots), np.nan, dtype=np.float32)
+        else:
+            self.sum = np.zeros((capacity, slots), dtype=np.float32)
+            self.count = np.zeros((capacity, slots), dtype=np.uint16)
+            self.min = np.full((capacity, slots), np.inf, dtype=np.float32)
+            self.max = np.full((capacity, slots), -np.inf, dtype=np.float32)
+
+    @property
+    def arrays(self) -> List[str]:
+        return ['value'] if self.raw else ['sum', 'count', 'min', 'max']
+
+    @property
+    def bytes_per_series(self) -> int:
+        return sum(getattr(self, name).itemsize for name in self.arrays) * self.slots
+
+    @property
+    def retention(self) -> int:
+        return self.step * self.slots
+
+    def grow(self, capacity: int):
+        """Extend every array to ``capacity`` rows, keeping existing data"""
+        for name in self.arrays:
+            current = getattr(self, name)
+            grown = np.empty((capacity, self.slots), dtype=current.dtype)
+            grown[:current.shape[0]] = current
+            grown[current.shape[0]:] = self._fill(name)
+            setattr(self, name, grown)
+
+    @staticmethod
+    def _fill(name: str):
+        return {'value': np.nan, 'sum': 0, 'count': 0, 'min': np.inf, 'max': -np.inf}[name]
+
+    def _claim_slot(self, timestamp: float) -> Optional[int]:
+        """Return the slot for ``timestamp``, clearing it if it held an older bucket.
+
+        None when the slot already holds a newer bucket: the sample is older
+        than this tier's retention and must not wipe the newer data.
+        """
+        bucket = int(timestamp // self.step)
+        slot = bucket % self.slots
+        if self.buckets[slot] > bucket:
+            return None
+        if self.buckets[slot] != bucket:
+            for name in self.arrays:
+                getattr(self, name)[:, slot] = self._fill(name)
+            self.buckets[slot] = bucket
+        return slot
+
+    def ingest(self, timestamp: float, rows: np.ndarray, values: np.ndarray):
+        slot = self._claim_slot(timestamp)
+        if slot is None:
+            return
+        if self.raw:
+            self.value[rows, slot] = values
+            return
+        # Rows within one batch are unique, so plain fancy indexing is safe
+        self.sum[rows, slot] += values
+        self.count[rows, slot] += 1
+        self.min[rows, slot] = np.minimum(self.min[rows, slot], values)
+        self.max[rows, slot] = np.maximum(self.max[rows, slot], values)
+
+    def read(self, row: int, start: float, end: float) -> Dict[str, list]:
+        """Read one series between two timestamps, missing buckets as None"""
+        first = int(start // self.step)
+        last = int(end // self.step)
+        first = max(first, last - self.slots + 1)
+        buckets = np.arange(first, last + 1, dtype=np.int64)
+        slots = buckets % self.slots
+        present = self.buckets[slots] == buckets
+
+        if self.raw:
+            values = self.value[row, slots]
+            present &= ~np.isnan(values)
+            minimum = maximum = values
+        else:
+            count = self.count[row, slots]
+            present &= count > 0
+            values = self.sum[row, slots] / np.maximum(count, 1)
+            minimum = self.min[row, slots]
+            maximum = self.max[row, slots]
+
+        def as_list(array):
+            return [float(value) if ok else None for value, ok in zip(array, present)]
+
+        return {
+            'step': self.step,
+            'timestamps': (buckets * self.step).tolist(),
+            'values': as_list(values),
+            'min': as_list(minimum),
+            'max': as_list(maximum)
+        }
+
+
+class TimeSeriesStore:
+    """Per-series NumPy ring buffers with 1 s / 1 m / 1 h rollups.
+
+    Memory is fixed per series: ``bytes_per_series`` is known up front, and
+    total usage is ``bytes_per_series * series_count`` (rounded up to the
+    allocated row capacity).
+    """
+
+    def __init__(self, resolutions: Sequence[Tuple[int, int]] = DEFAULT_RESOLUTIONS,
+                 initial_capacity: int = 1024):
+        self.capacity = initial_capacity
+        self.tiers = [_Tier(step, slots, initial_capacity) for step, slots in sorted(resolutions)]
+        self.series: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def bytes_per_series(self) -> int:
+        return sum(tier.bytes_per_series for tier in self.tiers)
+
+    def memory_bytes(self) -> int:
+        """Bytes currently allocated for series data"""
+        return self.bytes_per_series * self.capacity
+
+    def _rows_for(self, keys: Sequence[Hashable]) -> np.ndarray:
+        """Map series keys to row numbers, allocating rows for new series"""
+        series = self.series
+        rows = np.empty(len(keys), dtype=np.int64)
+        for index, key in enumerate(keys):
+            row = series.get(key)
+            if row is None:
+                row = len(series)
+                series[key] = row
+            rows[index] = row
+
+        if len(series) > self.capacity:
+            capacity = self.capacity
+            while capacity < len(series):
+                capacity *= 2
+            for tier in self.tiers:
+                tier.grow(capacity)
+            self.capacity = capacity
+            logger.info(f"Time-series store grown to {capacity} series "
+                        f"({self.memory_bytes() / 1_048_576:.1f} MiB)")
+        return rows
+
+    def append(self, key: Hashable, value: float, timestamp: Optional[float] = None):
+        """Record a single sample"""
+        self.append_many([key], [value], timestamp)
+
+    def append_many(self, keys: Sequence[Hashable], values: Sequence[float],
+                    timestamp: Optional[float] = None):
+        """Record one sample per key, all taken at the same timestamp"""
+        if timestamp is None:
+            timestamp = time.time()
+        values = np.asarray(values, dtype=np.float32)
+        with self._lock:
+            rows = self._rows_for(keys)
+            for tier in self.tiers:
+                tier.ingest(timestamp, rows, values)
+
+    def query(self, key: Hashable, start: float, end: Optional[float] = None,
+              step: Optional[int] = None) -> Optional[Dict[str, list]]:
+        """Range query for one series.
+
+        Picks the finest resolution that still covers ``start`` and is at
+        least ``step`` seconds wide. Returns None for unknown series.
+        """
+        if end is None:
+            end = time.time()
+        with self._lock:
+            row = self.series.get(key)
+            if row is None:
+                return None
+            tier = self._select_tier(end - start, step)
+            return tier.read(row, start, end)
+
+    def _select_tier(self, span: float, step: Optional[int]) -> _Tier:
+        for tier in self.tiers:
+            if (step is None or tier.step >= step) and tier.retention >= span:
+                return tier
+        return self.tiers[-1]
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self.series)
@@ -1,30 +1,57 @@
 """
 Demo NETCONF client for testing without real network devices
 """
+import copy
 import logging
+import random
+import time
 from typing import Dict, List, Optional
 import xml.etree.ElementTree as ET
-import json
+
+from monitoring.log_pipeline import LazyJson
+from netconf_client.interface_table import InterfaceTable
+from netconf_client.reconciler import merge_config
 
 logger = logging.getLogger(__name__)
 
+# Line rate per configured speed, in bits per second
+SPEED_BPS = {
+    "100M": 100_000_000,
+    "1G": 1_000_000_000,
+    "10G": 10_000_000_000,
+    "25G": 25_000_000_000,
+    "40G": 40_000_000_000,
+    "100G": 100_000_000_000,
+}
+
+COUNTER64_MASK = (1 << 64) - 1
+
 class DemoNETCONFClient:
-    def __init__(self, host: str, port: int, username: str, password: str):
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 interfaces: Optional[List[Dict]] = None):
         self.host = host
         self.port = port
         self.username = username
         self.password = password
         self.connected = False
         self.current_config = {}
+        self.seed_interfaces = interfaces
+        
+        # Simulated oper-state counters: name -> [in_octets, out_octets, utilization, last_update]
+        self._counters = {}
         
     def connect(self) -> bool:
         """Simulate connection to device"""
         logger.info(f"Demo: Connecting to {self.host}:{self.port}")
         self.connected = True
         
+        if self.seed_interfaces is not None:
+            self.current_config = {"interfaces": self.seed_interfaces}
+            return True
+        
         # Initialize with demo interfaces
         self.current_config = {
-            "interfaces": [
+            "interfaces": InterfaceTable.from_records([
                 {
                     "name": "eth0",
                     "ip_address": "192.168.1.10/24",
@@ -46,7 +73,7 @@ class DemoNETCONFClient:
                     "status": "up",
                     "vlan": 200
                 }
-            ]
+            ])
         }
         
         return True
@@ -63,14 +90,25 @@ class DemoNETCONFClient:
             return False
             
         logger.info("Demo: Applying configuration")
-        logger.info(f"Demo Config: {json.dumps(config, indent=2)}")
+        logger.debug("Demo Config: %s", LazyJson(config, indent=2))
         
-        # Store the configuration
-        self.current_config.update(config)
+        # Store the configuration with NETCONF merge semantics
+        merge_config(self.current_config, config)
         
         # Simulate successful configuration
         return True
     
+    def replace_config(self, config: Dict) -> bool:
+        """Simulate replacing the given configuration sections"""
+        if not self.connected:
+            logger.error("Not connected to device")
+            return False
+        
+        logger.info("Demo: Replacing configuration")
+        for key, value in config.items():
+            self.current_config[key] = copy.deepcopy(value)
+        return True
+    
     def get_interfaces(self) -> List[Dict]:
         """Get demo interface information"""
         if not self.connected:
@@ -78,6 +116,43 @@ class DemoNETCONFClient:
             
         return self.current_config.get("interfaces", [])
     
+    def get_interface_counters(self) -> List[Dict]:
+        """Simulate a NETCONF <get> of interface oper-state and statistics"""
+        if not self.connected:
+            return []
+        
+        now = time.monotonic()
+        counters = []
+        for interface in self.current_config.get("interfaces", []):
+            name = interface["name"]
+            speed_bps = SPEED_BPS.get(interface.get("speed"), 0)
+            oper_up = interface.get("status", "up") == "up"
+            
+            state = self._counters.get(name)
+            if state is None:
+                # Random starting offsets so 64-bit wrap is exercised eventually
+                state = [random.getrandbits(63), random.getrandbits(63), random.uniform(0.01, 0.3), now]
+                self._counters[name] = state
+            
+            elapsed = now - state[3]
+            if oper_up and elapsed > 0:
+                # Random walk the utilization to get realistic-looking traffic
+                state[2] = min(0.95, max(0.001, state[2] * random.uniform(0.8, 1.25)))
+                octets = int(speed_bps / 8 * state[2] * elapsed)
+                state[0] = (state[0] + octets) & COUNTER64_MASK
+                state[1] = (state[1] + int(octets * random.uniform(0.4, 0.9))) & COUNTER64_MASK
+            state[3] = now
+            
+            counters.append({
+                "name": name,
+                "oper_status": "up" if oper_up else "down",
+                "speed": speed_bps,
+                "in_octets": state[0],
+                "out_octets": state[1]
+            })
+        
+        return counters
+    
     def get_config(self) -> Dict:
         """Get current configuration"""
         return self.current_config
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""
+Fleet simulator - thousands of virtual NETCONF devices in one process, behind the demo client API
+"""
+import copy
+import json
+import logging
+import random
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from monitoring.log_pipeline import LazyJson
+from netconf_client.demo_client import COUNTER64_MASK, SPEED_BPS
+from netconf_client.interface_table import InterfaceTable
+from netconf_client.reconciler import merge_config
+
+logger = logging.getLogger(__name__)
+
+
+class SimulatedRpcError(ConnectionError):
+    """An injected RPC failure"""
+
+
+class SimulatedDevice:
+    """Client handle for one virtual device; same methods as DemoNETCONFClient.
+
+    Holds nothing but its index: counters, oper status and config live in
+    the fleet's columns. Failures behave like NETCONFClient's (False, {} or
+    [] after logging), so callers exercise their real error paths.
+    """
+
+    __slots__ = ('fleet', 'index', 'host', 'port', 'username', 'password')
+
+    def __init__(self, fleet: 'FleetSimulator', index: int):
+        self.fleet = fleet
+        self.index = index
+        self.host = fleet.names[index]
+        self.port = 830
+        self.username = 'admin'
+        self.password = 'admin'
+
+    @property
+    def connected(self) -> bool:
+        return bool(self.fleet.connected[self.index])
+
+    @property
+    def seed_interfaces(self):
+        return None
+
+    def connect(self) -> bool:
+        try:
+            self.fleet.rpc(self.index, 'connect')
+        except SimulatedRpcError as e:
+            logger.debug(f"{self.host}: connect failed: {e}")
+            return False
+        self.fleet.connected[self.index] = 1
+        return True
+
+    def disconnect(self):
+        self.fleet.connected[self.index] = 0
+
+    def send_config(self, config: Dict) -> bool:
+        """Merge ``config`` into the device's running config"""
+        if not self._call('edit-config'):
+            return False
+        logger.debug("%s: merge %s", self.host, LazyJson(config))
+        fleet = self.fleet
+        if fleet.configs[self.index] is None:
+            fleet.configs[self.index] = {}
+        merge_config(fleet.configs[self.index], config)
+        return True
+
+    def replace_config(self, config: Dict) -> bool:
+        """Replace the given top-level sections of the running config"""
+        if not self._call('edit-config'):
+            return False
+        fleet = self.fleet
+        running = fleet.configs[self.index]
+        if running is None:
+            running = fleet.configs[self.index] = {}
+        for key, value in config.items():
+            running[key] = copy.deepcopy(value)
+        return True
+
+    def get_config(self) -> Dict:
+        if not self._call('get-config'):
+            return {}
+        return self.fleet.configs[self.index] or {}
+
+    def get_interfaces(self) -> InterfaceTable:
+        if not self._call('get-config'):
+            return InterfaceTable()
+        return InterfaceTable.from_records(self.fleet.interface_records(self.index))
+
+    def get_interface_counters(self) -> List[Dict]:
+        if not self._call('get'):
+            return []
+        return self.fleet.poll_counters(self.index)
+
+    def _call(self, operation: str) -> bool:
+        if not self.fleet.connected[self.index]:
+            logger.debug(f"{self.host}: {operation} while not connected")
+            return False
+        try:
+            self.fleet.rpc(self.index, operation)
+        except SimulatedRpcError as e:
+            logger.debug(f"{self.host}: {operation} failed: {e}")
+            return False
+        return True
+
+
+class FleetSimulator:
+    """Many virtual devices sharing fleet-wide columnar state.
+
+    Interface ``p`` of device ``d`` is row ``d * ports + p`` of the counter,
+    rate and oper-status columns; interface names are shared by every
+    device, and a device's config is only allocated once something is
+    pushed to it. That keeps 10k devices x 48 ports at a few tens of MB.
+
+    Every RPC sleeps ``latency`` seconds (+/- ``jitter`` of it, releasing
+    the GIL like real I/O) and fails with probability ``error_rate``. Each
+    counter poll flips the oper status of ``churn`` of the device's
+    interfaces on average, so failover and alerting see flaps.
+    """
+
+    def __init__(self, devices: int = 10000, ports: int = 48, speed: str = '1G', latency: float = 0.0,
+                 jitter: float = 0.5, error_rate: float = 0.0, churn: float = 0.0,
+                 seed: Optional[int] = None, prefix: str = 'sim'):
+        if speed not in SPEED_BPS:
+            raise ValueError(f"Unknown interface speed {speed!r}. Supported: {list(SPEED_BPS)}")
+        self.ports = ports
+        self.speed = speed
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.churn = churn
+        self.rpcs = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+
+        self.names = [f'{prefix}{index:05d}' for index in range(devices)]
+        self._indexes = {name: index for index, name in enumerate(self.names)}
+        self.port_names = tuple(f'gigabitethernet1/0/{port + 1}' for port in range(ports))
+        rows = devices * ports
+        rng = self._rng
+        line_rate = SPEED_BPS[speed] / 8
+        # Mean bytes per second of each interface (1-30% utilization)
+        self.byte_rate = array('d', (line_rate * rng.uniform(0.01, 0.3) for _ in range(rows)))
+        self.in_octets = array('Q', (rng.getrandbits(63) for _ in range(rows)))
+        self.out_octets = array('Q', (rng.getrandbits(63) for _ in range(rows)))
+        self.oper_up = bytearray(b'\x01') * rows
+        self.last_poll = array('d', [time.monotonic()]) * devices
+        self.connected = bytearray(devices)
+        self.configs: List[Optional[Dict]] = [None] * devices
+        self.clients = [SimulatedDevice(self, index) for index in range(devices)]
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._indexes
+
+    def devices(self) -> Dict[str, SimulatedDevice]:
+        """Clients by device name, e.g. for TelemetryCollector or DriftReconciler"""
+        return dict(zip(self.names, self.clients))
+
+    def client(self, name: str) -> SimulatedDevice:
+        return self.clients[self._indexes[name]]
+
+    def inventory_records(self, block: int = 1000) -> List[Dict]:
+        """Inventory entries labelled ``simulated=true`` and ``block=<n>`` (``block`` devices per block)"""
+        return [{'name': name, 'host': name, 'labels': {'simulated': 'true', 'block': str(index // block)}}
+                for index, name in enumerate(self.names)]
+
+    def connect_all(self) -> int:
+        """Mark every device connected without simulated RPCs; returns the device count"""
+        self.connected[:] = b'\x01' * len(self.connected)
+        return len(self.connected)
+
+    def rpc(self, index: int, operation: str):
+        """Account, delay and possibly fail one RPC"""
+        self.rpcs += 1
+        if self.latency:
+            time.sleep(self.latency * (1 + self.jitter * (2 * self._rng.random() - 1)))
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            raise SimulatedRpcError(f"injected {operation} failure on {self.names[index]}")
+
+    def set_oper_status(self, index: int, port: int, up: bool):
+        self.oper_up[index * self.ports + port] = 1 if up else 0
+
+    def interface_records(self, index: int) -> List[Dict]:
+        base = index * self.ports
+        return [{'name': name, 'speed': self.speed, 'status': 'up' if self.oper_up[base + port] else 'down'}
+                for port, name in enumerate(self.port_names)]
+
+    def poll_counters(self, index: int) -> List[Dict]:
+        """Advance the device's counters to now and return them like a NETCONF <get> of interfaces-state"""
+        rng = self._rng
+        ports = self.ports
+        base = index * ports
+        now = time.monotonic()
+        elapsed = now - self.last_poll[index]
+        self.last_poll[index] = now
+
+        if self.churn:
+            expected = ports * self.churn
+            flips = min(int(expected) + (rng.random() < expected % 1), ports)
+            for port in rng.sample(range(ports), flips):
+                self.oper_up[base + port] ^= 1
+
+        # One traffic factor per device and poll keeps the per-interface work to arithmetic
+        scale = elapsed * rng.uniform(0.8, 1.25)
+        speed_bps = SPEED_BPS[self.speed]
+        byte_rate, in_octets, out_octets, oper_up = self.byte_rate, self.in_octets, self.out_octets, self.oper_up
+        counters = []
+        for port, name in enumerate(self.port_names):
+            row = base + port
+            up = oper_up[row]
+            if up and scale > 0:
+                octets = int(byte_rate[row] * scale)
+                in_octets[row] = (in_octets[row] + octets) & COUNTER64_MASK
+                out_octets[row] = (out_octets[row] + octets * 3 // 4) & COUNTER64_MASK
+            counters.append({
+                'name': name,
+                'oper_status': 'up' if up else 'down',
+                'speed': speed_bps,
+                'in_octets': in_octets[row],
+                'out_octets': out_octets[row]
+            })
+        return counters
+
+    def nbytes(self) -> int:
+        """Approximate size of the per-device state (columns, client handles and configs), in bytes"""
+        import sys
+
+        columns = sum(column.itemsize * len(column) for column in (self.byte_rate, self.in_octets,
+                                                                    self.out_octets, self.last_poll))
+        columns += len(self.oper_up) + len(self.connected)
+        handles = sum(sys.getsizeof(client) for client in self.clients)
+        names = sum(sys.getsizeof(name) for name in self.names) + sys.getsizeof(self.names) + \
+            sys.getsizeof(self._indexes)
+        configs = sys.getsizeof(self.configs) + sum(len(json.dumps(config, default=str))
+                                                    for config in self.configs if config)
+        return columns + handles + names + configs
+
+    def stats(self) -> Dict:
+        return {
+            'devices': len(self.clients),
+            'interfaces': len(self.oper_up),
+            'connected': sum(self.connected),
+            'configured': sum(1 for config in self.configs if config),
+            'rpcs': self.rpcs,
+            'errors': self.errors,
+            'bytes_per_device': round(self.nbytes() / max(len(self.clients), 1))
+        }
@@ -0,0 +1,556 @@
+"""
+Columnar interface table - typed arrays instead of one dict per interface
+"""
+import bisect
+import json
+import re
+from array import array
+from itertools import accumulate
+from json.encoder import encode_basestring_ascii
+from collections.abc import MutableMapping
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+# Fixed columns, in export order
+FIELDS = ('name', 'ip_address', 'speed', 'status', 'vlan', 'traffic_rx', 'traffic_tx',
+          'description', 'rx_bps', 'tx_bps')
+
+# Numeric columns and their array typecodes (rates are float32: ~7 significant digits)
+NUMERIC_COLUMNS = {
+    'vlan': 'H',          # uint16; 0 = no VLAN (VLAN 0 is never assigned to a port)
+    'traffic_rx': 'Q',    # uint64
+    'traffic_tx': 'Q',
+    'rx_bps': 'f',
+    'tx_bps': 'f',
+}
+
+# Repeated strings are stored once and referenced by code (0 = None); codes start
+# as uint8 and widen to uint16/uint32 as a pool grows
+POOLED_COLUMNS = ('speed', 'status', 'description')
+_CODE_TYPECODES = (('B', 0xFF), ('H', 0xFFFF), ('I', 0xFFFFFFFF))
+
+# Name suffixes are stored as byte lengths plus the absolute offset of every 64th row
+_BLOCK_SHIFT = 6
+_BLOCK_MASK = (1 << _BLOCK_SHIFT) - 1
+
+# Names appended since the last sort are looked up in a dict until there are this many
+_RECENT_LIMIT = 4096
+
+_FIELD_SET = frozenset(FIELDS)
+_NAME_PARTS = re.compile(r'(\D*)(.*)', re.DOTALL)
+_NO_PREFIX = 255
+
+
+class _Pool:
+    """Interned strings for one column"""
+
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _split_name(name: str):
+    """'gigabitethernet1/0/12' -> ('gigabitethernet', '1/0/12'); the type prefix is interned"""
+    return _NAME_PARTS.match(name).groups()
+
+
+def _fit(column: array, largest: int) -> array:
+    """``column`` widened if needed so ``largest`` fits"""
+    for typecode, limit in _CODE_TYPECODES:
+        if largest <= limit:
+            break
+    if array(typecode).itemsize <= column.itemsize:
+        return column
+    return array(typecode, column)
+
+
+def _fit_codes(codes: array, pool: _Pool) -> array:
+    """``codes`` widened if needed so every code of ``pool`` fits"""
+    return _fit(codes, len(pool.values) - 1)
+
+
+def _name_hash(name: str) -> int:
+    return hash(name) & 0xFFFFFFFF
+
+
+def _parse_ipv4(value) -> Optional[tuple]:
+    """'10.1.2.3/24' -> (address as int, prefix length); None if not IPv4"""
+    if not isinstance(value, str):
+        return None
+    address, _, prefix = value.partition('/')
+    try:
+        parts = [int(octet) for octet in address.split('.')]
+        length = int(prefix) if prefix else 32
+    except ValueError:
+        return None
+    if len(parts) != 4 or not all(0 <= part <= 255 for part in parts) or not 0 <= length <= 32:
+        return None
+    return (parts[0] << 24) | (parts[1] << 16) | (parts[2] << 8) | parts[3], length
+
+
+def _format_ipv4(address: int, prefix: int) -> str:
+    return f'{address >> 24}.{(address >> 16) & 255}.{(address >> 8) & 255}.{address & 255}/{prefix}'
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+class InterfaceRow(MutableMapping):
+    """Dict-like view of one table row; reads and writes go to the columns"""
+
+    __slots__ = ('table', 'row')
+
+    def __init__(self, table: 'InterfaceTable', row: int):
+        self.table = table
+        self.row = row
+
+    def __getitem__(self, field):
+        return self.table.get_value(self.row, field)
+
+    def __setitem__(self, field, value):
+        self.table.set_value(self.row, field, value)
+
+    def __delitem__(self, field):
+        extra = self.table._extra.get(self.row)
+        if extra is None or field not in extra:
+            raise KeyError(field)
+        del extra[field]
+
+    def __iter__(self):
+        yield from FIELDS
+        yield from self.table._extra.get(self.row, ())
+
+    def __len__(self) -> int:
+        return len(FIELDS) + len(self.table._extra.get(self.row, ()))
+
+    def __repr__(self) -> str:
+        return f'InterfaceRow({dict(self)!r})'
+
+
+class InterfaceTable:
+    """Interfaces stored column by column in typed arrays.
+
+    Names are split into an interned type prefix plus a byte-packed suffix,
+    speed/status/description are pooled codes, IPv4 addresses are packed
+    into integers and counters are uint64. Fields outside the fixed schema
+    (or values it cannot represent, such as IPv6 addresses) go to a small
+    per-row overflow dict, so a row behaves like the dict it replaces.
+
+    Iterating or indexing returns ``InterfaceRow`` views for code written
+    against lists of dicts. Columns are stdlib arrays, so the table costs
+    nothing to import; bulk updates (``add``, ``assign``) and ``column()``
+    work on zero-copy numpy views of them. Rows are only ever appended, so
+    a row number stays valid.
+
+    JSON and Prometheus exports are text, so they cannot be zero-copy: they
+    format straight from the columns chunk by chunk, without building a
+    dict or row object per interface. Only ``column()`` is zero-copy.
+    """
+
+    def __init__(self):
+        self._size = 0
+        self._prefix_codes = array('B')
+        self._suffix_lengths = array('B')
+        self._suffix_blocks = array('I', [0])
+        self._suffix_end = 0
+        self._suffixes = bytearray()
+        self._prefixes = _Pool()
+        self._ip = array('I')
+        self._ip_prefix = array('B')
+        self._numeric = {field: array(typecode) for field, typecode in NUMERIC_COLUMNS.items()}
+        self._codes = {field: array('B') for field in POOLED_COLUMNS}
+        self._pools = {field: _Pool() for field in POOLED_COLUMNS}
+        self._extra: Dict[int, Dict] = {}
+        # Name lookup: (hash, row) sorted by hash, plus rows appended since the last sort
+        self._lookup_hashes = array('I')
+        self._lookup_rows = array('I')
+        self._recent: Dict[str, int] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> 'InterfaceTable':
+        table = cls()
+        table.extend(records)
+        table._trim()
+        return table
+
+    # -- list-like access -------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        for row in range(self._size):
+            yield InterfaceRow(self, row)
+
+    def __getitem__(self, row: int) -> InterfaceRow:
+        if row < 0:
+            row += self._size
+        if not 0 <= row < self._size:
+            raise IndexError('interface row out of range')
+        return InterfaceRow(self, row)
+
+    def append(self, record: Dict) -> int:
+        """Add one interface; returns its row"""
+        self.extend([record])
+        return self._size - 1
+
+    def extend(self, records: Iterable[Dict]):
+        """Append interfaces, filling each column in one pass"""
+        records = list(records)
+        names = [record['name'] for record in records]
+        if len(set(names)) != len(names) or (self._size and any(self.row_of(name) is not None for name in names)):
+            raise ValueError("Duplicate interface names")
+        start = self._size
+
+        split = [_split_name(name) for name in names]
+        prefix_codes = [self._prefixes.encode(prefix) for prefix, _ in split]
+        self._prefix_codes = _fit_codes(self._prefix_codes, self._prefixes)
+        self._prefix_codes.extend(prefix_codes)
+        encoded = [suffix.encode('utf-8') for _, suffix in split]
+        lengths = [len(suffix) for suffix in encoded]
+        offset = self._suffix_end
+        for row, length in zip(range(start, start + len(records)), lengths):
+            if row & _BLOCK_MASK == 0 and row:
+                self._suffix_blocks.append(offset)
+            offset += length
+        self._suffix_end = offset
+        self._suffixes += b''.join(encoded)
+        self._suffix_lengths = _fit(self._suffix_lengths, max(lengths, default=0))
+        self._suffix_lengths.extend(lengths)
+
+        for field in POOLED_COLUMNS:
+            pool = self._pools[field]
+            codes = [pool.encode(record.get(field)) for record in records]
+            self._codes[field] = _fit_codes(self._codes[field], pool)
+            self._codes[field].extend(codes)
+        for field in NUMERIC_COLUMNS:
+            self._numeric[field].extend(record.get(field) or 0 for record in records)
+
+        addresses = [_parse_ipv4(record.get('ip_address')) for record in records]
+        self._ip.extend(parsed[0] if parsed else 0 for parsed in addresses)
+        self._ip_prefix.extend(parsed[1] if parsed else _NO_PREFIX for parsed in addresses)
+        for row, record, parsed in zip(range(start, start + len(records)), records, addresses):
+            if parsed is None and record.get('ip_address') is not None or not record.keys() <= _FIELD_SET:
+                self._extra[row] = {field: value for field, value in record.items()
+                                    if field not in _FIELD_SET or (field == 'ip_address' and parsed is None)}
+
+        self._size += len(records)
+        self._recent.update(zip(names, range(start, self._size)))
+        if len(self._recent) > _RECENT_LIMIT:
+            self._merge_recent()
+
+    # -- single values ----------------------------------------------------
+
+    def _suffix_start(self, row: int) -> int:
+        block = row >> _BLOCK_SHIFT
+        return self._suffix_blocks[block] + sum(self._suffix_lengths[block << _BLOCK_SHIFT:row])
+
+    def name_of(self, row: int) -> str:
+        start = self._suffix_start(row)
+        end = start + self._suffix_lengths[row]
+        return self._prefixes.values[self._prefix_codes[row]] + self._suffixes[start:end].decode('utf-8')
+
+    def get_value(self, row: int, field: str):
+        if field == 'name':
+            return self.name_of(row)
+        if field in POOLED_COLUMNS:
+            return self._pools[field].values[self._codes[field][row]]
+        if field in NUMERIC_COLUMNS:
+            value = self._numeric[field][row]
+            if field == 'vlan':
+                return value or None
+            return round(value) if isinstance(value, float) else value
+        if field == 'ip_address':
+            prefix = self._ip_prefix[row]
+            if prefix != _NO_PREFIX:
+                return _format_ipv4(self._ip[row], prefix)
+            return self._extra.get(row, {}).get('ip_address')
+        extra = self._extra.get(row)
+        if extra is None or field not in extra:
+            raise KeyError(field)
+        return extra[field]
+
+    def set_value(self, row: int, field: str, value):
+        if field == 'name':
+            if value != self.name_of(row):
+                raise ValueError("Interface names are row keys and cannot be changed")
+            return
+        if field in POOLED_COLUMNS:
+            pool = self._pools[field]
+            code = pool.encode(value)
+            self._codes[field] = _fit_codes(self._codes[field], pool)
+            self._codes[field][row] = code
+            return
+        if field in NUMERIC_COLUMNS:
+            self._numeric[field][row] = value or 0
+            return
+        if field == 'ip_address':
+            parsed = _parse_ipv4(value)
+            if parsed is not None or value is None:
+                self._ip[row], self._ip_prefix[row] = parsed or (0, _NO_PREFIX)
+                self._extra.get(row, {}).pop('ip_address', None)
+                return
+            self._ip_prefix[row] = _NO_PREFIX
+        self._extra.setdefault(row, {})[field] = value
+
+    # -- lookup -----------------------------------------------------------
+
+    def row_of(self, name: str) -> Optional[int]:
+        """Row of an interface by name, or None"""
+        row = self._recent.get(name)
+        if row is not None:
+            return row
+        target = _name_hash(name)
+        hashes = self._lookup_hashes
+        index = bisect.bisect_left(hashes, target)
+        while index < len(hashes) and hashes[index] == target:
+            row = self._lookup_rows[index]
+            if self.name_of(row) == name:
+                return row
+            index += 1
+        return None
+
+    def rows_of(self, names: Iterable[str]) -> List[int]:
+        """Rows for many names at once (-1 for unknown names)"""
+        names = list(names)
+        if len(names) < 256 or not self._lookup_hashes:
+            return [-1 if row is None else row for row in map(self.row_of, names)]
+
+        import numpy as np
+
+        # Probe the sorted hashes for all names at once, then confirm by name
+        hashes = np.frombuffer(self._lookup_hashes, dtype=np.uint32)
+        index = np.searchsorted(hashes, np.fromiter(map(_name_hash, names), dtype=np.uint32, count=len(names)))
+        index = np.minimum(index, len(hashes) - 1)
+        rows = np.frombuffer(self._lookup_rows, dtype=np.uint32)[index].tolist()
+        found = self.names(rows)
+        for position, (name, candidate) in enumerate(zip(names, found)):
+            if name != candidate:
+                # Appended since the last sort, a hash collision, or unknown
+                row = self.row_of(name)
+                rows[position] = -1 if row is None else row
+        return rows
+
+    def _merge_recent(self):
+        """Fold recently appended names into the sorted lookup arrays"""
+        import numpy as np
+
+        count = len(self._recent)
+        hashes = np.concatenate((np.frombuffer(self._lookup_hashes, dtype=np.uint32), np.fromiter(
+            map(_name_hash, self._recent), dtype=np.uint32, count=count)))
+        rows = np.concatenate((np.frombuffer(self._lookup_rows, dtype=np.uint32), np.fromiter(
+            self._recent.values(), dtype=np.uint32, count=count)))
+        order = np.argsort(hashes, kind='stable')
+        self._lookup_hashes = array('I', hashes[order].tobytes())
+        self._lookup_rows = array('I', rows[order].tobytes())
+        self._recent = {}
+
+    # -- bulk operations --------------------------------------------------
+
+    def column(self, field: str):
+        """Zero-copy numpy view of a numeric or code column.
+
+        Do not hold on to it across appends: an array cannot grow while a
+        view of it is alive.
+        """
+        import numpy as np
+
+        column = self._numeric.get(field)
+        if column is None:
+            column = self._codes[field]
+        return np.frombuffer(column, dtype=column.typecode)
+
+    def pool_values(self, field: str) -> List[Optional[str]]:
+        """Values of a pooled column indexed by code, for decoding ``column(field)`` in bulk"""
+        return list(self._pools[field].values)
+
+    def codes_for(self, field: str, values: Iterable[str]) -> List[int]:
+        """Pool codes of the given values, for comparing against ``column(field)``"""
+        return [self._pools[field].encode(value) for value in values]
+
+    def fill(self, field: str, value):
+        """Set one field to the same value on every row"""
+        if field in POOLED_COLUMNS:
+            pool = self._pools[field]
+            value = pool.encode(value)
+            column = self._codes[field] = _fit_codes(self._codes[field], pool)
+        elif field in NUMERIC_COLUMNS:
+            column, value = self._numeric[field], value or 0
+        else:
+            for row in range(self._size):
+                self.set_value(row, field, value)
+            return
+        column[:] = array(column.typecode, [value]) * self._size
+
+    def add(self, field: str, rows: Sequence[int], deltas: Sequence):
+        """Add ``deltas`` to a numeric column at ``rows`` in one vectorized step"""
+        import numpy as np
+
+        view = self.column(field)
+        np.add.at(view, np.asarray(rows, dtype=np.int64), np.asarray(deltas, dtype=view.dtype))
+
+    def assign(self, field: str, rows: Sequence[int], values: Sequence):
+        """Set a numeric or code column at ``rows`` in one vectorized step"""
+        import numpy as np
+
+        view = self.column(field)
+        view[np.asarray(rows, dtype=np.int64)] = values
+
+    # -- export -----------------------------------------------------------
+
+    def names(self, rows: Optional[Sequence[int]] = None) -> List[str]:
+        prefixes = self._prefixes.values
+        suffixes = bytes(self._suffixes)
+        if rows is None:
+            ends = list(accumulate(self._suffix_lengths))
+            return [prefixes[code] + suffixes[end - length:end].decode('utf-8')
+                    for code, length, end in zip(self._prefix_codes, self._suffix_lengths, ends)]
+        rows = list(rows)
+        prefix_codes = self._prefix_codes
+        lengths = self._suffix_lengths
+        if len(rows) < 256:
+            starts = [self._suffix_start(row) for row in rows]
+        else:
+            import numpy as np
+
+            # Many rows: one cumulative sum beats walking a block per row
+            ends = np.cumsum(np.frombuffer(lengths, dtype=lengths.typecode), dtype=np.int64)
+            starts = (ends[rows] - np.frombuffer(lengths, dtype=lengths.typecode)[rows]).tolist()
+        return [prefixes[prefix_codes[row]] + suffixes[start:start + lengths[row]].decode('utf-8')
+                for row, start in zip(rows, starts)]
+
+    def to_record(self, row: int) -> Dict:
+        return self.to_records([row])[0]
+
+    def to_records(self, rows: Optional[Sequence[int]] = None) -> List[Dict]:
+        """Plain dicts for the given rows (all by default), decoded column by column"""
+        if rows is not None:
+            rows = [int(row) for row in rows]
+
+        def gather(column):
+            return column if rows is None else [column[row] for row in rows]
+
+        columns = [self.names(rows)]
+        for field in FIELDS[1:]:
+            if field == 'ip_address':
+                columns.append([None if prefix == _NO_PREFIX else _format_ipv4(address, prefix)
+                                for address, prefix in zip(gather(self._ip), gather(self._ip_prefix))])
+            elif field in POOLED_COLUMNS:
+                values = self._pools[field].values
+                columns.append([values[code] for code in gather(self._codes[field])])
+            elif field == 'vlan':
+                columns.append([vlan or None for vlan in gather(self._numeric[field])])
+            elif NUMERIC_COLUMNS[field] == 'f':
+                columns.append([round(rate) for rate in gather(self._numeric[field])])
+            else:
+                columns.append(list(gather(self._numeric[field])))
+        records = [dict(zip(FIELDS, values)) for values in zip(*columns)]
+        if self._extra:
+            for record, row in zip(records, range(self._size) if rows is None else rows):
+                if row in self._extra:
+                    record.update(self._extra[row])
+        return records
+
+    def iter_json(self, chunk_rows: int = 10000) -> Iterator[str]:
+        """JSON array of all rows as text chunks, formatted from ``chunk_rows`` rows of columns at a time.
+
+        The output is what ``json.dumps(self.to_records())`` produces.
+        """
+        pooled = {field: ['null'] + [encode_basestring_ascii(value) for value in self._pools[field].values[1:]]
+                  for field in POOLED_COLUMNS}
+        names = self.names()
+        yield '['
+        for start in range(0, self._size, chunk_rows):
+            end = min(start + chunk_rows, self._size)
+            rows = range(start, end)
+            addresses = ['null' if prefix == _NO_PREFIX else f'"{_format_ipv4(address, prefix)}"'
+                         for address, prefix in zip(self._ip[start:end], self._ip_prefix[start:end])]
+            speed, status, description = (
+                [pooled[field][code] for code in self._codes[field][start:end]] for field in POOLED_COLUMNS)
+            numeric = self._numeric
+            lines = [
+                f'{{"name": {encode_basestring_ascii(name)}, "ip_address": {address}, "speed": {speed_text}, '
+                f'"status": {status_text}, "vlan": {vlan or "null"}, "traffic_rx": {rx}, "traffic_tx": {tx}, '
+                f'"description": {description_text}, "rx_bps": {round(rx_bps)}, "tx_bps": {round(tx_bps)}}}'
+                for name, address, speed_text, status_text, vlan, rx, tx, description_text, rx_bps, tx_bps in zip(
+                    names[start:end], addresses, speed, status, numeric['vlan'][start:end],
+                    numeric['traffic_rx'][start:end], numeric['traffic_tx'][start:end], description,
+                    numeric['rx_bps'][start:end], numeric['tx_bps'][start:end])
+            ]
+            if self._extra:
+                # Rows with overflow fields keep their extra keys
+                for position, row in enumerate(rows):
+                    if row in self._extra:
+                        lines[position] = json.dumps(self.to_record(row), default=str)
+            chunk = ', '.join(lines)
+            yield chunk if start == 0 else ', ' + chunk
+        yield ']'
+
+    def to_json(self) -> str:
+        return ''.join(self.iter_json())
+
+    def iter_prometheus(self, device: str, chunk_rows: int = 10000) -> Iterator[bytes]:
+        """Interface metric families in Prometheus text format, read straight from the columns.
+
+        Metric names match monitoring.interface_collector. Output is yielded
+        in chunks so a large table is never rendered into one string.
+        """
+        from netconf_client.demo_client import SPEED_BPS
+
+        device = _escape_label(device)
+        labels = [f'{{device="{device}",interface="{_escape_label(name)}"' for name in self.names()]
+        speed_mbps = [repr(SPEED_BPS.get(value, 0) / 1_000_000) for value in self._pools['speed'].values]
+        up_code = self._pools['status'].codes.get('up', -1)
+        families = (
+            ('network_interface_speed_mbps', 'Interface speed in Mbps',
+             ((None, self._codes['speed'], speed_mbps.__getitem__),)),
+            ('network_interface_status', 'Interface status (1=up, 0=down)',
+             ((None, self._codes['status'], lambda code: '1' if code == up_code else '0'),)),
+            ('network_interface_traffic_bytes', 'Interface traffic in bytes',
+             (('rx', self._numeric['traffic_rx'], str), ('tx', self._numeric['traffic_tx'], str))),
+            ('network_interface_rate_bps', 'Interface traffic rate in bits per second',
+             (('rx', self._numeric['rx_bps'], repr), ('tx', self._numeric['tx_bps'], repr))),
+        )
+        for metric, documentation, series in families:
+            yield f'# HELP {metric} {documentation}\n# TYPE {metric} gauge\n'.encode('utf-8')
+            for direction, column, format_value in series:
+                suffix = f',direction="{direction}"}} ' if direction else '} '
+                for start in range(0, self._size, chunk_rows):
+                    end = min(start + chunk_rows, self._size)
+                    yield ''.join(
+                        f'{metric}{label}{suffix}{format_value(value)}\n'
+                        for label, value in zip(labels[start:end], column[start:end])
+                    ).encode('utf-8')
+
+    def _trim(self):
+        """Drop the growth headroom of every column after a bulk build"""
+        self._prefix_codes = array(self._prefix_codes.typecode, self._prefix_codes)
+        self._suffix_lengths = array(self._suffix_lengths.typecode, self._suffix_lengths)
+        self._suffixes = bytearray(self._suffixes)
+        self._ip = array('I', self._ip)
+        self._ip_prefix = array('B', self._ip_prefix)
+        self._lookup_hashes = array('I', self._lookup_hashes)
+        self._lookup_rows = array('I', self._lookup_rows)
+        self._numeric = {field: array(column.typecode, column) for field, column in self._numeric.items()}
+        self._codes = {field: array(column.typecode, column) for field, column in self._codes.items()}
+
+    def render_prometheus(self, device: str) -> bytes:
+        return b''.join(self.iter_prometheus(device))
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and string pools"""
+        arrays = [self._prefix_codes, self._suffix_lengths, self._suffix_blocks, self._ip, self._ip_prefix,
+                  self._lookup_hashes, self._lookup_rows]
+        arrays.extend(self._numeric.values())
+        arrays.extend(self._codes.values())
+        pooled = sum(len(value) + 49 for pool in self._pools.values() for value in pool.values[1:])
+        return sum(column.itemsize * len(column) for column in arrays) + len(self._suffixes) + pooled
@@ -0,0 +1,241 @@
+"""
+NETCONF listener - serves a FleetSimulator's devices over SSH/NETCONF on localhost (requires paramiko)
+"""
+import logging
+import socket
+import threading
+import xml.etree.ElementTree as ET
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BASE_NS = 'urn:ietf:params:xml:ns:netconf:base:1.0'
+NETWORK_NS = 'http://campus-ibn/ns/network'
+INTERFACES_NS = 'urn:ietf:params:xml:ns:yang:ietf-interfaces'
+# NETCONF 1.0 end-of-message marker; only base:1.0 is advertised, so no chunked framing
+EOM = b']]>]]>'
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _build(parent, data):
+    """Same mapping as NETCONFClient._build_xml: lists repeat their element, booleans become YANG literals"""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            for item in (value if isinstance(value, list) else [value]):
+                _build(ET.SubElement(parent, key), item)
+    elif isinstance(data, bool):
+        parent.text = 'true' if data else 'false'
+    elif data is not None:
+        parent.text = str(data)
+
+
+def _to_dict(element):
+    """Same mapping as NETCONFClient._element_to_dict"""
+    children = list(element)
+    if not children:
+        return (element.text or '').strip()
+    result = {}
+    for child in children:
+        key = _local_name(child.tag)
+        value = _to_dict(child)
+        if key not in result:
+            result[key] = value
+        elif isinstance(result[key], list):
+            result[key].append(value)
+        else:
+            result[key] = [result[key], value]
+    return result
+
+
+def _hello(session_id: int) -> bytes:
+    hello = ET.Element('hello', xmlns=BASE_NS)
+    capabilities = ET.SubElement(hello, 'capabilities')
+    ET.SubElement(capabilities, 'capability').text = 'urn:ietf:params:netconf:base:1.0'
+    ET.SubElement(hello, 'session-id').text = str(session_id)
+    return ET.tostring(hello, encoding='utf-8') + EOM
+
+
+def _reply(message_id: Optional[str], body=None, error: Optional[str] = None) -> bytes:
+    reply = ET.Element('rpc-reply', xmlns=BASE_NS)
+    if message_id is not None:
+        reply.set('message-id', message_id)
+    if error is not None:
+        rpc_error = ET.SubElement(reply, 'rpc-error')
+        ET.SubElement(rpc_error, 'error-type').text = 'application'
+        ET.SubElement(rpc_error, 'error-tag').text = 'operation-failed'
+        ET.SubElement(rpc_error, 'error-severity').text = 'error'
+        ET.SubElement(rpc_error, 'error-message').text = error
+    elif body is None:
+        ET.SubElement(reply, 'ok')
+    else:
+        reply.append(body)
+    return ET.tostring(reply, encoding='utf-8') + EOM
+
+
+def handle_rpc(client, message: bytes) -> Tuple[bytes, bool]:
+    """Answer one <rpc> for ``client`` (a SimulatedDevice); returns the reply and whether to close"""
+    try:
+        rpc = ET.fromstring(message)
+    except ET.ParseError as e:
+        return _reply(None, error=f'malformed rpc: {e}'), False
+    message_id = rpc.get('message-id')
+    operation = next(iter(rpc), None)
+    name = _local_name(operation.tag) if operation is not None else ''
+
+    if name == 'close-session':
+        return _reply(message_id), True
+    if name == 'get-config':
+        filter_text = ET.tostring(operation, encoding='unicode')
+        data = ET.Element('data')
+        if INTERFACES_NS in filter_text:
+            interfaces = ET.SubElement(data, 'interfaces', xmlns=INTERFACES_NS)
+            for record in client.get_interfaces():
+                _build(ET.SubElement(interfaces, 'interface'), {'name': record['name'], 'speed': record['speed']})
+        else:
+            network = ET.SubElement(data, 'network', xmlns=NETWORK_NS)
+            _build(network, client.get_config().get('network', {}))
+        return _reply(message_id, data), False
+    if name == 'get':
+        data = ET.Element('data')
+        state = ET.SubElement(data, 'interfaces-state', xmlns=INTERFACES_NS)
+        for counter in client.get_interface_counters():
+            interface = ET.SubElement(state, 'interface')
+            _build(interface, {'name': counter['name'], 'oper-status': counter['oper_status'],
+                               'speed': counter['speed'],
+                               'statistics': {'in-octets': counter['in_octets'],
+                                              'out-octets': counter['out_octets']}})
+        return _reply(message_id, data), False
+    if name == 'edit-config':
+        children = {_local_name(child.tag): child for child in operation}
+        network = None
+        if 'config' in children:
+            network = next((child for child in children['config'] if _local_name(child.tag) == 'network'), None)
+        config = {'network': _to_dict(network) if network is not None else {}}
+        if config['network'] == '':
+            config['network'] = {}
+        default_operation = children.get('default-operation')
+        replace = default_operation is not None and (default_operation.text or '').strip() == 'replace'
+        ok = client.replace_config(config) if replace else client.send_config(config)
+        return (_reply(message_id) if ok else _reply(message_id, error='edit-config failed')), False
+    return _reply(message_id, error=f'operation {name or "(none)"} not supported'), False
+
+
+class NetconfListener:
+    """SSH server on localhost speaking NETCONF 1.0 for every device of a FleetSimulator.
+
+    Log in with the device name as the user name (``ssh -p 8300
+    sim00042@127.0.0.1 -s netconf``), so one port serves the whole fleet
+    and ncclient-based clients can be pointed at simulated devices.
+    """
+
+    def __init__(self, fleet, host: str = '127.0.0.1', port: int = 8300, password: str = 'admin'):
+        self.fleet = fleet
+        self.host = host
+        self.port = port
+        self.password = password
+        self.sessions = 0
+        self._socket: Optional[socket.socket] = None
+        self._host_key = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'NetconfListener':
+        try:
+            import paramiko
+        except ImportError:
+            raise RuntimeError("The NETCONF listener needs paramiko (pip install paramiko)") from None
+        self._host_key = paramiko.RSAKey.generate(2048)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.port))
+        self.port = self._socket.getsockname()[1]
+        self._socket.listen(128)
+        self._socket.settimeout(0.5)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._accept_loop, name='netconf-listener', daemon=True)
+        self._thread.start()
+        logger.info(f"NETCONF listener for {len(self.fleet)} simulated devices on {self.host}:{self.port}")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._socket:
+            self._socket.close()
+            self._socket = None
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                connection, _ = self._socket.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(connection,), name='netconf-session', daemon=True).start()
+
+    def _serve(self, connection: socket.socket):
+        import paramiko
+
+        listener = self
+        login: Dict[str, object] = {}
+        subsystem = threading.Event()
+
+        class Server(paramiko.ServerInterface):
+            def get_allowed_auths(self, username):
+                return 'password'
+
+            def check_auth_password(self, username, password):
+                if password != listener.password or username not in listener.fleet:
+                    return paramiko.AUTH_FAILED
+                login['client'] = listener.fleet.client(username)
+                return paramiko.AUTH_SUCCESSFUL
+
+            def check_channel_request(self, kind, chanid):
+                if kind == 'session':
+                    return paramiko.OPEN_SUCCEEDED
+                return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+            def check_channel_subsystem_request(self, channel, name):
+                if name != 'netconf':
+                    return False
+                subsystem.set()
+                return True
+
+        transport = paramiko.Transport(connection)
+        transport.add_server_key(self._host_key)
+        try:
+            transport.start_server(server=Server())
+            channel = transport.accept(timeout=10)
+            if channel is None or not subsystem.wait(10):
+                return
+            self.sessions += 1
+            self._session(channel, login['client'], self.sessions)
+        except Exception as e:
+            logger.debug(f"NETCONF session ended: {e}")
+        finally:
+            transport.close()
+
+    def _session(self, channel, client, session_id: int):
+        channel.sendall(_hello(session_id))
+        buffer = b''
+        greeted = False
+        while not self._stop.is_set():
+            data = channel.recv(65536)
+            if not data:
+                return
+            buffer += data
+            while EOM in buffer:
+                message, buffer = buffer.split(EOM, 1)
+                if not greeted:
+                    # The client's <hello>; nothing to negotiate beyond base:1.0
+                    greeted = True
+                    continue
+                reply, close = handle_rpc(client, message.strip())
+                channel.sendall(reply)
+                if close:
+                    return
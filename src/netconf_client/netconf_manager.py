@@ -1,9 +1,12 @@
 from ncclient import manager
 import xml.dom.minidom
+import xml.etree.ElementTree as ET
 import json
 import logging
 from typing import Dict, List, Optional
 
+from netconf_client.interface_table import InterfaceTable
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -54,7 +57,31 @@ class NETCONFClient:
             logger.error(f"Configuration failed: {e}")
             return False
     
-    def get_interfaces(self) -> List[Dict]:
+    def replace_config(self, config: Dict) -> bool:
+        """Replace the campus-network configuration with the given one"""
+        try:
+            config_xml = self._dict_to_xml(config)
+            self.connection.edit_config(target='running', config=config_xml, default_operation='replace')
+            logger.info("Configuration replaced successfully")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Configuration replace failed: {e}")
+            return False
+    
+    def get_config(self) -> Dict:
+        """Get the running campus-network configuration as a dictionary"""
+        try:
+            filter_xml = """
+            <network xmlns="http://campus-ibn/ns/network"/>
+            """
+            reply = self.connection.get_config(source='running', filter=('subtree', filter_xml))
+            return self._parse_config(reply.xml)
+        except Exception as e:
+            logger.error(f"Failed to get running config: {e}")
+            return {}
+    
+    def get_interfaces(self) -> InterfaceTable:
         """Get current interface configurations"""
         try:
             filter_xml = """
@@ -66,8 +93,95 @@ class NETCONFClient:
             return self._parse_interfaces(reply.xml)
         except Exception as e:
             logger.error(f"Failed to get interfaces: {e}")
+            return InterfaceTable()
+    
+    def get_interface_counters(self) -> List[Dict]:
+        """Get interface oper-state and octet counters via NETCONF <get>"""
+        try:
+            filter_xml = """
+            <interfaces-state xmlns="urn:ietf:params:xml:ns:yang:ietf-interfaces">
+                <interface>
+                    <name/>
+                    <oper-status/>
+                    <speed/>
+                    <statistics>
+                        <in-octets/>
+                        <out-octets/>
+                    </statistics>
+                </interface>
+            </interfaces-state>
+            """
+            reply = self.connection.get(filter=('subtree', filter_xml))
+            return self._parse_interface_counters(reply.xml)
+        except Exception as e:
+            logger.error(f"Failed to get interface counters: {e}")
             return []
     
+    def _parse_interface_counters(self, xml_data: str) -> List[Dict]:
+        """Parse ietf-interfaces oper-state into counter records"""
+        counters = []
+        try:
+            root = ET.fromstring(xml_data.encode() if isinstance(xml_data, str) else xml_data)
+            for interface in root.iter():
+                if self._local_name(interface.tag) != "interface":
+                    continue
+                
+                values = {self._local_name(child.tag): child for child in interface.iter()}
+                name = values.get("name")
+                if name is None or not name.text:
+                    continue
+                
+                counters.append({
+                    "name": name.text,
+                    "oper_status": self._element_text(values.get("oper-status"), "down"),
+                    "speed": int(self._element_text(values.get("speed"), "0")),
+                    "in_octets": int(self._element_text(values.get("in-octets"), "0")),
+                    "out_octets": int(self._element_text(values.get("out-octets"), "0"))
+                })
+                
+        except Exception as e:
+            logger.error(f"Failed to parse interface counters: {e}")
+        
+        return counters
+    
+    @staticmethod
+    def _local_name(tag: str) -> str:
+        """Strip the XML namespace from an element tag"""
+        return tag.rsplit("}", 1)[-1]
+    
+    @staticmethod
+    def _element_text(element, default: str) -> str:
+        """Text of an element, or a default when missing/empty"""
+        if element is None or element.text is None:
+            return default
+        return element.text.strip()
+    
+    def _parse_config(self, xml_data: str) -> Dict:
+        """Parse a get-config reply into the dictionary shape accepted by send_config"""
+        root = ET.fromstring(xml_data.encode() if isinstance(xml_data, str) else xml_data)
+        for element in root.iter():
+            if self._local_name(element.tag) == "network":
+                return {"network": self._element_to_dict(element)}
+        return {}
+    
+    def _element_to_dict(self, element):
+        """Inverse of _build_xml: repeated child tags become lists, leaves become text"""
+        children = list(element)
+        if not children:
+            return self._element_text(element, "")
+        
+        result = {}
+        for child in children:
+            key = self._local_name(child.tag)
+            value = self._element_to_dict(child)
+            if key not in result:
+                result[key] = value
+            elif isinstance(result[key], list):
+                result[key].append(value)
+            else:
+                result[key] = [result[key], value]
+        return result
+    
     def _dict_to_xml(self, config: Dict) -> str:
         """Convert dictionary configuration to XML"""
         # Simplified XML conversion - in practice, use proper YANG to XML mapping
@@ -89,13 +203,15 @@ class NETCONFClient:
                 else:
                     elem = ET.SubElement(parent, key)
                     self._build_xml(elem, value)
-        else:
+        elif isinstance(data, bool):
+            # YANG boolean literals
+            parent.text = 'true' if data else 'false'
+        elif data is not None:
             parent.text = str(data)
     
-    def _parse_interfaces(self, xml_data: str) -> List[Dict]:
-        """Parse interface information from XML response"""
-        # Implement XML to dictionary parsing
-        interfaces = []
+    def _parse_interfaces(self, xml_data: str) -> InterfaceTable:
+        """Parse interface information from XML response into a columnar table"""
+        interfaces = {}
         try:
             dom = xml.dom.minidom.parseString(xml_data)
             interface_nodes = dom.getElementsByTagName("interface")
@@ -106,17 +222,17 @@ class NETCONFClient:
                 speed = self._get_text_value(interface, "speed")
                 
                 if name:
-                    interfaces.append({
+                    interfaces[name] = {
                         "name": name,
                         "ip_address": ip,
                         "speed": speed,
                         "status": "up"
-                    })
+                    }
                     
         except Exception as e:
             logger.error(f"Failed to parse interfaces: {e}")
         
-        return interfaces
+        return InterfaceTable.from_records(interfaces.values())
     
     def _get_text_value(self, parent, tag_name: str) -> str:
         """Extract text value from XML element"""
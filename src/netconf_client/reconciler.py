@@ -0,0 +1,397 @@
+"""
+Drift reconciler - Merkle-hashed config comparison with sharded, rate-limited device sweeps
+"""
+import copy
+import hashlib
+import logging
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _named(items: list) -> bool:
+    """Lists of dicts with unique 'name' keys are keyed like YANG lists"""
+    if not items or not all(isinstance(item, dict) and 'name' in item for item in items):
+        return False
+    return len({str(item['name']) for item in items}) == len(items)
+
+
+def normalize_config(config):
+    """Config in the shape a device reads it back as (see NETCONFClient._element_to_dict).
+
+    Leaves become their XML text (YANG booleans, None as empty), empty
+    lists disappear and a one-entry list becomes that entry, because
+    repeated elements are the only thing that parses back as a list. Both
+    the intended and the running config are normalized before hashing.
+    """
+    if isinstance(config, dict):
+        normalized = {}
+        for key, value in config.items():
+            if isinstance(value, list):
+                items = [normalize_config(item) for item in value]
+                if not items:
+                    continue
+                value = items[0] if len(items) == 1 else items
+            else:
+                value = normalize_config(value)
+            normalized[str(key)] = value
+        return normalized
+    if isinstance(config, list):
+        return [normalize_config(item) for item in config]
+    if isinstance(config, bool):
+        return 'true' if config else 'false'
+    return '' if config is None else str(config)
+
+
+def merkle_tree(config) -> Dict:
+    """Hash tree over a config: every dict key and named list entry gets its own subtree hash.
+
+    Leaves hash their string form, so values read back from device XML
+    compare equal to the typed values in the intended config. Positional
+    lists are hashed as a whole and are compared and pushed as one unit.
+    """
+    if isinstance(config, dict):
+        children = {str(key): merkle_tree(value) for key, value in config.items()}
+        kind = 'dict'
+    elif isinstance(config, list) and _named(config):
+        children = {str(item['name']): merkle_tree(item) for item in config}
+        kind = 'named'
+    elif isinstance(config, list):
+        children = {str(index): merkle_tree(item) for index, item in enumerate(config)}
+        kind = 'list'
+    else:
+        return {'hash': _digest(b'v' + str(config).encode('utf-8')), 'kind': 'leaf'}
+
+    hasher = hashlib.blake2b(kind.encode(), digest_size=16)
+    for key in sorted(children):
+        hasher.update(key.encode('utf-8'))
+        hasher.update(children[key]['hash'])
+    return {'hash': hasher.digest(), 'kind': kind, 'children': children}
+
+
+def diff_trees(desired: Dict, running: Optional[Dict], path: tuple = ()):
+    """Paths where the running tree differs from the desired one.
+
+    Returns ``(changed, removed)``: ``changed`` paths exist in the desired
+    config and can be pushed as a merge; ``removed`` paths exist only on
+    the device. Matching subtree hashes are never descended into.
+    """
+    if running is not None and running['hash'] == desired['hash']:
+        return [], []
+    if (running is None or running['kind'] != desired['kind']
+            or desired['kind'] in ('leaf', 'list')):
+        return [path], []
+
+    changed, removed = [], []
+    running_children = running['children']
+    for key, child in desired['children'].items():
+        child_changed, child_removed = diff_trees(child, running_children.get(key), path + (key,))
+        changed.extend(child_changed)
+        removed.extend(child_removed)
+    removed.extend(path + (key,) for key in running_children if key not in desired['children'])
+    return changed, removed
+
+
+def _find_named(items: list, name: str):
+    return next((item for item in items if str(item['name']) == name), None)
+
+
+def _graft(target, source, path: tuple):
+    """Copy the subtree at ``path`` from ``source`` into ``target``, creating parents"""
+    key, rest = path[0], path[1:]
+    if isinstance(source, dict):
+        child = next(value for source_key, value in source.items() if str(source_key) == key)
+        if not rest:
+            target[key] = copy.deepcopy(child)
+            return
+        if key not in target:
+            target[key] = {} if isinstance(child, dict) else []
+        _graft(target[key], child, rest)
+        return
+
+    child = _find_named(source, key)
+    existing = _find_named(target, key)
+    if not rest:
+        if existing is not None:
+            target.remove(existing)
+        target.append(copy.deepcopy(child))
+        return
+    if existing is None:
+        existing = {'name': child['name']}
+        target.append(existing)
+    _graft(existing, child, rest)
+
+
+def _source_path(source, path: tuple) -> tuple:
+    """A path of the normalized tree, cut to where it still addresses ``source``.
+
+    A one-entry list normalizes to that entry, so the keys below it name
+    the entry's fields rather than list entries; such a list is patched whole.
+    """
+    resolved = []
+    for key in path:
+        if isinstance(source, list):
+            if len(source) == 1 or not _named(source):
+                break
+            source = _find_named(source, key)
+        else:
+            source = next(value for source_key, value in source.items() if str(source_key) == key)
+        resolved.append(key)
+    return tuple(resolved)
+
+
+def build_patch(desired: Dict, paths: List[tuple]) -> Dict:
+    """Partial config holding only the given subtrees of ``desired``.
+
+    ``desired`` is the intended config as given, not its normalized form,
+    so the pushed values keep their types and list shapes.
+    """
+    patch = {}
+    for path in paths:
+        path = _source_path(desired, path)
+        if path:
+            _graft(patch, desired, path)
+    return patch
+
+
+def merge_config(target: Dict, patch: Dict) -> Dict:
+    """NETCONF-style merge: containers merge recursively, named list entries merge by name"""
+    for key, value in patch.items():
+        current = target.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            merge_config(current, value)
+        elif isinstance(value, list) and isinstance(current, list) and _named(value) and _named(current):
+            for item in value:
+                existing = _find_named(current, str(item['name']))
+                if existing is None:
+                    current.append(copy.deepcopy(item))
+                else:
+                    merge_config(existing, item)
+        else:
+            target[key] = copy.deepcopy(value)
+    return target
+
+
+def format_path(path: tuple) -> str:
+    return '/'.join(path)
+
+
+class _RateLimiter:
+    """Blocking token bucket shared by all reconciler workers"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop: threading.Event) -> bool:
+        """Wait for a token; returns False if ``stop`` is set first"""
+        while not stop.is_set():
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            stop.wait(wait)
+        return False
+
+
+class DriftReconciler:
+    """Periodically compares each device's running config with its intended config.
+
+    Devices are sharded across ``workers`` by a stable hash and each shard
+    is handled sequentially, so no device sees more than one request at a
+    time and total concurrency is bounded by the worker count. Config
+    fetches also share a token bucket (``fetch_rate`` per second) and a
+    device is not re-fetched within ``min_device_interval`` seconds.
+
+    Both sides are normalized to the device's read-back schema first.
+    Intended configs are hashed once per distinct config, so a device in
+    sync costs one fetch, one hash pass and a root-hash comparison. Drifted
+    devices get only the drifted subtrees pushed as a merge; if the device
+    has entries the intent does not (which a merge cannot remove), the
+    intended sections are pushed with ``replace_config``.
+    """
+
+    def __init__(self, devices: Dict, desired_config: Callable[[str], Optional[Dict]],
+                 workers: int = 16, fetch_rate: float = 50.0, burst: int = 16,
+                 min_device_interval: float = 60.0, interval: float = 300.0, repair: bool = True):
+        self.devices = devices
+        self.desired_config = desired_config
+        self.workers = workers
+        self.min_device_interval = min_device_interval
+        self.interval = interval
+        self.repair = repair
+
+        self.results: Dict[str, Dict] = {}
+        self.last_sweep: Optional[Dict] = None
+        self.subscribers: List[Callable[[Dict], None]] = []
+        self.sweep_subscribers: List[Callable[[List[Dict]], None]] = []
+
+        self._limiter = _RateLimiter(fetch_rate, burst)
+        self._trees: Dict[int, tuple] = {}
+        self._trees_lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Callable[[Dict], None]):
+        """Receive each per-device result"""
+        self.subscribers.append(callback)
+
+    def subscribe_sweep(self, callback: Callable[[List[Dict]], None]):
+        """Receive all per-device results of a sweep at once, after it finishes"""
+        self.sweep_subscribers.append(callback)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='drift-reconciler', daemon=True)
+        self._thread.start()
+        logger.info(f"Drift reconciler started ({self.workers} workers, every {self.interval}s)")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Drift sweep failed: {e}")
+
+    def shard_of(self, device_id: str) -> int:
+        return zlib.crc32(device_id.encode('utf-8')) % self.workers
+
+    def sweep(self, force: bool = False) -> Dict:
+        """Check every device once; returns a summary of the sweep"""
+        with self._sweep_lock:
+            started = time.perf_counter()
+            shards = [[] for _ in range(self.workers)]
+            for device_id in list(self.devices):
+                shards[self.shard_of(device_id)].append(device_id)
+
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='reconcile') as pool:
+                for shard in shards:
+                    if shard:
+                        pool.submit(self._run_shard, shard, force)
+
+            summary = {'devices': 0, 'in_sync': 0, 'repaired': 0, 'drifted': 0,
+                       'failed': 0, 'skipped': 0, 'unmanaged': 0}
+            results = []
+            for shard in shards:
+                for device_id in shard:
+                    result = self.results.get(device_id)
+                    if result is not None:
+                        results.append(result)
+                        summary['devices'] += 1
+                        summary[result['status']] += 1
+            summary['duration'] = round(time.perf_counter() - started, 3)
+            self.last_sweep = summary
+            with self._trees_lock:
+                self._trees.clear()
+        logger.info(f"Drift sweep: {summary}")
+        for callback in self.sweep_subscribers:
+            try:
+                callback(results)
+            except Exception as e:
+                logger.error(f"Reconciler sweep subscriber error: {e}")
+        return summary
+
+    def _run_shard(self, shard: List[str], force: bool):
+        for device_id in shard:
+            if self._stop.is_set():
+                return
+            try:
+                self.reconcile_device(device_id, force)
+            except Exception as e:
+                logger.error(f"Reconcile of {device_id} failed: {e}")
+                self._record(device_id, 'failed', error=str(e))
+
+    def _desired_tree(self, desired: Dict) -> tuple:
+        """Normalized intended config and its Merkle tree, shared by devices with the same intent"""
+        key = id(desired)
+        with self._trees_lock:
+            cached = self._trees.get(key)
+            if cached is not None and cached[0] is desired:
+                return cached[1], cached[2]
+        normalized = normalize_config(desired)
+        tree = merkle_tree(normalized)
+        with self._trees_lock:
+            self._trees[key] = (desired, normalized, tree)
+        return normalized, tree
+
+    def reconcile_device(self, device_id: str, force: bool = False) -> Dict:
+        """Compare one device with its intent and repair drifted subtrees"""
+        client = self.devices.get(device_id)
+        desired = self.desired_config(device_id)
+        if client is None or not desired:
+            return self._record(device_id, 'unmanaged')
+
+        previous = self.results.get(device_id)
+        if (not force and previous is not None and previous['status'] != 'failed'
+                and time.time() - previous['checked_at'] < self.min_device_interval):
+            return self._record(device_id, 'skipped', paths=previous['paths'])
+
+        if not self._limiter.acquire(self._stop):
+            return self._record(device_id, 'skipped')
+        running = client.get_config() or {}
+        # Only the sections we intend are compared; other device state is not ours
+        running_tree = merkle_tree(normalize_config({key: running[key] for key in desired if key in running}))
+        # The normalized form is only for comparing; devices get the intended config as given
+        _, desired_tree = self._desired_tree(desired)
+        if running_tree['hash'] == desired_tree['hash']:
+            return self._record(device_id, 'in_sync')
+
+        changed, removed = diff_trees(desired_tree, running_tree)
+        paths = [format_path(path) for path in changed + removed]
+        if not self.repair:
+            return self._record(device_id, 'drifted', paths=paths)
+
+        if removed:
+            pushed = client.replace_config(desired)
+        else:
+            pushed = client.send_config(build_patch(desired, changed))
+        if not pushed:
+            return self._record(device_id, 'failed', paths=paths, error='push rejected')
+        return self._record(device_id, 'repaired', paths=paths)
+
+    def _record(self, device_id: str, status: str, paths: Optional[List[str]] = None,
+                error: Optional[str] = None) -> Dict:
+        result = {
+            'device': device_id,
+            'status': status,
+            'paths': paths or [],
+            'checked_at': time.time()
+        }
+        if error:
+            result['error'] = error
+        if status == 'skipped' and device_id in self.results:
+            # Keep the time of the last real check so the cooldown does not slide
+            result['checked_at'] = self.results[device_id]['checked_at']
+        self.results[device_id] = result
+        if status in ('repaired', 'drifted'):
+            logger.info(f"Config drift on {device_id}: {len(result['paths'])} subtrees ({status})")
+        for callback in self.subscribers:
+            try:
+                callback(result)
+            except Exception as e:
+                logger.error(f"Reconciler subscriber error: {e}")
+        return result
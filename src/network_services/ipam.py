@@ -0,0 +1,392 @@
+"""
+DHCP/IPAM address pools - one bitmap per subnet, free-run hints, timer-wheel lease expiry and snapshots
+"""
+import ipaddress
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 86400
+SNAPSHOT_VERSION = 1
+
+# First byte of the bitmap with at least one free address (a clear bit)
+_NOT_FULL = re.compile(b'[^\xff]')
+# Index of the lowest clear bit of each byte value
+_FIRST_FREE_BIT = bytes(next((bit for bit in range(8) if not value >> bit & 1), 8) for value in range(256))
+
+
+def _format_address(value: int) -> str:
+    return f'{value >> 24}.{value >> 16 & 255}.{value >> 8 & 255}.{value & 255}'
+
+
+def _parse_address(value: str) -> int:
+    return int(ipaddress.IPv4Address(value.strip()))
+
+
+def parse_dhcp_range(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """'192.168.100.100-192.168.100.200' -> (first, last); raises ValueError"""
+    if not value:
+        return None
+    first, _, last = str(value).partition('-')
+    try:
+        if _parse_address(first) > _parse_address(last):
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"dhcp_range must look like first-last, got {value!r}") from None
+    return first.strip(), last.strip()
+
+
+class TimerWheel:
+    """Hashed timing wheel: O(1) scheduling, due entries drained one tick slot at a time.
+
+    Entries are never cancelled; the consumer checks whether an entry it
+    gets back is still current (e.g. the lease was not renewed since).
+    Deadlines more than ``slots`` ticks ahead stay in their slot for
+    another turn of the wheel, so size it to cover the usual lease time.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 1 << 17, now: Optional[float] = None):
+        self.tick = tick
+        self.slots = slots
+        # Only slots holding entries exist, so a wheel sized for day-long leases costs nothing when idle
+        self._wheel: Dict[int, List[Tuple[int, object]]] = {}
+        self._current = int((time.time() if now is None else now) // tick)
+        self.pending = 0
+
+    def schedule(self, item, deadline: float):
+        tick = max(int(deadline // self.tick), self._current + 1)
+        bucket = self._wheel.get(tick % self.slots)
+        if bucket is None:
+            bucket = self._wheel[tick % self.slots] = []
+        bucket.append((tick, item))
+        self.pending += 1
+
+    def advance(self, now: float) -> List:
+        """Items whose deadline has passed by ``now``"""
+        target = int(now // self.tick)
+        if target <= self._current:
+            return []
+        due = []
+        first = self._current + 1 if target - self._current < self.slots else target - self.slots + 1
+        for tick in range(first, target + 1):
+            slot = tick % self.slots
+            bucket = self._wheel.get(slot)
+            if bucket is None:
+                continue
+            keep = [entry for entry in bucket if entry[0] > target]
+            if len(keep) != len(bucket):
+                due.extend(item for entry_tick, item in bucket if entry_tick <= target)
+                if keep:
+                    self._wheel[slot] = keep
+                else:
+                    del self._wheel[slot]
+        self._current = target
+        self.pending -= len(due)
+        return due
+
+
+class SubnetPool:
+    """Dynamic addresses of one subnet as a bitmap (set bit = leased or reserved).
+
+    Allocation first tries the free-run index, a stack of bitmap bytes
+    (runs of 8 addresses) that gained a free address on release, then
+    scans forward from a next-fit cursor with a compiled byte pattern.
+    Both are O(1) amortized; within a byte the free bit comes from a
+    256-entry table.
+    """
+
+    def __init__(self, name: str, network: str, vlan: Optional[int] = None, gateway: Optional[str] = None,
+                 first: Optional[str] = None, last: Optional[str] = None):
+        subnet = ipaddress.IPv4Network(network, strict=False)
+        self.name = name
+        self.network = str(subnet)
+        self.vlan = vlan
+        self.gateway = gateway
+        hosts_first = int(subnet.network_address) + (1 if subnet.prefixlen < 31 else 0)
+        hosts_last = int(subnet.broadcast_address) - (1 if subnet.prefixlen < 31 else 0)
+        self.first = max(_parse_address(first), hosts_first) if first else hosts_first
+        self.last = min(_parse_address(last), hosts_last) if last else hosts_last
+        if self.first > self.last:
+            raise ValueError(f"Pool {name}: range {first}-{last} is outside {self.network}")
+        self.size = self.last - self.first + 1
+
+        self._bitmap = bytearray((self.size + 7) // 8)
+        # Bits past the end of the range are permanently taken
+        for offset in range(self.size, len(self._bitmap) * 8):
+            self._bitmap[offset >> 3] |= 1 << (offset & 7)
+        self.reserved = 0
+        if gateway:
+            self.reserve(_parse_address(gateway))
+        self._free_runs: List[int] = []
+        self._cursor = 0
+        # offset -> [client, expiry]; client -> offset
+        self.leases: Dict[int, list] = {}
+        self.clients: Dict[str, int] = {}
+
+    @property
+    def free(self) -> int:
+        return self.size - self.reserved - len(self.leases)
+
+    def contains(self, address: int) -> bool:
+        return self.first <= address <= self.last
+
+    def reserve(self, address: int):
+        """Exclude a static address (gateway, servers) from allocation"""
+        if self.contains(address):
+            offset = address - self.first
+            if not self._bitmap[offset >> 3] >> (offset & 7) & 1:
+                self._bitmap[offset >> 3] |= 1 << (offset & 7)
+                self.reserved += 1
+
+    def allocate(self, client: str, expiry: float) -> Optional[int]:
+        """Lease a free address to ``client``; returns its offset, or None if the pool is full"""
+        bitmap = self._bitmap
+        runs = self._free_runs
+        while runs and bitmap[runs[-1]] == 0xFF:
+            runs.pop()
+        if runs:
+            byte = runs[-1]
+        else:
+            match = _NOT_FULL.search(bitmap, self._cursor) or _NOT_FULL.search(bitmap, 0, self._cursor)
+            if match is None:
+                return None
+            byte = self._cursor = match.start()
+        value = bitmap[byte]
+        bit = _FIRST_FREE_BIT[value]
+        bitmap[byte] = value | 1 << bit
+        offset = byte << 3 | bit
+        self.leases[offset] = [client, expiry]
+        self.clients[client] = offset
+        return offset
+
+    def claim(self, offset: int, client: str, expiry: float) -> bool:
+        """Lease a specific offset (restoring a snapshot); False if it is taken"""
+        if not 0 <= offset < self.size or self._bitmap[offset >> 3] >> (offset & 7) & 1 or client in self.clients:
+            return False
+        self._bitmap[offset >> 3] |= 1 << (offset & 7)
+        self.leases[offset] = [client, expiry]
+        self.clients[client] = offset
+        return True
+
+    def release(self, offset: int) -> Optional[str]:
+        """Free a leased offset; returns the client that held it"""
+        lease = self.leases.pop(offset, None)
+        if lease is None:
+            return None
+        del self.clients[lease[0]]
+        byte = offset >> 3
+        if self._bitmap[byte] == 0xFF:
+            self._free_runs.append(byte)
+        self._bitmap[byte] &= ~(1 << (offset & 7)) & 0xFF
+        return lease[0]
+
+    def lease_dict(self, offset: int) -> Dict:
+        client, expiry = self.leases[offset]
+        return {'client_id': client, 'address': _format_address(self.first + offset), 'pool': self.name,
+                'vlan': self.vlan, 'gateway': self.gateway, 'expires': expiry}
+
+    def stats(self) -> Dict:
+        return {
+            'network': self.network,
+            'range': f'{_format_address(self.first)}-{_format_address(self.last)}',
+            'vlan': self.vlan,
+            'size': self.size,
+            'leased': len(self.leases),
+            'reserved': self.reserved,
+            'free': self.free,
+            'bitmap_bytes': len(self._bitmap)
+        }
+
+
+class IpamService:
+    """DHCP lease service over the campus network ranges.
+
+    One SubnetPool per range; leases expire through a shared TimerWheel
+    (checked on every call, so no sweeper thread is needed) and the lease
+    table is snapshotted to ``path`` as JSON, atomically replaced.
+    """
+
+    def __init__(self, path: Optional[Path] = None, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 tick: float = 1.0, clock=time.time):
+        self.path = Path(path) if path else None
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        self.enabled = True
+        self.pools: Dict[str, SubnetPool] = {}
+        self._by_vlan: Dict[int, SubnetPool] = {}
+        self._wheel = TimerWheel(tick, now=clock())
+        self._lock = threading.Lock()
+        self.counters = {'allocated': 0, 'renewed': 0, 'released': 0, 'expired': 0, 'exhausted': 0}
+        self.dirty = False
+
+    def configure(self, network_ranges: Iterable[Dict], network_services: Optional[Dict] = None):
+        """(Re)build pools from the network ranges, keeping leases that still fit.
+
+        ``network_services['dhcp_range']`` ('first-last') narrows the pool of
+        the range that contains it; ``dhcp_enabled`` false stops new leases.
+        """
+        network_services = network_services or {}
+        first, last = parse_dhcp_range(network_services.get('dhcp_range')) or (None, None)
+
+        pools = {}
+        for network_range in network_ranges:
+            try:
+                subnet = ipaddress.IPv4Network(network_range['range'], strict=False)
+            except ValueError:
+                logger.warning(f"Skipping DHCP pool for invalid range {network_range.get('range')!r}")
+                continue
+            narrowed = first is not None and ipaddress.IPv4Address(first) in subnet
+            pool = SubnetPool(network_range['name'], str(subnet), network_range.get('vlan'),
+                              network_range.get('gateway'),
+                              first if narrowed else None, last if narrowed else None)
+            pools[pool.name] = pool
+
+        with self._lock:
+            leases = self._lease_records()
+            self.enabled = network_services.get('dhcp_enabled', True)
+            self.pools = pools
+            self._by_vlan = {pool.vlan: pool for pool in pools.values() if pool.vlan is not None}
+            restored = self._restore(leases, self.clock())
+            self.dirty = True
+        logger.info(f"Configured {len(pools)} DHCP pools ({sum(pool.size for pool in pools.values())} addresses, "
+                    f"{restored}/{len(leases)} leases kept)")
+
+    # -- lease operations -------------------------------------------------
+
+    def request(self, client_id: str, pool: Optional[str] = None, vlan: Optional[int] = None) -> Optional[Dict]:
+        """DHCP request: renew the client's lease or allocate one; None if the pool is exhausted"""
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            subnet = self._pool(pool, vlan)
+            expiry = now + self.lease_seconds
+            offset = subnet.clients.get(client_id)
+            if offset is not None:
+                subnet.leases[offset][1] = expiry
+                self.counters['renewed'] += 1
+            else:
+                if not self.enabled:
+                    raise ValueError("DHCP service is disabled")
+                offset = subnet.allocate(client_id, expiry)
+                if offset is None:
+                    self.counters['exhausted'] += 1
+                    return None
+                self.counters['allocated'] += 1
+            self._wheel.schedule((subnet, offset, expiry), expiry)
+            self.dirty = True
+            return subnet.lease_dict(offset)
+
+    def release(self, client_id: str, pool: Optional[str] = None, vlan: Optional[int] = None) -> bool:
+        """DHCP release; False if the client holds no lease in the pool"""
+        with self._lock:
+            self._expire(self.clock())
+            subnet = self._pool(pool, vlan)
+            offset = subnet.clients.get(client_id)
+            if offset is None:
+                return False
+            subnet.release(offset)
+            self.counters['released'] += 1
+            self.dirty = True
+            return True
+
+    def expire(self) -> int:
+        """Release every lease past its expiry; returns how many"""
+        with self._lock:
+            return self._expire(self.clock())
+
+    def _expire(self, now: float) -> int:
+        expired = 0
+        for subnet, offset, expiry in self._wheel.advance(now):
+            lease = subnet.leases.get(offset)
+            # Renewed or released since this entry was scheduled
+            if lease is not None and lease[1] == expiry and self.pools.get(subnet.name) is subnet:
+                subnet.release(offset)
+                expired += 1
+        if expired:
+            self.counters['expired'] += expired
+            self.dirty = True
+        return expired
+
+    def _pool(self, name: Optional[str], vlan: Optional[int]) -> SubnetPool:
+        if name is not None:
+            subnet = self.pools.get(name)
+        elif vlan is not None:
+            subnet = self._by_vlan.get(int(vlan))
+        elif len(self.pools) == 1:
+            subnet = next(iter(self.pools.values()))
+        else:
+            raise ValueError("Specify the pool name or VLAN")
+        if subnet is None:
+            raise ValueError(f"No DHCP pool for {name if name is not None else f'VLAN {vlan}'}")
+        return subnet
+
+    # -- snapshots --------------------------------------------------------
+
+    def _lease_records(self) -> List[Tuple[str, int, str, float]]:
+        return [(subnet.name, subnet.first + offset, client, expiry)
+                for subnet in self.pools.values() for offset, (client, expiry) in subnet.leases.items()]
+
+    def _restore(self, leases: Iterable[Tuple[str, int, str, float]], now: float) -> int:
+        restored = 0
+        for name, address, client, expiry in leases:
+            subnet = self.pools.get(name)
+            if subnet is None or expiry <= now or not subnet.contains(address):
+                continue
+            if subnet.claim(address - subnet.first, client, expiry):
+                self._wheel.schedule((subnet, address - subnet.first, expiry), expiry)
+                restored += 1
+        return restored
+
+    def save(self) -> bool:
+        """Write the lease table to ``path`` if it changed since the last save"""
+        if self.path is None:
+            return False
+        with self._lock:
+            if not self.dirty:
+                return False
+            snapshot = {'version': SNAPSHOT_VERSION, 'saved_at': self.clock(), 'leases': self._lease_records()}
+            self.dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix('.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        logger.debug(f"Saved {len(snapshot['leases'])} DHCP leases to {self.path}")
+        return True
+
+    def load(self) -> int:
+        """Restore unexpired leases from the last snapshot into the configured pools"""
+        if self.path is None or not self.path.exists():
+            return 0
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read DHCP lease snapshot {self.path}: {e}")
+            return 0
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            logger.warning(f"Ignoring DHCP lease snapshot version {snapshot.get('version')}")
+            return 0
+        with self._lock:
+            restored = self._restore(map(tuple, snapshot['leases']), self.clock())
+        logger.info(f"Restored {restored}/{len(snapshot['leases'])} DHCP leases from {self.path}")
+        return restored
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'lease_seconds': self.lease_seconds,
+                'pools': {name: subnet.stats() for name, subnet in self.pools.items()},
+                'timer_entries': self._wheel.pending,
+                'counters': dict(self.counters)
+            }
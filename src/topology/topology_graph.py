@@ -0,0 +1,427 @@
+"""
+Topology graph - devices, ports, links and VLAN membership with precomputed failure impact
+"""
+import bisect
+import logging
+import multiprocessing
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Scenarios that need a graph search go to worker processes once there are this many
+PARALLEL_THRESHOLD = 256
+# Devices listed per impact (the count is always exact)
+MAX_LISTED_DEVICES = 100
+
+Interval = Tuple[int, int]
+
+
+def port_key(device: str, interface: str) -> str:
+    return f'{device}:{interface}'
+
+
+def _merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        elif start < end:
+            merged.append((start, end))
+    return merged
+
+
+def _runs(positions: Iterable[int]) -> List[Interval]:
+    """Sorted positions -> intervals of consecutive positions"""
+    runs: List[Interval] = []
+    for position in positions:
+        if runs and runs[-1][1] == position:
+            runs[-1] = (runs[-1][0], position + 1)
+        else:
+            runs.append((position, position + 1))
+    return runs
+
+
+class TopologyGraph:
+    """Campus topology rooted at the core, with what-breaks answers precomputed.
+
+    On build, an iterative DFS from the root numbers devices in Euler order,
+    so every DFS subtree is one contiguous position range. Low-links give
+    the bridges (links whose loss cuts off a subtree) and articulation
+    points. Each non-tree link gets a random 64-bit label and every tree
+    link the XOR of the labels of the non-tree links spanning it, so two
+    links form a cut exactly when their labels are equal (false positives
+    ~2^-64). Single and double link failures and single device failures
+    are then answered from these arrays without searching the graph;
+    other scenarios fall back to a BFS.
+    """
+
+    def __init__(self, root: str, devices: Dict[str, Iterable[Dict]], links: Iterable[Tuple[str, str]],
+                 ranges_by_vlan: Optional[Dict[int, List[str]]] = None, seed: Optional[int] = None):
+        if root not in devices:
+            raise ValueError(f"Topology root {root!r} is not a known device")
+        self.root_name = root
+        self.ranges_by_vlan = ranges_by_vlan or {}
+        self.device_names: List[str] = list(devices)
+        self.device_index = {name: index for index, name in enumerate(self.device_names)}
+        # port -> (device index, vlan)
+        self.ports: Dict[str, Tuple[int, Optional[int]]] = {}
+        self._bare_names: Dict[str, List[str]] = {}
+        for device, interfaces in devices.items():
+            for interface in interfaces:
+                self._add_port(device, interface['name'], interface.get('vlan'))
+
+        # Links as (device a, device b, port a, port b); a port carries at most one link
+        self.edges: List[Tuple[int, int, str, str]] = []
+        self.link_of_port: Dict[str, int] = {}
+        self.adjacency: List[List[Tuple[int, int]]] = [[] for _ in self.device_names]
+        for end_a, end_b in links:
+            self._add_link(end_a, end_b)
+
+        self._build(random.Random(seed))
+        self._impacts: Dict[Tuple[str, ...], Dict] = {}
+
+    def _add_port(self, device: str, interface: str, vlan) -> str:
+        key = port_key(device, interface)
+        if key not in self.ports:
+            self.ports[key] = (self.device_index[device], int(vlan) if vlan else None)
+            self._bare_names.setdefault(interface, []).append(key)
+        return key
+
+    def _add_link(self, end_a: str, end_b: str):
+        ports = []
+        for end in (end_a, end_b):
+            device, _, interface = end.partition(':')
+            if device not in self.device_index or not interface:
+                raise ValueError(f"Link end {end!r} must be device:interface on a known device")
+            ports.append(self._add_port(device, interface, None))
+        a, b = (self.ports[port][0] for port in ports)
+        if a == b:
+            raise ValueError(f"Link {end_a} - {end_b} loops back to the same device")
+        edge = len(self.edges)
+        for port in ports:
+            if port in self.link_of_port:
+                raise ValueError(f"Port {port} is already linked")
+            self.link_of_port[port] = edge
+        self.edges.append((a, b, ports[0], ports[1]))
+        self.adjacency[a].append((b, edge))
+        self.adjacency[b].append((a, edge))
+
+    def _build(self, rng: random.Random):
+        count = len(self.device_names)
+        root = self.root = self.device_index[self.root_name]
+        tin = [-1] * count
+        low = [0] * count
+        parent_edge = [-1] * count
+        order: List[int] = []
+        tree_edges: Set[int] = set()
+
+        # Iterative DFS: (node, next adjacency index)
+        tin[root] = 0
+        order.append(root)
+        stack = [(root, 0)]
+        while stack:
+            node, index = stack[-1]
+            if index < len(self.adjacency[node]):
+                stack[-1] = (node, index + 1)
+                neighbor, edge = self.adjacency[node][index]
+                if edge == parent_edge[node]:
+                    continue
+                if tin[neighbor] < 0:
+                    tin[neighbor] = low[neighbor] = len(order)
+                    order.append(neighbor)
+                    parent_edge[neighbor] = edge
+                    tree_edges.add(edge)
+                    stack.append((neighbor, 0))
+                else:
+                    low[node] = min(low[node], tin[neighbor])
+            else:
+                stack.pop()
+                if stack:
+                    parent = stack[-1][0]
+                    low[parent] = min(low[parent], low[node])
+
+        reached = len(order)
+        tout = [0] * count
+        subtree_end = [position + 1 for position in range(reached)]
+        for position in range(reached - 1, 0, -1):
+            node = order[position]
+            parent = self._parent(node, parent_edge)
+            subtree_end[tin[parent]] = max(subtree_end[tin[parent]], subtree_end[position])
+        for position, node in enumerate(order):
+            tout[node] = subtree_end[position]
+
+        # XOR labels: non-tree links get random labels, tree links the XOR over the subtree below them
+        edge_label = [0] * len(self.edges)
+        node_xor = [0] * count
+        for edge, (a, b, _, _) in enumerate(self.edges):
+            if edge not in tree_edges and tin[a] >= 0 and tin[b] >= 0:
+                label = edge_label[edge] = rng.getrandbits(64) or 1
+                node_xor[a] ^= label
+                node_xor[b] ^= label
+        for position in range(reached - 1, 0, -1):
+            node = order[position]
+            edge_label[parent_edge[node]] = node_xor[node]
+            node_xor[self._parent(node, parent_edge)] ^= node_xor[node]
+
+        self.tin, self.tout, self.order = tin, tout, order
+        self.parent_edge, self.tree_edges, self.edge_label = parent_edge, tree_edges, edge_label
+        self.unreachable = [name for name, position in zip(self.device_names, tin) if position < 0]
+        self.bridges = {edge for edge in tree_edges if low[self._child(edge)] > tin[self._parent(self._child(edge), parent_edge)]}
+        # Device -> DFS children whose subtree is cut off when the device fails
+        self.cut_children: Dict[int, List[int]] = {}
+        for node in order[1:]:
+            parent = self._parent(node, parent_edge)
+            if parent == root or low[node] >= tin[parent]:
+                self.cut_children.setdefault(parent, []).append(node)
+        self.articulation_points = {node for node, children in self.cut_children.items()
+                                    if node != root or len(children) > 1}
+
+        # Edge (host-facing) ports per Euler position, and where each VLAN has them
+        edge_ports = [0] * (reached + 1)
+        self.vlan_positions: Dict[int, List[int]] = {}
+        self.position_vlans: List[Dict[int, int]] = [{} for _ in range(reached)]
+        for port, (device, vlan) in self.ports.items():
+            if port in self.link_of_port or tin[device] < 0:
+                continue
+            edge_ports[tin[device] + 1] += 1
+            if vlan is not None:
+                self.vlan_positions.setdefault(vlan, []).append(tin[device])
+                vlans = self.position_vlans[tin[device]]
+                vlans[vlan] = vlans.get(vlan, 0) + 1
+        for position in range(reached):
+            edge_ports[position + 1] += edge_ports[position]
+        self.edge_port_prefix = edge_ports
+        for positions in self.vlan_positions.values():
+            positions.sort()
+
+    def _parent(self, node: int, parent_edge: Sequence[int]) -> int:
+        a, b, _, _ = self.edges[parent_edge[node]]
+        return b if a == node else a
+
+    def _child(self, edge: int) -> int:
+        """Lower end of a tree link"""
+        a, b, _, _ = self.edges[edge]
+        return a if self.parent_edge[a] == edge else b
+
+    def _subtree(self, node: int) -> Interval:
+        return self.tin[node], self.tout[node]
+
+    # -- queries ----------------------------------------------------------
+
+    def summary(self) -> Dict:
+        return {
+            'root': self.root_name,
+            'devices': len(self.device_names),
+            'unreachable_devices': self.unreachable,
+            'links': len(self.edges),
+            'ports': len(self.ports),
+            'edge_ports': self.edge_port_prefix[-1],
+            'vlans': len(self.vlan_positions),
+            'bridges': sorted(f'{self.edges[edge][2]} - {self.edges[edge][3]}' for edge in self.bridges),
+            'articulation_points': sorted(self.device_names[node] for node in self.articulation_points)
+        }
+
+    def port_of(self, interface: str) -> Optional[str]:
+        """Canonical device:interface key for ``interface`` (bare names must be unique)"""
+        if interface in self.ports:
+            return interface
+        matches = self._bare_names.get(interface, [])
+        return matches[0] if len(matches) == 1 else None
+
+    def resolve(self, failure: str) -> Tuple[str, object]:
+        """'device' -> ('device', index); 'device:port' or a unique bare port name -> ('link'|'port', ...)"""
+        if failure in self.device_index:
+            return 'device', self.device_index[failure]
+        port = self.port_of(failure)
+        if port is None:
+            raise ValueError(f"Unknown or ambiguous device/interface {failure!r}")
+        if port in self.link_of_port:
+            return 'link', self.link_of_port[port]
+        return 'port', port
+
+    def impact(self, failures: Sequence[str], detail: bool = True) -> Dict:
+        """What breaks if every device/interface in ``failures`` goes down together"""
+        key = tuple(sorted(set(failures)))
+        cached = self._impacts.get(key) if detail else None
+        if cached is not None:
+            return cached
+        resolved = [self.resolve(failure) for failure in key]
+        region = self._region(resolved)
+        result = self._describe(key, region, [value for kind, value in resolved if kind == 'port'], detail)
+        if detail and len(key) <= 2:
+            self._impacts[key] = result
+        return result
+
+    def failover_exposure(self, failures: Sequence[str], groups: Iterable[Dict]) -> List[Dict]:
+        """Failover groups (primary-/backup-interfaces configs) with an interface taken down by ``failures``"""
+        resolved = [self.resolve(failure) for failure in failures]
+        region = self._region(resolved)
+        down_ports = {value for kind, value in resolved if kind == 'port'}
+        for kind, value in resolved:
+            if kind == 'link':
+                down_ports.update(self.edges[value][2:])
+
+        def is_down(interface):
+            port = self.port_of(interface)
+            if port is None:
+                return False
+            position = self.tin[self.ports[port][0]]
+            return port in down_ports or any(start <= position < end for start, end in region)
+
+        exposed = []
+        for group in groups:
+            primary = group.get('primary-interfaces', [])
+            backup = group.get('backup-interfaces', [])
+            primary_down = [interface for interface in primary if is_down(interface)]
+            backup_down = [interface for interface in backup if is_down(interface)]
+            if primary_down or backup_down:
+                backups_left = [interface for interface in backup if interface not in backup_down]
+                exposed.append({
+                    'group': group.get('name'),
+                    'primary_down': primary_down,
+                    'backup_down': backup_down,
+                    'outage': len(primary_down) == len(primary) and not backups_left
+                })
+        return exposed
+
+    def needs_search(self, failures: Sequence[str]) -> bool:
+        return self._fast_region([self.resolve(failure) for failure in failures]) is None
+
+    def what_if(self, scenarios: Sequence[Sequence[str]], workers: Optional[int] = None) -> List[Dict]:
+        """Impact of each failure scenario; scenarios that need a graph search run in worker processes"""
+        results: List[Optional[Dict]] = [None] * len(scenarios)
+        searched = []
+        for index, failures in enumerate(scenarios):
+            if self.needs_search(failures):
+                searched.append(index)
+            else:
+                results[index] = self.impact(failures, detail=False)
+        workers = workers or os.cpu_count() or 1
+        if len(searched) >= PARALLEL_THRESHOLD and workers > 1:
+            chunk = max(1, len(searched) // (workers * 4))
+            # Spawned, not forked: the web app calls this from a request thread
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(self,)) as pool:
+                for index, result in zip(searched, pool.map(_worker_impact, [scenarios[i] for i in searched],
+                                                            chunksize=chunk)):
+                    results[index] = result
+        else:
+            for index in searched:
+                results[index] = self.impact(scenarios[index], detail=False)
+        return results
+
+    # -- regions (Euler position intervals cut off from the root) -----------
+
+    def _region(self, resolved: List[Tuple[str, object]]) -> List[Interval]:
+        region = self._fast_region(resolved)
+        return region if region is not None else self._search_region(resolved)
+
+    def _fast_region(self, resolved: List[Tuple[str, object]]) -> Optional[List[Interval]]:
+        links = [value for kind, value in resolved if kind == 'link']
+        devices = [value for kind, value in resolved if kind == 'device']
+        if devices:
+            if len(devices) > 1 or links:
+                return None
+            node = devices[0]
+            if self.tin[node] < 0:
+                return []
+            if node == self.root:
+                return [(0, len(self.order))]
+            return _merge_intervals([(self.tin[node], self.tin[node] + 1)] +
+                                    [self._subtree(child) for child in self.cut_children.get(node, [])])
+        links = sorted(set(links))
+        if len(links) > 2:
+            return None
+        regions = [self._subtree(self._child(edge)) for edge in links if edge in self.bridges]
+        if len(links) == 2 and not regions:
+            first, second = links
+            label = self.edge_label[first]
+            if label and label == self.edge_label[second]:
+                tree = [edge for edge in links if edge in self.tree_edges]
+                if len(tree) == 1:
+                    regions = [self._subtree(self._child(tree[0]))]
+                else:
+                    outer, inner = sorted((self._subtree(self._child(edge)) for edge in tree),
+                                          key=lambda interval: (interval[0], -interval[1]))
+                    if outer[0] <= inner[0] and inner[1] <= outer[1]:
+                        regions = [(outer[0], inner[0]), (inner[1], outer[1])]
+                    else:
+                        regions = [outer, inner]
+        return _merge_intervals(regions)
+
+    def _search_region(self, resolved: List[Tuple[str, object]]) -> List[Interval]:
+        failed_edges = {value for kind, value in resolved if kind == 'link'}
+        failed_devices = {value for kind, value in resolved if kind == 'device'}
+        if self.root in failed_devices:
+            return [(0, len(self.order))]
+        seen = [False] * len(self.device_names)
+        seen[self.root] = True
+        queue = deque([self.root])
+        while queue:
+            node = queue.popleft()
+            for neighbor, edge in self.adjacency[node]:
+                if not seen[neighbor] and edge not in failed_edges and neighbor not in failed_devices:
+                    seen[neighbor] = True
+                    queue.append(neighbor)
+        return _runs(position for position, node in enumerate(self.order) if not seen[node])
+
+    def _describe(self, failures: Tuple[str, ...], region: List[Interval], failed_ports: List[str],
+                  detail: bool) -> Dict:
+        prefix = self.edge_port_prefix
+        devices = sum(end - start for start, end in region)
+        edge_ports = sum(prefix[end] - prefix[start] for start, end in region)
+        # VLAN -> its host ports inside the region; failed host ports outside it are lost individually
+        inside: Dict[int, int] = {}
+        for port in failed_ports:
+            device, vlan = self.ports[port]
+            position = self.tin[device]
+            if position >= 0 and not any(start <= position < end for start, end in region):
+                edge_ports += 1
+                if vlan is not None:
+                    inside[vlan] = inside.get(vlan, 0) + 1
+        # Count from whichever side is smaller: the region's devices or the VLANs
+        if devices <= len(self.vlan_positions):
+            for start, end in region:
+                for vlans in self.position_vlans[start:end]:
+                    for vlan, count in vlans.items():
+                        inside[vlan] = inside.get(vlan, 0) + count
+        elif region:
+            for vlan, positions in self.vlan_positions.items():
+                count = sum(bisect.bisect_left(positions, end) - bisect.bisect_left(positions, start)
+                            for start, end in region)
+                if count:
+                    inside[vlan] = inside.get(vlan, 0) + count
+        affected = sorted(inside)
+        lost = [vlan for vlan in affected if inside[vlan] == len(self.vlan_positions[vlan])]
+        result = {
+            'failures': list(failures),
+            'disconnected_device_count': devices,
+            'edge_ports_lost': edge_ports,
+            'vlans_affected': affected,
+            'vlans_lost': lost,
+            'ranges_affected': sorted({name for vlan in affected for name in self.ranges_by_vlan.get(vlan, ())})
+        }
+        if detail:
+            listed = []
+            for start, end in region:
+                listed.extend(self.device_names[node] for node in self.order[start:min(end, start + MAX_LISTED_DEVICES)])
+                if len(listed) >= MAX_LISTED_DEVICES:
+                    break
+            result['disconnected_devices'] = listed[:MAX_LISTED_DEVICES]
+        return result
+
+
+_worker_graph: Optional[TopologyGraph] = None
+
+
+def _init_worker(graph: TopologyGraph):
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _worker_impact(failures: Sequence[str]) -> Dict:
+    return _worker_graph.impact(failures, detail=False)
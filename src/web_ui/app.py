@@ -4,8 +4,34 @@ import json
 import threading
 import time
 import logging
-import random
+import os
+import sys
 from datetime import datetime
+from pathlib import Path
+
+# Make sibling packages importable when this module is run directly
+src_path = str(Path(__file__).resolve().parent.parent)
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from failover.failover_manager import FailoverManager
+from failover.state_store import thaw
+from intent_engine.intent_store import CommitTimeout, IntentStore
+from intent_engine.qos_planner import QosAdmissionError, QosPlanner
+from intent_engine.rollout import RolloutExecutor, plan_rollout
+from intent_engine.security_compiler import compile_security_policy, parse_security_rules
+from intent_engine.sharding import ShardedIntentRouter, partition_of
+from inventory.device_inventory import DeviceInventory, parse_selector
+from monitoring.aggregates import InterfaceAggregates
+from monitoring.log_pipeline import LazyJson
+from monitoring.metrics import get_default_hub
+from monitoring.telemetry_collector import TelemetryCollector
+from network_services.ipam import IpamService, parse_dhcp_range
+from netconf_client.demo_client import DemoNETCONFClient
+from netconf_client.interface_table import InterfaceTable
+from netconf_client.reconciler import DriftReconciler
+from topology.topology_graph import TopologyGraph
+from web_ui.versioning import VersionedResource
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -16,12 +42,12 @@ app.config['SECRET_KEY'] = 'campus-ibn-secret-key-2024'
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
 # Enhanced demo data
-demo_interfaces = [
+demo_interfaces = InterfaceTable.from_records([
     {"name": "gigabitethernet0/1", "ip_address": "192.168.1.10/24", "speed": "1G", "status": "up", "vlan": 100, "traffic_rx": 0, "traffic_tx": 0, "description": "Faculty Network"},
     {"name": "gigabitethernet0/2", "ip_address": "192.168.1.11/24", "speed": "1G", "status": "up", "vlan": 200, "traffic_rx": 0, "traffic_tx": 0, "description": "Student Network"},
     {"name": "tengigabitethernet0/1", "ip_address": "192.168.1.12/24", "speed": "10G", "status": "up", "vlan": 300, "traffic_rx": 0, "traffic_tx": 0, "description": "Data Center"},
     {"name": "fortygigabitethernet0/1", "ip_address": "192.168.1.13/24", "speed": "40G", "status": "down", "vlan": 400, "traffic_rx": 0, "traffic_tx": 0, "description": "Backbone"},
-]
+])
 
 # Network ranges configuration
 network_ranges = [
@@ -31,63 +57,668 @@ network_ranges = [
     {"name": "Guest", "range": "192.168.400.0/24", "vlan": 400, "gateway": "192.168.400.1"},
 ]
 
+def normalize_failover_groups(failover_config):
+    """Turn UI/API failover settings into failover group configs"""
+    if not failover_config:
+        return []
+    if 'groups' in failover_config:
+        return [group for group in failover_config['groups'] if group.get('name')]
+    if failover_config.get('primary'):
+        return [{
+            'name': failover_config.get('name', 'primary_failover'),
+            'primary-interfaces': [failover_config['primary']],
+            'backup-interfaces': [failover_config['backup']] if failover_config.get('backup') else [],
+            'threshold': failover_config.get('threshold')
+        }]
+    return []
+
+# Intent sections persisted individually (last writer wins per section)
+PERSISTED_SECTIONS = ('current_config', 'failover_config', 'network_services',
+                      'security_rules', 'qos_config', 'monitored_metrics', 'topology')
+# Intents routed to a building/device-group worker are persisted as PARTITION_SECTION + partition
+PARTITION_SECTION = 'partition:'
+# Sections that make up the configuration pushed to devices
+DEVICE_SECTIONS = ('current_config', 'failover_config', 'network_services', 'security_rules', 'qos_config')
+
 class NetworkManager:
-    def __init__(self):
+    def __init__(self, failover_manager, intent_store=None):
         self.device_status = "disconnected"
         self.current_config = None
         self.monitoring_active = False
         self.failover_active = False
-        self.failover_groups = []
+        self.failover_manager = failover_manager
+        self.intent_store = intent_store
+        self._device_config = (None, {})
         self.network_services = {}
         self.security_rules = []
+        self.security_policy = compile_security_policy([])
         self.qos_config = {}
+        self.topology_config = {}
+        self._topology = (None, None)
+    
+    @property
+    def failover_groups(self):
+        """Failover group configs from the failover manager's latest snapshot"""
+        snapshot = self.failover_manager.snapshot()
+        return [thaw(group_data['config']) for group_data in snapshot.data.values()]
+    
+    def set_failover_config(self, failover_config):
+        """Publish failover groups to the failover manager"""
+        self.failover_manager.set_failover_groups(normalize_failover_groups(failover_config))
+        if self.failover_active and not self.failover_manager.is_running:
+            self.failover_manager.start_monitoring()
     
     def connect_to_device(self):
         """Simulate device connection"""
         logger.info("Connecting to network device...")
-        time.sleep(2)
+        demo_device.connect()
         self.device_status = "connected"
+        notify_state_changed()
         logger.info("Successfully connected to network device")
         return True
     
     def apply_intent(self, intent_data):
         """Apply enhanced network intent"""
         try:
-            logger.info(f"Applying enhanced network intent: {intent_data}")
+            logger.info("Applying enhanced network intent (%d settings)", len(intent_data))
+            logger.debug("Intent payload: %s", LazyJson(intent_data))
             time.sleep(3)
             
-            # Update interfaces based on intent
-            for interface in demo_interfaces:
+            # Durable first: QoS reservations and DHCP pools are only committed for a persisted intent
+            previous = self.persist(dict(intent_data, current_config=intent_data))
+            state = self._memory_state()
+            try:
+                # Update interfaces based on intent
                 if 'interface_speed' in intent_data:
-                    interface['speed'] = intent_data['interface_speed']
-            
-            # Store enhanced configuration
-            self.current_config = intent_data
-            self.monitoring_active = intent_data.get('monitoring_enabled', True)
-            self.failover_active = intent_data.get('failover_enabled', True)
-            
-            # Process enhanced features
-            if 'failover_config' in intent_data:
-                self.failover_groups = intent_data['failover_config'].get('groups', [])
-            
-            if 'network_services' in intent_data:
-                self.network_services = intent_data['network_services']
-            
-            if 'security_rules' in intent_data:
-                self.security_rules = intent_data['security_rules']
+                    demo_interfaces.fill('speed', intent_data['interface_speed'])
+                    invalidate_interface_query()
+                    if 'qos_config' not in intent_data:
+                        # Re-evaluate committed reservations at the new line rate (admitted by check_admission)
+                        qos_planner.apply(self.qos_config, force=True)
+                
+                # Store enhanced configuration
+                self._apply_current_config(intent_data)
+                
+                # Process enhanced features
+                self._apply_sections(intent_data)
+            except Exception:
+                self._restore_memory_state(state)
+                self.persist(previous)
+                raise
             
-            if 'qos_config' in intent_data:
-                self.qos_config = intent_data['qos_config']
+            self.push_device_config(self.target_devices(intent_data))
             
             logger.info("Enhanced network intent applied successfully")
             return True
             
+        except CommitTimeout:
+            raise
         except Exception as e:
             logger.error(f"Error applying intent: {e}")
             return False
+        finally:
+            notify_state_changed()
+    
+    def apply_advanced_config(self, config_data):
+        """Apply only the advanced feature sections (persisted before they are committed)"""
+        previous = self.persist(config_data)
+        state = self._memory_state()
+        try:
+            self._apply_sections(config_data)
+        except Exception:
+            self._restore_memory_state(state)
+            self.persist(previous)
+            raise
+        finally:
+            notify_state_changed()
+        self.push_device_config()
+    
+    def _memory_state(self):
+        """In-memory state an intent may change, so a failed apply can be undone along with the store"""
+        return {
+            'speeds': demo_interfaces.column('speed').copy(),
+            'current_config': self.current_config,
+            'monitoring_active': self.monitoring_active,
+            'failover_active': self.failover_active,
+            'failover_groups': self.failover_groups,
+            'failover_running': self.failover_manager.is_running,
+            'network_services': self.network_services,
+            'security_rules': self.security_rules,
+            'security_policy': self.security_policy,
+            'qos_config': self.qos_config,
+            'topology_config': self.topology_config
+        }
+    
+    def _restore_memory_state(self, state):
+        """Undo a partially applied intent; monitored_metrics is applied last, so it never needs undoing"""
+        speeds = state['speeds']
+        demo_interfaces.assign('speed', range(len(speeds)), speeds)
+        invalidate_interface_query()
+        self.current_config = state['current_config']
+        self.monitoring_active = state['monitoring_active']
+        self.failover_active = state['failover_active']
+        self.failover_manager.set_failover_groups(state['failover_groups'])
+        if self.failover_manager.is_running and not state['failover_running']:
+            self.failover_manager.stop_monitoring()
+        ipam.configure(network_ranges, state['network_services'])
+        self.network_services = state['network_services']
+        self.security_rules = state['security_rules']
+        self.security_policy = state['security_policy']
+        # Reservations are re-committed at the restored line rates
+        qos_planner.apply(state['qos_config'], force=True)
+        self.qos_config = state['qos_config']
+        self.topology_config = state['topology_config']
+    
+    def _apply_current_config(self, intent_data):
+        self.current_config = intent_data
+        self.monitoring_active = intent_data.get('monitoring_enabled', True)
+        self.failover_active = intent_data.get('failover_enabled', True)
+    
+    def check_admission(self, settings):
+        """Raise ValueError (QosAdmissionError for oversubscription) if ``settings`` cannot be applied"""
+        parse_security_rules(settings.get('security_rules'))
+        if settings.get('device_selector') is not None:
+            if not isinstance(settings['device_selector'], str):
+                raise ValueError("device_selector must be a label selector string")
+            parse_selector(settings['device_selector'])
+        parse_dhcp_range((settings.get('network_services') or {}).get('dhcp_range'))
+        if 'monitored_metrics' in settings:
+            from monitoring.alerting import validate_monitored_metrics
+            validate_monitored_metrics(settings['monitored_metrics'])
+        if 'qos_config' in settings or 'interface_speed' in settings:
+            plan = qos_planner.plan(settings.get('qos_config', self.qos_config), speed=settings.get('interface_speed'))
+            if not plan.admitted:
+                raise QosAdmissionError(plan)
+        if 'topology' in settings:
+            self.build_topology(settings['topology'])
+    
+    def _apply_sections(self, settings, restoring=False):
+        """Apply the feature sections present in an intent or advanced config"""
+        if 'failover_config' in settings:
+            self.set_failover_config(settings['failover_config'])
+        
+        if 'network_services' in settings:
+            ipam.configure(network_ranges, settings['network_services'])
+            self.network_services = settings['network_services']
+        
+        if 'security_rules' in settings:
+            self.security_policy = compile_security_policy(settings['security_rules'])
+            self.security_rules = settings['security_rules']
+        
+        if 'qos_config' in settings:
+            qos_planner.apply(settings['qos_config'], force=restoring)
+            self.qos_config = settings['qos_config']
+        
+        if 'topology' in settings:
+            self.topology_config = settings['topology'] or {}
+        
+        if 'monitored_metrics' in settings:
+            monitored_metrics = settings['monitored_metrics']
+            if alert_engine is not None:
+                alert_engine.load_rules(monitored_metrics)
+            else:
+                # Picked up by init_analytics() once the engine exists
+                DEFAULT_MONITORED_METRICS[:] = monitored_metrics
+    
+    def build_topology(self, topology_config):
+        """Topology graph of the managed (and configured unmanaged) devices and the configured links"""
+        topology_config = topology_config or {}
+        devices = {device_id: client.get_interfaces() for device_id, client in telemetry_collector.devices.items()}
+        devices.update(topology_config.get('devices', {}))
+        links = []
+        for link in topology_config.get('links', []):
+            if not isinstance(link, dict) or not link.get('a') or not link.get('b'):
+                raise ValueError(f"Topology links need 'a' and 'b' device:interface ends: {link!r}")
+            links.append((link['a'], link['b']))
+        ranges_by_vlan = {}
+        for network_range in network_ranges:
+            ranges_by_vlan.setdefault(network_range['vlan'], []).append(network_range['name'])
+        root = topology_config.get('root') or next(iter(devices), None)
+        if root is None:
+            raise ValueError("Topology has no devices")
+        return TopologyGraph(root, devices, links, ranges_by_vlan)
+    
+    def topology_graph(self):
+        """Current topology graph, rebuilt when the topology config or the connected devices change"""
+        connected = tuple(device_id for device_id, client in telemetry_collector.devices.items()
+                          if getattr(client, 'connected', False))
+        # Serialized so in-place edits to the config dict are seen as changes
+        key = (json.dumps(self.topology_config, sort_keys=True, default=str), connected)
+        if self._topology[0] != key:
+            self._topology = (key, self.build_topology(self.topology_config))
+        return self._topology[1]
+    
+    def persist(self, settings):
+        """Durably log the persisted sections present in ``settings`` (one group commit)
+
+        Returns the values they replace (None for absent sections), which
+        undo the change when persisted in turn. Raises CommitTimeout if the
+        store does not commit within its commit timeout.
+        """
+        if self.intent_store is None:
+            return {}
+        sections = self.intent_store.state()['sections']
+        previous = {section: sections.get(section) for section in PERSISTED_SECTIONS if section in settings}
+        last_seq = None
+        for section in PERSISTED_SECTIONS:
+            if section in settings:
+                last_seq = self.intent_store.set_section(section, settings[section])
+        if last_seq is not None:
+            self.intent_store.commit(last_seq)
+        return previous
+    
+    def persist_partition(self, partition, intent_data):
+        """Durably log a partitioned intent; replayed to its worker by restore_partitions()"""
+        if self.intent_store is None:
+            return
+        self.intent_store.commit(self.intent_store.set_section(PARTITION_SECTION + partition, intent_data))
+    
+    def restore_partitions(self, router):
+        """Re-apply persisted partitioned intents to the worker pool after a restart"""
+        if self.intent_store is None:
+            return 0
+        sections = self.intent_store.state()['sections']
+        intents = [intent for section, intent in sections.items() if section.startswith(PARTITION_SECTION)]
+        for intent in intents:
+            try:
+                router.apply_intent(intent)
+            except Exception as e:
+                logger.error(f"Could not restore partition intent {partition_of(intent)}: {e}")
+        return len(intents)
+    
+    def device_config(self):
+        """Configuration every managed device should be running (rebuilt only when the store changes)
+
+        Sections go under the campus-network ``network`` container, the subtree
+        devices read back with get_config.
+        """
+        if self.intent_store is None:
+            return {}
+        seq = self.intent_store.seq
+        if self._device_config[0] != seq:
+            sections = self.intent_store.state()['sections']
+            config = {section: sections[section] for section in DEVICE_SECTIONS if section in sections}
+            if 'security_rules' in config:
+                # Devices get the merged ACL, without shadowed or redundant rules
+                config['security_rules'] = self.compiled_security(config['security_rules']).acl
+            self._device_config = (seq, {'network': config} if config else {})
+        return self._device_config[1]
+    
+    def compiled_security(self, rules):
+        """Compiled policy for ``rules``, reusing the last compile when they are unchanged"""
+        if self.security_policy.source != rules:
+            self.security_policy = compile_security_policy(rules)
+        return self.security_policy
+    
+    def target_devices(self, intent_data):
+        """Inventory devices matching the intent's ``device_selector`` (None targets every managed device)
+
+        Simulated devices are only matched by selectors that require the
+        ``simulated`` label, so a broad selector never pushes to the fleet.
+        """
+        selector = intent_data.get('device_selector')
+        if not selector:
+            return None
+        devices = set(device_inventory.names(selector))
+        if simulated_inventory is not None and any(key == 'simulated' and operator in ('=', 'in', 'exists')
+                                                   for key, operator, _ in parse_selector(selector)):
+            devices.update(simulated_inventory.names(selector))
+        return devices
+    
+    def desired_config(self, device_id):
+        """Config ``device_id`` should run; simulated devices have none until an intent targeted them"""
+        if self.intent_store is None:
+            return {}
+        if simulated_fleet is not None and device_id in simulated_fleet and \
+                self.intent_store.desired_digest(device_id) is None:
+            return {}
+        return self.device_config()
+    
+    def push_device_config(self, devices=None):
+        """Record the desired config per device and roll it out to connected devices
+
+        Sections are applied in dependency order, devices in parallel; each
+        device's rollout ends with a replace when entries removed from the
+        intent are still on it, before it is marked as running the desired
+        config. A failed step stops the rollout and restores the devices it
+        left half-configured.
+        """
+        if self.intent_store is None:
+            return []
+        config = self.device_config()
+        digests = {}
+        targets = {}
+        fleet = simulated_fleet
+        for device_id, client in telemetry_collector.devices.items():
+            if devices is None:
+                # The simulated fleet is only pushed to when an intent's selector targets it
+                if fleet is not None and device_id in fleet:
+                    continue
+            elif device_id not in devices:
+                continue
+            digests[device_id] = self.intent_store.set_desired(device_id, config)
+            if getattr(client, 'connected', False):
+                targets[device_id] = client
+        if not targets:
+            return []
+        result = rollout_executor.run(plan_rollout(dict.fromkeys(targets, config)), targets)
+        for device_id in result.completed:
+            self.intent_store.mark_applied(device_id, digests[device_id])
+        return result.completed
+    
+    def restore(self):
+        """Rebuild state from the intent store after a restart"""
+        if self.intent_store is None:
+            return False
+        sections = self.intent_store.state()['sections']
+        if not sections:
+            return False
+        if 'current_config' in sections:
+            self._apply_current_config(sections['current_config'])
+            if 'interface_speed' in self.current_config:
+                demo_interfaces.fill('speed', self.current_config['interface_speed'])
+                invalidate_interface_query()
+        # Restored reservations are committed even if capacity has shrunk since
+        self._apply_sections(sections, restoring=True)
+        notify_state_changed()
+        logger.info(f"Restored {len(sections)} intent sections from the intent store")
+        return True
+    
+    def reconcile_drifted(self):
+        """Re-push config only to devices whose last push does not match their desired config"""
+        if self.intent_store is None:
+            return []
+        drifted = self.intent_store.drifted_devices()
+        if not drifted:
+            return []
+        # Compare against the running config and push only the drifted subtrees
+        results = [reconciler.reconcile_device(device_id, force=True) for device_id in drifted]
+        record_reconcile_results(results)
+        repaired = [result['device'] for result in results if result['status'] in ('in_sync', 'repaired')]
+        logger.info(f"Reconciled {len(repaired)}/{len(drifted)} drifted devices")
+        return repaired
+
+# Simulated device backing demo_interfaces, polled by the telemetry collector
+DEMO_DEVICE_ID = 'localhost'
+demo_device = DemoNETCONFClient(DEMO_DEVICE_ID, 830, 'admin', 'admin', interfaces=demo_interfaces)
+telemetry_collector = TelemetryCollector({DEMO_DEVICE_ID: demo_device}, interval=5)
+
+# Running totals behind /api/metrics, kept current by the telemetry ingest path
+interface_aggregates = InterfaceAggregates()
+interface_aggregates.load(demo_interfaces)
+
+# Dependency-ordered config pushes to the managed devices
+rollout_executor = RolloutExecutor(max_workers=16)
+
+# Guaranteed-bandwidth reservations of qos_config, checked against port and uplink line rates
+qos_planner = QosPlanner(demo_interfaces)
+
+def apply_interface_telemetry(batch):
+    """Fold collected counter deltas, rates and oper status into demo_interfaces"""
+    # Other devices (e.g. the simulated fleet) reuse the same interface names
+    batch = [sample for sample in batch if sample['device'] == DEMO_DEVICE_ID]
+    rows = demo_interfaces.rows_of(sample['interface'] for sample in batch)
+    matched = [(row, sample) for row, sample in zip(rows, batch) if row >= 0]
+    if not matched:
+        return
+    rows = [row for row, _ in matched]
+    samples = [sample for _, sample in matched]
+    demo_interfaces.add('traffic_rx', rows, [sample['rx_delta'] for sample in samples])
+    demo_interfaces.add('traffic_tx', rows, [sample['tx_delta'] for sample in samples])
+    demo_interfaces.assign('rx_bps', rows, [sample['rx_bps'] for sample in samples])
+    demo_interfaces.assign('tx_bps', rows, [sample['tx_bps'] for sample in samples])
+    
+    status_changed = False
+    for row, sample in matched:
+        status = 'up' if sample['status'] else 'down'
+        if demo_interfaces.get_value(row, 'status') != status:
+            demo_interfaces.set_value(row, 'status', status)
+            status_changed = True
+        interface_aggregates.observe(sample['interface'], status, sample['rx_delta'], sample['tx_delta'])
+    if status_changed:
+        invalidate_interface_query()
+    notify_state_changed()
+
+# Indexed view over demo_interfaces for /api/interfaces; built on first query
+INTERFACE_QUERY_FILTERS = ('status', 'vlan', 'speed', 'description_prefix')
+_interface_query = None
+
+def interface_query():
+    """Query engine over demo_interfaces (imported lazily to keep startup cheap)"""
+    global _interface_query
+    if _interface_query is None:
+        from web_ui.interface_query import InterfaceQueryEngine
+        _interface_query = InterfaceQueryEngine(demo_interfaces)
+    return _interface_query
+
+def invalidate_interface_query():
+    """Rebuild indexes on the next query after status/vlan/speed/description changes"""
+    if _interface_query is not None:
+        _interface_query.invalidate()
+
+# Rolling per-interface history for dashboard charts, fed from the same batches.
+# The numpy-backed history store and alert engine are built by init_analytics()
+# so importing this module stays cheap.
+HISTORY_METRICS = ('rx_bps', 'tx_bps', 'status')
+interface_history = None
+alert_engine = None
+
+def analytics_samples(batch):
+    """Samples kept in history and alerting: simulated devices only up to IBN_SIMULATED_HISTORY_DEVICES"""
+    fleet = simulated_fleet
+    if fleet is None:
+        return batch
+    kept = simulated_history_devices
+    return [sample for sample in batch if sample['device'] in kept or sample['device'] not in fleet]
+
+def record_interface_history(batch):
+    """Append each telemetry batch to the time-series store"""
+    keys = []
+    values = []
+    for sample in analytics_samples(batch):
+        for metric in HISTORY_METRICS:
+            keys.append((sample['device'], sample['interface'], metric))
+            values.append(sample[metric])
+    if keys:
+        interface_history.append_many(keys, values)
+
+# Threshold alerts over each telemetry batch, per YANG monitoring/monitored-metrics
+DEFAULT_MONITORED_METRICS = [
+    {"name": "rx_utilization", "threshold": 80, "severity": "high"},
+    {"name": "tx_utilization", "threshold": 80, "severity": "high"},
+    {"name": "status", "threshold": 1, "severity": "critical", "comparison": "<", "hysteresis": 0},
+]
+
+def evaluate_alerts(batch):
+    alert_engine.evaluate_batch(analytics_samples(batch))
+
+def broadcast_alerts(notifications):
+    """Push alert state changes to dashboard clients"""
+    socketio.emit('alerts', {'alerts': notifications})
+
+telemetry_collector.add_sink(apply_interface_telemetry)
+
+_analytics_lock = threading.Lock()
+
+def init_analytics():
+    """Build the history store and alert engine and attach them to the collector"""
+    global interface_history, alert_engine
+    with _analytics_lock:
+        if alert_engine is not None:
+            return
+        from monitoring.alerting import AlertEngine
+        from monitoring.tsdb import TimeSeriesStore
+        
+        interface_history = TimeSeriesStore()
+        engine = AlertEngine()
+        engine.load_rules(DEFAULT_MONITORED_METRICS)
+        engine.subscribe(broadcast_alerts)
+        alert_engine = engine
+        
+        telemetry_collector.add_sink(record_interface_history)
+        telemetry_collector.add_sink(evaluate_alerts)
+    logger.info("Interface history and alerting initialized")
+
+# Failover events are published once and fanned out to Prometheus, SocketIO and history
+metrics_hub = get_default_hub()
+
+def broadcast_failover_event(event):
+    """Push failover/failback events to dashboard clients"""
+    socketio.emit('failover_event', event)
+
+def record_failover_event(event):
+    """Keep failover state transitions in the time-series store"""
+    if interface_history is None:
+        return
+    on_backup = 1 if event['kind'] == 'failover' else 0
+    interface_history.append((event['shard'], event['group'], 'on_backup'), on_backup, event['timestamp'])
+
+metrics_hub.subscribe(broadcast_failover_event)
+metrics_hub.subscribe(record_failover_event)
+metrics_hub.subscribe(lambda event: notify_state_changed())
+
+# Intent/config state survives restarts in data/; recovered on first use (or by start_background_tasks())
+DATA_DIR = Path(os.environ.get('IBN_DATA_DIR', 'data'))
+intent_store = IntentStore(DATA_DIR / 'intent_store.db')
+
+# DHCP pools over network_ranges; leases are snapshotted next to the intent store
+ipam = IpamService(DATA_DIR / 'ipam.json')
+ipam.configure(network_ranges)
+
+# Labelled devices that intents target with device_selector, from netconf_devices of the config file
+INVENTORY_FILE = Path(os.environ.get('IBN_INVENTORY', 'configs/default.yaml'))
+device_inventory = DeviceInventory()
+
+def reload_inventory():
+    """Reload the device inventory if its file changed (only changed devices are re-indexed)"""
+    if not INVENTORY_FILE.exists():
+        return None
+    try:
+        return device_inventory.load_file(INVENTORY_FILE)
+    except Exception as e:
+        logger.error(f"Failed to load inventory from {INVENTORY_FILE}: {e}")
+        return None
+
+# Initialize failover and network managers
+failover_manager = FailoverManager(netconf_client=None, monitoring_system=metrics_hub, name='campus')
+network_manager = NetworkManager(failover_manager, intent_store)
+
+# Periodic drift sweep of running configs against the intended device config
+reconciler = DriftReconciler(telemetry_collector.devices, network_manager.desired_config,
+                             workers=4, interval=300)
+
+def record_reconcile_results(results):
+    """Mark devices confirmed or repaired by the reconciler as running their intended config"""
+    drifted = set(intent_store.drifted_devices())
+    for result in results:
+        device_id = result['device']
+        if result['status'] in ('in_sync', 'repaired') and device_id in drifted:
+            intent_store.mark_applied(device_id, intent_store.desired_digest(device_id))
+
+reconciler.subscribe_sweep(record_reconcile_results)
+
+def status_payload():
+    return {
+        'device_status': network_manager.device_status,
+        'monitoring': 'active' if network_manager.monitoring_active else 'inactive',
+        'failover': 'enabled' if network_manager.failover_active else 'disabled',
+        'current_config': network_manager.current_config,
+        'intent_store': intent_store.stats()
+    }
+
+def metrics_payload():
+    failover_snapshot = failover_manager.snapshot()
+    summary = interface_aggregates.summary()
+    return {
+        'total_interfaces': summary['total_interfaces'],
+        'up_interfaces': summary['up_interfaces'],
+        'down_interfaces': summary['down_interfaces'],
+        'total_traffic': summary['total_traffic'],
+        'health_score': summary['health_score'],
+        'network_ranges': len(network_ranges),
+        'failover_groups': len(failover_snapshot),
+        'failover_state_version': failover_snapshot.version,
+        'security_rules': len(network_manager.security_rules)
+    }
+
+# Polled endpoints are encoded once per state change and support ETag and ?wait=<version>
+status_resource = VersionedResource('status', status_payload, lambda: (
+    network_manager.device_status, network_manager.monitoring_active, network_manager.failover_active,
+    id(network_manager.current_config), tuple(intent_store.stats().values())
+))
+metrics_resource = VersionedResource('metrics', metrics_payload, lambda: (
+    interface_aggregates.version, failover_manager.snapshot().version,
+    len(network_ranges), len(network_manager.security_rules)
+))
+
+def notify_state_changed():
+    """Wake long-polling clients; each resource re-checks whether its state changed"""
+    status_resource.notify()
+    metrics_resource.notify()
 
-# Initialize network manager
-network_manager = NetworkManager()
+# Opt-in: intents tagged with a building/device_group run in a pool of worker processes
+INTENT_WORKERS = int(os.environ.get('IBN_INTENT_WORKERS', 0))
+intent_router = ShardedIntentRouter(INTENT_WORKERS) if INTENT_WORKERS > 0 else None
+
+# Load testing: IBN_SIMULATED_DEVICES=10000 adds that many virtual devices to telemetry polling.
+# Config is only pushed to them (and then reconciled) by intents whose device_selector names the
+# ``simulated`` label, e.g. "simulated=true,block=3"; only the first IBN_SIMULATED_HISTORY_DEVICES
+# of them feed history and alerting. IBN_SIMULATED_NETCONF_PORT also serves them over SSH/NETCONF
+# (needs paramiko).
+SIMULATED_DEVICES = int(os.environ.get('IBN_SIMULATED_DEVICES', 0))
+SIMULATED_HISTORY_DEVICES = int(os.environ.get('IBN_SIMULATED_HISTORY_DEVICES', 0))
+SIMULATED_NETCONF_PORT = int(os.environ.get('IBN_SIMULATED_NETCONF_PORT', 0))
+simulated_fleet = None
+simulated_inventory = None
+simulated_history_devices = frozenset()
+netconf_listener = None
+
+def attach_simulated_fleet():
+    """Build the simulated fleet and manage its devices alongside the demo device"""
+    global simulated_fleet, simulated_inventory, simulated_history_devices, netconf_listener
+    from netconf_client.fleet_simulator import FleetSimulator
+    
+    fleet = FleetSimulator(
+        SIMULATED_DEVICES,
+        latency=float(os.environ.get('IBN_SIMULATED_LATENCY', 0)),
+        error_rate=float(os.environ.get('IBN_SIMULATED_ERROR_RATE', 0)),
+        churn=float(os.environ.get('IBN_SIMULATED_CHURN', 0))
+    )
+    fleet.connect_all()
+    simulated_inventory = DeviceInventory(fleet.inventory_records())
+    simulated_history_devices = frozenset(fleet.names[:SIMULATED_HISTORY_DEVICES])
+    simulated_fleet = fleet
+    for name, client in fleet.devices().items():
+        telemetry_collector.add_device(name, client)
+    if SIMULATED_NETCONF_PORT:
+        from netconf_client.netconf_listener import NetconfListener
+        netconf_listener = NetconfListener(simulated_fleet, port=SIMULATED_NETCONF_PORT).start()
+    logger.info(f"Managing {len(simulated_fleet)} simulated devices")
+
+# Prometheus scrape endpoint serving metrics_hub; IBN_METRICS_PORT=0 disables it
+METRICS_PORT = int(os.environ.get('IBN_METRICS_PORT', 8000))
+metrics_exporter = None
+
+def start_metrics_exporter():
+    """Serve metrics_hub on METRICS_PORT, with interface series fed from each telemetry batch"""
+    global metrics_exporter
+    if METRICS_PORT <= 0:
+        return None
+    if metrics_exporter is None:
+        # Registers its gauges in the hub registry, so built once per process
+        from monitoring.prometheus_exporter import NetworkMonitor
+        exporter = NetworkMonitor(METRICS_PORT, metrics=metrics_hub)
+        telemetry_collector.add_sink(lambda batch: exporter.update_interface_metrics(analytics_samples(batch)))
+        metrics_exporter = exporter
+    if metrics_exporter.http_server is None:
+        try:
+            metrics_exporter.start_monitoring()
+        except OSError as e:
+            logger.warning(f"Metrics exporter not started on port {METRICS_PORT}: {e}")
+    return metrics_exporter
+
+# Flask debug mode (tracebacks, debugger) only when asked for explicitly
+DEBUG = os.environ.get('IBN_DEBUG', '').lower() in ('1', 'true', 'yes', 'on')
 
 @app.route('/')
 def index():
@@ -628,7 +1259,7 @@ def apply_intent():
     """Apply enhanced network intent API endpoint"""
     try:
         intent_data = request.json
-        logger.info(f"Received enhanced intent: {intent_data}")
+        logger.debug("Received enhanced intent: %s", LazyJson(intent_data))
         
         # Validate required fields
         required_fields = ['network_name', 'network_range', 'subnet_mask', 'interface_speed']
@@ -639,8 +1270,42 @@ def apply_intent():
                     'message': f'Missing required field: {field}'
                 }), 400
         
+        try:
+            network_manager.check_admission(intent_data)
+        except QosAdmissionError as e:
+            return jsonify({'success': False, 'message': str(e), 'qos_plan': e.plan.to_dict()}), 400
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
+        # Partitioned intents are applied by the worker that owns the building/device group
+        if intent_router is not None and (intent_data.get('building') or intent_data.get('device_group')):
+            partition = partition_of(intent_data)
+            # Logged only once the worker took it, so a restart never replays a rejected intent
+            try:
+                result = intent_router.apply_intent(intent_data)
+            except Exception as e:
+                logger.error(f"Partition {partition} did not apply intent: {e}")
+                return jsonify({
+                    'success': False,
+                    'message': f'Partition {partition} did not apply intent: {e}'
+                }), 502
+            try:
+                network_manager.persist_partition(partition, intent_data)
+            except CommitTimeout as e:
+                logger.error(f"Partition intent not persisted: {e}")
+                return jsonify({'success': False, 'message': str(e)}), 503
+            return jsonify({
+                'success': True,
+                'message': f"Intent applied to partition {result['partition']} on {result['worker']}",
+                'result': result
+            })
+        
         # Apply intent
-        success = network_manager.apply_intent(intent_data)
+        try:
+            success = network_manager.apply_intent(intent_data)
+        except CommitTimeout as e:
+            logger.error(f"Intent not persisted: {e}")
+            return jsonify({'success': False, 'message': str(e)}), 503
         
         if success:
             # Broadcast update to all connected clients
@@ -672,20 +1337,22 @@ def apply_advanced_config():
     """Apply only advanced configuration"""
     try:
         config_data = request.json
-        logger.info(f"Applying advanced configuration: {config_data}")
+        logger.info("Applying advanced configuration (%d settings)", len(config_data))
+        logger.debug("Advanced configuration payload: %s", LazyJson(config_data))
         
-        # Update network manager with advanced config
-        if 'failover_config' in config_data:
-            network_manager.failover_groups = [config_data['failover_config']]
-        
-        if 'network_services' in config_data:
-            network_manager.network_services = config_data['network_services']
-        
-        if 'qos_config' in config_data:
-            network_manager.qos_config = config_data['qos_config']
+        try:
+            network_manager.check_admission(config_data)
+        except QosAdmissionError as e:
+            return jsonify({'success': False, 'message': str(e), 'qos_plan': e.plan.to_dict()}), 400
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
         
-        if 'security_rules' in config_data:
-            network_manager.security_rules = config_data['security_rules']
+        # Update network manager with advanced config
+        try:
+            network_manager.apply_advanced_config(config_data)
+        except CommitTimeout as e:
+            logger.error(f"Advanced configuration not persisted: {e}")
+            return jsonify({'success': False, 'message': str(e)}), 503
         
         return jsonify({
             'success': True,
@@ -701,42 +1368,261 @@ def apply_advanced_config():
 
 @app.route('/api/interfaces')
 def get_interfaces():
-    """Get interface information"""
-    # Update traffic stats for demo
-    for interface in demo_interfaces:
-        if interface['status'] == 'up':
-            interface['traffic_rx'] += random.randint(1000, 10000)
-            interface['traffic_tx'] += random.randint(500, 5000)
+    """Get interface information, optionally filtered, sorted, paged and projected"""
+    filters = {name: request.args[name] for name in INTERFACE_QUERY_FILTERS if name in request.args}
+    fields = [field for field in request.args.get('fields', '').split(',') if field]
+    try:
+        result = interface_query().query(
+            filters,
+            fields=fields or None,
+            sort=request.args.get('sort', 'name'),
+            limit=request.args.get('limit', 1000, type=int),
+            cursor=request.args.get('cursor')
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify(result)
+
+@app.route('/api/history')
+def get_interface_history():
+    """Get interface metric history for charts"""
+    interface = request.args.get('interface')
+    if not interface:
+        return jsonify({'success': False, 'message': 'Missing required parameter: interface'}), 400
+    
+    metric = request.args.get('metric', 'rx_bps')
+    if metric not in HISTORY_METRICS:
+        return jsonify({'success': False, 'message': f'Unsupported metric. Supported: {list(HISTORY_METRICS)}'}), 400
+    
+    device = request.args.get('device', DEMO_DEVICE_ID)
+    # 0 is a valid timestamp, so only a missing parameter falls back to the default
+    end = request.args.get('end', type=float)
+    if end is None:
+        end = time.time()
+    start = request.args.get('start', type=float)
+    if start is None:
+        start = end - request.args.get('range', 3600, type=float)
+    if start > end:
+        return jsonify({'success': False, 'message': 'start must not be after end'}), 400
+    step = request.args.get('step', type=int)
     
-    return jsonify({'interfaces': demo_interfaces})
+    if interface_history is None:
+        return jsonify({'success': False, 'message': 'History is still initializing'}), 503
+    
+    series = interface_history.query((device, interface, metric), start, end, step)
+    if series is None:
+        return jsonify({'success': False, 'message': f'No history for {device} {interface}'}), 404
+    
+    series.update({'device': device, 'interface': interface, 'metric': metric})
+    return jsonify(series)
+
+@app.route('/api/alerts')
+def get_alerts():
+    """Get currently firing alerts"""
+    limit = request.args.get('limit', 500, type=int)
+    if alert_engine is None:
+        return jsonify({'alerts': [], 'active': 0})
+    return jsonify({
+        'alerts': alert_engine.get_active_alerts(limit),
+        'active': alert_engine.active_alert_count()
+    })
+
+@app.route('/api/partitions')
+def get_partitions():
+    """Get intent worker pool and partition ownership"""
+    if intent_router is None:
+        return jsonify({'enabled': False, 'workers': [], 'partitions': {}})
+    return jsonify({
+        'enabled': True,
+        'workers': intent_router.stats(),
+        'partitions': dict(intent_router.partitions)
+    })
+
+@app.route('/api/partitions/<partition>')
+def get_partition(partition):
+    """Get one partition's intent, config and failover state from its owner"""
+    if intent_router is None or partition not in intent_router.partitions:
+        return jsonify({'success': False, 'message': f'Unknown partition {partition}'}), 404
+    return jsonify(intent_router.partition_state(partition))
 
 @app.route('/api/status')
 def get_status():
     """Get system status"""
+    return status_resource.respond(request)
+
+@app.route('/api/failover')
+def get_failover_state():
+    """Get the latest failover state snapshot"""
+    return jsonify(failover_manager.snapshot().to_dict())
+
+@app.route('/api/failover/dampening')
+def get_failover_dampening():
+    """Get flap dampening parameters and the penalised/suppressed interfaces"""
+    return jsonify(failover_manager.dampener.to_dict())
+
+@app.route('/api/failover/simulate', methods=['POST'])
+def simulate_failover():
+    """Monte Carlo run of the current failover groups: MTTR, flaps and unavailability percentiles"""
+    from failover.simulator import FailoverSimulator
+    
+    data = request.json or {}
+    try:
+        duration = float(data.get('duration', 365 * 86400))
+        if not 0 < duration <= MAX_SIMULATED_SECONDS:
+            raise ValueError(f"duration must be between 0 and {MAX_SIMULATED_SECONDS} seconds")
+        # "dampening": null simulates without flap dampening, an object overrides the manager's parameters
+        options = {'dampening': data['dampening']} if 'dampening' in data else {}
+        simulator = FailoverSimulator.from_manager(failover_manager, **options)
+        result = simulator.run(duration, failure=data.get('failure'), repair=data.get('repair'),
+                               seed=data.get('seed'), flaky=data.get('flaky'))
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify(dict(result.to_dict(), success=True))
+
+@app.route('/api/security')
+def get_security_policy():
+    """Get the compiled security policy: findings, merged ACL and its rendered text"""
+    policy = network_manager.security_policy
+    return jsonify(dict(policy.to_dict(), config=policy.render()))
+
+@app.route('/api/rollout')
+def get_rollout():
+    """Get the outcome of the last config rollout to the devices"""
+    result = rollout_executor.last_result
+    return jsonify({'rollout': result.to_dict() if result is not None else None})
+
+@app.route('/api/qos')
+def get_qos():
+    """Get the committed QoS reservations and the last admission result"""
+    last_plan = qos_planner.last_plan
     return jsonify({
-        'device_status': network_manager.device_status,
-        'monitoring': 'active' if network_manager.monitoring_active else 'inactive',
-        'failover': 'enabled' if network_manager.failover_active else 'disabled',
-        'current_config': network_manager.current_config
+        'summary': qos_planner.summary(),
+        'config': qos_planner.config,
+        'last_plan': last_plan.to_dict() if last_plan else None
     })
 
+@app.route('/api/qos/plan', methods=['POST'])
+def plan_qos():
+    """Dry-run a qos_config against current capacity without applying it"""
+    try:
+        plan = qos_planner.plan(request.json, speed=request.args.get('speed'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify(dict(plan.to_dict(), success=True))
+
+@app.route('/api/ipam')
+def get_ipam():
+    """Get DHCP pool usage and lease counters"""
+    return jsonify(ipam.stats())
+
+@app.route('/api/ipam/leases', methods=['POST'])
+def request_lease():
+    """Allocate or renew a DHCP lease for a client in a pool (by name or VLAN)"""
+    data = request.json or {}
+    if not data.get('client_id'):
+        return jsonify({'success': False, 'message': 'Missing required field: client_id'}), 400
+    try:
+        lease = ipam.request(str(data['client_id']), pool=data.get('pool'), vlan=data.get('vlan'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    if lease is None:
+        return jsonify({'success': False, 'message': 'DHCP pool exhausted'}), 503
+    return jsonify({'success': True, 'lease': lease})
+
+@app.route('/api/ipam/leases/<client_id>', methods=['DELETE'])
+def release_lease(client_id):
+    """Release a client's DHCP lease"""
+    try:
+        released = ipam.release(client_id, pool=request.args.get('pool'), vlan=request.args.get('vlan', type=int))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    if not released:
+        return jsonify({'success': False, 'message': f'No lease for {client_id}'}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/inventory')
+def get_inventory():
+    """Get the devices matching ?selector= (e.g. building=eng,role=access), or label counts without one"""
+    selector = request.args.get('selector', '')
+    snapshot = device_inventory.snapshot()
+    try:
+        devices = snapshot.resolve(selector)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    response = {
+        'version': snapshot.version,
+        'selector': selector,
+        'count': len(devices),
+        'devices': [{key: value for key, value in device.items() if key != 'password'} for device in devices]
+    }
+    if not selector:
+        response['labels'] = snapshot.label_values()
+    return jsonify(response)
+
+@app.route('/api/inventory/reload', methods=['POST'])
+def reload_inventory_file():
+    """Re-read the inventory file now; unchanged devices keep their index entries"""
+    if not INVENTORY_FILE.exists():
+        return jsonify({'success': False, 'message': f'No inventory file at {INVENTORY_FILE}'}), 404
+    try:
+        summary = device_inventory.load_file(INVENTORY_FILE, force=True)
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify(dict(summary, success=True))
+
+# Longest run accepted by /api/failover/simulate (ten years)
+MAX_SIMULATED_SECONDS = 10 * 365 * 86400
+# Upper bound on one /api/topology/what-if batch
+MAX_WHAT_IF_SCENARIOS = 50000
+
+@app.route('/api/topology')
+def get_topology():
+    """Get the topology summary: devices, links, bridges and articulation points"""
+    try:
+        return jsonify(network_manager.topology_graph().summary())
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+@app.route('/api/topology/impact')
+def get_topology_impact():
+    """What breaks if the given devices/interfaces (?failure=, repeatable) fail together"""
+    failures = request.args.getlist('failure')
+    if not failures:
+        return jsonify({'success': False, 'message': 'Missing required parameter: failure'}), 400
+    try:
+        graph = network_manager.topology_graph()
+        impact = dict(graph.impact(failures))
+        impact['failover_groups'] = graph.failover_exposure(failures, network_manager.failover_groups)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify(impact)
+
+@app.route('/api/topology/what-if', methods=['POST'])
+def topology_what_if():
+    """Evaluate a batch of failure scenarios (lists of devices/interfaces)"""
+    scenarios = (request.json or {}).get('scenarios')
+    if not isinstance(scenarios, list) or not all(isinstance(scenario, list) for scenario in scenarios):
+        return jsonify({'success': False, 'message': 'scenarios must be a list of failure lists'}), 400
+    if len(scenarios) > MAX_WHAT_IF_SCENARIOS:
+        return jsonify({'success': False, 'message': f'At most {MAX_WHAT_IF_SCENARIOS} scenarios per request'}), 400
+    try:
+        results = network_manager.topology_graph().what_if(scenarios)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify({'success': True, 'results': results})
+
 @app.route('/api/metrics')
 def get_metrics():
-    """Get enhanced system metrics"""
-    total_interfaces = len(demo_interfaces)
-    up_interfaces = sum(1 for i in demo_interfaces if i['status'] == 'up')
-    total_traffic = sum(i['traffic_rx'] + i['traffic_tx'] for i in demo_interfaces)
-    
-    return jsonify({
-        'total_interfaces': total_interfaces,
-        'up_interfaces': up_interfaces,
-        'down_interfaces': total_interfaces - up_interfaces,
-        'total_traffic': total_traffic,
-        'health_score': round((up_interfaces / total_interfaces) * 100, 1),
-        'network_ranges': len(network_ranges),
-        'failover_groups': len(network_manager.failover_groups),
-        'security_rules': len(network_manager.security_rules)
-    })
+    """Get enhanced system metrics (?group_by=building|vlan adds per-group totals)"""
+    group_by = request.args.get('group_by')
+    if not group_by:
+        return metrics_resource.respond(request)
+    metrics = metrics_payload()
+    try:
+        metrics['groups'] = interface_aggregates.groups(group_by)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify(metrics)
 
 @socketio.on('connect')
 def handle_connect():
@@ -749,41 +1635,82 @@ def handle_disconnect():
     """Handle client disconnection"""
     logger.info('Client disconnected')
 
+_background_stop = threading.Event()
+_background_threads = []
+
 def start_background_tasks():
-    """Start background monitoring tasks"""
-    def connect_device():
-        """Connect to device in background"""
-        time.sleep(1)
+    """Start background monitoring tasks (lifecycle hook; call once the server is starting)"""
+    if _background_threads:
+        return _background_threads
+    _background_stop.clear()
+    
+    def bootstrap():
+        """Build analytics, recover intent state and connect to the device off the startup path"""
+        init_analytics()
+        reload_inventory()
+        if SIMULATED_DEVICES > 0:
+            attach_simulated_fleet()
+        network_manager.restore()
+        if intent_router is not None:
+            network_manager.restore_partitions(intent_router)
         network_manager.connect_to_device()
+        network_manager.reconcile_drifted()
         socketio.emit('device_status', {'status': network_manager.device_status})
+        reconciler.start()
+    
+    # Recover before serving so the API never reports pre-restart defaults
+    intent_store.open()
+    ipam.load()
+    if intent_router is not None:
+        intent_router.start()
+    start_metrics_exporter()
     
     def update_metrics():
         """Update metrics periodically"""
-        while True:
-            time.sleep(5)
+        while not _background_stop.wait(telemetry_collector.interval):
+            ipam.save()
+            reload_inventory()
             if network_manager.monitoring_active:
-                # Update interface traffic
-                for interface in demo_interfaces:
-                    if interface['status'] == 'up':
-                        interface['traffic_rx'] += random.randint(100, 1000)
-                        interface['traffic_tx'] += random.randint(50, 500)
+                # Poll interface counters from the device
+                telemetry_collector.collect_once()
                 
                 # Broadcast metrics update
                 socketio.emit('metrics_update', {
-                    'interfaces': demo_interfaces,
+                    'interfaces': demo_interfaces.to_records(),
+                    'failover': failover_manager.snapshot().to_dict(),
                     'timestamp': time.time()
                 })
     
     # Start background threads
-    connect_thread = threading.Thread(target=connect_device, daemon=True)
-    metrics_thread = threading.Thread(target=update_metrics, daemon=True)
-    
-    connect_thread.start()
-    metrics_thread.start()
+    for target in (bootstrap, update_metrics):
+        thread = threading.Thread(target=target, name=f'ibn-{target.__name__}', daemon=True)
+        thread.start()
+        _background_threads.append(thread)
+    return _background_threads
 
-# Start background tasks when module loads
-start_background_tasks()
+def stop_background_tasks(timeout=5.0):
+    """Stop background tasks started by start_background_tasks()"""
+    _background_stop.set()
+    failover_manager.stop_monitoring()
+    reconciler.stop()
+    if netconf_listener is not None:
+        netconf_listener.stop()
+    if intent_router is not None:
+        intent_router.stop()
+    for thread in _background_threads:
+        thread.join(timeout)
+    _background_threads.clear()
+    ipam.save()
+    intent_store.close()
+
+def run_server(port=5000):
+    """Serve the web UI; never with the reloader, which would re-import everything in a child process"""
+    socketio.run(app, host='0.0.0.0', port=port, debug=DEBUG, use_reloader=False, allow_unsafe_werkzeug=True)
 
 if __name__ == '__main__':
     logger.info("Starting Enhanced Campus IBN NMS Web UI")
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    start_background_tasks()
+    try:
+        run_server(int(os.environ.get('IBN_WEB_PORT', 5000)))
+    finally:
+        stop_background_tasks()
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""
+Interface query engine - secondary indexes, keyset cursors, sparse fieldsets and sorting
+"""
+import base64
+import bisect
+import json
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from netconf_client.demo_client import SPEED_BPS
+
+# Filterable fields backed by an exact-match index
+INDEXED_FIELDS = ('status', 'vlan', 'speed')
+
+# Sortable fields whose order is precomputed at index time
+STATIC_SORT_FIELDS = {
+    'name': lambda record: record.get('name') or '',
+    'status': lambda record: record.get('status') or '',
+    'vlan': lambda record: record.get('vlan') if isinstance(record.get('vlan'), int) else -1,
+    'speed': lambda record: SPEED_BPS.get(record.get('speed'), 0),
+    'description': lambda record: (record.get('description') or '').lower(),
+}
+
+# Counters change every poll, so they are sorted per query over the matching rows only
+DYNAMIC_SORT_FIELDS = ('traffic_rx', 'traffic_tx', 'rx_bps', 'tx_bps')
+
+MAX_LIMIT = 10000
+
+
+def encode_cursor(sort: str, key: Sequence) -> str:
+    raw = json.dumps([sort, list(key)], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort, key = json.loads(raw)
+        return sort, tuple(key)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+class _InterfaceIndex:
+    """Immutable indexes over one version of the interface list"""
+
+    def __init__(self, records: List[Dict]):
+        self.records = records
+        self.count = len(records)
+        self.rows = np.arange(self.count, dtype=np.int64)
+
+        # Exact-match postings: field -> value (as text) -> sorted row ids
+        self.postings: Dict[str, Dict[str, np.ndarray]] = {}
+        for field in INDEXED_FIELDS:
+            buckets: Dict[str, List[int]] = {}
+            for row, record in enumerate(records):
+                buckets.setdefault(str(record.get(field)), []).append(row)
+            self.postings[field] = {value: np.array(rows, dtype=np.int64) for value, rows in buckets.items()}
+
+        # Sort keys are (field key, name), so every order is total and cursors are stable
+        self.sorted_keys: Dict[str, List[tuple]] = {}
+        self.ranks: Dict[str, np.ndarray] = {}
+        for field, key_of in STATIC_SORT_FIELDS.items():
+            keys = [(key_of(record), record.get('name') or '') for record in records]
+            order = sorted(range(self.count), key=keys.__getitem__)
+            rank = np.empty(self.count, dtype=np.int64)
+            rank[order] = np.arange(self.count, dtype=np.int64)
+            self.ranks[field] = rank
+            self.sorted_keys[field] = [keys[row] for row in order]
+
+        # Description prefix search: bisect over the description sort order
+        self.description_order = np.argsort(self.ranks['description'], kind='stable')
+
+    def key_of(self, field: str, row: int) -> tuple:
+        record = self.records[row]
+        if field in STATIC_SORT_FIELDS:
+            return STATIC_SORT_FIELDS[field](record), record.get('name') or ''
+        return record.get(field) or 0, record.get('name') or ''
+
+    def prefix_rows(self, prefix: str) -> np.ndarray:
+        prefix = prefix.lower()
+        keys = self.sorted_keys['description']
+        low = bisect.bisect_left(keys, (prefix, ''))
+        high = bisect.bisect_left(keys, (prefix + '\U0010ffff', ''))
+        return np.sort(self.description_order[low:high])
+
+
+class InterfaceQueryEngine:
+    """Filters, sorts and pages an interface list without scanning or serializing all of it.
+
+    Indexes are built from the list on first use and rebuilt after
+    ``invalidate()`` (call it when an indexed field changes) or when the
+    list length changes. Counter fields are read live from the records.
+    """
+
+    def __init__(self, records: List[Dict]):
+        self.records = records
+        self._index: Optional[_InterfaceIndex] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self._index = None
+
+    def index(self) -> _InterfaceIndex:
+        index = self._index
+        if index is None or index.count != len(self.records):
+            with self._lock:
+                index = self._index
+                if index is None or index.count != len(self.records):
+                    index = self._index = _InterfaceIndex(self.records)
+        return index
+
+    def query(self, filters: Optional[Dict[str, str]] = None, fields: Optional[Sequence[str]] = None,
+              sort: str = 'name', limit: int = 1000, cursor: Optional[str] = None) -> Dict:
+        """Run one query.
+
+        ``filters`` maps status/vlan/speed to comma-separated values and may
+        include ``description_prefix``. ``sort`` is a field name, prefixed
+        with ``-`` for descending. Raises ValueError for invalid parameters.
+        """
+        index = self.index()
+        filters = filters or {}
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+
+        descending = sort.startswith('-')
+        field = sort.lstrip('-')
+        if field not in STATIC_SORT_FIELDS and field not in DYNAMIC_SORT_FIELDS:
+            raise ValueError(f"Unsupported sort field. Supported: "
+                             f"{sorted(STATIC_SORT_FIELDS) + list(DYNAMIC_SORT_FIELDS)}")
+
+        candidates = self._filter(index, filters)
+        total = int(candidates.size)
+        # One row past the page tells whether another page follows
+        fetch = limit + 1
+
+        if field in STATIC_SORT_FIELDS:
+            order = index.ranks[field][candidates]
+            if descending:
+                order = index.count - 1 - order
+            if cursor is not None:
+                threshold = self._static_threshold(index, field, sort, cursor, descending)
+                keep = order >= threshold
+                candidates, order = candidates[keep], order[keep]
+            page = candidates[self._smallest(order, fetch)]
+        else:
+            page = self._dynamic_page(index, candidates, field, sort, descending, cursor, fetch)
+        has_more = page.size > limit
+        page = page[:limit]
+
+        records = index.records
+        if fields:
+            interfaces = [{name: records[row].get(name) for name in fields} for row in page.tolist()]
+        elif hasattr(records, 'to_records'):
+            # Columnar tables hand out row views; decode the page into plain dicts
+            interfaces = records.to_records(page.tolist())
+        else:
+            interfaces = [records[row] for row in page.tolist()]
+
+        next_cursor = None
+        if has_more:
+            last_key = index.key_of(field, int(page[-1]))
+            next_cursor = encode_cursor(sort, last_key)
+        return {'interfaces': interfaces, 'total': total, 'next_cursor': next_cursor}
+
+    @staticmethod
+    def _filter(index: _InterfaceIndex, filters: Dict[str, str]) -> np.ndarray:
+        """Intersect index postings, smallest first"""
+        postings = []
+        for name, value in filters.items():
+            if name == 'description_prefix':
+                postings.append(index.prefix_rows(value))
+            elif name in INDEXED_FIELDS:
+                buckets = index.postings[name]
+                matches = [buckets[option] for option in str(value).split(',') if option in buckets]
+                if not matches:
+                    return np.empty(0, dtype=np.int64)
+                postings.append(matches[0] if len(matches) == 1 else np.unique(np.concatenate(matches)))
+            else:
+                raise ValueError(f"Unsupported filter {name}. Supported: "
+                                 f"{list(INDEXED_FIELDS) + ['description_prefix']}")
+
+        if not postings:
+            return index.rows
+        postings.sort(key=len)
+        result = postings[0]
+        for rows in postings[1:]:
+            if result.size == 0:
+                break
+            result = np.intersect1d(result, rows, assume_unique=True)
+        return result
+
+    @staticmethod
+    def _smallest(order: np.ndarray, limit: int) -> np.ndarray:
+        """Positions of the ``limit`` smallest order values, sorted"""
+        if order.size > limit:
+            positions = np.argpartition(order, limit - 1)[:limit]
+            return positions[np.argsort(order[positions], kind='stable')]
+        return np.argsort(order, kind='stable')
+
+    @staticmethod
+    def _static_threshold(index: _InterfaceIndex, field: str, sort: str, cursor: str, descending: bool) -> int:
+        cursor_sort, key = decode_cursor(cursor)
+        if cursor_sort != sort:
+            raise ValueError("Cursor was issued for a different sort order")
+        keys = index.sorted_keys[field]
+        if descending:
+            return index.count - bisect.bisect_left(keys, key)
+        return bisect.bisect_right(keys, key)
+
+    @staticmethod
+    def _dynamic_page(index: _InterfaceIndex, candidates: np.ndarray, field: str, sort: str,
+                      descending: bool, cursor: Optional[str], limit: int) -> np.ndarray:
+        records = index.records
+        if hasattr(records, 'column'):
+            values = records.column(field)[candidates].astype(np.float64)
+        else:
+            values = np.fromiter((records[row].get(field) or 0 for row in candidates.tolist()),
+                                 dtype=np.float64, count=candidates.size)
+        # Ties break on name, which is unique
+        names = index.ranks['name'][candidates]
+        if descending:
+            values = -values
+            names = -names
+
+        if cursor is not None:
+            cursor_sort, (value, name) = decode_cursor(cursor)
+            if cursor_sort != sort:
+                raise ValueError("Cursor was issued for a different sort order")
+            name_keys = index.sorted_keys['name']
+            if descending:
+                value = -float(value)
+                name_threshold = -bisect.bisect_left(name_keys, (name, name))
+            else:
+                value = float(value)
+                name_threshold = bisect.bisect_right(name_keys, (name, name)) - 1
+            keep = (values > value) | ((values == value) & (names > name_threshold))
+            candidates, values, names = candidates[keep], values[keep], names[keep]
+
+        if values.size > limit:
+            # Only rows up to the limit-th value can make the page
+            kth = np.partition(values, limit - 1)[limit - 1]
+            keep = values <= kth
+            candidates, values, names = candidates[keep], values[keep], names[keep]
+        order = np.lexsort((names, values))[:limit]
+        return candidates[order]
@@ -0,0 +1,95 @@
+"""
+Versioned API resources - cached response bytes, ETag/304 and long-poll on change
+"""
+import json
+import secrets
+import threading
+import time
+from typing import Callable, Dict, Hashable, Tuple
+
+from flask import Response
+
+# Upper bound for ?wait= long-polls; clients re-issue the request after a 304
+MAX_WAIT_SECONDS = 30.0
+
+
+class VersionedResource:
+    """A JSON resource that is re-rendered only when its state changes.
+
+    ``fingerprint`` returns a cheap hashable summary of the state the
+    resource renders from (version counters, flags). Whenever it differs
+    from the last one seen, the version is bumped and ``render`` is
+    encoded once; every poll in between is served the cached bytes.
+    Writers call ``notify()`` after changing that state to wake long-polls.
+    """
+
+    def __init__(self, name: str, render: Callable[[], Dict], fingerprint: Callable[[], Hashable]):
+        self.name = name
+        self.render = render
+        self.fingerprint = fingerprint
+        # Distinguishes versions across restarts, when the counter starts over
+        self.epoch = secrets.token_hex(4)
+        self.version = 0
+        self.renders = 0
+        self._fingerprint = object()
+        self._body = b''
+        self._changed = threading.Condition()
+
+    @property
+    def etag(self) -> str:
+        return f'{self.name}-{self.epoch}-{self.version}'
+
+    def current(self) -> Tuple[int, str, bytes]:
+        """Latest (version, etag, body), re-encoding only if the state changed"""
+        with self._changed:
+            return self._refresh()
+
+    def notify(self):
+        """Wake long-polls so they re-check the state"""
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait(self, version: int, timeout: float) -> Tuple[int, str, bytes]:
+        """Block until the version differs from ``version`` or ``timeout`` passes"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                current = self._refresh()
+                remaining = deadline - time.monotonic()
+                if current[0] != version or remaining <= 0:
+                    return current
+                self._changed.wait(remaining)
+
+    def _refresh(self) -> Tuple[int, str, bytes]:
+        fingerprint = self.fingerprint()
+        if fingerprint != self._fingerprint:
+            self._body = json.dumps(self.render(), separators=(',', ':'), default=str).encode('utf-8')
+            self._fingerprint = fingerprint
+            self.version += 1
+            self.renders += 1
+        return self.version, self.etag, self._body
+
+    def respond(self, request) -> Response:
+        """Serve the resource honouring ``If-None-Match`` and ``?wait=<version>``"""
+        wait = request.args.get('wait')
+        if wait is not None:
+            try:
+                version = int(wait)
+                timeout = min(float(request.args.get('timeout', MAX_WAIT_SECONDS)), MAX_WAIT_SECONDS)
+            except ValueError:
+                return Response(json.dumps({'success': False, 'message': 'wait and timeout must be numbers'}),
+                                status=400, mimetype='application/json')
+            waited_for = version
+            version, etag, body = self.wait(version, max(timeout, 0.0))
+            unchanged = version == waited_for
+        else:
+            version, etag, body = self.current()
+            unchanged = False
+
+        response = Response(b'' if unchanged else body, status=304 if unchanged else 200,
+                            mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['X-Resource-Version'] = str(version)
+        # Browsers revalidate every poll, so unchanged state costs a 304
+        response.headers['Cache-Control'] = 'no-cache'
+        return response if unchanged else response.make_conditional(request)
@@ -0,0 +1,25 @@
+"""
+Shared pytest fixtures - src on sys.path and a Flask test client over an isolated data directory
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """web_ui.app imported once, with its stores under a temporary directory"""
+    os.environ['IBN_DATA_DIR'] = str(tmp_path_factory.mktemp('ibn-data'))
+    import web_ui.app as app_module
+    return app_module
+
+
+@pytest.fixture
+def client(app_module, monkeypatch):
+    """Flask test client; apply_intent's simulated device delay is skipped"""
+    monkeypatch.setattr(app_module.time, 'sleep', lambda seconds: None)
+    return app_module.app.test_client()
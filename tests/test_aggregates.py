@@ -0,0 +1,63 @@
+import pytest
+
+from monitoring.aggregates import InterfaceAggregates
+
+RECORDS = [
+    {'name': 'ge0/1', 'status': 'up', 'building': 'A', 'vlan': 10, 'traffic_rx': 100, 'traffic_tx': 50},
+    {'name': 'ge0/2', 'status': 'down', 'building': 'A', 'vlan': 20, 'traffic_rx': 10, 'traffic_tx': 5},
+    {'name': 'ge0/3', 'status': 'up', 'vlan': 10},
+]
+
+
+def loaded():
+    aggregates = InterfaceAggregates()
+    aggregates.load(RECORDS)
+    return aggregates
+
+
+def test_summary_and_groups():
+    aggregates = loaded()
+    summary = aggregates.summary()
+    assert summary['total_interfaces'] == 3
+    assert summary['up_interfaces'] == 2 and summary['down_interfaces'] == 1
+    assert summary['total_traffic'] == 165
+    assert summary['health_score'] == 66.7
+
+    buildings = aggregates.groups('building')
+    assert buildings['A']['total_interfaces'] == 2
+    assert buildings['unassigned']['up_interfaces'] == 1
+    assert aggregates.groups('vlan')['10']['total_interfaces'] == 2
+
+
+def test_observe_moves_status_and_adds_traffic():
+    aggregates = loaded()
+    version = aggregates.version
+    assert aggregates.observe('ge0/2', status='up', rx_delta=5, tx_delta=1)
+    assert aggregates.version == version + 1
+    assert aggregates.summary()['by_status'] == {'up': 3}
+    assert aggregates.groups('building')['A']['traffic_rx'] == 115
+    assert not aggregates.observe('missing', status='up')
+
+
+def test_upsert_and_remove_keep_totals_consistent():
+    aggregates = loaded()
+    aggregates.upsert(dict(RECORDS[0], building='B', status='down'))
+    assert sorted(aggregates.groups('building')) == ['A', 'B', 'unassigned']
+    assert aggregates.summary()['up_interfaces'] == 1
+
+    aggregates.remove('ge0/1')
+    aggregates.remove('ge0/1')
+    assert 'B' not in aggregates.groups('building')
+    assert aggregates.summary()['total_interfaces'] == 2
+    assert aggregates.summary()['traffic_rx'] == 10
+
+
+def test_unknown_dimension():
+    with pytest.raises(ValueError):
+        loaded().groups('floor')
+
+
+def test_metrics_endpoint_groups(client):
+    body = client.get('/api/metrics?group_by=building').get_json()
+    assert sum(group['total_interfaces'] for group in body['groups'].values()) == body['total_interfaces']
+    assert client.get('/api/metrics?group_by=floor').status_code == 400
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from monitoring.alerting import AlertEngine, validate_monitored_metrics
+
+RULES = [
+    {'name': 'rx_utilization', 'threshold': 80, 'severity': 'high'},
+    {'name': 'rx_hot', 'metric': 'rx_utilization', 'threshold': 95, 'severity': 'critical'},
+    {'name': 'status', 'threshold': 1, 'severity': 'critical', 'comparison': '<', 'hysteresis': 0},
+]
+
+
+def batch(rx_bps, status=1, interface='ge0/1'):
+    return [{'device': 'sw1', 'interface': interface, 'status': status, 'speed_mbps': 1000.0,
+             'rx_bps': float(rx_bps), 'tx_bps': 0.0, 'rx_bytes': 0, 'tx_bytes': 0}]
+
+
+def states(notifications):
+    return [(n['rule'], n['state']) for n in notifications]
+
+
+def engine_with(rules=RULES):
+    engine = AlertEngine()
+    engine.load_rules(rules)
+    received = []
+    engine.subscribe(received.extend)
+    return engine, received
+
+
+def test_fires_escalates_and_resolves_with_hysteresis():
+    engine, received = engine_with()
+    assert states(engine.evaluate_batch(batch(850e6))) == [('rx_utilization', 'firing')]
+    assert engine.evaluate_batch(batch(860e6)) == []
+    assert states(engine.evaluate_batch(batch(970e6))) == [('rx_hot', 'firing')]
+    assert states(engine.evaluate_batch(batch(900e6))) == [('rx_utilization', 'downgraded')]
+    # 5% hysteresis: still firing just under the threshold
+    assert engine.evaluate_batch(batch(790e6)) == []
+    assert states(engine.evaluate_batch(batch(700e6))) == [('rx_utilization', 'resolved')]
+    assert len(received) == 4
+
+
+def test_below_threshold_rule():
+    engine, _ = engine_with()
+    assert states(engine.evaluate_batch(batch(0, status=0))) == [('status', 'firing')]
+    assert engine.active_alert_count() == 1
+    assert engine.get_active_alerts()[0]['severity'] == 'critical'
+    assert states(engine.evaluate_batch(batch(0, status=1))) == [('status', 'resolved')]
+
+
+def test_unknown_metric_and_severity_are_ignored():
+    engine = AlertEngine()
+    engine.load_rules([{'name': 'nope', 'threshold': 1}, {'name': 'status', 'threshold': 1, 'severity': 'x'},
+                       {'name': 'status'}, {'name': 'status', 'threshold': 1, 'comparison': '<='}])
+    assert engine.evaluate_batch(batch(0, status=0)) == []
+
+
+@pytest.mark.parametrize('rules', [
+    {'name': 'status'}, [{'name': 'rx_utilization'}], [{'name': 'status', 'threshold': '1'}],
+    [{'name': 'status', 'threshold': True}], [{'name': 'status', 'threshold': 1, 'comparison': '<='}],
+    [{'name': 'status', 'threshold': 1, 'hysteresis': 'x'}], [{'name': 'nope', 'threshold': 1}], [{}]
+])
+def test_invalid_rules_are_rejected(rules):
+    with pytest.raises(ValueError):
+        validate_monitored_metrics(rules)
+
+
+def test_intent_with_invalid_rules_is_rejected_before_any_change(app_module, client):
+    intent = {'network_name': 'Campus', 'network_range': '10.0.0.0', 'subnet_mask': '255.255.0.0',
+              'interface_speed': '25G', 'monitored_metrics': [{'name': 'rx_utilization'}]}
+    speeds = app_module.demo_interfaces.to_records()
+    config = app_module.network_manager.current_config
+    response = client.post('/api/intent', json=intent)
+    assert response.status_code == 400 and 'threshold is required' in response.get_json()['message']
+    assert app_module.demo_interfaces.to_records() == speeds
+    assert app_module.network_manager.current_config is config
+    assert validate_monitored_metrics(RULES)[2]['comparison'] == '<'
+
+
+def test_notifications_are_rate_limited_and_counted():
+    engine = AlertEngine(notify_rate=0.001, notify_burst=2)
+    engine.load_rules(RULES[:1])
+    keys = [('sw1', f'ge0/{index}') for index in range(5)]
+    columns = {'rx_bps': np.full(5, 900e6), 'speed_mbps': np.full(5, 1000.0)}
+    delivered = engine.evaluate_columns(keys, columns)
+    assert states(delivered[:2]) == [('rx_utilization', 'firing')] * 2
+    assert delivered[-1] == {'state': 'suppressed', 'count': 3, 'timestamp': delivered[-1]['timestamp']}
+    assert engine.active_alert_count() == 5
+
+
+def test_reload_resolves_alerts_of_removed_and_changed_rules():
+    engine, received = engine_with()
+    engine.evaluate_batch(batch(850e6, status=0))
+    received.clear()
+
+    changed = [dict(RULES[0], threshold=90), RULES[1]]
+    notifications = engine.load_rules(changed)
+    assert sorted(states(notifications)) == [('rx_utilization', 'resolved'), ('status', 'resolved')]
+    assert received == notifications
+    assert engine.active_alert_count() == 0
+    # The changed rule no longer matches, so nothing fires again
+    assert engine.evaluate_batch(batch(850e6, status=0)) == []
+
+
+def test_reload_keeps_state_of_unchanged_rules():
+    engine, received = engine_with()
+    engine.evaluate_batch(batch(850e6))
+    assert engine.load_rules([dict(rule) for rule in RULES]) == []
+    assert engine.active_alert_count() == 1
+    # No duplicate "firing" after the reload
+    assert engine.evaluate_batch(batch(850e6)) == []
+
+
+def test_alerts_endpoint(app_module, client):
+    app_module.init_analytics()
+    app_module.alert_engine.evaluate_batch(batch(0, status=0, interface='ge9/9'))
+    body = client.get('/api/alerts').get_json()
+    assert any(alert['interface'] == 'ge9/9' and alert['rule'] == 'status' for alert in body['alerts'])
+    assert body['active'] >= 1
+    app_module.alert_engine.evaluate_batch(batch(0, status=1, interface='ge9/9'))
@@ -0,0 +1,19 @@
+def test_server_runs_without_reloader_or_debug(app_module, monkeypatch):
+    calls = []
+    monkeypatch.setattr(app_module.socketio, 'run', lambda app, **options: calls.append(options))
+    app_module.run_server(5123)
+    assert calls == [{'host': '0.0.0.0', 'port': 5123, 'debug': False, 'use_reloader': False,
+                      'allow_unsafe_werkzeug': True}]
+
+
+def test_debug_is_opt_in(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'DEBUG', True)
+    calls = []
+    monkeypatch.setattr(app_module.socketio, 'run', lambda app, **options: calls.append(options))
+    app_module.run_server()
+    assert calls[0]['debug'] is True and calls[0]['use_reloader'] is False
+
+
+def test_index_and_status(client):
+    assert client.get('/').status_code == 200
+    assert client.get('/api/status').status_code == 200
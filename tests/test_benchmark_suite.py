@@ -0,0 +1,37 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SUITE_PATH = Path(__file__).resolve().parent.parent / 'benchmarks' / 'suite.py'
+
+
+@pytest.fixture(scope='module')
+def suite():
+    spec = importlib.util.spec_from_file_location('benchmark_suite', SUITE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_compare_flags_results_beyond_tolerance(suite):
+    baseline = {'a[1 x]': {'seconds': 1.0}, 'b[1 x]': {'seconds': 1.0}}
+    results = {'a[1 x]': {'seconds': 1.2}, 'b[1 x]': {'seconds': 1.5}, 'new[1 x]': {'seconds': 9.0}}
+    assert suite.compare(results, baseline, 0.25) == [('b[1 x]', 1.5, 1.0, 1.5)]
+    assert suite.compare(results, baseline, 0.5) == []
+
+
+def test_grouped_cases_run_size_by_size(suite):
+    order = suite.schedule(['intent_config', 'api_intent', 'api_metrics', 'api_interfaces'])
+    assert order[:3] == [('intent_config', 1), ('intent_config', 64), ('intent_config', 1024)]
+    assert [name for name, _ in order[3:6]] == ['api_intent'] * 3
+    assert order[6:9] == [('api_metrics', 48), ('api_interfaces', 48), ('api_metrics', 4800)]
+    assert suite.schedule(['intent_config'], quick=True) == [('intent_config', 1)]
+
+
+def test_run_suite_records_results_and_skips(suite):
+    results, skipped = suite.run_suite(['intent_config', 'netconf_dict_to_xml'], quick=True, repeat=1, min_time=0)
+    assert results['intent_config[1 vlans]']['seconds'] > 0
+    assert list(results) == ['intent_config[1 vlans]'] or 'netconf_dict_to_xml[4 interfaces]' in results
+    if 'netconf_dict_to_xml[4 interfaces]' not in results:
+        assert 'ncclient' in skipped['netconf_dict_to_xml']
@@ -0,0 +1,97 @@
+import pytest
+
+from failover.dampening import FlapDampener
+from failover.failover_manager import FailoverManager
+from monitoring.metrics import MetricsHub
+
+
+def flap(dampener, name, at):
+    dampener.observe(name, True, now=at)
+    return dampener.observe(name, False, now=at)
+
+
+def test_penalty_decays_with_half_life():
+    dampener = FlapDampener()
+    assert not flap(dampener, 'ge0/1', 0)
+    assert dampener.to_dict(now=900)['interfaces']['ge0/1']['penalty'] == 500
+
+
+def test_repeated_flaps_suppress_until_reuse():
+    dampener = FlapDampener()
+    assert not flap(dampener, 'ge0/1', 0)
+    assert not flap(dampener, 'ge0/1', 60)
+    assert flap(dampener, 'ge0/1', 120)
+    assert dampener.suppressed_count(now=120) == 1
+    # ~2823 decays to 750 after half_life * log2(2823 / 750) seconds
+    reuse_in = dampener.reuse_in('ge0/1', now=120)
+    assert 1700 < reuse_in < 1750
+    assert dampener.is_suppressed('ge0/1', now=120 + reuse_in - 1)
+    assert not dampener.is_suppressed('ge0/1', now=120 + reuse_in + 1)
+    assert dampener.reuse_in('ge0/1', now=120 + reuse_in + 1) == 0
+
+
+def test_staying_down_is_not_a_flap():
+    dampener = FlapDampener()
+    for at in range(0, 100, 10):
+        dampener.observe('ge0/1', False, now=at)
+    assert dampener.flaps == 1
+
+
+def test_suppression_is_bounded_by_max_suppress():
+    dampener = FlapDampener()
+    for at in range(0, 200, 10):
+        flap(dampener, 'ge0/1', at)
+    assert dampener.is_suppressed('ge0/1', now=190 + 3599)
+    assert not dampener.is_suppressed('ge0/1', now=190 + 3601)
+
+
+@pytest.mark.parametrize('params', [{'half_life': 0}, {'reuse': 3000}, {'reuse': 0}])
+def test_invalid_parameters_rejected(params):
+    with pytest.raises(ValueError):
+        FlapDampener(**params)
+
+
+def test_manager_holds_failback_to_flapping_primary():
+    clock = [0.0]
+    hub = MetricsHub()
+    manager = FailoverManager(None, hub, name='flappy', dampener=FlapDampener(clock=lambda: clock[0]))
+    manager.add_failover_group({'name': 'uplink', 'primary-interfaces': ['a'], 'backup-interfaces': ['b']})
+    health = {'a': True, 'b': True}
+    manager._check_interface_health = health.__getitem__
+
+    def run(checks, primary_up):
+        health['a'] = primary_up
+        for _ in range(checks):
+            clock[0] += manager.CHECK_INTERVAL
+            manager.run_health_checks()
+
+    for _ in range(3):
+        run(3, False)
+        run(5, True)
+    assert manager.snapshot().data['uplink']['current_active'] == 'b'
+    assert hub.suppressed_counts() == {('flappy', 'uplink', 'failback'): 1}
+    assert manager.dampener.to_dict()['interfaces']['a']['suppressed']
+
+    run(int(manager.dampener.reuse_in('a')) // manager.CHECK_INTERVAL + 1, True)
+    assert manager.snapshot().data['uplink']['current_active'] == 'a'
+    assert hub.event_counts() == {('flappy', 'uplink', 'failover'): 3, ('flappy', 'uplink', 'failback'): 3}
+
+
+def test_dampening_endpoint(client):
+    body = client.get('/api/failover/dampening').get_json()
+    assert body['params']['half_life'] == 900
+    assert 'interfaces' in body
+
+
+def test_simulate_endpoint_dampening_override(app_module, client):
+    app_module.failover_manager.set_failover_groups(
+        [{'name': 'uplink', 'primary-interfaces': ['gigabitethernet0/1'], 'backup-interfaces': ['gigabitethernet0/2']}])
+    flaky = {'fraction': 1, 'failure': {'distribution': 'fixed', 'value': 120},
+             'repair': {'distribution': 'fixed', 'value': 60}}
+    dampened = client.post('/api/failover/simulate', json={'duration': 86400, 'seed': 1, 'flaky': flaky}).get_json()
+    plain = client.post('/api/failover/simulate',
+                        json={'duration': 86400, 'seed': 1, 'flaky': flaky, 'dampening': None}).get_json()
+    assert dampened['suppressed_failbacks'] > 0 and plain['suppressed_failbacks'] == 0
+    assert dampened['failovers'] + dampened['failbacks'] < plain['failovers'] + plain['failbacks']
+    response = client.post('/api/failover/simulate', json={'dampening': {'reuse': -1}})
+    assert response.status_code == 400
@@ -0,0 +1,170 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from failover.dampening import DEFAULT_DAMPENING, FlapDampener
+from failover.failover_manager import FailoverManager
+from failover.simulator import FailoverSimulator, parse_distribution
+from monitoring.metrics import MetricsHub
+
+
+def random_groups(rng, interfaces=8, groups=6):
+    names = [f'if{index}' for index in range(interfaces)]
+    result = []
+    for index in range(groups):
+        picks = rng.sample(names, rng.randint(1, 4))
+        result.append({'name': f'group{index}', 'primary-interfaces': picks[:1] if rng.random() > 0.1 else [],
+                       'backup-interfaces': picks[1:]})
+    return result
+
+
+def manager_replay(groups, transitions, ticks, dampening=None):
+    """Drive the real FailoverManager check by check over the same interface timelines"""
+    hub = MetricsHub()
+    clock = [0]
+    # Without dampening the manager's dampener must never suppress
+    dampener = FlapDampener(**(dampening or {'suppress': math.inf}), clock=lambda: clock[0] * FailoverManager.CHECK_INTERVAL)
+    manager = FailoverManager(None, hub, name='replay', dampener=dampener)
+    manager.set_failover_groups(groups)
+    events = []
+    hub.subscribe(events.append)
+    seen = {name: np.minimum(np.ceil(times / manager.CHECK_INTERVAL), ticks) for name, times in transitions.items()}
+    manager._check_interface_health = lambda name: np.searchsorted(seen[name], clock[0], side='right') % 2 == 0
+    downtime = dict.fromkeys((group['name'] for group in groups), 0)
+    for tick in range(ticks):
+        clock[0] = tick
+        for name, data in manager.run_health_checks().data.items():
+            active = data['current_active']
+            if active and not manager._check_interface_health(active):
+                downtime[name] += 1
+    return manager, events, downtime
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_replay_matches_failover_manager(seed):
+    groups = random_groups(random.Random(seed))
+    simulator = FailoverSimulator(groups, dampening=None)
+    duration = 20000
+    transitions = simulator.sample_transitions(duration, failure={'distribution': 'exponential', 'mean': 400},
+                                               repair={'distribution': 'exponential', 'mean': 120}, seed=seed)
+    result = simulator.replay(transitions, duration)
+    manager, events, downtime = manager_replay(groups, transitions, math.ceil(duration / 10))
+
+    for index, group in enumerate(groups):
+        name = group['name']
+        kinds = [event['kind'] for event in events if event['group'] == name]
+        assert result.failovers[index] == kinds.count('failover')
+        assert result.failbacks[index] == kinds.count('failback')
+        assert result.downtime_ticks[index] == downtime[name]
+        assert result.final_active[index] == manager.snapshot().data[name]['current_active']
+
+
+def test_outage_is_detected_after_three_checks_and_failed_back_after_five():
+    simulator = FailoverSimulator([{'name': 'uplink', 'primary-interfaces': ['a'], 'backup-interfaces': ['b']}])
+    # Primary down from 100 s to 400 s
+    result = simulator.replay({'a': np.array([100.0, 400.0]), 'b': np.empty(0)}, 1000)
+    assert (result.failovers[0], result.failbacks[0]) == (1, 1)
+    assert list(result.outages * 10) == [20]
+    assert result.downtime_ticks[0] == 2
+    assert result.final_active == ['a']
+    summary = result.to_dict()
+    assert summary['mttr_seconds']['p50'] == 20
+    assert summary['open_outages'] == 0
+
+
+def test_group_without_primary_is_idle():
+    simulator = FailoverSimulator([{'name': 'empty', 'backup-interfaces': ['b']}])
+    result = simulator.run(86400, seed=1)
+    assert result.failovers[0] == 0 and result.final_active == [None]
+
+
+def test_flaky_population_flaps_more():
+    groups = [{'name': f'g{index}', 'primary-interfaces': [f'p{index}'], 'backup-interfaces': [f'b{index}']}
+              for index in range(200)]
+    simulator = FailoverSimulator(groups)
+    steady = simulator.run(30 * 86400, seed=3)
+    flaky = simulator.run(30 * 86400, seed=3, flaky={'fraction': 0.2, 'failure': {'distribution': 'fixed', 'value': 3600}})
+    assert flaky.failovers.sum() > steady.failovers.sum()
+
+
+@pytest.mark.parametrize('spec', [{'distribution': 'gamma', 'mean': 1}, {'distribution': 'weibull', 'shape': 2},
+                                  {'distribution': 'fixed', 'value': 0}])
+def test_invalid_distribution_rejected(spec):
+    with pytest.raises(ValueError):
+        parse_distribution(spec)
+
+
+def test_simulate_endpoint(app_module, client):
+    app_module.failover_manager.set_failover_groups(
+        [{'name': 'uplink', 'primary-interfaces': ['gigabitethernet0/1'], 'backup-interfaces': ['gigabitethernet0/2']}])
+    response = client.post('/api/failover/simulate', json={'duration': 30 * 86400, 'seed': 1})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['groups'] == 1 and body['simulated_seconds'] == 30 * 86400
+    assert client.post('/api/failover/simulate', json={'duration': -1}).status_code == 400
+    assert client.post('/api/failover/simulate', json={'failure': {'distribution': 'nope'}}).status_code == 400
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_dampened_replay_matches_failover_manager(seed):
+    rng = random.Random(seed)
+    # Dampening is tracked per group, so primaries are not shared here
+    groups = [{'name': f'group{index}', 'primary-interfaces': [f'p{index}'],
+               'backup-interfaces': [f'b{index}.{backup}' for backup in range(rng.randint(1, 3))]}
+              for index in range(6)]
+    simulator = FailoverSimulator(groups)
+    duration = 40000
+    transitions = simulator.sample_transitions(duration, failure={'distribution': 'exponential', 'mean': 300},
+                                               repair={'distribution': 'exponential', 'mean': 90}, seed=seed)
+    result = simulator.replay(transitions, duration)
+    manager, events, downtime = manager_replay(groups, transitions, math.ceil(duration / 10), DEFAULT_DAMPENING)
+    suppressed = manager.monitoring_system.suppressed_counts()
+
+    assert result.suppressed.sum() > 0
+    for index, group in enumerate(groups):
+        name = group['name']
+        kinds = [event['kind'] for event in events if event['group'] == name]
+        assert result.failovers[index] == kinds.count('failover')
+        assert result.failbacks[index] == kinds.count('failback')
+        assert result.suppressed[index] == suppressed.get(('replay', name, 'failback'), 0)
+        assert result.downtime_ticks[index] == downtime[name]
+        assert result.final_active[index] == manager.snapshot().data[name]['current_active']
+
+
+def test_dampening_holds_failback_to_flapping_primary():
+    groups = [{'name': 'uplink', 'primary-interfaces': ['a'], 'backup-interfaces': ['b']}]
+    # Primary flaps three times in ten minutes; the third flap suppresses it for ~27 minutes
+    flaps = {'a': np.array([100.0, 200.0, 300.0, 400.0, 500.0, 600.0]), 'b': np.empty(0)}
+    undampened = FailoverSimulator(groups, dampening=None).replay(flaps, 1800)
+    assert (undampened.failbacks[0], undampened.suppressed[0]) == (3, 0)
+    assert undampened.final_active == ['a']
+    dampened = FailoverSimulator(groups).replay(flaps, 1800)
+    assert (dampened.failbacks[0], dampened.suppressed[0]) == (2, 1)
+    assert dampened.to_dict()['suppressed_failbacks'] == 1
+    assert dampened.final_active == ['b']
+    # Reusable again well within max_suppress
+    assert FailoverSimulator(groups).replay(flaps, 3600).final_active == ['a']
+
+
+def test_suppressed_failback_stops_publishing_new_versions(monkeypatch):
+    manager = FailoverManager(None, MetricsHub(), name='held')
+    manager.set_failover_groups([{'name': 'uplink', 'primary-interfaces': ['a'], 'backup-interfaces': ['b']}])
+    healthy = {'a': False, 'b': True}
+    manager._check_interface_health = healthy.get
+    for _ in range(manager.FAILOVER_THRESHOLD):
+        manager.run_health_checks()
+    assert manager.snapshot().data['uplink']['current_active'] == 'b'
+
+    healthy['a'] = True
+    monkeypatch.setattr(manager.dampener, 'is_suppressed', lambda name: True)
+    monkeypatch.setattr(manager.dampener, 'reuse_in', lambda name: 60.0)
+    for _ in range(manager.FAILBACK_THRESHOLD + 1):
+        manager.run_health_checks()
+    version = manager.snapshot().version
+    for _ in range(10):
+        manager.run_health_checks()
+    assert manager.snapshot().version == version
+    assert manager.snapshot().data['uplink']['recovery_count'] == manager.FAILBACK_THRESHOLD + 1
+    assert manager.monitoring_system.suppressed_counts()[('held', 'uplink', 'failback')] == 1
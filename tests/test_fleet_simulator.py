@@ -0,0 +1,167 @@
+import socket
+
+import pytest
+
+from intent_engine.rollout import RolloutExecutor, plan_rollout
+from monitoring.telemetry_collector import TelemetryCollector
+from netconf_client.fleet_simulator import FleetSimulator
+from netconf_client.netconf_listener import handle_rpc
+
+NETWORK = {'network': {'interfaces': [{'name': 'eth0', 'vlan': 10}], 'monitoring': {'enabled': True}}}
+
+
+def test_counters_advance_and_churn_flips(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('netconf_client.fleet_simulator.time.monotonic', lambda: now[0])
+    fleet = FleetSimulator(devices=3, ports=4, seed=1)
+    fleet.connect_all()
+    device = fleet.client('sim00001')
+
+    before = device.get_interface_counters()
+    assert [counter['name'] for counter in before] == list(fleet.port_names)
+    now[0] += 10
+    after = device.get_interface_counters()
+    assert all(a['in_octets'] > b['in_octets'] for a, b in zip(after, before))
+
+    fleet.set_oper_status(1, 2, False)
+    now[0] += 10
+    stalled = device.get_interface_counters()
+    assert stalled[2]['oper_status'] == 'down' and stalled[2]['in_octets'] == after[2]['in_octets']
+    assert device.get_interfaces().to_records()[2]['status'] == 'down'
+
+    flapping = FleetSimulator(devices=1, ports=8, churn=0.5, seed=2)
+    flapping.connect_all()
+    flapping.clients[0].get_interface_counters()
+    assert flapping.oper_up.count(0) == 4
+
+
+def test_config_merge_and_replace():
+    fleet = FleetSimulator(devices=2, ports=2, seed=1)
+    device = fleet.clients[0]
+    assert device.send_config(NETWORK) is False
+    assert fleet.connect_all() == 2
+
+    assert device.get_config() == {} and fleet.configs[0] is None
+    assert device.send_config(NETWORK)
+    assert device.send_config({'network': {'monitoring': {'interval': 5}}})
+    assert device.get_config()['network']['monitoring'] == {'enabled': True, 'interval': 5}
+    assert device.replace_config({'network': {'qos': {}}})
+    assert device.get_config() == {'network': {'qos': {}}}
+    assert fleet.configs[1] is None
+    assert fleet.stats()['configured'] == 1
+
+
+def test_injected_errors_surface_as_failed_calls():
+    fleet = FleetSimulator(devices=2, ports=2, error_rate=1.0, seed=1)
+    fleet.connect_all()
+    device = fleet.clients[0]
+    assert device.send_config(NETWORK) is False
+    assert device.get_config() == {}
+    assert device.get_interface_counters() == []
+    assert len(device.get_interfaces()) == 0
+    assert fleet.stats()['errors'] == fleet.stats()['rpcs'] == 4
+
+
+def test_rollout_and_telemetry_over_the_fleet():
+    fleet = FleetSimulator(devices=50, ports=4, latency=0.002, seed=1)
+    fleet.connect_all()
+    clients = fleet.devices()
+
+    result = RolloutExecutor(max_workers=16).run(plan_rollout(dict.fromkeys(clients, NETWORK)), clients)
+    assert result.success and len(result.completed) == 50
+    assert all(config == NETWORK for config in fleet.configs)
+
+    collector = TelemetryCollector(clients, max_workers=16)
+    assert len(collector.collect_once()) == 50 * 4
+    collector.stop()
+
+
+def test_handle_rpc():
+    fleet = FleetSimulator(devices=1, ports=2, seed=1)
+    fleet.connect_all()
+    device = fleet.clients[0]
+    base = 'xmlns="urn:ietf:params:xml:ns:netconf:base:1.0"'
+
+    reply, close = handle_rpc(device, (
+        f'<rpc {base} message-id="1"><edit-config><target><running/></target><config>'
+        '<network xmlns="http://campus-ibn/ns/network"><interfaces><name>eth0</name><vlan>10</vlan></interfaces>'
+        '<interfaces><name>eth1</name><vlan>20</vlan></interfaces></network></config></edit-config></rpc>').encode())
+    assert b'<ok />' in reply and b'message-id="1"' in reply and not close
+    assert device.get_config()['network']['interfaces'][1] == {'name': 'eth1', 'vlan': '20'}
+
+    reply, _ = handle_rpc(device, f'<rpc {base} message-id="2"><get-config><source><running/></source>'
+                                  f'</get-config></rpc>'.encode())
+    assert b'<vlan>20</vlan>' in reply
+
+    reply, _ = handle_rpc(device, f'<rpc {base} message-id="3"><get/></rpc>'.encode())
+    assert reply.count(b'<in-octets>') == 2
+
+    reply, _ = handle_rpc(device, f'<rpc {base} message-id="4"><edit-config><default-operation>replace'
+                                  f'</default-operation><config/></edit-config></rpc>'.encode())
+    assert b'<ok />' in reply and device.get_config() == {'network': {}}
+
+    reply, _ = handle_rpc(device, f'<rpc {base} message-id="5"><lock/></rpc>'.encode())
+    assert b'operation lock not supported' in reply
+    assert handle_rpc(device, f'<rpc {base}><close-session/></rpc>'.encode())[1]
+
+
+def test_listener_serves_netconf_over_ssh():
+    paramiko = pytest.importorskip('paramiko')
+    from netconf_client.netconf_listener import EOM, NetconfListener
+
+    fleet = FleetSimulator(devices=2, ports=2, seed=1)
+    fleet.connect_all()
+    listener = NetconfListener(fleet, port=0).start()
+    try:
+        transport = paramiko.Transport(socket.create_connection(('127.0.0.1', listener.port)))
+        transport.connect(username='sim00001', password='admin')
+        channel = transport.open_session()
+        channel.invoke_subsystem('netconf')
+        channel.sendall(b'<hello xmlns="urn:ietf:params:xml:ns:netconf:base:1.0"/>' + EOM +
+                        b'<rpc xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="1"><get/></rpc>' + EOM)
+        received = b''
+        while received.count(EOM) < 2:
+            received += channel.recv(65536)
+        assert b'<session-id>' in received and received.count(b'<in-octets>') == 2
+        transport.close()
+    finally:
+        listener.stop()
+
+
+def test_app_keeps_the_fleet_out_of_history_and_untargeted_pushes(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, 'SIMULATED_DEVICES', 4)
+    monkeypatch.setattr(app_module, 'SIMULATED_HISTORY_DEVICES', 1)
+    monkeypatch.setattr(app_module, 'SIMULATED_NETCONF_PORT', 0)
+    app_module.attach_simulated_fleet()
+    fleet = app_module.simulated_fleet
+    try:
+        batch = [{'device': name} for name in ['localhost'] + fleet.names]
+        assert [sample['device'] for sample in app_module.analytics_samples(batch)] == ['localhost', 'sim00000']
+
+        manager = app_module.network_manager
+        assert client.post('/api/advanced-config', json={'qos_config': {}}).status_code == 200
+        assert manager.device_config()
+        assert fleet.configs == [None] * 4
+        assert manager.desired_config('sim00001') == {}
+        assert manager.target_devices({'device_selector': '!floor'}).isdisjoint(fleet.names)
+
+        targets = manager.target_devices({'device_selector': 'simulated=true'})
+        assert targets == set(fleet.names)
+        manager.push_device_config(targets)
+        assert all(config == manager.device_config() for config in fleet.configs)
+        assert manager.desired_config('sim00001') == manager.device_config()
+    finally:
+        for name in fleet.names:
+            app_module.telemetry_collector.remove_device(name)
+        monkeypatch.setattr(app_module, 'simulated_fleet', None)
+        monkeypatch.setattr(app_module, 'simulated_inventory', None)
+
+
+def test_demo_interfaces_ignore_other_devices_with_the_same_port_names(app_module):
+    records = app_module.demo_interfaces.to_records()
+    summary = app_module.interface_aggregates.summary()
+    name = records[0]['name']
+    app_module.apply_interface_telemetry([{'device': 'sim00000', 'interface': name, 'status': 0,
+                                           'rx_delta': 10, 'tx_delta': 10, 'rx_bps': 1.0, 'tx_bps': 1.0}])
+    assert app_module.demo_interfaces.to_records() == records
+    assert app_module.interface_aggregates.summary() == summary
@@ -0,0 +1,86 @@
+import pytest
+
+from intent_engine.intent_store import CommitTimeout, IntentStore, config_digest
+
+INTENT = {'network_name': 'Campus', 'network_range': '10.0.0.0/16', 'subnet_mask': '255.255.0.0',
+          'interface_speed': '1G'}
+
+
+def test_opens_on_first_use_and_recovers(tmp_path):
+    store = IntentStore(tmp_path / 'intents.db', flush_interval=0.01)
+    store.set_section('qos_config', {'voice': 1}, wait=True)
+    digest = store.set_desired('sw1', {'vlan': 10}, wait=True)
+    store.close()
+
+    reopened = IntentStore(tmp_path / 'intents.db')
+    state = reopened.state()
+    assert state['sections'] == {'qos_config': {'voice': 1}}
+    assert state['devices']['sw1'] == {'desired': digest, 'applied': None}
+    assert reopened.drifted_devices() == ['sw1']
+    reopened.mark_applied('sw1', digest, wait=True)
+    assert reopened.drifted_devices() == []
+    reopened.close()
+
+
+def test_snapshot_compacts_the_log(tmp_path):
+    store = IntentStore(tmp_path / 'intents.db', flush_interval=0.01, snapshot_every=10)
+    for index in range(25):
+        store.set_section('topology', {'root': f'sw{index}'})
+    store.close()
+    reopened = IntentStore(tmp_path / 'intents.db')
+    assert reopened.state()['sections']['topology'] == {'root': 'sw24'}
+    assert reopened.replayed == 0 and reopened.stats()['snapshot_seq'] == 25
+    reopened.close()
+
+
+def test_commit_times_out_when_the_writer_is_stuck(tmp_path):
+    store = IntentStore(tmp_path / 'intents.db', commit_timeout=0.05)
+    store.open()
+    store._flush = lambda: None
+    with pytest.raises(CommitTimeout):
+        store.set_section('qos_config', {}, wait=True)
+    del store._flush
+    store.close()
+
+
+def test_config_digest_ignores_key_order():
+    assert config_digest({'a': 1, 'b': [1, 2]}) == config_digest({'b': [1, 2], 'a': 1})
+
+
+def test_intent_endpoint_persists_without_background_tasks(app_module, client):
+    response = client.post('/api/intent', json=INTENT)
+    assert response.status_code == 200, response.get_json()
+    assert app_module.intent_store.state()['sections']['current_config']['network_name'] == 'Campus'
+    assert client.post('/api/intent', json={'network_name': 'x'}).status_code == 400
+
+
+def test_intent_endpoint_reports_commit_timeout(app_module, client, monkeypatch):
+    def stuck(seq):
+        raise CommitTimeout(f"Intent store did not commit change {seq} within 0s")
+
+    monkeypatch.setattr(app_module.intent_store, 'commit', stuck)
+    response = client.post('/api/intent', json=INTENT)
+    assert response.status_code == 503 and 'did not commit' in response.get_json()['message']
+    assert client.post('/api/advanced-config', json={'qos_config': {}}).status_code == 503
+
+
+def test_failed_apply_restores_memory_and_store(app_module, client, monkeypatch):
+    assert client.post('/api/intent', json=INTENT).status_code == 200
+    manager = app_module.network_manager
+    records = app_module.demo_interfaces.to_records()
+    config, groups, services = manager.current_config, manager.failover_groups, manager.network_services
+    sections = app_module.intent_store.state()['sections']
+
+    def broken(rules):
+        raise RuntimeError('compiler crashed')
+
+    monkeypatch.setattr(app_module, 'compile_security_policy', broken)
+    intent = dict(INTENT, interface_speed='10G', security_rules=[],
+                  failover_config={'primary': 'gigabitethernet0/1', 'backup': 'gigabitethernet0/2'},
+                  network_services={'dhcp_enabled': False})
+    assert client.post('/api/intent', json=intent).status_code == 500
+
+    assert app_module.demo_interfaces.to_records() == records
+    assert manager.current_config is config and manager.network_services == services
+    assert manager.failover_groups == groups and app_module.ipam.enabled
+    assert app_module.intent_store.state()['sections'] == sections
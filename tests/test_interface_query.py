@@ -0,0 +1,54 @@
+import pytest
+
+from web_ui.interface_query import InterfaceQueryEngine
+
+
+def records(count=10):
+    return [{'name': f'ge0/{index:02d}', 'status': 'up' if index % 3 else 'down', 'vlan': 100 + index % 2,
+             'speed': '1G', 'description': f'port {index}', 'rx_bps': float(index % 4)} for index in range(count)]
+
+
+def pages(engine, sort, limit, **filters):
+    cursor, seen, sizes = None, [], []
+    while True:
+        result = engine.query(filters, sort=sort, limit=limit, cursor=cursor)
+        seen.extend(interface['name'] for interface in result['interfaces'])
+        sizes.append(len(result['interfaces']))
+        cursor = result['next_cursor']
+        if cursor is None:
+            return seen, sizes
+
+
+@pytest.mark.parametrize('sort', ['name', '-name', 'rx_bps', '-rx_bps'])
+def test_exactly_full_last_page_has_no_cursor(sort):
+    engine = InterfaceQueryEngine(records(10))
+    names, sizes = pages(engine, sort, 5)
+    assert sizes == [5, 5] and sorted(names) == sorted(record['name'] for record in records(10))
+    assert pages(engine, sort, 4)[1] == [4, 4, 2]
+
+
+def test_filters_and_sparse_fields():
+    engine = InterfaceQueryEngine(records(10))
+    result = engine.query({'status': 'down', 'vlan': '100'}, fields=['name'])
+    assert result == {'interfaces': [{'name': 'ge0/00'}, {'name': 'ge0/06'}], 'total': 2, 'next_cursor': None}
+    assert engine.query({'description_prefix': 'PORT 1'})['total'] == 1
+    names, sizes = pages(engine, '-rx_bps', 2, status='up')
+    assert sizes == [2, 2, 2] and len(names) == 6
+
+
+def test_invalid_parameters():
+    engine = InterfaceQueryEngine(records())
+    cursor = engine.query(limit=2)['next_cursor']
+    for kwargs in ({'limit': 0}, {'sort': 'mtu'}, {'cursor': 'not-a-cursor'}, {'sort': '-name', 'cursor': cursor}):
+        with pytest.raises(ValueError):
+            engine.query(**kwargs)
+    with pytest.raises(ValueError):
+        engine.query({'mtu': '1500'})
+
+
+def test_interfaces_endpoint_pages(client):
+    first = client.get('/api/interfaces?limit=1&fields=name').get_json()
+    assert len(first['interfaces']) == 1 and list(first['interfaces'][0]) == ['name']
+    rest = client.get(f"/api/interfaces?limit={first['total']}&cursor={first['next_cursor']}").get_json()
+    assert len(rest['interfaces']) == first['total'] - 1 and rest['next_cursor'] is None
+    assert client.get('/api/interfaces?sort=bogus').status_code == 400
@@ -0,0 +1,77 @@
+import gc
+import json
+import tracemalloc
+
+import numpy as np
+from prometheus_client.parser import text_string_to_metric_families
+
+from netconf_client.interface_table import InterfaceTable
+
+
+def records(count):
+    return [{'name': f'gigabitethernet{index // 480}/{index // 48 % 10}/{index % 48}',
+             'ip_address': f'10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}/24',
+             'speed': ('1G', '10G')[index % 2], 'status': 'up' if index % 5 else 'down',
+             'vlan': 100 + index % 20, 'traffic_rx': index * 1000, 'traffic_tx': index * 10,
+             'description': ('Uplink', 'Faculty access', 'Camera')[index % 3],
+             'rx_bps': index * 8, 'tx_bps': index} for index in range(count)]
+
+
+def held_by(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, held
+
+
+def test_rows_round_trip_including_overflow_fields():
+    source = records(300)
+    source[3] = dict(source[3], ip_address='fe80::1/64', lldp_neighbor='sw2')
+    source[4] = dict(source[4], vlan=None, description=None)
+    source.append({'name': 'port' + '7' * 300, 'status': 'up'})
+    table = InterfaceTable.from_records(source)
+    expected = [dict({'ip_address': None, 'speed': None, 'vlan': None, 'traffic_rx': 0, 'traffic_tx': 0,
+                      'description': None, 'rx_bps': 0, 'tx_bps': 0}, **record) for record in source]
+    assert table.to_records() == expected
+    assert dict(table[3]) == expected[3] and table[-1]['name'] == source[-1]['name']
+    assert table.names(range(0, 301, 3)) == [record['name'] for record in source[::3]]
+    assert table.rows_of([record['name'] for record in source] + ['missing']) == list(range(301)) + [-1]
+
+
+def test_appends_and_writes_go_to_the_columns():
+    table = InterfaceTable.from_records(records(10))
+    row = table.append({'name': 'eth9', 'speed': '100G', 'status': 'up'})
+    table[row]['status'] = 'down'
+    table[row]['ip_address'] = '192.168.1.1/24'
+    assert table.row_of('eth9') == row and table[row]['status'] == 'down'
+    assert table.to_record(row)['ip_address'] == '192.168.1.1/24'
+
+
+def test_bulk_updates_use_zero_copy_views():
+    table = InterfaceTable.from_records(records(100))
+    view = table.column('traffic_rx')
+    table.add('traffic_rx', [1, 1, 2], [5, 5, 7])
+    table.assign('rx_bps', [0], [123.0])
+    assert view[1] == 1010 and table[2]['traffic_rx'] == 2007 and table[0]['rx_bps'] == 123
+    assert np.shares_memory(view, table.column('traffic_rx'))
+
+
+def test_exports_match_the_records():
+    table = InterfaceTable.from_records(records(250))
+    table.append({'name': 'eth"quoted', 'extra': [1, 2]})
+    assert table.to_json() == json.dumps(table.to_records())
+    assert ''.join(table.iter_json(chunk_rows=7)) == table.to_json()
+    families = {family.name: family for family in
+                text_string_to_metric_families(table.render_prometheus('campus').decode())}
+    status = {sample.labels['interface']: sample.value for sample in families['network_interface_status'].samples}
+    assert status['gigabitethernet0/0/0'] == 0 and status['gigabitethernet0/0/1'] == 1
+
+
+def test_a_tenth_of_the_memory_of_dicts():
+    source, dict_bytes = held_by(lambda: records(50000))
+    table, table_bytes = held_by(lambda: InterfaceTable.from_records(source))
+    assert dict_bytes / table_bytes >= 10
+    assert abs(table.nbytes() - table_bytes) / table_bytes < 0.1
@@ -0,0 +1,120 @@
+import random
+
+import pytest
+
+from inventory.device_inventory import DeviceInventory, bitmap_slots, parse_selector
+
+SELECTORS = ['building=b1,role=access', 'role!=core', 'floor in (1,2),vendor==cisco', '!floor',
+             'floor notin (0,1,2)', 'vendor', '']
+
+
+def fleet(count, seed=3):
+    rng = random.Random(seed)
+    devices = []
+    for index in range(count):
+        labels = {'building': f'b{index % 5}', 'role': rng.choice(['access', 'distribution', 'core']),
+                  'vendor': rng.choice(['cisco', 'juniper'])}
+        if index % 7:
+            labels['floor'] = str(index % 4)
+        devices.append({'name': f'sw{index}', 'host': f'10.0.0.{index % 250}', 'labels': labels})
+    return devices
+
+
+def matches(labels, selector):
+    for key, operator, values in parse_selector(selector):
+        value = labels.get(key)
+        if operator in ('=', 'in') and value not in values:
+            return False
+        if operator in ('!=', 'notin') and value in values:
+            return False
+        if operator == 'exists' and key not in labels:
+            return False
+        if operator == 'absent' and key in labels:
+            return False
+    return True
+
+
+def assert_consistent(inventory, devices):
+    for selector in SELECTORS:
+        expected = {device['name'] for device in devices if matches(device['labels'], selector)}
+        assert set(inventory.names(selector)) == expected, selector
+        assert inventory.snapshot().count(selector) == len(expected)
+
+
+def test_parse_selector():
+    assert parse_selector('building=eng, floor in (1, 2),!decommissioned') == (
+        ('building', '=', ('eng',)), ('floor', 'in', ('1', '2')), ('decommissioned', 'absent', ()))
+    for selector in ('building=eng=x', '!role=core', 'floor in ()', 'a b'):
+        with pytest.raises(ValueError):
+            parse_selector(selector)
+
+
+def test_selectors_match_a_full_scan():
+    devices = fleet(300)
+    inventory = DeviceInventory(devices)
+    assert_consistent(inventory, devices)
+
+
+def test_reload_is_incremental():
+    devices = fleet(300)
+    inventory = DeviceInventory(devices)
+    before = inventory.snapshot()
+
+    devices[3]['labels']['role'] = 'edge'
+    summary = inventory.load(devices)
+    assert (summary['added'], summary['updated'], summary['removed']) == (0, 1, 0)
+    # Labels nobody changed keep their bitmaps
+    assert inventory.snapshot().index['vendor'] is before.index['vendor']
+
+    del devices[10]
+    devices.append({'name': 'new', 'labels': {'building': 'b1', 'role': 'access'}})
+    summary = inventory.load(devices)
+    assert (summary['added'], summary['updated'], summary['removed']) == (1, 0, 1)
+    assert_consistent(inventory, devices)
+
+    after = inventory.snapshot()
+    # The removed device's slot is reused; the old snapshot is untouched
+    assert after.slots['new'] == before.slots['sw10']
+    assert before.get('sw10') is not None and after.get('sw10') is None
+    assert inventory.load(devices)['version'] == after.version
+
+
+def test_upsert_and_remove():
+    inventory = DeviceInventory()
+    inventory.upsert({'host': '10.1.1.1', 'labels': {'role': 'core'}})
+    inventory.upsert({'name': '10.1.1.1', 'labels': {'role': 'access'}})
+    assert inventory.names('role=access') == ['10.1.1.1']
+    assert inventory.names('role=core') == []
+    inventory.remove('10.1.1.1')
+    assert inventory.names('') == [] and 'role' not in inventory.snapshot().index
+    assert bitmap_slots(0b1010_0000_0001) == [0, 9, 11]
+
+
+def test_load_file_skips_unchanged_files(tmp_path):
+    path = tmp_path / 'inventory.yaml'
+    path.write_text('netconf_devices:\n  - host: sw1\n    labels: {building: eng, role: access}\n')
+    inventory = DeviceInventory()
+    assert inventory.load_file(path)['added'] == 1
+    assert inventory.load_file(path) is None
+    assert inventory.load_file(path, force=True)['updated'] == 0
+
+
+def test_inventory_endpoints(app_module, client, tmp_path, monkeypatch):
+    path = tmp_path / 'inventory.yaml'
+    path.write_text('netconf_devices:\n'
+                    '  - {name: localhost, host: localhost, password: secret, labels: {building: eng}}\n'
+                    '  - {name: sw2, host: 10.0.0.2, labels: {building: lab}}\n')
+    monkeypatch.setattr(app_module, 'INVENTORY_FILE', path)
+    assert client.post('/api/inventory/reload').get_json()['added'] == 2
+
+    body = client.get('/api/inventory?selector=building=eng').get_json()
+    assert body['count'] == 1 and body['devices'][0]['name'] == 'localhost'
+    assert 'password' not in body['devices'][0]
+    assert client.get('/api/inventory').get_json()['labels'] == {'building': {'eng': 1, 'lab': 1}}
+    assert client.get('/api/inventory?selector=a b').status_code == 400
+
+    assert app_module.network_manager.target_devices({'device_selector': 'building=lab'}) == {'sw2'}
+    assert app_module.network_manager.target_devices({}) is None
+    with pytest.raises(ValueError):
+        app_module.network_manager.check_admission({'device_selector': 'building in ()'})
+    app_module.device_inventory.load([])
@@ -0,0 +1,76 @@
+import pytest
+
+from network_services.ipam import IpamService, SubnetPool, TimerWheel, parse_dhcp_range
+
+RANGES = [{'name': 'staff', 'range': '10.0.0.0/29', 'vlan': 10, 'gateway': '10.0.0.1'},
+          {'name': 'guest', 'range': '10.0.1.0/24', 'vlan': 20}]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_dhcp_range():
+    assert parse_dhcp_range('10.0.0.10 - 10.0.0.20') == ('10.0.0.10', '10.0.0.20')
+    assert parse_dhcp_range(None) is None
+    with pytest.raises(ValueError):
+        parse_dhcp_range('10.0.0.20-10.0.0.10')
+
+
+def test_pool_allocates_until_exhausted_and_reuses_released():
+    pool = SubnetPool('staff', '10.0.0.0/29', gateway='10.0.0.1')
+    offsets = [pool.allocate(f'c{index}', 0) for index in range(pool.free)]
+    assert None not in offsets and pool.allocate('late', 0) is None
+    assert pool.release(offsets[2]) == 'c2'
+    assert pool.allocate('late', 0) == offsets[2]
+
+
+def test_timer_wheel_returns_due_items_once():
+    wheel = TimerWheel(tick=1, slots=8, now=0)
+    wheel.schedule('a', 3)
+    wheel.schedule('b', 20)
+    assert wheel.advance(2) == [] and wheel.advance(5) == ['a']
+    assert wheel.advance(25) == ['b'] and wheel.pending == 0
+
+
+def test_leases_expire_renew_and_survive_a_snapshot(tmp_path):
+    clock = Clock()
+    service = IpamService(tmp_path / 'ipam.json', lease_seconds=60, clock=clock)
+    service.configure(RANGES)
+    first = service.request('aa:bb', vlan=10)
+    assert first['address'] == '10.0.0.2' and first['gateway'] == '10.0.0.1'
+    service.request('cc:dd', pool='guest')
+    clock.now += 50
+    assert service.request('aa:bb', vlan=10)['address'] == '10.0.0.2'
+    clock.now += 20
+    assert service.expire() == 1 and service.stats()['counters']['renewed'] == 1
+    assert service.save()
+
+    restored = IpamService(tmp_path / 'ipam.json', lease_seconds=60, clock=clock)
+    restored.configure(RANGES)
+    assert restored.load() == 1
+    assert restored.request('aa:bb', vlan=10)['address'] == '10.0.0.2'
+
+
+def test_reconfigure_narrows_pool_and_keeps_fitting_leases():
+    service = IpamService(clock=Clock())
+    service.configure(RANGES)
+    service.request('aa:bb', pool='guest')
+    service.configure(RANGES, {'dhcp_range': '10.0.1.1-10.0.1.10', 'dhcp_enabled': False})
+    stats = service.stats()
+    assert stats['pools']['guest']['size'] == 10 and stats['pools']['guest']['leased'] == 1
+    with pytest.raises(ValueError):
+        service.request('new', pool='guest')
+    with pytest.raises(ValueError):
+        service.request('any')
+
+
+def test_lease_endpoints(client):
+    response = client.post('/api/ipam/leases', json={'client_id': 'test-client', 'vlan': 100})
+    assert response.status_code == 200, response.get_json()
+    assert client.get('/api/ipam').get_json()['pools']['Faculty']['leased'] >= 1
+    assert client.delete('/api/ipam/leases/test-client?vlan=100').status_code == 200
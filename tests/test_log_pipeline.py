@@ -0,0 +1,67 @@
+import json
+import logging
+
+from monitoring.log_pipeline import AccessLogSampler, JsonFormatter, LazyJson, LogPipeline
+
+
+class Exploding:
+    def __repr__(self):
+        return 'Exploding()'
+
+
+def record(message, *args, **extra):
+    entry = logging.LogRecord('test', logging.INFO, __file__, 1, message, args, None)
+    entry.__dict__.update(extra)
+    return entry
+
+
+def test_lazy_json_serializes_only_when_formatted(monkeypatch):
+    calls = []
+    monkeypatch.setattr(json, 'dumps', lambda *args, **kwargs: calls.append(args) or '{}')
+    logger = logging.getLogger('lazy-json-test')
+    logger.setLevel(logging.INFO)
+    logger.debug("payload %s", LazyJson({'a': 1}))
+    assert calls == []
+
+
+def test_lazy_json_truncates():
+    text = str(LazyJson({'key': 'x' * 100}, max_chars=20))
+    assert text.startswith('{"key": "xxxxxxxxxx') and text.endswith('(111 chars)')
+
+
+def test_json_formatter_carries_extra_fields():
+    line = JsonFormatter().format(record('applied %s', LazyJson({'vlan': 10}), device='sw1'))
+    entry = json.loads(line)
+    assert entry['message'] == 'applied {"vlan": 10}'
+    assert entry['device'] == 'sw1' and entry['level'] == 'INFO'
+
+
+def test_access_log_sampler_keeps_errors_and_one_in_rate():
+    sampler = AccessLogSampler(rate=10)
+    polled = [sampler.filter(record('%s %s %s', 'GET /api/status HTTP/1.1', '200', '-')) for _ in range(30)]
+    assert sum(polled) == 3
+    assert sampler.filter(record('%s %s %s', 'GET /api/status HTTP/1.1', '500', '-'))
+    assert sampler.filter(record('%s %s %s', 'POST /api/intent HTTP/1.1', '200', '-'))
+
+
+def test_pipeline_writes_json_lines(tmp_path):
+    pipeline = LogPipeline(tmp_path / 'app.log', console=False)
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    pipeline.start()
+    try:
+        logging.getLogger('pipeline-test').info("hello %s", LazyJson({'n': 1}))
+    finally:
+        pipeline.stop()
+        for handler in handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
+    lines = [json.loads(line) for line in (tmp_path / 'app.log').read_text().splitlines()]
+    assert [line['message'] for line in lines if line['logger'] == 'pipeline-test'] == ['hello {"n": 1}']
+    assert pipeline.stats()['dropped'] == 0
+
+
+def test_intent_payload_is_not_logged_at_info(client, caplog):
+    caplog.set_level(logging.INFO, logger='web_ui.app')
+    client.post('/api/intent', json={'network_name': 'secret-payload-marker'})
+    assert 'secret-payload-marker' not in caplog.text
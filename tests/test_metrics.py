@@ -0,0 +1,122 @@
+import gzip
+import socket
+import urllib.error
+import urllib.request
+
+import pytest
+from prometheus_client import CollectorRegistry
+from prometheus_client.openmetrics.exposition import CONTENT_TYPE_LATEST as OPENMETRICS
+from prometheus_client.parser import text_string_to_metric_families
+
+from failover.failover_manager import FailoverManager
+from monitoring.metrics import MetricsHub
+from monitoring.prometheus_exporter import NetworkMonitor
+
+
+def sample(device, interface, **values):
+    row = {'device': device, 'interface': interface, 'status': 1, 'speed_mbps': 1000.0,
+           'rx_bytes': 10, 'tx_bytes': 20, 'rx_bps': 8.0, 'tx_bps': 16.0}
+    row.update(values)
+    return row
+
+
+def families(payload):
+    return {family.name: family for family in text_string_to_metric_families(payload.decode())}
+
+
+@pytest.fixture
+def hub():
+    return MetricsHub(CollectorRegistry())
+
+
+def test_interface_families_come_from_the_collector_once(hub):
+    hub.interface_metrics.update([sample('sw1', 'ge0/1'), sample('sw1', 'ge0/2', status=0)])
+    payload, headers = hub.render()
+    assert headers == [('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')]
+    assert payload.count(b'# TYPE network_interface_status gauge') == 1
+    status = families(payload)['network_interface_status']
+    assert {s.labels['interface']: s.value for s in status.samples} == {'ge0/1': 1, 'ge0/2': 0}
+    rates = families(payload)['network_interface_rate_bps'].samples
+    assert sorted((s.labels['direction'], s.value) for s in rates) == [('rx', 8), ('rx', 8), ('tx', 16), ('tx', 16)]
+
+
+def test_interfaces_missing_from_the_latest_batch_drop_out(hub):
+    hub.interface_metrics.update([sample('sw1', 'ge0/1'), sample('sw1', 'ge0/2')])
+    hub.interface_metrics.update([sample('sw1', 'ge0/2')])
+    assert hub.interface_metrics.series_count() == 1
+    assert b'ge0/1' not in hub.render()[0]
+
+
+def test_openmetrics_and_gzip_are_negotiated(hub):
+    hub.interface_metrics.update([sample('sw1', 'ge0/1')])
+    payload, headers = hub.render('application/openmetrics-text', 'gzip, deflate')
+    assert dict(headers) == {'Content-Type': OPENMETRICS, 'Content-Encoding': 'gzip'}
+    text = gzip.decompress(payload)
+    assert text.endswith(b'# EOF\n') and b'network_interface_status{' in text
+
+
+def test_name_filter_restricts_families(hub):
+    hub.interface_metrics.update([sample('sw1', 'ge0/1')])
+    payload, _ = hub.render(names=['network_interface_status'])
+    assert set(families(payload)) == {'network_interface_status'}
+
+
+def test_failover_families_cover_every_registered_manager(hub):
+    managers = [FailoverManager(None, hub, name=f'shard{index}') for index in range(2)]
+    for manager in managers:
+        manager.add_failover_group({'name': 'uplink', 'primary-interfaces': ['a'], 'backup-interfaces': ['b']})
+    hub.publish_failover_event('shard1', 'uplink', 'failover', 'a', 'b')
+    parsed = families(hub.render()[0])
+    assert {s.labels['shard'] for s in parsed['failover_manager_status'].samples} == {'shard0', 'shard1'}
+    events = [s for s in parsed['failover_switch_events'].samples if s.name.endswith('_total')]
+    assert [(s.labels['shard'], s.labels['kind'], s.value) for s in events] == [('shard1', 'failover', 1)]
+
+
+def test_name_filter_renders_failover_families(hub):
+    manager = FailoverManager(None, hub, name='shard0')
+    manager.add_failover_group({'name': 'uplink', 'primary-interfaces': ['a'], 'backup-interfaces': ['b']})
+    hub.publish_failover_event('shard0', 'uplink', 'failover', 'a', 'b')
+    parsed = families(hub.render(names=['network_failover_active', 'failover_switch_events_total'])[0])
+    assert set(parsed) == {'network_failover_active', 'failover_switch_events'}
+    assert [s.labels['group'] for s in parsed['network_failover_active'].samples] == ['uplink']
+    assert [s.value for s in parsed['failover_switch_events'].samples] == [1]
+
+
+def test_exporter_http_handler():
+    hub = MetricsHub(CollectorRegistry())
+    hub.interface_metrics.update([sample('sw1', 'ge0/1')])
+    monitor = NetworkMonitor(port=0, metrics=hub)
+    server = monitor._start_http_server()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        request = urllib.request.Request(f'{base}/metrics', headers={
+            'Accept': 'application/openmetrics-text', 'Accept-Encoding': 'gzip'})
+        with urllib.request.urlopen(request) as response:
+            assert response.headers['Content-Type'] == OPENMETRICS
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert b'network_interface_status' in gzip.decompress(response.read())
+        with urllib.request.urlopen(f'{base}/metrics?name[]=network_ip_usage_percent') as response:
+            assert b'network_interface_status' not in response.read()
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f'{base}/favicon.ico')
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_app_exporter_serves_the_hub_with_demo_interfaces(app_module, monkeypatch):
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    monkeypatch.setattr(app_module, 'METRICS_PORT', port)
+    monkeypatch.setattr(app_module, 'metrics_exporter', None)
+    exporter = app_module.start_metrics_exporter()
+    try:
+        assert app_module.start_metrics_exporter() is exporter
+        app_module.telemetry_collector.sinks[-1]([sample('localhost', 'ge7/7')])
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+            assert b'interface="ge7/7"' in response.read()
+    finally:
+        exporter.http_server.shutdown()
+        exporter.http_server.server_close()
@@ -0,0 +1,72 @@
+import pytest
+
+from intent_engine.intent_store import CommitTimeout
+from intent_engine.qos_planner import QosAdmissionError, QosPlanner, parse_qos_config
+from netconf_client.interface_table import InterfaceTable
+
+
+def table(ports=8, speed='1G'):
+    records = [{'name': f'ge1/0/{index}', 'speed': speed, 'status': 'up', 'vlan': 100 + index % 2}
+               for index in range(ports)]
+    records.append({'name': 'te1/1/1', 'speed': '10G', 'status': 'up'})
+    return InterfaceTable.from_records(records)
+
+
+def test_parse_short_and_long_forms():
+    classes, uplinks, max_reserved = parse_qos_config(
+        {'voice': 'ge1/0/1', 'classes': {'video': {'guaranteed': '100M', 'vlan': 101}}, 'max_reserved': 0.8})
+    assert classes['voice'] == {'guaranteed': ['percent', 10.0], 'interfaces': ['ge1/0/1'], 'vlan': None}
+    assert classes['video'] == {'guaranteed': ['bps', 1e8], 'interfaces': None, 'vlan': [101]}
+    assert uplinks == {} and max_reserved == 0.8
+    for bad in ({'voice': {'guaranteed': '120%'}}, {'max_reserved': 0}, {'voice': {'guaranteed': 'fast'}}):
+        with pytest.raises(ValueError):
+            parse_qos_config(bad)
+
+
+def test_port_and_uplink_oversubscription_are_rejected():
+    planner = QosPlanner(table(ports=10))
+    uplinks = {'te1/1/1': 'ge1/0/'}
+    assert planner.apply({'classes': {'voice': {'guaranteed': '500M'}}, 'uplinks': uplinks}).admitted
+    plan = planner.plan({'classes': {'voice': {'guaranteed': '500M'}, 'video': {'guaranteed': '600M'}},
+                         'uplinks': uplinks})
+    assert not plan.admitted and {violation['kind'] for violation in plan.violations} == {'port', 'uplink'}
+    with pytest.raises(QosAdmissionError):
+        planner.apply(plan.config)
+    # The rejected plan left the committed reservations alone
+    assert planner.summary()['reserved_bps'] == 11 * 500e6
+
+
+def test_incremental_plan_touches_only_changed_classes():
+    planner = QosPlanner(table())
+    planner.apply({'classes': {'voice': {'guaranteed': '10%'}, 'cams': {'guaranteed': '1M', 'interfaces': ['ge1/0/3']}}})
+    plan = planner.plan({'classes': {'voice': {'guaranteed': '10%'}, 'cams': {'guaranteed': '2M', 'interfaces': ['ge1/0/3']}}})
+    assert plan.changed_classes == ['cams'] and plan.evaluated_ports == 1
+
+
+def test_speed_preview_rejects_unknown_speeds():
+    planner = QosPlanner(table())
+    config = {'classes': {'voice': {'guaranteed': '500M'}}}
+    assert not planner.plan(config, speed='100M').admitted
+    assert planner.plan(config, speed='10G').admitted
+    with pytest.raises(ValueError, match='Unknown interface speed'):
+        planner.plan(config, speed='2G')
+
+
+def test_plan_endpoint_rejects_unknown_speed(client):
+    response = client.post('/api/qos/plan?speed=2G', json={'voice': {'guaranteed': '1M'}})
+    assert response.status_code == 400 and 'Unknown interface speed' in response.get_json()['message']
+    assert client.post('/api/qos/plan?speed=10G', json={'voice': {'guaranteed': '1M'}}).get_json()['admitted']
+
+
+def test_nothing_is_committed_when_persisting_fails(app_module, client, monkeypatch):
+    before = (dict(app_module.qos_planner.config), app_module.ipam.stats()['pools'])
+
+    def stuck(seq):
+        raise CommitTimeout('stuck')
+
+    monkeypatch.setattr(app_module.intent_store, 'commit', stuck)
+    response = client.post('/api/advanced-config', json={
+        'qos_config': {'classes': {'voice': {'guaranteed': '1M'}}},
+        'network_services': {'dhcp_range': '192.168.100.50-192.168.100.60'}})
+    assert response.status_code == 503
+    assert (app_module.qos_planner.config, app_module.ipam.stats()['pools']) == before
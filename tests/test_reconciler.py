@@ -0,0 +1,121 @@
+import copy
+
+import pytest
+
+from netconf_client.demo_client import DemoNETCONFClient
+from netconf_client.reconciler import DriftReconciler, merkle_tree, normalize_config
+
+DESIRED = {
+    'network': {
+        'interfaces': [
+            {'name': 'ge0/1', 'enabled': True, 'speed': '1G', 'vlan': 100},
+            {'name': 'ge0/2', 'enabled': False, 'speed': '10G', 'vlan': 200},
+        ],
+        'network-ranges': {'ip-range': [{'name': 'staff', 'subnet': '10.1.0.0/16', 'vlan-id': 100}]},
+        'failover-system': {'enabled': True, 'failover-groups': []},
+    }
+}
+
+# What NETCONFClient._parse_config returns for DESIRED: text leaves, a one-entry list read back as its entry
+READ_BACK = {
+    'network': {
+        'interfaces': [
+            {'name': 'ge0/1', 'enabled': 'true', 'speed': '1G', 'vlan': '100'},
+            {'name': 'ge0/2', 'enabled': 'false', 'speed': '10G', 'vlan': '200'},
+        ],
+        'network-ranges': {'ip-range': {'name': 'staff', 'subnet': '10.1.0.0/16', 'vlan-id': '100'}},
+        'failover-system': {'enabled': 'true'},
+    }
+}
+
+
+def device(config):
+    client = DemoNETCONFClient('sw1', 830, 'admin', 'admin', interfaces=[])
+    client.connect()
+    client.current_config = copy.deepcopy(config)
+    return client
+
+
+def reconciler_for(devices, desired=DESIRED):
+    return DriftReconciler(devices, lambda device_id: desired, workers=2, min_device_interval=0)
+
+
+def test_read_back_config_hashes_like_the_intended_one():
+    assert normalize_config(READ_BACK) == normalize_config(DESIRED)
+    assert merkle_tree(normalize_config(READ_BACK))['hash'] == merkle_tree(normalize_config(DESIRED))['hash']
+    assert normalize_config({'a': None, 'b': []}) == {'a': ''}
+
+
+def test_xml_round_trip_is_in_sync():
+    pytest.importorskip('ncclient')
+    from netconf_client.netconf_manager import NETCONFClient
+    client = NETCONFClient('sw1', 830, 'admin', 'admin')
+    parsed = client._parse_config(f"<data>{client._dict_to_xml(DESIRED)}</data>")
+    assert normalize_config(parsed) == normalize_config(DESIRED)
+
+
+def test_device_in_read_back_schema_is_in_sync():
+    devices = {'sw1': device(READ_BACK)}
+    assert reconciler_for(devices).reconcile_device('sw1')['status'] == 'in_sync'
+
+
+def test_changed_leaf_is_patched_and_extra_entry_replaced():
+    drifted = copy.deepcopy(DESIRED)
+    drifted['network']['interfaces'][0]['speed'] = '100M'
+    extra = copy.deepcopy(DESIRED)
+    extra['network']['interfaces'].append({'name': 'lo99', 'enabled': True})
+    devices = {'sw1': device(drifted), 'sw2': device(extra)}
+    reconciler = reconciler_for(devices)
+
+    result = reconciler.reconcile_device('sw1')
+    assert result['status'] == 'repaired' and result['paths'] == ['network/interfaces/ge0/1/speed']
+    result = reconciler.reconcile_device('sw2')
+    assert result['status'] == 'repaired' and result['paths'] == ['network/interfaces/lo99']
+    assert [reconciler.reconcile_device(name)['status'] for name in devices] == ['in_sync', 'in_sync']
+    assert 'lo99' not in str(devices['sw2'].get_config())
+
+
+def test_sweep_subscribers_get_all_results_once():
+    devices = {f'sw{index}': device(DESIRED) for index in range(5)}
+    reconciler = reconciler_for(devices)
+    batches = []
+    reconciler.subscribe_sweep(batches.append)
+    summary = reconciler.sweep()
+    assert summary['in_sync'] == 5
+    assert len(batches) == 1 and sorted(result['device'] for result in batches[0]) == sorted(devices)
+
+
+def test_app_pushes_network_config_with_replace(app_module, monkeypatch):
+    client = device({'network': {'stale': 'entry'}})
+    monkeypatch.setitem(app_module.telemetry_collector.devices, 'sw-test', client)
+    manager = app_module.network_manager
+    manager.persist({'qos_config': {'voice': {'min_bandwidth': '10M'}}})
+    assert manager.push_device_config(['sw-test']) == ['sw-test']
+    assert client.get_config()['network'] == manager.device_config()['network']
+    assert 'stale' not in client.get_config()['network']
+    assert 'sw-test' not in app_module.intent_store.drifted_devices()
+
+    # A device that drifted after a failed push is repaired and marked applied again
+    client.current_config['network']['qos_config'] = 'changed'
+    app_module.intent_store.mark_applied('sw-test', 'stale-digest')
+    assert 'sw-test' in manager.reconcile_drifted()
+    assert 'sw-test' not in app_module.intent_store.drifted_devices()
+
+
+def test_repairs_push_the_intended_config_not_its_normalized_form(monkeypatch):
+    drifted = copy.deepcopy(READ_BACK)
+    drifted['network']['interfaces'][0]['vlan'] = '999'
+    drifted['network']['network-ranges']['ip-range']['vlan-id'] = '999'
+    client = device(drifted)
+    sent = []
+    monkeypatch.setattr(client, 'send_config', lambda config: sent.append(config) or True)
+    result = reconciler_for({'sw1': client}).reconcile_device('sw1')
+
+    assert result['paths'] == ['network/interfaces/ge0/1/vlan', 'network/network-ranges/ip-range/vlan-id']
+    assert sent == [{'network': {'interfaces': [{'name': 'ge0/1', 'vlan': 100}],
+                                 'network-ranges': DESIRED['network']['network-ranges']}}]
+
+    client = device({'network': {'stale': 'entry'}})
+    monkeypatch.setattr(client, 'replace_config', lambda config: sent.append(config) or True)
+    reconciler_for({'sw2': client}).reconcile_device('sw2')
+    assert sent[-1] is DESIRED
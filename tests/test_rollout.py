@@ -0,0 +1,134 @@
+import copy
+import threading
+import time
+
+import pytest
+
+from intent_engine.rollout import RolloutExecutor, plan_rollout
+from netconf_client.demo_client import DemoNETCONFClient
+
+CONFIG = {
+    'network': {
+        'interfaces': [{'name': 'eth0', 'vlan': 10}, {'name': 'eth1', 'vlan': 10}],
+        'network-ranges': {'ip-range': [{'name': 'main', 'subnet': '10.0.0.0/24', 'vlan-id': 10}]},
+        'failover-system': {'enabled': True, 'failover-groups': [
+            {'name': 'primary', 'primary-interfaces': ['eth0'], 'backup-interfaces': ['eth1']}]},
+        'monitoring': {'enabled': True, 'monitored-metrics': []}
+    }
+}
+
+
+class RecordingDevice(DemoNETCONFClient):
+    """Demo client that records its operations and the devices busy at the same time"""
+
+    lock = threading.Lock()
+    active = set()
+    peak_devices = 0
+
+    def __init__(self, name, running=None, fail_on=None):
+        super().__init__(name, 830, 'admin', 'admin')
+        self.connected = True
+        self.current_config = copy.deepcopy(running or {})
+        self.fail_on = fail_on
+        self.operations = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _rpc(self, operation):
+        with RecordingDevice.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            RecordingDevice.active.add(self.host)
+            RecordingDevice.peak_devices = max(RecordingDevice.peak_devices, len(RecordingDevice.active))
+        time.sleep(0.01)
+        with RecordingDevice.lock:
+            self.in_flight -= 1
+            RecordingDevice.active.discard(self.host)
+        self.operations.append(operation)
+
+    def get_config(self):
+        self._rpc('get')
+        return super().get_config()
+
+    def send_config(self, config):
+        section = next(iter(config['network']))
+        self._rpc(section)
+        if section == self.fail_on:
+            return False
+        return super().send_config(config)
+
+    def replace_config(self, config):
+        self._rpc('replace')
+        return super().replace_config(config)
+
+
+def test_plan_orders_sections_by_their_references():
+    plan = plan_rollout({'sw1': CONFIG})
+    order = [step.section for step in plan.steps]
+    assert order.index('network-ranges') < order.index('interfaces') < order.index('failover-system')
+    assert order[-1] is None
+    # ranges -> interfaces -> failover-system -> commit
+    assert plan.critical_path() == 4
+
+
+def test_plan_device_order_and_errors():
+    plan = plan_rollout({'core': CONFIG, 'access': CONFIG}, after={'access': ['core']})
+    assert plan.critical_path() == 8
+    with pytest.raises(ValueError, match='unknown device'):
+        plan_rollout({'core': CONFIG}, after={'core': ['edge']})
+    with pytest.raises(ValueError, match='cycle'):
+        plan_rollout({'a': CONFIG, 'b': CONFIG}, after={'a': ['b'], 'b': ['a']})
+
+
+def test_devices_run_in_parallel_one_operation_each():
+    RecordingDevice.peak_devices = 0
+    devices = {f'sw{index}': RecordingDevice(f'sw{index}') for index in range(4)}
+    result = RolloutExecutor(max_workers=4).run(plan_rollout(dict.fromkeys(devices, CONFIG)), devices)
+
+    assert result.success and result.completed == list(devices)
+    assert RecordingDevice.peak_devices > 1
+    for device in devices.values():
+        assert device.peak_in_flight == 1
+        assert device.operations[0] == 'get'
+        assert device.operations.index('network-ranges') < device.operations.index('interfaces')
+        # Nothing stale on a fresh device, so no replace
+        assert 'replace' not in device.operations
+        assert device.current_config == CONFIG
+
+
+def test_commit_replaces_when_entries_were_removed():
+    running = copy.deepcopy(CONFIG)
+    running['network']['interfaces'].append({'name': 'eth9', 'vlan': 10})
+    device = RecordingDevice('sw1', running)
+    result = RolloutExecutor().run(plan_rollout({'sw1': CONFIG}), {'sw1': device})
+    assert result.success
+    assert device.operations[-1] == 'replace'
+    assert device.current_config == CONFIG
+
+
+def test_failure_stops_and_rolls_back_unfinished_devices():
+    running = {'network': {'monitoring': {'enabled': False}}}
+    core = RecordingDevice('core')
+    access = RecordingDevice('access', running, fail_on='interfaces')
+    edge = RecordingDevice('edge')
+    clients = {'core': core, 'access': access, 'edge': edge}
+    plan = plan_rollout(dict.fromkeys(clients, CONFIG), after={'access': ['core'], 'edge': ['access']})
+
+    executor = RolloutExecutor()
+    result = executor.run(plan, clients)
+    summary = result.to_dict()
+    assert not result.success
+    assert summary['failed_step']['device'] == 'access' and summary['failed_step']['section'] == 'interfaces'
+    assert result.completed == ['core'] and core.current_config == CONFIG
+    assert result.rolled_back == ['access'] and access.current_config == running
+    assert edge.operations == []
+    assert summary['skipped'] > 0
+    assert executor.last_result is result
+
+
+def test_rollout_endpoint(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module.demo_device, 'connected', True)
+    assert client.post('/api/advanced-config', json={'qos_config': {}}).status_code == 200
+    body = client.get('/api/rollout').get_json()['rollout']
+    assert body['status'] == 'completed'
+    assert body['completed'] == ['localhost']
@@ -0,0 +1,61 @@
+import pytest
+
+from intent_engine.security_compiler import compile_security_policy, parse_security_rules
+
+RULES = [
+    {'action': 'deny', 'source': '10.0.0.0/8', 'destination': 'any'},
+    {'action': 'allow', 'source': '10.1.0.0/16', 'destination': 'any'},
+    {'action': 'allow', 'source': '192.168.0.0/24', 'destination': '172.16.0.1', 'protocol': 'tcp', 'port': 443},
+    {'action': 'allow', 'source': '192.168.1.0/24', 'destination': '172.16.0.1', 'protocol': 'tcp', 'port': 443},
+    {'action': 'deny', 'source': 'any', 'destination': '172.16.0.0/12'},
+    {'action': 'deny', 'source': 'any', 'destination': 'any'},
+]
+
+
+def test_shadowed_redundant_and_conflicting_rules():
+    policy = compile_security_policy(RULES)
+    assert policy.findings[0] == {'rule': 1, 'type': 'shadowed', 'by': 0}
+    assert {'rule': 4, 'type': 'conflict', 'with': 2, 'kind': 'generalization'} in policy.findings
+    # Trailing denies only repeat the default action
+    assert [finding['rule'] for finding in policy.findings if finding['type'] == 'redundant'] == [4, 5]
+    summary = policy.summary()
+    assert (summary['shadowed'], summary['redundant'], summary['conflicts']) == (1, 2, 4)
+
+
+def test_earlier_rule_with_same_action_makes_a_rule_redundant():
+    policy = compile_security_policy(RULES[:1] + [dict(RULES[0], source='10.2.0.0/16')], default_action='allow')
+    assert policy.findings == [{'rule': 1, 'type': 'redundant', 'by': 0}]
+    assert len(policy.acl) == 1
+
+
+def test_adjacent_rules_are_merged():
+    policy = compile_security_policy(RULES)
+    merged = [entry for entry in policy.acl if entry['action'] == 'allow']
+    assert merged == [{'sequence': 20, 'action': 'allow', 'protocol': 'tcp', 'source': '192.168.0.0/23',
+                       'destination': '172.16.0.1/32', 'source_port': 'any', 'destination_port': '443',
+                       'rules': [2, 3]}]
+    lines = policy.render()
+    assert lines[2] == ' 20 permit tcp 192.168.0.0 0.0.1.255 host 172.16.0.1 eq 443'
+    assert lines[-1] == ' 30 deny ip any any'
+
+
+@pytest.mark.parametrize('rule', [
+    {'action': 'maybe'},
+    {'action': 'allow', 'source': '10.0.0.300/8'},
+    {'action': 'allow', 'protocol': 'icmp', 'port': 80},
+    {'action': 'allow', 'protocol': 'tcp', 'port': '90-80'},
+])
+def test_invalid_rules_name_their_position(rule):
+    with pytest.raises(ValueError, match='Security rule 1'):
+        parse_security_rules([RULES[0], rule])
+
+
+def test_security_endpoint(client):
+    response = client.post('/api/advanced-config', json={'security_rules': RULES})
+    assert response.status_code == 200
+    body = client.get('/api/security').get_json()
+    assert body['summary']['rules'] == len(RULES)
+    assert body['config'][0] == 'ip access-list extended CAMPUS-SECURITY'
+
+    assert client.post('/api/advanced-config', json={'security_rules': [{'action': 'maybe'}]}).status_code == 400
+    assert client.post('/api/advanced-config', json={'security_rules': []}).status_code == 200
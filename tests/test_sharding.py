@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+
+from intent_engine.sharding import HashRing, Partition, ShardedIntentRouter, partition_of
+
+
+def intent(building, speed='1G'):
+    return {'network_name': f'campus-{building}', 'building': building, 'network_range': '10.20.0.0',
+            'subnet_mask': '255.255.0.0', 'interface_speed': speed, 'vlans': [{'id': 120}]}
+
+
+def test_partition_key_preference():
+    assert partition_of({'network_name': 'n', 'device_group': 'g'}) == 'g'
+    assert partition_of({'network_name': 'n', 'building': 'b', 'device_group': 'g'}) == 'b'
+    with pytest.raises(ValueError):
+        partition_of({})
+
+
+def test_ring_moves_only_keys_of_the_new_node():
+    ring = HashRing(['a', 'b', 'c'])
+    keys = [f'building{index}' for index in range(2000)]
+    before = {key: ring.owner(key) for key in keys}
+    ring.add_node('d')
+    moved = [key for key in keys if ring.owner(key) != before[key]]
+    assert all(ring.owner(key) == 'd' for key in moved)
+    assert 0.1 < len(moved) / len(keys) < 0.4
+
+
+def test_partition_applies_intent_in_process():
+    partition = Partition('b1')
+    try:
+        result = partition.apply_intent(intent('b1'))
+        assert result == {'interfaces': 4, 'failover_groups': 1}
+        assert partition.export()['intent']['building'] == 'b1'
+    finally:
+        partition.close()
+
+
+def test_add_worker_blocks_routing_until_state_moved():
+    router = ShardedIntentRouter(1).start()
+    try:
+        buildings = [f'b{index}' for index in range(12)]
+        for building in buildings:
+            router.apply_intent(intent(building))
+        owners = dict(router.partitions)
+        added = threading.Thread(target=router.add_worker)
+        added.start()
+        # Requests issued while the pool grows see the migrated state, never an empty partition
+        states = [router.partition_state(building) for building in buildings]
+        added.join()
+        assert all(state['intent']['building'] == building for state, building in zip(states, buildings))
+        moved = [building for building in buildings if router.partitions[building] != owners[building]]
+        assert moved and all(router.partitions[building] == 'worker1' for building in moved)
+        for building in moved:
+            assert router.partition_state(building)['applied'] == 1
+    finally:
+        router.stop()
+
+
+class RecordingRouter:
+    def __init__(self, error=None):
+        self.applied = []
+        self.partitions = {}
+        self.error = error
+
+    def apply_intent(self, intent_data):
+        if self.error:
+            raise self.error
+        self.applied.append(intent_data)
+        return {'partition': partition_of(intent_data), 'worker': 'worker0'}
+
+
+def test_partitioned_intent_is_validated_and_persisted(app_module, client, monkeypatch):
+    router = RecordingRouter()
+    monkeypatch.setattr(app_module, 'intent_router', router)
+    bad = dict(intent('b-api'), security_rules=[{'action': 'teleport'}])
+    assert client.post('/api/intent', json=bad).status_code == 400
+    assert router.applied == []
+
+    assert client.post('/api/intent', json=intent('b-api')).status_code == 200
+    assert router.applied == [intent('b-api')]
+    sections = app_module.intent_store.state()['sections']
+    assert sections[app_module.PARTITION_SECTION + 'b-api'] == intent('b-api')
+
+    router.applied.clear()
+    assert app_module.network_manager.restore_partitions(router) >= 1
+    assert intent('b-api') in router.applied
+
+
+def test_partition_intent_is_persisted_only_once_applied(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, 'intent_router', RecordingRouter(RuntimeError('worker0: worker crashed')))
+    response = client.post('/api/intent', json=intent('b-failed'))
+    assert response.status_code == 502 and 'worker crashed' in response.get_json()['message']
+    assert app_module.PARTITION_SECTION + 'b-failed' not in app_module.intent_store.state()['sections']
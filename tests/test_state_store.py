@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from failover.failover_manager import FailoverManager
+from failover.state_store import StateStore, freeze, thaw
+from monitoring.metrics import MetricsHub
+
+
+def test_snapshots_are_immutable_and_versioned():
+    store = StateStore({'a': {'x': [1, 2]}})
+    first = store.snapshot()
+    store.put('b', {'y': 1})
+    assert first.version == 0 and 'b' not in first
+    assert store.version == 1
+    with pytest.raises(TypeError):
+        first.data['a']['x'] = 3
+    assert thaw(store.snapshot().data) == {'a': {'x': [1, 2]}, 'b': {'y': 1}}
+
+
+def test_unchanged_values_are_shared_between_versions():
+    store = StateStore({'a': {'x': 1}})
+    before = store.snapshot().data['a']
+    store.put('b', 2)
+    assert store.snapshot().data['a'] is before
+
+
+def test_compare_and_update_skips_keys_replaced_meanwhile():
+    store = StateStore({'a': 1, 'b': 2})
+    expected = store.snapshot().data
+    store.put('b', 20)
+    applied = []
+    snapshot = store.compare_and_update(expected, {'a': 10, 'b': 200, 'c': 3}, applied)
+    assert applied == ['a']
+    assert dict(snapshot.data) == {'a': 10, 'b': 20}
+
+
+def test_freeze_thaw_round_trip():
+    value = {'a': [1, {'b': (2, 3)}], 'c': {'d'}}
+    assert thaw(freeze(value)) == {'a': [1, {'b': [2, 3]}], 'c': ['d']}
+
+
+def test_concurrent_writers_do_not_lose_updates():
+    store = StateStore()
+
+    def writer(index):
+        for step in range(200):
+            store.put(f'{index}.{step}', step)
+
+    threads = [threading.Thread(target=writer, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(store.snapshot()) == 800 and store.version == 800
+
+
+def test_no_switchover_for_group_replaced_during_the_check():
+    hub = MetricsHub()
+    manager = FailoverManager(None, hub, name='cas')
+    group = {'name': 'uplink', 'primary-interfaces': ['a'], 'backup-interfaces': ['b']}
+    manager.add_failover_group(group)
+    switched = []
+    manager._activate_interface = switched.append
+    manager._check_interface_health = lambda name: name != 'a'
+    for _ in range(manager.FAILOVER_THRESHOLD - 1):
+        manager.run_health_checks()
+
+    def check_and_replace(name):
+        # Another writer replaces the group while this check is still evaluating it
+        manager.add_failover_group(group)
+        return name != 'a'
+
+    manager._check_interface_health = check_and_replace
+    manager.run_health_checks()
+    assert switched == [] and hub.event_counts() == {}
+    assert manager.snapshot().data['uplink']['current_active'] == 'a'
+
+    manager._check_interface_health = lambda name: name != 'a'
+    for _ in range(manager.FAILOVER_THRESHOLD):
+        manager.run_health_checks()
+    assert switched == ['b'] and hub.event_counts() == {('cas', 'uplink', 'failover'): 1}
+
+
+def test_failover_endpoint_serves_snapshot(app_module, client):
+    app_module.failover_manager.set_failover_groups(
+        [{'name': 'uplink', 'primary-interfaces': ['gigabitethernet0/1'], 'backup-interfaces': ['gigabitethernet0/2']}])
+    body = client.get('/api/failover').get_json()
+    assert body['data']['uplink']['current_active'] == 'gigabitethernet0/1'
+    assert body['version'] == app_module.failover_manager.snapshot().version
@@ -0,0 +1,77 @@
+from monitoring.telemetry_collector import COUNTER64_MODULUS, TelemetryCollector, counter_delta
+
+
+class FakeDevice:
+    def __init__(self, speed=1_000_000_000):
+        self.speed = speed
+        self.in_octets = 0
+        self.out_octets = 0
+        self.fail = False
+
+    def get_interface_counters(self):
+        if self.fail:
+            raise ConnectionError('unreachable')
+        return [{'name': 'ge0/1', 'oper_status': 'up', 'speed': self.speed,
+                 'in_octets': self.in_octets, 'out_octets': self.out_octets}]
+
+
+def test_counter_delta_wraps():
+    assert counter_delta(10, 25) == 15
+    assert counter_delta(COUNTER64_MODULUS - 5, 10) == 15
+
+
+def test_rates_from_deltas(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('monitoring.telemetry_collector.time.monotonic', lambda: now[0])
+    device = FakeDevice()
+    collector = TelemetryCollector({'sw1': device}, max_workers=2)
+    received = []
+    collector.add_sink(received.append)
+
+    first = collector.collect_once()
+    assert first[0]['rx_bps'] == 0.0 and first[0]['status'] == 1 and first[0]['speed_mbps'] == 1000.0
+
+    now[0] += 10
+    device.in_octets = 125_000_000
+    device.out_octets = 12_500_000
+    sample = collector.collect_once()[0]
+    assert sample['rx_delta'] == 125_000_000
+    assert sample['rx_bps'] == 100_000_000.0
+    assert sample['tx_bps'] == 10_000_000.0
+    assert len(received) == 2
+    collector.stop()
+
+
+def test_counter_reset_drops_the_interval(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('monitoring.telemetry_collector.time.monotonic', lambda: now[0])
+    device = FakeDevice(speed=1_000_000)
+    device.in_octets = 5_000_000
+    collector = TelemetryCollector({'sw1': device}, max_workers=1)
+    collector.collect_once()
+
+    now[0] += 1
+    device.in_octets = 100
+    sample = collector.collect_once()[0]
+    assert sample['rx_delta'] == 0 and sample['rx_bps'] == 0.0
+    collector.stop()
+
+
+def test_failing_device_and_sink_do_not_stop_the_cycle():
+    healthy, broken = FakeDevice(), FakeDevice()
+    broken.fail = True
+    collector = TelemetryCollector({'sw1': healthy, 'sw2': broken}, max_workers=2)
+
+    def bad_sink(batch):
+        raise RuntimeError('sink down')
+
+    received = []
+    collector.add_sink(bad_sink)
+    collector.add_sink(received.append)
+    batch = collector.collect_once()
+    assert [sample['device'] for sample in batch] == ['sw1']
+    assert received == [batch]
+
+    collector.remove_device('sw1')
+    assert collector._previous == {}
+    collector.stop()
@@ -0,0 +1,68 @@
+from monitoring.tsdb import TimeSeriesStore
+
+
+def test_raw_points_and_missing_buckets():
+    store = TimeSeriesStore(initial_capacity=2)
+    for second in (100, 101, 103):
+        store.append('a', second * 2.0, timestamp=second)
+    series = store.query('a', 100, 103)
+    assert series['step'] == 1
+    assert series['timestamps'] == [100, 101, 102, 103]
+    assert series['values'] == [200.0, 202.0, None, 206.0]
+    assert store.query('missing', 0, 10) is None
+
+
+def test_rollups_keep_mean_min_max():
+    store = TimeSeriesStore()
+    for second in range(120):
+        store.append('a', float(second), timestamp=7200 + second)
+    series = store.query('a', 0, 7200 + 119, step=60)
+    assert series['step'] == 60
+    assert series['values'][-2:] == [29.5, 89.5]
+    assert series['min'][-1] == 60 and series['max'][-1] == 119
+
+
+def test_ring_overwrites_old_buckets():
+    store = TimeSeriesStore(resolutions=((1, 10),))
+    store.append('a', 1.0, timestamp=0)
+    store.append('a', 2.0, timestamp=10)
+    series = store.query('a', 0, 10)
+    # Slot 0 now holds t=10, so t=0 reads as missing and the window is clamped to the ring
+    assert series['timestamps'][0] == 1 and series['values'][-1] == 2.0
+
+
+def test_late_sample_does_not_wipe_newer_buckets():
+    store = TimeSeriesStore(resolutions=((1, 10), (60, 10)))
+    store.append('a', 2.0, timestamp=110)
+    # Same raw slot as t=110 but an older bucket; still within the rollup tier's window
+    store.append('a', 1.0, timestamp=100)
+    assert store.query('a', 110, 110)['values'] == [2.0]
+    assert store.query('a', 100, 100)['values'] == [None]
+    assert store.query('a', 60, 110, step=60)['values'] == [1.5]
+
+
+def test_grows_past_initial_capacity():
+    store = TimeSeriesStore(initial_capacity=2)
+    store.append_many([f's{index}' for index in range(5)], [float(index) for index in range(5)], timestamp=50)
+    assert store.capacity >= 5
+    assert store.query('s4', 50, 50)['values'] == [4.0]
+    assert store.memory_bytes() == store.bytes_per_series * store.capacity
+
+
+def test_history_endpoint_accepts_epoch_zero(app_module, client):
+    app_module.init_analytics()
+    key = ('localhost', 'eth9', 'rx_bps')
+    for second in range(6):
+        app_module.interface_history.append(key, float(second), timestamp=second)
+
+    response = client.get('/api/history?interface=eth9&start=0&end=5')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['timestamps'] == [0, 1, 2, 3, 4, 5]
+    assert body['values'] == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+
+    assert client.get('/api/history?interface=eth9&start=10&end=5').status_code == 400
+    assert client.get('/api/history?interface=eth9&metric=nope').status_code == 400
+    assert client.get('/api/history?interface=unknown').status_code == 404
+    # end=0 is the epoch, not "now"
+    assert client.get('/api/history?interface=eth9&end=0&range=2').get_json()['values'] == [None, None, 0.0]
@@ -0,0 +1,71 @@
+import threading
+
+from flask import Flask, request
+
+from web_ui.versioning import VersionedResource
+
+
+def resource_with(state):
+    renders = []
+
+    def render():
+        renders.append(state['value'])
+        return {'value': state['value']}
+
+    return VersionedResource('test', render, lambda: state['value']), renders
+
+
+def test_renders_once_per_state_change():
+    state = {'value': 1}
+    resource, renders = resource_with(state)
+    first = resource.current()
+    assert resource.current() == first
+    assert first[2] == b'{"value":1}'
+
+    state['value'] = 2
+    version, etag, body = resource.current()
+    assert version == first[0] + 1 and etag != first[1]
+    assert renders == [1, 2]
+
+
+def test_wait_returns_on_notify_or_timeout():
+    state = {'value': 1}
+    resource, _ = resource_with(state)
+    version = resource.current()[0]
+    assert resource.wait(version, 0.01)[0] == version
+
+    def change():
+        state['value'] = 2
+        resource.notify()
+
+    timer = threading.Timer(0.05, change)
+    timer.start()
+    assert resource.wait(version, 5)[0] == version + 1
+    timer.join()
+
+
+def test_respond_etag_and_long_poll():
+    state = {'value': 1}
+    resource, _ = resource_with(state)
+    app = Flask(__name__)
+    app.add_url_rule('/r', 'r', lambda: resource.respond(request))
+    client = app.test_client()
+
+    response = client.get('/r')
+    assert response.status_code == 200 and response.get_json() == {'value': 1}
+    etag = response.headers['ETag']
+    version = response.headers['X-Resource-Version']
+    assert client.get('/r', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get(f'/r?wait={version}&timeout=0').status_code == 304
+    assert client.get('/r?wait=x').status_code == 400
+
+    state['value'] = 2
+    response = client.get(f'/r?wait={version}&timeout=0')
+    assert response.status_code == 200 and response.get_json() == {'value': 2}
+
+
+def test_status_and_metrics_endpoints_support_etags(client):
+    for path in ('/api/status', '/api/metrics'):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert client.get(path, headers={'If-None-Match': response.headers['ETag']}).status_code == 304